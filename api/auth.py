@@ -0,0 +1,156 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class TokenCache:
+    """
+    Bounded cache of already verified JWT claims.
+
+    A token's signature only needs to be checked once: later requests with
+    the same token are served from memory until the token's own ``exp``
+    claim passes. Tokens without ``exp`` are never cached. When full, the
+    least recently used token is evicted.
+    """
+
+    def __init__(self, max_entries: int = 10000, clock: Callable[[], float] = time.time):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached tokens
+            clock: Source of the current Unix time
+        """
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: 'OrderedDict[str, Tuple[float, Dict[str, Any]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up the verified claims of a token.
+
+        Args:
+            token: Encoded JWT
+
+        Returns:
+            The claims, or None if the token is unknown or expired
+        """
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None:
+                if entry[0] > self.clock():
+                    self._entries.move_to_end(token)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[token]
+            self.misses += 1
+            return None
+
+    def set(self, token: str, claims: Dict[str, Any]) -> None:
+        """
+        Remember the claims of a freshly verified token.
+
+        Args:
+            token: Encoded JWT
+            claims: Decoded claims, including "exp"
+        """
+        expires_at = claims.get("exp")
+        if expires_at is None or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[token] = (float(expires_at), claims)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget every cached token (e.g. after rotating the signing key)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with size, hits and misses
+        """
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class ServiceKeyStore:
+    """
+    Long-lived API keys of machine clients.
+
+    Only SHA-256 digests of the keys are kept. A presented key is hashed and
+    looked up by digest: a single dictionary probe regardless of the number
+    of keys, and since the probe compares digests rather than the secrets,
+    its timing does not reveal how much of a key an attacker guessed.
+    """
+
+    def __init__(self, keys: Optional[Dict[str, str]] = None):
+        """
+        Initialize the store.
+
+        Args:
+            keys: Plain API keys keyed by service name
+        """
+        self._digests: Dict[bytes, str] = {}
+        for name, key in (keys or {}).items():
+            self.add(name, key)
+
+    def __len__(self) -> int:
+        return len(self._digests)
+
+    @staticmethod
+    def digest(key: str) -> bytes:
+        """SHA-256 digest of an API key."""
+        return hashlib.sha256(key.encode()).digest()
+
+    @classmethod
+    def from_env(cls, value: Optional[str]) -> 'ServiceKeyStore':
+        """
+        Build a store from a "name:key,name:key" string.
+
+        Args:
+            value: Environment variable value (None for no keys)
+
+        Returns:
+            Configured store
+        """
+        keys = {}
+        for entry in (value or "").split(","):
+            name, _, key = entry.strip().partition(":")
+            if name and key:
+                keys[name] = key
+        return cls(keys)
+
+    def add(self, name: str, key: str) -> None:
+        """
+        Register an API key.
+
+        Args:
+            name: Service name
+            key: Plain API key
+        """
+        self._digests[self.digest(key)] = name
+
+    def authenticate(self, key: str) -> Optional[str]:
+        """
+        Check a presented API key.
+
+        Args:
+            key: Presented API key
+
+        Returns:
+            Service name if the key is valid, None otherwise
+        """
+        return self._digests.get(self.digest(key))
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List
+
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
+
+from api.codecs import decode_document, dumps_json, media_type
+from api.executor import ComputeTimeout
+
+logger = logging.getLogger(__name__)
+
+NDJSON = "application/x-ndjson"
+
+
+def batch_items(document: Any, max_items: int) -> List[Any]:
+    """
+    Get the items of a batch request document.
+
+    Batches are either a bare list or ``{"items": [...]}``.
+
+    Args:
+        document: Decoded request body
+        max_items: Largest accepted batch
+
+    Returns:
+        List of undecoded items
+
+    Raises:
+        HTTPException: 400 if there is no item list, 413 if it is too long
+    """
+    items = document.get("items") if isinstance(document, dict) else document
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Batch body must be a list or {\"items\": [...]}")
+    if len(items) > max_items:
+        raise HTTPException(status_code=413, detail=f"Batch of {len(items)} items exceeds the limit of {max_items}")
+    return items
+
+
+async def read_batch_payload(request: Request, max_items: int) -> List[Any]:
+    """
+    Read the items of a JSON or MessagePack batch request.
+
+    Args:
+        request: Incoming request
+        max_items: Largest accepted batch
+
+    Returns:
+        List of undecoded items
+    """
+    document = decode_document(await request.body(), media_type(request.headers.get("content-type")))
+    return batch_items(document, max_items)
+
+
+def item_error(error: Exception) -> str:
+    """
+    Describe why a single batch item failed.
+
+    Args:
+        error: Exception raised while processing the item
+
+    Returns:
+        Message for the item's result line
+    """
+    if isinstance(error, ValidationError):
+        return "; ".join(f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors())
+    if isinstance(error, (ValueError, ComputeTimeout)):
+        return str(error)
+    if isinstance(error, HTTPException):
+        return str(error.detail)
+    return "Internal server error"
+
+
+async def stream_batch(items: List[Any],
+                       process: Callable[[Any], Awaitable[Dict[str, Any]]],
+                       max_concurrency: int) -> AsyncIterator[bytes]:
+    """
+    Process batch items concurrently and yield NDJSON result lines as they finish.
+
+    Every item produces exactly one line, ``{"index": i, "status": "ok",
+    "result": ...}`` or ``{"index": i, "status": "error", "error": ...}``, in
+    completion order. A failing or slow item only affects its own line. At
+    most ``max_concurrency`` items are in flight; the compute executor bounds
+    the actual parallelism. If the client disconnects, unfinished items are
+    cancelled.
+
+    Args:
+        items: Undecoded batch items
+        process: Coroutine function handling one item
+        max_concurrency: Maximum number of items in flight
+
+    Yields:
+        One encoded NDJSON line per item
+    """
+    async def run(index: int, item: Any) -> Dict[str, Any]:
+        try:
+            return {"index": index, "status": "ok", "result": await process(item)}
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if not isinstance(e, (ValueError, ComputeTimeout, HTTPException)):
+                logger.error(f"Error in batch item {index}: {str(e)}")
+            return {"index": index, "status": "error", "error": item_error(e)}
+
+    pending = set()
+    queue = iter(enumerate(items))
+    try:
+        while True:
+            for index, item in queue:
+                pending.add(asyncio.ensure_future(run(index, item)))
+                if len(pending) >= max_concurrency:
+                    break
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield dumps_json(task.result()) + b"\n"
+    finally:
+        for task in pending:
+            task.cancel()
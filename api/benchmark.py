@@ -0,0 +1,503 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import httpx
+
+try:
+    import websockets
+except ImportError:  # pragma: no cover - only needed for WebSocket clients against --url
+    websockets = None
+
+# Load test of the HTTP and WebSocket API: ``python -m api.benchmark``.
+# By default the app is driven in-process through its ASGI interface, so no
+# server, port or WebSocket library is needed; --url targets a running server.
+
+REPORT_VERSION = 1
+DEFAULT_TEST_DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_data")
+# Relative request weights per endpoint
+DEFAULT_MIX = {"grid_currents": 4, "grid_validate": 2, "ml_predict": 3, "ml_anomalies": 1}
+ENDPOINTS = {
+    "grid_currents": "/grid/currents",
+    "grid_validate": "/grid/validate",
+    "ml_predict": "/ml/predict",
+    "ml_anomalies": "/ml/anomalies"
+}
+WS_PING = "ws_ping"
+
+
+class PayloadFactory:
+    """
+    Generates request bodies shaped like the sample data in ``test_data``.
+
+    Grids follow the topology of ``sample_grid.json`` with jittered node
+    voltages; voltage series repeat the daily profile of
+    ``voltage_data.json`` with noise and occasional spikes. Every body is
+    new, so result caches do not turn the benchmark into a cache test.
+    """
+
+    def __init__(self, test_data: str = DEFAULT_TEST_DATA, series_length: int = 168,
+                 grid_copies: int = 1, predict_model: str = "naive", sequence_length: int = 24):
+        """
+        Initialize the factory.
+
+        Args:
+            test_data: Directory with sample_grid.json and voltage_data.json
+            series_length: Values per voltage series
+            grid_copies: Copies of the sample topology per grid, tied together by extra lines
+            predict_model: ``model`` of /ml/predict requests
+            sequence_length: ``sequence_length`` of /ml/predict requests
+        """
+        with open(os.path.join(test_data, "sample_grid.json")) as f:
+            grid = json.load(f)
+        with open(os.path.join(test_data, "voltage_data.json")) as f:
+            voltages = json.load(f)
+        self.node_ids = [node["id"] for node in grid["nodes"]]
+        self.voltages = np.array([node["voltage"] for node in grid["nodes"]], dtype=np.float64)
+        self.links = [(link["id"], link["source"], link["target"], link["resistance"]) for link in grid["links"]]
+        self.profile = np.array([sample["value"] for sample in voltages["voltage_series"]], dtype=np.float64)
+        self.series_length = series_length
+        self.grid_copies = grid_copies
+        self.predict_model = predict_model
+        self.sequence_length = sequence_length
+
+    def grid(self, rng: np.random.Generator) -> Dict[str, Any]:
+        """Build a GridModel document."""
+        nodes, lines = [], []
+        for copy in range(self.grid_copies):
+            suffix = f"-{copy}" if copy else ""
+            voltages = self.voltages * (1 + rng.normal(0, 0.01, len(self.voltages)))
+            nodes += [{"node_id": node_id + suffix, "voltage": float(max(v, 0.0))}
+                      for node_id, v in zip(self.node_ids, voltages)]
+            lines += [{"line_id": line_id + suffix, "from_node_id": source + suffix,
+                       "to_node_id": target + suffix, "resistance": resistance}
+                      for line_id, source, target, resistance in self.links]
+            if copy:
+                lines.append({"line_id": f"TIE{suffix}", "from_node_id": self.node_ids[0],
+                              "to_node_id": self.node_ids[0] + suffix, "resistance": 1.0})
+        return {"nodes": nodes, "lines": lines}
+
+    def series(self, rng: np.random.Generator) -> List[float]:
+        """Build a voltage series: the daily profile with noise and rare spikes."""
+        values = np.resize(self.profile, self.series_length) + rng.normal(0, 0.3, self.series_length)
+        spikes = rng.random(self.series_length) < 0.01
+        values[spikes] += rng.choice([-15.0, 15.0], int(spikes.sum()))
+        return values.round(2).tolist()
+
+    def body(self, endpoint: str, rng: np.random.Generator) -> Dict[str, Any]:
+        """
+        Build the request body of an endpoint.
+
+        Args:
+            endpoint: Key of ENDPOINTS
+            rng: Random generator of the calling client
+
+        Returns:
+            JSON document
+        """
+        if endpoint.startswith("grid_"):
+            return self.grid(rng)
+        if endpoint == "ml_predict":
+            return {"values": self.series(rng), "sequence_length": self.sequence_length,
+                    "model": self.predict_model}
+        return {"values": self.series(rng)}
+
+
+class LatencyRecorder:
+    """Collects request latencies and outcomes per endpoint."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.errors: Counter = Counter()
+
+    def record(self, endpoint: str, seconds: float, status: Any, ok: bool) -> None:
+        """
+        Record one request.
+
+        Args:
+            endpoint: Endpoint name
+            seconds: Latency
+            status: HTTP status code, or an error name
+            ok: Whether the request succeeded
+        """
+        self.latencies[endpoint].append(seconds)
+        self.statuses[endpoint][str(status)] += 1
+        if not ok:
+            self.errors[endpoint] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        """
+        Summarize the recorded requests.
+
+        Args:
+            elapsed: Length of the measurement in seconds
+
+        Returns:
+            Statistics per endpoint, and of all HTTP endpoints under "total"
+        """
+        endpoints = {name: self._stats(self.latencies[name], self.errors[name], self.statuses[name], elapsed)
+                     for name in sorted(self.latencies)}
+        http = [name for name in self.latencies if name != WS_PING]
+        total_statuses: Counter = Counter()
+        for name in http:
+            total_statuses.update(self.statuses[name])
+        total = self._stats([s for name in http for s in self.latencies[name]],
+                            sum(self.errors[name] for name in http), total_statuses, elapsed)
+        return {"endpoints": endpoints, "total": total}
+
+    @staticmethod
+    def _stats(latencies: List[float], errors: int, statuses: Counter, elapsed: float) -> Dict[str, Any]:
+        milliseconds = np.asarray(latencies, dtype=np.float64) * 1000
+        latency = {"mean": None, "p50": None, "p95": None, "p99": None, "max": None}
+        if len(milliseconds):
+            p50, p95, p99 = np.percentile(milliseconds, [50, 95, 99])
+            latency = {"mean": float(milliseconds.mean()), "p50": float(p50), "p95": float(p95),
+                       "p99": float(p99), "max": float(milliseconds.max())}
+        return {
+            "requests": len(milliseconds),
+            "errors": int(errors),
+            "status_codes": dict(statuses),
+            "throughput_rps": len(milliseconds) / elapsed if elapsed > 0 else 0.0,
+            "latency_ms": latency
+        }
+
+
+async def _next_message(queue: asyncio.Queue, task: asyncio.Future) -> Dict[str, Any]:
+    """Wait for the app's next message, failing if the app returns first."""
+    getter = asyncio.ensure_future(queue.get())
+    await asyncio.wait([getter, task], return_when=asyncio.FIRST_COMPLETED)
+    if getter.done():
+        return getter.result()
+    getter.cancel()
+    task.result()
+    raise ConnectionError("Application finished without responding")
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: Any):
+    """Run an ASGI app's startup and shutdown handlers around the block."""
+    to_app: asyncio.Queue = asyncio.Queue()
+    from_app: asyncio.Queue = asyncio.Queue()
+    task = asyncio.ensure_future(app({"type": "lifespan", "asgi": {"version": "3.0"}}, to_app.get, from_app.put))
+    await to_app.put({"type": "lifespan.startup"})
+    message = await _next_message(from_app, task)
+    if message["type"] == "lifespan.startup.failed":
+        raise RuntimeError(f"Application startup failed: {message.get('message', '')}")
+    try:
+        yield
+    finally:
+        await to_app.put({"type": "lifespan.shutdown"})
+        await _next_message(from_app, task)
+        await task
+
+
+class ASGIWebSocket:
+    """Minimal WebSocket client talking to an ASGI app in the same process."""
+
+    def __init__(self, app: Any, path: str, query_string: str = ""):
+        self.app = app
+        self.path = path
+        self.query_string = query_string
+        self._to_app: asyncio.Queue = asyncio.Queue()
+        self._from_app: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Future] = None
+
+    async def connect(self) -> None:
+        """
+        Open the connection.
+
+        Raises:
+            ConnectionError: If the app rejects the connection
+        """
+        scope = {
+            "type": "websocket", "asgi": {"version": "3.0"}, "scheme": "ws", "http_version": "1.1",
+            "path": self.path, "raw_path": self.path.encode(), "root_path": "",
+            "query_string": self.query_string.encode(), "headers": [(b"host", b"benchmark")],
+            "client": ("127.0.0.1", 0), "server": ("benchmark", 80), "subprotocols": []
+        }
+        self._task = asyncio.ensure_future(self.app(scope, self._to_app.get, self._from_app.put))
+        await self._to_app.put({"type": "websocket.connect"})
+        message = await _next_message(self._from_app, self._task)
+        if message["type"] != "websocket.accept":
+            raise ConnectionError(f"WebSocket rejected ({message.get('code')})")
+
+    async def send(self, text: str) -> None:
+        await self._to_app.put({"type": "websocket.receive", "text": text})
+
+    async def recv(self) -> str:
+        """
+        Receive the next text message.
+
+        Raises:
+            ConnectionError: If the app closed the connection
+        """
+        message = await _next_message(self._from_app, self._task)
+        if message["type"] == "websocket.close":
+            raise ConnectionError(f"WebSocket closed ({message.get('code')})")
+        return message.get("text") or message.get("bytes", b"").decode()
+
+    async def close(self) -> None:
+        await self._to_app.put({"type": "websocket.disconnect", "code": 1000})
+        with contextlib.suppress(Exception):
+            await asyncio.wait_for(self._task, 5)
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """
+    Parse an endpoint mix such as ``grid_currents=4,ml_predict=1``.
+
+    Raises:
+        ValueError: If an endpoint is unknown or a weight is negative
+    """
+    mix = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        name, _, weight = item.partition("=")
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}'. Use one of {sorted(ENDPOINTS)}")
+        mix[name] = float(weight or 1)
+        if mix[name] < 0:
+            raise ValueError(f"Weight of {name} must not be negative")
+    return mix
+
+
+async def _http_client(client: httpx.AsyncClient, payloads: PayloadFactory, mix: Dict[str, float],
+                       seed: int, record_from: float, stop_at: float, recorder: LatencyRecorder) -> None:
+    """Closed-loop client: send the next request as soon as the previous one is answered."""
+    chooser = random.Random(seed)
+    rng = np.random.default_rng(seed)
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < stop_at:
+        name = chooser.choices(names, weights)[0]
+        body = json.dumps(payloads.body(name, rng)).encode()
+        start = time.perf_counter()
+        try:
+            response = await client.post(ENDPOINTS[name], content=body,
+                                         headers={"Content-Type": "application/json"})
+            status, ok = response.status_code, response.status_code < 400
+        except Exception as e:
+            status, ok = type(e).__name__, False
+        if start >= record_from:
+            recorder.record(name, time.perf_counter() - start, status, ok)
+        # Let other clients run even when the app answers without suspending
+        await asyncio.sleep(0)
+
+
+async def _ws_client(connect: Callable[[], Any], interval: float, record_from: float, stop_at: float,
+                     recorder: LatencyRecorder, received: Counter) -> None:
+    """Grid update subscriber measuring ping/pong round trips between broadcasts."""
+    start = time.perf_counter()
+    try:
+        ws = await connect()
+    except Exception as e:
+        recorder.record(WS_PING, time.perf_counter() - start, type(e).__name__, False)
+        return
+    try:
+        await ws.recv()  # connection_established
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            await ws.send("ping")
+            while True:
+                message = json.loads(await ws.recv())
+                if message.get("type") == "pong":
+                    break
+                received[message.get("type", "message")] += 1
+            if start >= record_from:
+                recorder.record(WS_PING, time.perf_counter() - start, "pong", True)
+            await asyncio.sleep(interval)
+    except Exception as e:
+        recorder.record(WS_PING, time.perf_counter() - start, type(e).__name__, False)
+    finally:
+        await ws.close()
+
+
+async def _login(client: httpx.AsyncClient, username: str, password: str) -> str:
+    response = await client.post("/auth/login", data={"username": username, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run_benchmark(app: Any = None, url: Optional[str] = None, concurrency: int = 16,
+                        duration: float = 10.0, warmup: float = 2.0, mix: Optional[Dict[str, float]] = None,
+                        ws_clients: int = 0, ws_interval: float = 0.5, payloads: Optional[PayloadFactory] = None,
+                        seed: int = 0, username: str = "admin", password: str = "admin") -> Dict[str, Any]:
+    """
+    Drive the API with concurrent clients and measure latency and throughput.
+
+    Args:
+        app: ASGI app driven in-process (with its startup and shutdown handlers)
+        url: Base URL of a running server, used instead of app
+        concurrency: Concurrent HTTP clients, each sending one request at a time
+        duration: Measured seconds
+        warmup: Seconds of load before measuring
+        mix: Relative request weights per endpoint (DEFAULT_MIX if None)
+        ws_clients: WebSocket subscribers of /grid/updates
+        ws_interval: Seconds between a subscriber's pings
+        payloads: Request body factory
+        seed: Seed of the endpoint choice and payloads
+        username: Login of the WebSocket subscribers
+        password: Password of the WebSocket subscribers
+
+    Returns:
+        Report with latency percentiles and throughput per endpoint
+    """
+    if (app is None) == (url is None):
+        raise ValueError("Pass exactly one of app and url")
+    mix = {name: weight for name, weight in (mix or DEFAULT_MIX).items() if weight > 0}
+    payloads = payloads or PayloadFactory()
+    recorder = LatencyRecorder()
+    received: Counter = Counter()
+    limits = httpx.Limits(max_connections=concurrency + 1)
+
+    if app is not None:
+        transport = httpx.ASGITransport(app=app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://benchmark", limits=limits, timeout=60)
+        session = lifespan(app)
+    else:
+        client = httpx.AsyncClient(base_url=url, limits=limits, timeout=60)
+        session = contextlib.AsyncExitStack()
+
+    async with session, client:
+        connect = None
+        if ws_clients:
+            token = await _login(client, username, password)
+            if app is not None:
+                async def connect():
+                    ws = ASGIWebSocket(app, "/grid/updates", f"token={token}")
+                    await ws.connect()
+                    return ws
+            elif websockets is None:
+                raise RuntimeError("WebSocket clients against --url need the 'websockets' package")
+            else:
+                async def connect():
+                    return await websockets.connect(f"{url.replace('http', 'ws', 1)}/grid/updates?token={token}")
+
+        start = time.perf_counter()
+        record_from = start + warmup
+        stop_at = record_from + duration
+        tasks = [_http_client(client, payloads, mix, seed + i, record_from, stop_at, recorder)
+                 for i in range(concurrency if mix else 0)]
+        tasks += [_ws_client(connect, ws_interval, record_from, stop_at, recorder, received)
+                  for _ in range(ws_clients)]
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - record_from
+
+    return {
+        "version": REPORT_VERSION,
+        "started": datetime.now(timezone.utc).isoformat(),
+        "duration_seconds": elapsed,
+        "config": {"target": url or "in-process", "concurrency": concurrency, "duration": duration,
+                   "warmup": warmup, "mix": mix, "ws_clients": ws_clients, "ws_interval": ws_interval,
+                   "series_length": payloads.series_length, "grid_copies": payloads.grid_copies,
+                   "predict_model": payloads.predict_model, "seed": seed},
+        "environment": environment(),
+        **recorder.summary(elapsed),
+        "ws_messages": dict(received)
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """Describe the code and machine a report was produced on."""
+    commit = None
+    with contextlib.suppress(Exception):
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=5,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    return {"git_commit": commit, "python": platform.python_version(), "platform": platform.platform(),
+            "cpus": os.cpu_count()}
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Compare two reports endpoint by endpoint.
+
+    Args:
+        baseline: Earlier report
+        current: New report
+
+    Returns:
+        Per endpoint (and "total"), the ratio current / baseline of
+        throughput and of each latency percentile; None where undefined
+    """
+    def ratio(new, old):
+        return new / old if new is not None and old else None
+
+    pairs = {name: (baseline["endpoints"][name], stats) for name, stats in current["endpoints"].items()
+             if name in baseline["endpoints"]}
+    pairs["total"] = (baseline["total"], current["total"])
+    return {
+        name: {
+            "throughput": ratio(new["throughput_rps"], old["throughput_rps"]),
+            **{p: ratio(new["latency_ms"][p], old["latency_ms"][p]) for p in ("p50", "p95", "p99")}
+        }
+        for name, (old, new) in pairs.items()
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render a report as a table."""
+    lines = [f"{'endpoint':<16}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"]
+    for name, stats in list(report["endpoints"].items()) + [("total", report["total"])]:
+        latency = stats["latency_ms"]
+        cells = [f"{latency[p]:>10.2f}" if latency[p] is not None else f"{'-':>10}" for p in ("p50", "p95", "p99")]
+        lines.append(f"{name:<16}{stats['requests']:>10}{stats['errors']:>8}{stats['throughput_rps']:>10.1f}"
+                     + "".join(cells))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point: ``python -m api.benchmark``."""
+    parser = argparse.ArgumentParser(description="Load test the Smart Grid API and report latency percentiles")
+    parser.add_argument("--url", help="Base URL of a running server (default: drive the app in-process)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent HTTP clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds of load before measuring")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="Endpoint weights, e.g. grid_currents=4,grid_validate=2,ml_predict=3,ml_anomalies=1")
+    parser.add_argument("--ws-clients", type=int, default=0, help="WebSocket subscribers of /grid/updates")
+    parser.add_argument("--ws-interval", type=float, default=0.5, help="Seconds between WebSocket pings")
+    parser.add_argument("--series-length", type=int, default=168, help="Values per voltage series")
+    parser.add_argument("--grid-copies", type=int, default=1, help="Copies of the sample topology per grid")
+    parser.add_argument("--predict-model", default="naive", help="Forecaster of /ml/predict requests")
+    parser.add_argument("--test-data", default=DEFAULT_TEST_DATA, help="Directory with the sample payloads")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--username", default="admin", help="Login of the WebSocket clients")
+    parser.add_argument("--password", default="admin")
+    parser.add_argument("--output", default="benchmark.json", help="JSON report file")
+    parser.add_argument("--compare", help="Earlier JSON report to compare against")
+    args = parser.parse_args(argv)
+
+    payloads = PayloadFactory(args.test_data, args.series_length, args.grid_copies, args.predict_model)
+    app = None
+    if args.url is None:
+        from api.main import app
+    report = asyncio.run(run_benchmark(
+        app=app, url=args.url, concurrency=args.concurrency, duration=args.duration, warmup=args.warmup,
+        mix=args.mix, ws_clients=args.ws_clients, ws_interval=args.ws_interval, payloads=payloads,
+        seed=args.seed, username=args.username, password=args.password
+    ))
+    if args.compare:
+        with open(args.compare) as f:
+            report["comparison"] = compare_reports(json.load(f), report)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(format_report(report))
+    for name, ratios in report.get("comparison", {}).items():
+        cells = ", ".join(f"{key} x{value:.2f}" for key, value in ratios.items() if value is not None)
+        print(f"{name}: {cells}")
+    print(f"Report written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
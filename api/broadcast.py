@@ -0,0 +1,384 @@
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple, Any, FrozenSet
+
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+
+class ClientChannel:
+    """
+    Outgoing message queue of a single WebSocket client.
+
+    The queue is bounded. When it is full the client has fallen behind and
+    any delta it misses leaves it inconsistent, so every pending message is
+    discarded and the client is flagged for a resync: its next message is a
+    full snapshot, which supersedes the discarded deltas.
+    """
+
+    def __init__(self, websocket: WebSocket, max_queue: int = 32):
+        """
+        Initialize the channel.
+
+        Args:
+            websocket: Accepted WebSocket connection
+            max_queue: Maximum number of pending messages
+        """
+        self.websocket = websocket
+        self.queue: deque = deque(maxlen=max_queue)
+        self.session: Optional[str] = None
+        self.nodes: Optional[Set[str]] = None
+        self.regions: Optional[Set[str]] = None
+        self.needs_snapshot = True
+        self.dropped = 0
+        self._ready = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def filter_key(self) -> Tuple[Optional[FrozenSet[str]], Optional[FrozenSet[str]]]:
+        """Hashable form of the node and region filter, used to share serialized payloads."""
+        return (frozenset(self.nodes) if self.nodes is not None else None,
+                frozenset(self.regions) if self.regions is not None else None)
+
+    def follows(self, session_id: str) -> bool:
+        """Whether updates of a grid session are sent to this client."""
+        return self.session is None or self.session == session_id
+
+    def subscribe(self, nodes: Optional[List[str]] = None, regions: Optional[List[str]] = None,
+                  session: Optional[str] = None) -> None:
+        """
+        Restrict updates to one grid session and to some nodes and/or regions (None means everything).
+
+        Args:
+            nodes: Node IDs of interest
+            regions: Region names of interest
+            session: Grid session of interest
+        """
+        self.session = session
+        self.nodes = set(nodes) if nodes is not None else None
+        self.regions = set(regions) if regions is not None else None
+        self.needs_snapshot = True
+        self.wake()
+
+    def enqueue(self, message: str) -> None:
+        """
+        Queue a message without blocking, flushing the queue for a resync if full.
+
+        Args:
+            message: Serialized message
+        """
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += len(self.queue)
+            self.needs_snapshot = True
+            self.queue.clear()
+        self.queue.append(message)
+        self._ready.set()
+
+    def wake(self) -> None:
+        """Wake the sender task, e.g. to send a pending snapshot."""
+        self._ready.set()
+
+    async def wait(self) -> None:
+        """Wait until there is something to send."""
+        await self._ready.wait()
+        self._ready.clear()
+
+
+class GridState:
+    """Published values and topology of one grid session."""
+
+    def __init__(self):
+        # Last values sent to clients and values published since the last tick
+        self.voltages: Dict[str, float] = {}
+        self.currents: Dict[str, float] = {}
+        self.pending_voltages: Dict[str, float] = {}
+        self.pending_currents: Dict[str, float] = {}
+
+        # Topology used for region and line filtering
+        self.node_regions: Dict[str, str] = {}
+        self.line_nodes: Dict[str, Tuple[str, str]] = {}
+
+
+class ConnectionManager:
+    """
+    WebSocket connection manager with concurrent, backpressured fan-out.
+
+    ``publish`` only records the latest values of a grid session; a
+    periodic tick coalesces everything published since the previous tick
+    into one delta per session and distinct subscription and hands it to
+    the client queues. Every message names its session, since node and
+    line IDs are only unique within one grid.
+    """
+
+    def __init__(self, max_queue: int = 32, tick_interval: float = 0.5,
+                 tolerance: float = 1e-6):
+        """
+        Initialize the manager.
+
+        Args:
+            max_queue: Maximum pending messages per client
+            tick_interval: Seconds between coalesced updates
+            tolerance: Minimum absolute change for a value to be resent
+        """
+        self.max_queue = max_queue
+        self.tick_interval = tick_interval
+        self.tolerance = tolerance
+        self.channels: Dict[WebSocket, ClientChannel] = {}
+        self.sessions: Dict[str, GridState] = {}
+
+        self._tick_task: Optional[asyncio.Task] = None
+        self.sequence = 0
+
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        """Currently connected WebSockets."""
+        return list(self.channels)
+
+    async def connect(self, websocket: WebSocket) -> ClientChannel:
+        """
+        Accept a WebSocket and start its sender task.
+
+        Args:
+            websocket: Incoming WebSocket connection
+
+        Returns:
+            The client's channel
+        """
+        await websocket.accept()
+        channel = ClientChannel(websocket, self.max_queue)
+        channel.wake()  # Send the initial snapshot right away
+        channel.task = asyncio.create_task(self._sender(channel))
+        self.channels[websocket] = channel
+        return channel
+
+    def disconnect(self, websocket: WebSocket) -> None:
+        """
+        Forget a WebSocket and stop its sender task.
+
+        Args:
+            websocket: Connection to remove
+        """
+        channel = self.channels.pop(websocket, None)
+        if channel is not None and channel.task is not None:
+            channel.task.cancel()
+
+    async def send_personal_message(self, message: str, websocket: WebSocket) -> None:
+        """
+        Queue a message for a single client.
+
+        Args:
+            message: Serialized message
+            websocket: Target connection
+        """
+        channel = self.channels.get(websocket)
+        if channel is not None:
+            channel.enqueue(message)
+        else:
+            await websocket.send_text(message)
+
+    async def broadcast(self, message: str) -> None:
+        """
+        Queue a message for every client without waiting on any of them.
+
+        Args:
+            message: Serialized message
+        """
+        for channel in list(self.channels.values()):
+            channel.enqueue(message)
+
+    def _state(self, session_id: str) -> GridState:
+        state = self.sessions.get(session_id)
+        if state is None:
+            state = self.sessions[session_id] = GridState()
+        return state
+
+    def set_topology(self, session_id: str, node_regions: Optional[Dict[str, str]] = None,
+                     line_nodes: Optional[Dict[str, Tuple[str, str]]] = None) -> None:
+        """
+        Register which region each node of a session is in and which nodes each line joins.
+
+        Args:
+            session_id: Grid session
+            node_regions: Region name keyed by node ID
+            line_nodes: (from node ID, to node ID) keyed by line ID
+        """
+        state = self._state(session_id)
+        if node_regions:
+            state.node_regions.update(node_regions)
+        if line_nodes:
+            state.line_nodes.update(line_nodes)
+
+    def publish(self, session_id: str, voltages: Optional[Dict[str, float]] = None,
+                currents: Optional[Dict[str, float]] = None) -> None:
+        """
+        Record new node voltages and line currents of a session for the next tick.
+
+        Repeated publishes of the same element within a tick are coalesced;
+        only the latest value is sent.
+
+        Args:
+            session_id: Grid session
+            voltages: Node voltages keyed by node ID
+            currents: Line currents keyed by line ID
+        """
+        state = self._state(session_id)
+        if voltages:
+            state.pending_voltages.update(voltages)
+        if currents:
+            state.pending_currents.update(currents)
+
+    def remove_session(self, session_id: str) -> None:
+        """
+        Forget a session's state and tell its subscribers it is gone.
+
+        Args:
+            session_id: Grid session
+        """
+        if self.sessions.pop(session_id, None) is None:
+            return
+        message = json.dumps({"type": "session_closed", "session": session_id})
+        for channel in list(self.channels.values()):
+            if channel.follows(session_id):
+                channel.enqueue(message)
+
+    def _changed(self, pending: Dict[str, float], current: Dict[str, float]) -> Dict[str, float]:
+        """Keep only values that moved by more than the tolerance."""
+        return {key: value for key, value in pending.items()
+                if key not in current or abs(current[key] - value) > self.tolerance}
+
+    def _node_visible(self, channel: ClientChannel, state: GridState, node_id: str) -> bool:
+        if channel.nodes is None and channel.regions is None:
+            return True
+        if channel.nodes is not None and node_id in channel.nodes:
+            return True
+        return channel.regions is not None and state.node_regions.get(node_id) in channel.regions
+
+    def _line_visible(self, channel: ClientChannel, state: GridState, line_id: str) -> bool:
+        if channel.nodes is None and channel.regions is None:
+            return True
+        endpoints = state.line_nodes.get(line_id)
+        return endpoints is not None and any(self._node_visible(channel, state, n) for n in endpoints)
+
+    def _filtered_message(self, channel: ClientChannel, message_type: str, session_id: str,
+                          voltages: Dict[str, float], currents: Dict[str, float]) -> Optional[str]:
+        """Serialize the part of a session's update visible to a channel."""
+        state = self.sessions.get(session_id) or GridState()
+        visible_voltages = {k: v for k, v in voltages.items() if self._node_visible(channel, state, k)}
+        visible_currents = {k: v for k, v in currents.items() if self._line_visible(channel, state, k)}
+        if message_type == "delta" and not visible_voltages and not visible_currents:
+            return None
+        return json.dumps({
+            "type": message_type,
+            "session": session_id,
+            "sequence": self.sequence,
+            "voltages": visible_voltages,
+            "currents": visible_currents
+        })
+
+    def flush(self) -> int:
+        """
+        Send everything published since the last tick as one delta per session.
+
+        Each delta is serialized once per distinct subscription and shared
+        by all clients with that subscription.
+
+        Returns:
+            Number of messages queued
+        """
+        changes = {}
+        for session_id, state in self.sessions.items():
+            voltages = self._changed(state.pending_voltages, state.voltages)
+            currents = self._changed(state.pending_currents, state.currents)
+            state.pending_voltages = {}
+            state.pending_currents = {}
+            if voltages or currents:
+                state.voltages.update(voltages)
+                state.currents.update(currents)
+                changes[session_id] = (voltages, currents)
+        if not changes:
+            return 0
+        self.sequence += 1
+
+        payloads: Dict[Any, Optional[str]] = {}
+        queued = 0
+        for channel in list(self.channels.values()):
+            if channel.needs_snapshot:
+                # The sender will send a full snapshot instead
+                channel.wake()
+                continue
+            for session_id, (voltages, currents) in changes.items():
+                if not channel.follows(session_id):
+                    continue
+                key = (session_id, channel.filter_key)
+                if key not in payloads:
+                    payloads[key] = self._filtered_message(channel, "delta", session_id, voltages, currents)
+                if payloads[key] is not None:
+                    channel.enqueue(payloads[key])
+                    queued += 1
+        return queued
+
+    async def _sender(self, channel: ClientChannel) -> None:
+        """Per-client loop draining the channel's queue."""
+        try:
+            while True:
+                await channel.wait()
+                while channel.queue:
+                    await channel.websocket.send_text(channel.queue.popleft())
+                # A snapshot supersedes every delta sent before it
+                if channel.needs_snapshot:
+                    channel.needs_snapshot = False
+                    if channel.session is not None:
+                        session_ids = [channel.session]
+                    else:
+                        session_ids = list(self.sessions)
+                    for session_id in session_ids:
+                        state = self.sessions.get(session_id) or GridState()
+                        snapshot = self._filtered_message(channel, "snapshot", session_id,
+                                                          state.voltages, state.currents)
+                        await channel.websocket.send_text(snapshot)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Dropping WebSocket client after send failure: {str(e)}")
+            self.channels.pop(channel.websocket, None)
+
+    async def _tick_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.tick_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error in grid update broadcast: {str(e)}")
+
+    def start(self) -> None:
+        """Start the periodic tick (call from within the running event loop)."""
+        if self._tick_task is None or self._tick_task.done():
+            self._tick_task = asyncio.create_task(self._tick_loop())
+
+    async def stop(self) -> None:
+        """Stop the periodic tick and every sender task."""
+        tasks = [c.task for c in self.channels.values() if c.task is not None]
+        if self._tick_task is not None:
+            tasks.append(self._tick_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tick_task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get fan-out statistics.
+
+        Returns:
+            Dictionary with client count, queued and dropped message totals
+        """
+        channels = list(self.channels.values())
+        return {
+            "clients": len(channels),
+            "queued": sum(len(c.queue) for c in channels),
+            "dropped": sum(c.dropped for c in channels),
+            "sequence": self.sequence
+        }
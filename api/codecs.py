@@ -0,0 +1,467 @@
+import io
+import json
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type, Union
+
+import numpy as np
+from fastapi import HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ValidationError
+
+from api.metrics import timed
+
+# Optional accelerators: orjson for JSON, msgpack for the binary document format
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Request/response media types
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+NPY = "application/x-npy"
+OCTET = "application/octet-stream"
+
+MSGPACK_TYPES = {MSGPACK, "application/x-msgpack", "application/vnd.msgpack"}
+ARRAY_TYPES = {NPY, OCTET}
+FLOAT_DTYPES = {"<f4", "<f8"}
+
+
+def media_type(header: Optional[str]) -> str:
+    """
+    Get the bare media type of a Content-Type or Accept entry.
+
+    Args:
+        header: Header value, e.g. "application/json; charset=utf-8"
+
+    Returns:
+        Lower-case media type without parameters ("application/json" if empty)
+    """
+    if not header:
+        return JSON
+    return header.split(";", 1)[0].strip().lower() or JSON
+
+
+def dumps_json(content: Any) -> bytes:
+    """
+    Serialize a response document to JSON, using orjson when available.
+
+    NumPy arrays and scalars are serialized natively.
+
+    Args:
+        content: Document to serialize
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_plain, separators=(",", ":")).encode("utf-8")
+
+
+def _plain(value: Any) -> Any:
+    """Convert NumPy values to plain Python for serializers without NumPy support."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when it is installed."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
+
+
+def decode_array(body: bytes, content_type: str, dtype: str = "<f8") -> np.ndarray:
+    """
+    Decode a binary float array without copying the payload.
+
+    ``application/octet-stream`` bodies are raw little-endian floats of the
+    given dtype; ``application/x-npy`` bodies are .npy files whose header
+    carries the dtype and shape.
+
+    Args:
+        body: Request body
+        content_type: OCTET or NPY
+        dtype: Element type of raw bodies ("<f8" or "<f4")
+
+    Returns:
+        One-dimensional read-only array backed by the body
+
+    Raises:
+        ValueError: If the payload is malformed or not a float array
+    """
+    if content_type == OCTET:
+        if dtype not in FLOAT_DTYPES:
+            raise ValueError(f"Unsupported dtype '{dtype}', use one of {sorted(FLOAT_DTYPES)}")
+        itemsize = np.dtype(dtype).itemsize
+        if len(body) % itemsize:
+            raise ValueError(f"Body length {len(body)} is not a multiple of {itemsize} bytes")
+        return np.frombuffer(body, dtype=dtype)
+
+    # Parse the .npy header ourselves so the data itself is not copied
+    stream = io.BytesIO(body)
+    version = np.lib.format.read_magic(stream)
+    if version == (1, 0):
+        shape, fortran_order, array_dtype = np.lib.format.read_array_header_1_0(stream)
+    else:
+        shape, fortran_order, array_dtype = np.lib.format.read_array_header_2_0(stream)
+    if array_dtype.kind != "f":
+        raise ValueError(f"Expected a float array, got dtype {array_dtype}")
+    count = int(np.prod(shape))
+    if len(body) - stream.tell() < count * array_dtype.itemsize:
+        raise ValueError("Truncated .npy payload")
+    array = np.frombuffer(body, dtype=array_dtype, count=count, offset=stream.tell())
+    return array.reshape(shape, order="F" if fortran_order else "C").ravel()
+
+
+def decode_document(body: bytes, content_type: str) -> Any:
+    """
+    Decode a JSON or MessagePack request document.
+
+    Args:
+        body: Request body
+        content_type: Media type of the body
+
+    Returns:
+        Decoded document
+
+    Raises:
+        HTTPException: 415 for unsupported media types, 400 for malformed bodies
+    """
+    try:
+        if content_type == JSON or content_type.endswith("+json"):
+            return orjson.loads(body) if orjson is not None else json.loads(body)
+        if content_type in MSGPACK_TYPES:
+            if msgpack is None:
+                raise HTTPException(status_code=415, detail="MessagePack support is not installed")
+            return msgpack.unpackb(body, raw=False)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Malformed {content_type} body: {str(e)}")
+    raise HTTPException(status_code=415, detail=f"Unsupported content type '{content_type}'")
+
+
+def column(value: Any, dtype: str = "<f8") -> np.ndarray:
+    """
+    Decode one column of a document.
+
+    Columns are either lists or raw little-endian bytes (MessagePack ``bin``),
+    which are wrapped without copying.
+
+    Args:
+        value: List of numbers or raw bytes
+        dtype: Element type of raw bytes
+
+    Returns:
+        One-dimensional array
+    """
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        if len(value) % np.dtype(dtype).itemsize:
+            raise ValueError(f"Column length {len(value)} is not a multiple of {np.dtype(dtype).itemsize} bytes")
+        return np.frombuffer(value, dtype=dtype)
+    return np.asarray(value, dtype=np.dtype(dtype).newbyteorder("="))
+
+
+def voltage_from_document(document: Any,
+                          model_cls: Type[BaseModel]) -> Tuple[np.ndarray, int, str]:
+    """
+    Extract a voltage series from a decoded document.
+
+    The document is shaped like ``model_cls``; in MessagePack documents the
+    ``values`` may also be raw little-endian float64 bytes.
+
+    Args:
+        document: Decoded JSON or MessagePack document
+        model_cls: Pydantic model validating the document
+
+    Returns:
+        Tuple of (values, sequence_length, model name)
+
+    Raises:
+        ValidationError: If the document does not match the model
+        ValueError: If a raw column is malformed
+    """
+    if isinstance(document, dict) and isinstance(document.get("values"), (bytes, bytearray)):
+        values = column(document["values"])
+        if values.size == 0:
+            raise ValueError("Need at least one value")
+        # Validate the scalar fields with a placeholder series
+        with timed("pydantic_parse"):
+            data = model_cls.parse_obj({**document, "values": [0.0]})
+    else:
+        with timed("pydantic_parse"):
+            data = model_cls.parse_obj(document)
+        values = np.asarray(data.values, dtype=np.float64)
+    return values, data.sequence_length, data.model
+
+
+def grid_from_document(document: Any,
+                       model_cls: Type[BaseModel]) -> Union[BaseModel, Dict[str, Any]]:
+    """
+    Extract a grid from a decoded document.
+
+    Documents are either shaped like ``model_cls`` or use the columnar layout::
+
+        {"node_ids": [...], "voltages": [...],
+         "line_ids": [...], "from_node_ids": [...], "to_node_ids": [...],
+         "resistances": [...]}
+
+    where ``from_node_ids``/``to_node_ids`` may be replaced by integer
+    ``from_index``/``to_index`` columns, and numeric columns may be raw
+    little-endian bytes (float64 values, int64 indices).
+
+    Args:
+        document: Decoded JSON or MessagePack document
+        model_cls: Pydantic model validating object-style documents
+
+    Returns:
+        Validated model instance, or a dictionary of decoded columns
+
+    Raises:
+        ValidationError: If an object-style document does not match the model
+        ValueError: If a columnar document is incomplete or malformed
+    """
+    if not (isinstance(document, dict) and "node_ids" in document):
+        with timed("pydantic_parse"):
+            return model_cls.parse_obj(document)
+
+    try:
+        columns = {key: document[key] for key in ("node_ids", "line_ids")}
+        columns["voltages"] = column(document["voltages"])
+        columns["resistances"] = column(document["resistances"])
+        if "from_index" in document:
+            columns["from_index"] = column(document["from_index"], "<i8")
+            columns["to_index"] = column(document["to_index"], "<i8")
+        else:
+            columns["from_node_ids"] = document["from_node_ids"]
+            columns["to_node_ids"] = document["to_node_ids"]
+    except KeyError as e:
+        raise ValueError(f"Columnar grid is missing '{e.args[0]}'")
+    except TypeError as e:
+        raise ValueError(f"Malformed grid column: {str(e)}")
+    return columns
+
+
+def priorities_from_document(document: Any) -> List[Tuple[str, int]]:
+    """
+    Extract load priority updates from a decoded document.
+
+    Documents are either a mapping ``{"priorities": {load_id: priority}}``
+    or the columnar layout::
+
+        {"load_ids": [...], "priorities": [...]}
+
+    where ``priorities`` may be raw little-endian int64 bytes.
+
+    Args:
+        document: Decoded JSON or MessagePack document
+
+    Returns:
+        List of (load ID, priority) pairs, in document order
+
+    Raises:
+        ValueError: If the document is incomplete or malformed
+    """
+    if not isinstance(document, dict) or "priorities" not in document:
+        raise ValueError("Priority update is missing 'priorities'")
+    priorities = document["priorities"]
+    if isinstance(priorities, dict):
+        load_ids, priorities = list(priorities), list(priorities.values())
+    elif "load_ids" in document:
+        load_ids = document["load_ids"]
+    else:
+        raise ValueError("Columnar priority update is missing 'load_ids'")
+    try:
+        priorities = column(priorities, "<i8")
+    except (TypeError, ValueError, OverflowError) as e:
+        raise ValueError(f"Malformed priority column: {str(e)}")
+    if not isinstance(load_ids, list) or not all(isinstance(load_id, str) for load_id in load_ids):
+        raise ValueError("Load IDs must be a list of strings")
+    if priorities.ndim != 1 or len(load_ids) != priorities.size:
+        raise ValueError(f"Got {len(load_ids)} load IDs but {priorities.size} priorities")
+    return list(zip(load_ids, priorities.tolist()))
+
+
+@contextmanager
+def payload_errors(document: Any = None) -> Iterator[None]:
+    """
+    Report payload errors like FastAPI body validation does.
+
+    Pydantic errors become 422 responses and other ``ValueError``s 400.
+
+    Args:
+        document: Decoded body, echoed back in validation errors
+    """
+    try:
+        yield
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("body",) + tuple(error["loc"])} for error in e.errors()],
+            body=document
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def read_voltage_payload(request: Request,
+                               model_cls: Type[BaseModel]) -> Tuple[np.ndarray, int, str]:
+    """
+    Read a voltage series in any supported encoding.
+
+    - JSON / MessagePack documents (see ``voltage_from_document``)
+    - ``application/octet-stream`` raw floats (``?dtype=<f4`` for float32)
+    - ``application/x-npy``
+
+    For the binary array encodings ``sequence_length`` and ``model`` are
+    taken from the query string.
+
+    Args:
+        request: Incoming request
+        model_cls: Pydantic model validating JSON documents
+
+    Returns:
+        Tuple of (values, sequence_length, model name)
+
+    Raises:
+        HTTPException: 400/415 for malformed or unsupported bodies
+        RequestValidationError: If a document does not match the model
+    """
+    content_type = media_type(request.headers.get("content-type"))
+    body = await request.body()
+
+    if content_type in ARRAY_TYPES:
+        params = request.query_params
+        with payload_errors():
+            values = decode_array(body, content_type, params.get("dtype", "<f8"))
+            sequence_length = int(params.get("sequence_length", 24))
+            if values.size == 0 or sequence_length < 1:
+                raise ValueError("Need at least one value and sequence_length >= 1")
+        return values, sequence_length, params.get("model", "naive")
+
+    document = decode_document(body, content_type)
+    with payload_errors(document):
+        return voltage_from_document(document, model_cls)
+
+
+async def read_grid_payload(request: Request,
+                            model_cls: Type[BaseModel]) -> Union[BaseModel, Dict[str, Any]]:
+    """
+    Read a grid from a JSON or MessagePack body (see ``grid_from_document``).
+
+    Args:
+        request: Incoming request
+        model_cls: Pydantic model validating object-style documents
+
+    Returns:
+        Validated model instance, or a dictionary of decoded columns
+
+    Raises:
+        HTTPException: 400/415 for malformed or unsupported bodies
+        RequestValidationError: If an object-style document does not match the model
+    """
+    content_type = media_type(request.headers.get("content-type"))
+    document = decode_document(await request.body(), content_type)
+    with payload_errors(document):
+        return grid_from_document(document, model_cls)
+
+
+async def read_priority_payload(request: Request) -> List[Tuple[str, int]]:
+    """
+    Read load priority updates from a JSON or MessagePack body (see ``priorities_from_document``).
+
+    Args:
+        request: Incoming request
+
+    Returns:
+        List of (load ID, priority) pairs
+
+    Raises:
+        HTTPException: 400/415 for malformed or unsupported bodies
+    """
+    content_type = media_type(request.headers.get("content-type"))
+    document = decode_document(await request.body(), content_type)
+    with payload_errors(document):
+        return priorities_from_document(document)
+
+
+def _accepted(header: Optional[str]) -> List[str]:
+    """Media types of an Accept header, most preferred first."""
+    if not header:
+        return [JSON]
+    entries = []
+    for position, entry in enumerate(header.split(",")):
+        quality = 1.0
+        for param in entry.split(";")[1:]:
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            entries.append((-quality, position, media_type(entry)))
+    return [media for _, _, media in sorted(entries)]
+
+
+def encode_response(request: Request, content: Dict[str, Any],
+                    array_key: Optional[str] = None) -> Response:
+    """
+    Encode a response document in the format the client asked for.
+
+    MessagePack is used when accepted and installed. When ``array_key`` is
+    given, ``application/octet-stream`` (raw little-endian float64) and
+    ``application/x-npy`` return just that array. Everything else falls back
+    to JSON.
+
+    Args:
+        request: Incoming request (its Accept header is used)
+        content: Response document
+        array_key: Key of the main numeric array of the document
+
+    Returns:
+        Encoded response
+    """
+    for accepted in _accepted(request.headers.get("accept")):
+        if accepted in MSGPACK_TYPES and msgpack is not None:
+            return Response(msgpack.packb(content, default=_plain, use_bin_type=True),
+                            media_type=MSGPACK)
+        if accepted in ARRAY_TYPES and array_key is not None:
+            array = np.asarray(content[array_key], dtype="<f8")
+            if accepted == OCTET:
+                return Response(array.tobytes(), media_type=OCTET)
+            buffer = io.BytesIO()
+            np.save(buffer, array, allow_pickle=False)
+            return Response(buffer.getvalue(), media_type=NPY)
+        if accepted == JSON or accepted in ("*/*", "application/*"):
+            break
+    return FastJSONResponse(content)
+
+
+def request_body_spec(json_schema: Dict[str, Any], arrays: bool = False) -> Dict[str, Any]:
+    """
+    OpenAPI request body for endpoints that read their body themselves.
+
+    Args:
+        json_schema: Schema of the JSON document
+        arrays: Whether raw float arrays are also accepted
+
+    Returns:
+        Value for the route's ``openapi_extra``
+    """
+    binary = {"schema": {"type": "string", "format": "binary"}}
+    content = {JSON: {"schema": json_schema}, MSGPACK: binary}
+    if arrays:
+        content[OCTET] = binary
+        content[NPY] = binary
+    return {"requestBody": {"required": True, "content": content}}
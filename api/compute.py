@@ -0,0 +1,524 @@
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional
+
+from power_grid.grid import Node, Line, PowerGrid
+from power_grid.arrays import ArrayGrid
+from ml_pipeline.models import AnomalyDetector, VoltagePredictor
+from ml_pipeline.baselines import ForecasterSelector, PredictorForecaster, default_baselines
+from api.metrics import timed
+from api.shared_state import SharedSnapshot, SharedState, SharedStateStore
+
+# CPU-bound endpoint work. Everything here is a plain module-level function of
+# plain data so it can run in a thread or a spawned worker process.
+
+baseline_forecasters = {forecaster.name: forecaster for forecaster in default_baselines()}
+
+# Name of the published VoltagePredictor in the shared state store
+PREDICTOR_STATE = "voltage_predictor"
+# Per-process views of published predictors, keyed by store directory
+_shared_predictors: Dict[str, SharedState] = {}
+
+
+def create_power_grid(grid_model: Any) -> PowerGrid:
+    """
+    Convert a GridModel to a PowerGrid object.
+
+    Args:
+        grid_model: Pydantic model of the grid
+
+    Returns:
+        PowerGrid object
+
+    Raises:
+        ValueError: If a line references a missing node or a value is invalid
+    """
+    with timed("create_power_grid"):
+        return _build_power_grid(grid_model)
+
+
+def _build_power_grid(grid_model: Any) -> PowerGrid:
+    """Build the PowerGrid of create_power_grid."""
+    grid = PowerGrid()
+
+    # Add nodes
+    for node_model in grid_model.nodes:
+        node = Node(node_model.node_id, node_model.voltage)
+        grid.add_node(node)
+
+    # Add lines
+    for line_model in grid_model.lines:
+        from_node = grid.get_node(line_model.from_node_id)
+        to_node = grid.get_node(line_model.to_node_id)
+
+        if from_node is None or to_node is None:
+            raise ValueError(
+                f"Nodes {line_model.from_node_id} and/or {line_model.to_node_id} not found"
+            )
+
+        line = Line(line_model.line_id, from_node, to_node, line_model.resistance)
+        grid.add_line(line)
+
+    return grid
+
+
+def create_array_grid(columns: Dict[str, Any]) -> ArrayGrid:
+    """
+    Convert decoded columnar grid payload to an ArrayGrid.
+
+    Args:
+        columns: Node and line columns (lines reference nodes by ID or by index)
+
+    Returns:
+        ArrayGrid object
+
+    Raises:
+        ValueError: If a line references a missing node or a value is invalid
+    """
+    with timed("create_power_grid"):
+        return _build_array_grid(columns)
+
+
+def _build_array_grid(columns: Dict[str, Any]) -> ArrayGrid:
+    """Build the ArrayGrid of create_array_grid."""
+    if "from_index" in columns:
+        return ArrayGrid(columns["node_ids"], columns["voltages"], columns["line_ids"],
+                         columns["from_index"], columns["to_index"], columns["resistances"])
+    return ArrayGrid.from_columns(columns["node_ids"], columns["voltages"], columns["line_ids"],
+                                  columns["from_node_ids"], columns["to_node_ids"],
+                                  columns["resistances"])
+
+
+def to_array_grid(grid_model: Any) -> ArrayGrid:
+    """
+    Convert a GridModel or decoded columnar grid payload to an ArrayGrid.
+
+    Args:
+        grid_model: Grid configuration, or decoded columnar grid payload
+
+    Returns:
+        ArrayGrid object
+
+    Raises:
+        ValueError: If a line references a missing node or a value is invalid
+    """
+    if isinstance(grid_model, dict):
+        return create_array_grid(grid_model)
+    return ArrayGrid.from_power_grid(create_power_grid(grid_model))
+
+
+def array_grid_currents(grid: ArrayGrid) -> Dict[str, Any]:
+    """
+    Calculate line currents and total resistive power of an ArrayGrid.
+
+    Args:
+        grid: Column-oriented grid
+
+    Returns:
+        Dictionary of line currents and total power
+    """
+    with timed("calculate_all_currents"):
+        currents = grid.line_currents()
+    return {"currents": dict(zip(grid.line_ids, currents.tolist())),
+            "total_power": grid.total_power(currents)}
+
+
+def grid_currents(grid_model: Any) -> Dict[str, Any]:
+    """
+    Calculate line currents and total resistive power of a grid.
+
+    Args:
+        grid_model: Grid configuration, or decoded columnar grid payload
+
+    Returns:
+        Dictionary of line currents and total power
+    """
+    if isinstance(grid_model, dict):
+        # Columnar payloads are computed for all lines at once
+        return array_grid_currents(create_array_grid(grid_model))
+
+    grid = create_power_grid(grid_model)
+    with timed("calculate_all_currents"):
+        currents = grid.calculate_all_currents()
+
+    # Calculate total power (P = I²R)
+    total_power = 0.0
+    for line_id, current in currents.items():
+        total_power += current**2 * grid.lines[line_id].resistance
+
+    return {"currents": currents, "total_power": total_power}
+
+
+def grid_validation(grid_model: Any) -> List[str]:
+    """
+    Validate a grid configuration.
+
+    Args:
+        grid_model: Grid configuration, or decoded columnar grid payload
+
+    Returns:
+        List of validation errors, empty if grid is valid
+    """
+    if isinstance(grid_model, dict):
+        return create_array_grid(grid_model).validate_grid()
+    return create_power_grid(grid_model).validate_grid()
+
+
+def forecast_voltage(values: np.ndarray, sequence_length: int, model: str,
+                     state_directory: Optional[str] = None) -> Dict[str, List[float]]:
+    """
+    Forecast future voltage values with a baseline forecaster.
+
+    Args:
+        values: Voltage history
+        sequence_length: Input window length
+        model: Forecaster name, or "auto" to pick one by backtest
+        state_directory: Shared state store directory; with "auto", a predictor
+            published there competes with the baselines
+
+    Returns:
+        Dictionary with the predictions
+
+    Raises:
+        ValueError: If the history is too short or the model is unknown
+    """
+    if len(values) <= sequence_length:
+        raise ValueError(f"Not enough data points. Need more than {sequence_length} values.")
+
+    # One forecast step per available input window, up to 10 future values
+    horizon = min(10, len(values) - sequence_length)
+
+    # Forecast with a cheap statistical baseline; "auto" backtests all of
+    # them, and the published VoltagePredictor if any, on the submitted
+    # history and keeps the most accurate one
+    if model != "auto" and model not in baseline_forecasters:
+        raise ValueError(
+            f"Unknown model '{model}'. Use 'auto' or one of {sorted(baseline_forecasters)}"
+        )
+    with timed("model_inference"):
+        if model == "auto":
+            candidates = default_baselines()
+            predictor = shared_predictor(state_directory).get() if state_directory is not None else None
+            if predictor is not None:
+                # Published predictors are trained on raw voltages (see forecast_lstm)
+                candidates.append(PredictorForecaster(predictor, normalize=False))
+            forecasts, _ = ForecasterSelector(candidates, horizon=horizon).forecast(values, horizon)
+        else:
+            forecasts = baseline_forecasters[model].forecast(values, horizon)
+    return {"predictions": forecasts[0].tolist()}
+
+
+def build_voltage_predictor(snapshot: SharedSnapshot) -> VoltagePredictor:
+    """Build a VoltagePredictor from a published snapshot of its weights."""
+    weights = [snapshot.arrays[f"w{i:03d}"] for i in range(snapshot.meta["weights"])]
+    return VoltagePredictor.from_weights(snapshot.meta["config"], weights)
+
+
+def publish_voltage_predictor(store: SharedStateStore, predictor: VoltagePredictor) -> int:
+    """
+    Publish a predictor's weights to all workers.
+
+    Args:
+        store: Shared state store
+        predictor: Trained predictor
+
+    Returns:
+        Published version
+    """
+    weights = predictor.get_weights()
+    return store.publish(PREDICTOR_STATE, {f"w{i:03d}": w for i, w in enumerate(weights)},
+                         {"config": predictor.get_config(), "weights": len(weights)})
+
+
+def shared_predictor(directory: str) -> SharedState:
+    """
+    Get this process's view of the predictor published in a shared state directory.
+
+    Args:
+        directory: Shared state store directory
+
+    Returns:
+        Shared state view building VoltagePredictor objects
+    """
+    view = _shared_predictors.get(directory)
+    if view is None:
+        view = _shared_predictors.setdefault(
+            directory, SharedState(SharedStateStore(directory), PREDICTOR_STATE, build_voltage_predictor)
+        )
+    return view
+
+
+def forecast_lstm(values: np.ndarray, sequence_length: int, state_directory: str,
+                  horizon: Optional[int] = None) -> Dict[str, List[float]]:
+    """
+    Forecast future voltage values with the published VoltagePredictor.
+
+    Each step feeds the last ``sequence_length`` values, including earlier
+    predictions, to the one-step model.
+
+    Args:
+        values: Voltage history
+        sequence_length: Input window length (must match the model's)
+        state_directory: Shared state store directory
+        horizon: Number of future values (default: up to 10, bounded by the history)
+
+    Returns:
+        Dictionary with the predictions
+
+    Raises:
+        ValueError: If no model is published, the window length differs or the history is too short
+    """
+    predictor = shared_predictor(state_directory).get()
+    if predictor is None:
+        raise ValueError("No voltage predictor has been published")
+    if sequence_length != predictor.sequence_length:
+        raise ValueError(f"The published model expects sequence_length {predictor.sequence_length}")
+    if horizon is None:
+        if len(values) <= sequence_length:
+            raise ValueError(f"Not enough data points. Need more than {sequence_length} values.")
+        horizon = min(10, len(values) - sequence_length)
+    elif len(values) < sequence_length:
+        raise ValueError(f"Not enough data points. Need {sequence_length} values.")
+    window = np.asarray(values[-sequence_length:], dtype=np.float64)
+    predictions = []
+    with timed("model_inference"):
+        for _ in range(horizon):
+            prediction = float(np.ravel(predictor.predict(window.reshape(1, sequence_length, 1)))[0])
+            predictions.append(prediction)
+            window = np.append(window[1:], prediction)
+    return {"predictions": predictions}
+
+
+def anomaly_report(values: np.ndarray, eps: float, min_samples: int) -> Dict[str, Any]:
+    """
+    Detect anomalies in voltage data.
+
+    A fresh detector is used per call: the scaler and DBSCAN model are refit
+    on every input, so sharing one instance between workers is not safe.
+    The scaler and DBSCAN run once each (``get_anomaly_stats`` clusters
+    twice) and are timed as separate stages.
+
+    Args:
+        values: Voltage measurements
+        eps: DBSCAN neighborhood radius
+        min_samples: DBSCAN core point threshold
+
+    Returns:
+        Detected anomalies and statistics
+    """
+    detector = AnomalyDetector(eps=eps, min_samples=min_samples)
+    with timed("scaler_fit"):
+        scaled = detector.preprocess(values)
+    with timed("dbscan"):
+        labels = detector.model.fit_predict(scaled)
+
+    anomaly_indices = np.flatnonzero(labels == -1)
+    return {
+        "anomaly_indices": anomaly_indices.tolist(),
+        "anomaly_values": np.asarray(values)[anomaly_indices].tolist(),
+        "anomaly_count": int(len(anomaly_indices)),
+        "anomaly_percentage": float(100 * len(anomaly_indices) / len(values))
+    }
+
+
+# Progress callback of background jobs: progress(fraction, message). It is
+# also where a cancelled job stops, so long loops call it regularly.
+Progress = Callable[[float, Optional[str]], None]
+
+
+def contingency_sweep(grid_model: Any, progress: Progress, chunk_size: int = 10000) -> Dict[str, Any]:
+    """
+    Evaluate every single-line outage (N-1 contingency) of a grid.
+
+    Node voltages are fixed in this grid model, so losing a line leaves the
+    other lines' currents unchanged: each outage only removes that line's
+    I²R loss and may isolate nodes it was the last line of. All outages are
+    therefore evaluated from one set of currents and node degrees.
+
+    Args:
+        grid_model: Grid configuration, or decoded columnar grid payload
+        progress: Job progress callback
+        chunk_size: Outages evaluated between progress reports
+
+    Returns:
+        Base case and, aligned with line_ids, total power and largest
+        remaining current per outage, plus the nodes each outage isolates
+    """
+    grid = to_array_grid(grid_model)
+    currents = grid.line_currents()
+    losses = currents * currents * grid.resistances
+    base_power = float(losses.sum())
+    n_lines = len(grid.line_ids)
+
+    # Largest remaining current: the overall maximum, or the runner-up for the line carrying it
+    magnitude = np.abs(currents)
+    max_current = np.zeros(n_lines)
+    if n_lines > 1:
+        order = np.argsort(magnitude)
+        max_current[:] = magnitude[order[-1]]
+        max_current[order[-1]] = magnitude[order[-2]]
+
+    degree = np.bincount(grid.from_index, minlength=len(grid.node_ids)) \
+        + np.bincount(grid.to_index, minlength=len(grid.node_ids))
+    total_power = np.empty(n_lines)
+    isolated: Dict[str, List[str]] = {}
+    for start in range(0, n_lines, chunk_size):
+        progress(start / max(n_lines, 1), f"Evaluated {start} of {n_lines} outages")
+        stop = min(start + chunk_size, n_lines)
+        total_power[start:stop] = base_power - losses[start:stop]
+        ends = np.stack([grid.from_index[start:stop], grid.to_index[start:stop]], axis=1)
+        for offset in np.flatnonzero((degree[ends] == 1).any(axis=1)):
+            nodes = np.unique(ends[offset][degree[ends[offset]] == 1])
+            isolated[grid.line_ids[start + offset]] = [grid.node_ids[i] for i in nodes]
+
+    return {
+        "base": {"total_power": base_power, "max_current": float(magnitude.max()) if n_lines else 0.0,
+                 "errors": grid.validate_grid()},
+        "line_ids": grid.line_ids,
+        "total_power": total_power,
+        "power_change": total_power - base_power,
+        "max_current": max_current,
+        "isolated_nodes": isolated
+    }
+
+
+def anomaly_reprocess(timestamps: np.ndarray, values: np.ndarray, window_seconds: float,
+                      eps: float, min_samples: int, progress: Progress) -> Dict[str, Any]:
+    """
+    Detect anomalies in a long voltage history, one time window at a time.
+
+    Args:
+        timestamps: Sample times in Unix seconds, ascending
+        values: Voltage measurements
+        window_seconds: Width of the windows clustered independently
+        eps: DBSCAN neighborhood radius
+        min_samples: DBSCAN core point threshold
+        progress: Job progress callback
+
+    Returns:
+        Timestamps and values of all anomalies, and per-window counts
+    """
+    if len(values) == 0:
+        raise ValueError("No samples in the requested range")
+    window_index = ((timestamps - timestamps[0]) // window_seconds).astype(np.int64)
+    n_windows = int(window_index[-1]) + 1
+    bounds = np.searchsorted(window_index, np.arange(n_windows + 1))
+
+    anomalies = []
+    window_starts, window_samples, window_anomalies = [], [], []
+    for i in range(n_windows):
+        progress(i / n_windows, f"Window {i + 1} of {n_windows}")
+        lo, hi = bounds[i], bounds[i + 1]
+        if hi - lo < min_samples:
+            continue
+        detector = AnomalyDetector(eps=eps, min_samples=min_samples)
+        with timed("dbscan"):
+            labels = detector.model.fit_predict(detector.preprocess(values[lo:hi]))
+        found = lo + np.flatnonzero(labels == -1)
+        anomalies.append(found)
+        window_starts.append(timestamps[0] + i * window_seconds)
+        window_samples.append(hi - lo)
+        window_anomalies.append(len(found))
+
+    indices = np.concatenate(anomalies) if anomalies else np.empty(0, dtype=np.int64)
+    return {
+        "anomaly_timestamps": timestamps[indices],
+        "anomaly_values": values[indices],
+        "anomaly_count": int(len(indices)),
+        "anomaly_percentage": float(100 * len(indices) / len(values)),
+        "windows": {"start": np.asarray(window_starts), "samples": np.asarray(window_samples),
+                    "anomalies": np.asarray(window_anomalies)}
+    }
+
+
+def train_voltage_predictor(X: np.ndarray, y: np.ndarray, epochs: int, batch_size: int,
+                            lstm_units: List[int], model_path: Optional[str],
+                            progress: Progress, store: Optional[SharedStateStore] = None) -> Dict[str, Any]:
+    """
+    Train a VoltagePredictor, reporting progress after every epoch.
+
+    Args:
+        X: Input sequences shaped [n, sequence_length, 1]
+        y: Targets shaped [n, 1]
+        epochs: Number of training epochs
+        batch_size: Training batch size
+        lstm_units: Units of the two LSTM layers
+        model_path: Where the trained model is saved (not saved if None)
+        progress: Job progress callback
+        store: Shared state store the trained weights are published to (not published if None)
+
+    Returns:
+        Training and validation loss per epoch, the saved model path and the published version
+    """
+    if len(X) == 0:
+        raise ValueError("Not enough samples for a single training sequence")
+    predictor = VoltagePredictor(sequence_length=X.shape[1], lstm_units=tuple(lstm_units))
+    history: Dict[str, List[float]] = {}
+    for epoch in range(epochs):
+        progress(epoch / epochs, f"Epoch {epoch + 1} of {epochs}")
+        fitted = predictor.model.fit(X, y, epochs=1, batch_size=batch_size,
+                                     validation_split=0.2, verbose=0)
+        for name, values in fitted.history.items():
+            history.setdefault(name, []).extend(float(v) for v in values)
+    if model_path is not None:
+        predictor.save_model(model_path)
+    version = publish_voltage_predictor(store, predictor) if store is not None else None
+    return {"history": history, "samples": int(len(X)), "model_path": model_path, "published_version": version}
+
+
+def sample_grid_visualization() -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Build nodes and links data of the sample grid for visualization.
+
+    Returns:
+        Dictionary with "nodes" and "links" lists
+    """
+    # In a real app, this would come from the database or a real grid
+    # Here we'll create a sample grid
+    sample_grid = PowerGrid()
+
+    # Create nodes
+    nodes = [
+        Node("N1", 230.0),  # Source
+        Node("N2", 115.0),  # Intermediate
+        Node("N3", 110.0),  # Intermediate
+        Node("N4", 0.0),    # Ground
+    ]
+
+    for node in nodes:
+        sample_grid.add_node(node)
+
+    # Create lines
+    lines = [
+        Line("L1", nodes[0], nodes[1], 10.0),
+        Line("L2", nodes[1], nodes[2], 5.0),
+        Line("L3", nodes[1], nodes[3], 20.0),
+        Line("L4", nodes[2], nodes[3], 15.0),
+    ]
+
+    for line in lines:
+        sample_grid.add_line(line)
+
+    # Calculate currents
+    currents = sample_grid.calculate_all_currents()
+
+    # Format data for visualization
+    nodes_data = [
+        {
+            "id": node.node_id,
+            "voltage": node.voltage
+        }
+        for node in nodes
+    ]
+
+    links_data = [
+        {
+            "id": line.line_id,
+            "source": line.from_node.node_id,
+            "target": line.to_node.node_id,
+            "resistance": line.resistance,
+            "current": currents.get(line.line_id, 0.0)
+        }
+        for line in lines
+    ]
+
+    return {"nodes": nodes_data, "links": links_data}
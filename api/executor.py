@@ -0,0 +1,193 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
+from typing import Any, Callable, Dict, Optional
+
+from api.profiling import active_profile, profile_call
+
+
+class ComputeTimeout(Exception):
+    """Raised when CPU-bound work does not finish within its time budget."""
+
+
+class ComputeExecutor:
+    """
+    Runs CPU-bound endpoint work off the asyncio event loop.
+
+    Work is dispatched to a thread or process pool. Each endpoint class (e.g.
+    "grid" or "ml") has its own concurrency limit, so a burst of heavy anomaly
+    requests cannot occupy every worker and starve cheap grid calculations.
+    A concurrency slot is held until the underlying work actually finishes,
+    even if the request timed out or was cancelled, so the limits stay honest.
+    """
+
+    def __init__(self,
+                 kind: str = "thread",
+                 max_workers: Optional[int] = None,
+                 limits: Optional[Dict[str, int]] = None,
+                 default_timeout: Optional[float] = None):
+        """
+        Initialize the executor.
+
+        Args:
+            kind: "thread" or "process"
+            max_workers: Pool size (CPU count if None)
+            limits: Maximum concurrent calls per endpoint class
+            default_timeout: Seconds before a call fails with ComputeTimeout (None for no limit)
+
+        Raises:
+            ValueError: If kind is not "thread" or "process"
+        """
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.limits = dict(limits or {})
+        self.default_timeout = default_timeout
+        self._executor: Optional[Executor] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.in_flight: Dict[str, int] = {}
+        self.timeouts = 0
+
+    @classmethod
+    def from_env(cls) -> "ComputeExecutor":
+        """
+        Build an executor from environment variables.
+
+        COMPUTE_EXECUTOR selects "thread" or "process", COMPUTE_WORKERS the pool
+        size, COMPUTE_TIMEOUT_SECONDS the default timeout and
+        COMPUTE_LIMIT_<CLASS> the concurrency limit of an endpoint class.
+
+        Returns:
+            Configured executor
+        """
+        limits = {
+            name[len("COMPUTE_LIMIT_"):].lower(): int(value)
+            for name, value in os.environ.items() if name.startswith("COMPUTE_LIMIT_")
+        }
+        timeout = os.environ.get("COMPUTE_TIMEOUT_SECONDS")
+        workers = os.environ.get("COMPUTE_WORKERS")
+        return cls(kind=os.environ.get("COMPUTE_EXECUTOR", "thread"),
+                   max_workers=int(workers) if workers else None,
+                   limits=limits,
+                   default_timeout=float(timeout) if timeout else None)
+
+    @property
+    def executor(self) -> Executor:
+        """The underlying pool, created on first use."""
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="compute")
+        return self._executor
+
+    def _semaphore(self, endpoint_class: str) -> asyncio.Semaphore:
+        # Semaphores belong to the loop they are used in; start over if the
+        # executor is used from a new loop (e.g. a test client per request)
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphores = {}
+        if endpoint_class not in self._semaphores:
+            limit = self.limits.get(endpoint_class, self.max_workers)
+            self._semaphores[endpoint_class] = asyncio.Semaphore(limit)
+        return self._semaphores[endpoint_class]
+
+    async def run(self, endpoint_class: str, func: Callable[..., Any], *args: Any,
+                  timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """
+        Run a function in the pool and await its result.
+
+        With a process pool, ``func`` and its arguments must be picklable
+        (module-level functions and plain data). If the current request is
+        being profiled, the call runs under its profiler in the worker.
+
+        Args:
+            endpoint_class: Concurrency class of the caller
+            func: Function to run
+            *args: Positional arguments for func
+            timeout: Seconds before giving up (the executor default if None)
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The function's return value
+
+        Raises:
+            ComputeTimeout: If waiting for a slot plus running exceeds the timeout
+        """
+        timeout = self.default_timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        semaphore = self._semaphore(endpoint_class)
+
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise ComputeTimeout(f"No {endpoint_class} worker available within {timeout}s")
+
+        self.in_flight[endpoint_class] = self.in_flight.get(endpoint_class, 0) + 1
+
+        def release() -> None:
+            self.in_flight[endpoint_class] -= 1
+            semaphore.release()
+
+        profile = active_profile()
+        if profile is not None:
+            call = functools.partial(profile_call, profile.mode, profile.interval, func, *args, **kwargs)
+        else:
+            call = functools.partial(func, *args, **kwargs)
+
+        try:
+            work = self.executor.submit(call)
+        except BaseException:
+            release()
+            raise
+        # Fires from the worker once the work is really done, or right away if
+        # it is cancelled before it started
+        work.add_done_callback(lambda _: loop.call_soon_threadsafe(release))
+
+        remaining = None if deadline is None else max(0.0, deadline - loop.time())
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(work), remaining)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            work.cancel()
+            raise ComputeTimeout(f"{endpoint_class} computation exceeded {timeout}s")
+        except asyncio.CancelledError:
+            # Client went away: drop the work if it has not started yet
+            work.cancel()
+            raise
+        if profile is not None:
+            result, data = result
+            profile.add(data)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get executor statistics.
+
+        Returns:
+            Dictionary with pool kind, size, in-flight calls per class and timeouts
+        """
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "limits": dict(self.limits),
+            "in_flight": dict(self.in_flight),
+            "timeouts": self.timeouts
+        }
+
+    def shutdown(self) -> None:
+        """Shut down the pool without waiting for queued work."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
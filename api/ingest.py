@@ -0,0 +1,366 @@
+import asyncio
+import json
+import struct
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional accelerator
+    orjson = None
+
+# Binary telemetry frame, little-endian:
+#   header  "SGTF" | u8 version | u8 flags | u16 series count
+#   series  u16 id length | id (UTF-8) | u32 sample count |
+#           count x f64 timestamps (Unix seconds) | count x f64 values
+FRAME_MAGIC = b"SGTF"
+FRAME_VERSION = 1
+_FRAME_HEADER = struct.Struct("<4sBBH")
+_SERIES_ID = struct.Struct("<H")
+_SERIES_COUNT = struct.Struct("<I")
+
+# Samples of one node: (timestamps, values), both float64
+Series = Tuple[np.ndarray, np.ndarray]
+Sink = Callable[[str, np.ndarray, np.ndarray], None]
+
+
+class IngestBackpressure(Exception):
+    """Raised when the ingestion buffer stays full for longer than allowed."""
+
+
+def encode_frame(series: Dict[str, Series]) -> bytes:
+    """
+    Encode samples of several nodes as one binary telemetry frame.
+
+    Args:
+        series: (timestamps, values) keyed by node ID
+
+    Returns:
+        Frame bytes
+
+    Raises:
+        ValueError: If a node's timestamps and values differ in length
+    """
+    parts = [_FRAME_HEADER.pack(FRAME_MAGIC, FRAME_VERSION, 0, len(series))]
+    for node_id, (timestamps, values) in series.items():
+        timestamps = np.ascontiguousarray(timestamps, dtype="<f8")
+        values = np.ascontiguousarray(values, dtype="<f8")
+        if len(timestamps) != len(values):
+            raise ValueError(f"Node {node_id}: {len(timestamps)} timestamps for {len(values)} values")
+        encoded_id = node_id.encode("utf-8")
+        parts += [_SERIES_ID.pack(len(encoded_id)), encoded_id, _SERIES_COUNT.pack(len(values)),
+                  timestamps.tobytes(), values.tobytes()]
+    return b"".join(parts)
+
+
+def decode_frame(frame: bytes) -> Dict[str, Series]:
+    """
+    Decode a binary telemetry frame.
+
+    Sample arrays are read straight from the frame without copying.
+
+    Args:
+        frame: Frame bytes
+
+    Returns:
+        (timestamps, values) keyed by node ID
+
+    Raises:
+        ValueError: If the frame is malformed or truncated
+    """
+    if len(frame) < _FRAME_HEADER.size:
+        raise ValueError("Telemetry frame is shorter than its header")
+    magic, version, _, n_series = _FRAME_HEADER.unpack_from(frame, 0)
+    if magic != FRAME_MAGIC or version != FRAME_VERSION:
+        raise ValueError("Not a version 1 telemetry frame")
+
+    series: Dict[str, Series] = {}
+    offset = _FRAME_HEADER.size
+    try:
+        for _ in range(n_series):
+            (id_length,) = _SERIES_ID.unpack_from(frame, offset)
+            offset += _SERIES_ID.size
+            node_id = bytes(frame[offset:offset + id_length]).decode("utf-8")
+            offset += id_length
+            (count,) = _SERIES_COUNT.unpack_from(frame, offset)
+            offset += _SERIES_COUNT.size
+            if offset + 16 * count > len(frame):
+                raise ValueError(f"Telemetry frame is truncated in series {node_id}")
+            timestamps = np.frombuffer(frame, dtype="<f8", count=count, offset=offset)
+            values = np.frombuffer(frame, dtype="<f8", count=count, offset=offset + 8 * count)
+            offset += 16 * count
+            if node_id in series:
+                previous = series[node_id]
+                timestamps = np.concatenate([previous[0], timestamps])
+                values = np.concatenate([previous[1], values])
+            series[node_id] = (timestamps, values)
+    except struct.error:
+        raise ValueError("Telemetry frame is truncated")
+    except UnicodeDecodeError:
+        raise ValueError("Telemetry frame contains an invalid node ID")
+    if offset != len(frame):
+        raise ValueError("Telemetry frame has trailing bytes")
+    return series
+
+
+def parse_ndjson_records(lines: List[bytes], now: Optional[float] = None) -> Tuple[Dict[str, Series], List[Dict[str, Any]]]:
+    """
+    Parse NDJSON telemetry lines, grouping samples by node.
+
+    Each line is either a single sample, ``{"node_id": "N1", "value": 230.1,
+    "timestamp": 1700000000.0}``, or several samples of one node,
+    ``{"node_id": "N1", "values": [...], "timestamps": [...]}``. Missing
+    timestamps default to the time of receipt.
+
+    Args:
+        lines: Raw lines without their newline (blank lines are skipped)
+        now: Timestamp of samples without one (current time if None)
+
+    Returns:
+        Tuple of (timestamps, values) keyed by node ID, and errors of the
+        rejected lines as {"line": index, "error": message}
+    """
+    now = time.time() if now is None else now
+    loads = orjson.loads if orjson is not None else json.loads
+    timestamps: Dict[str, List[float]] = defaultdict(list)
+    values: Dict[str, List[float]] = defaultdict(list)
+    errors = []
+
+    for index, line in enumerate(lines):
+        if not line.strip():
+            continue
+        try:
+            record = loads(line)
+            node_id = record["node_id"]
+            if not isinstance(node_id, str):
+                raise ValueError("node_id must be a string")
+            if "values" in record:
+                new_values = [float(v) for v in record["values"]]
+                new_timestamps = record.get("timestamps")
+                if new_timestamps is None:
+                    new_timestamps = [now] * len(new_values)
+                elif len(new_timestamps) != len(new_values):
+                    raise ValueError("timestamps and values differ in length")
+                else:
+                    new_timestamps = [float(t) for t in new_timestamps]
+                values[node_id].extend(new_values)
+                timestamps[node_id].extend(new_timestamps)
+            else:
+                value = float(record["value"])
+                timestamp = float(record.get("timestamp", now))
+                values[node_id].append(value)
+                timestamps[node_id].append(timestamp)
+        except KeyError as e:
+            errors.append({"line": index, "error": f"Missing field {e.args[0]}"})
+        except (ValueError, TypeError, AttributeError) as e:
+            errors.append({"line": index, "error": str(e) or "Invalid record"})
+
+    series = {
+        node_id: (np.asarray(timestamps[node_id], dtype=np.float64), np.asarray(node_values, dtype=np.float64))
+        for node_id, node_values in values.items()
+    }
+    return series, errors
+
+
+class TelemetryIngestor:
+    """
+    Buffers incoming telemetry and hands it to its sinks in bulk.
+
+    Producers (request handlers) only append array chunks to a pending
+    table under a short lock, once per batch rather than per sample. A
+    background thread periodically swaps the table out and writes each
+    node's samples to every sink with a single call, so sinks see few,
+    large appends.
+
+    When sinks fall behind and the pending sample count reaches
+    ``max_pending``, ``wait_for_capacity`` makes producers wait, which stops
+    them reading from their sockets and pushes the backpressure to clients.
+    """
+
+    def __init__(self, sinks: Iterable[Sink], max_pending: int = 1_000_000,
+                 flush_interval: float = 0.05, flush_samples: int = 50_000):
+        """
+        Initialize the ingestor.
+
+        Args:
+            sinks: Called as sink(node_id, timestamps, values) for every flushed node
+            max_pending: Pending samples above which producers have to wait
+            flush_interval: Longest time samples stay pending, in seconds
+            flush_samples: Pending samples that trigger an early flush
+        """
+        self.sinks = list(sinks)
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.flush_samples = flush_samples
+        self._pending: Dict[str, List[Series]] = defaultdict(list)
+        self._pending_samples = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.accepted = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.sink_errors = 0
+
+    @property
+    def pending(self) -> int:
+        """Samples accepted but not yet written to the sinks."""
+        return self._pending_samples
+
+    def has_capacity(self) -> bool:
+        """Whether producers may submit more samples."""
+        return self._pending_samples < self.max_pending
+
+    def start(self) -> None:
+        """Start the background flusher (idempotent)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="telemetry-flush", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Flush everything still pending and stop the background flusher."""
+        with self._lock:
+            self._stopping = True
+            self._wakeup.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        self.flush()
+
+    def submit(self, series: Dict[str, Series]) -> int:
+        """
+        Queue samples for the sinks.
+
+        Args:
+            series: (timestamps, values) keyed by node ID
+
+        Returns:
+            Number of samples accepted
+        """
+        count = sum(len(values) for _, values in series.values())
+        if count == 0:
+            return 0
+        if self._thread is None:
+            self.start()
+        with self._lock:
+            for node_id, chunk in series.items():
+                if len(chunk[1]):
+                    self._pending[node_id].append(chunk)
+            self._pending_samples += count
+            self.accepted += count
+            if self._pending_samples >= self.flush_samples:
+                self._wakeup.notify()
+        return count
+
+    async def wait_for_capacity(self, timeout: Optional[float] = None, poll_interval: float = 0.005) -> None:
+        """
+        Wait until the pending buffer has room again.
+
+        Args:
+            timeout: Seconds to wait at most (None for no limit)
+            poll_interval: Seconds between checks
+
+        Raises:
+            IngestBackpressure: If the buffer is still full after the timeout
+        """
+        if self.has_capacity():
+            return
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while not self.has_capacity():
+            if deadline is not None and loop.time() >= deadline:
+                raise IngestBackpressure(f"Ingestion buffer full ({self._pending_samples} samples pending)")
+            await asyncio.sleep(poll_interval)
+
+    def flush(self) -> int:
+        """
+        Write all pending samples to the sinks now.
+
+        Returns:
+            Number of samples written
+        """
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(list)
+            count = self._pending_samples
+
+        written = 0
+        for node_id, chunks in pending.items():
+            if len(chunks) == 1:
+                timestamps, values = chunks[0]
+            else:
+                timestamps = np.concatenate([chunk[0] for chunk in chunks])
+                values = np.concatenate([chunk[1] for chunk in chunks])
+            for sink in self.sinks:
+                try:
+                    sink(node_id, timestamps, values)
+                except Exception:
+                    self.sink_errors += 1
+            written += len(values)
+
+        with self._lock:
+            # Samples submitted during the flush stay pending for the next one
+            self._pending_samples -= count
+            self.flushed += written
+            self.flushes += 1
+        return written
+
+    def _run(self) -> None:
+        """Flush periodically, or early when many samples are pending."""
+        while True:
+            with self._lock:
+                if not self._stopping and self._pending_samples < self.flush_samples:
+                    self._wakeup.wait(self.flush_interval)
+                if self._stopping:
+                    return
+            if self._pending_samples:
+                self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get ingestion statistics.
+
+        Returns:
+            Dictionary with accepted, pending and flushed sample counts
+        """
+        return {
+            "accepted": self.accepted,
+            "pending": self._pending_samples,
+            "max_pending": self.max_pending,
+            "flushed": self.flushed,
+            "flushes": self.flushes,
+            "sink_errors": self.sink_errors
+        }
+
+
+class LineSplitter:
+    """Reassembles NDJSON lines from arbitrarily split body chunks."""
+
+    def __init__(self):
+        self._partial = b""
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        """
+        Add a body chunk.
+
+        Args:
+            chunk: Next bytes of the body
+
+        Returns:
+            Lines completed by this chunk
+        """
+        lines = (self._partial + chunk).split(b"\n")
+        self._partial = lines.pop()
+        return lines
+
+    def close(self) -> List[bytes]:
+        """Return the last line if the body did not end with a newline."""
+        partial, self._partial = self._partial, b""
+        return [partial] if partial.strip() else []
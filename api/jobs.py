@@ -0,0 +1,582 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from api.codecs import _plain
+from api.singleflight import canonical_key
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional accelerator
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT UNIQUE NOT NULL,
+    kind TEXT NOT NULL,
+    dedupe_key TEXT NOT NULL,
+    params TEXT NOT NULL,
+    state TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    error TEXT,
+    result BLOB,
+    result_format TEXT,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    owner TEXT,
+    heartbeat REAL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, seq);
+CREATE INDEX IF NOT EXISTS jobs_dedupe ON jobs (dedupe_key);
+"""
+
+# Columns added after the first release, created on databases that predate them
+_ADDED_COLUMNS = {
+    "owner": "TEXT",
+    "heartbeat": "REAL",
+    "cancel_requested": "INTEGER NOT NULL DEFAULT 0",
+}
+
+
+class JobCancelled(Exception):
+    """Raised inside a job handler once its job has been cancelled."""
+
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are waiting to run."""
+
+
+def encode_result(result: Any) -> Tuple[bytes, str]:
+    """
+    Serialize a job result compactly.
+
+    Args:
+        result: Plain data, possibly containing NumPy arrays and scalars
+
+    Returns:
+        Tuple of (zlib-compressed MessagePack, or JSON without msgpack) and its format name
+    """
+    if msgpack is not None:
+        return zlib.compress(msgpack.packb(result, default=_plain, use_bin_type=True)), "msgpack+zlib"
+    return zlib.compress(json.dumps(result, default=_plain).encode()), "json+zlib"
+
+
+def decode_result(data: bytes, result_format: str) -> Any:
+    """Inverse of ``encode_result``."""
+    raw = zlib.decompress(data)
+    if result_format == "msgpack+zlib":
+        return msgpack.unpackb(raw, raw=False)
+    return json.loads(raw)
+
+
+class JobContext:
+    """Handle given to a running job for progress reports and cancellation checks."""
+
+    def __init__(self, queue: "JobQueue", job_id: str, params: Dict[str, Any]):
+        self.queue = queue
+        self.job_id = job_id
+        self.params = params
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancellation of the job was requested."""
+        return self.job_id in self.queue._cancel_requested
+
+    def check_cancelled(self) -> None:
+        """
+        Stop the job if it has been cancelled.
+
+        Raises:
+            JobCancelled: If cancellation was requested
+        """
+        if self.cancelled:
+            raise JobCancelled(self.job_id)
+
+    def progress(self, fraction: float, message: Optional[str] = None) -> None:
+        """
+        Report progress; also a cancellation point.
+
+        Args:
+            fraction: Share of the work done, between 0 and 1
+            message: Short description of the current step
+
+        Raises:
+            JobCancelled: If cancellation was requested
+        """
+        self.queue._report(self.job_id, min(1.0, max(0.0, float(fraction))), message)
+        self.check_cancelled()
+
+
+class JobQueue:
+    """
+    Persistent queue of long-running jobs with a bounded pool of worker threads.
+
+    Jobs are kept in a SQLite database, so queued jobs and results survive
+    restarts, and several processes (e.g. uvicorn workers) may share one
+    file. A worker claims a job by recording its queue as the owner and
+    holds a lease that is renewed while the job runs; jobs whose lease
+    expires, because their process died, are queued again. Progress and
+    cancellation requests are stored in the database, so any process can
+    report or cancel any job. Submitting a job whose kind and parameters
+    match a queued, running or succeeded job returns that job instead of
+    starting another; jobs registered with side effects only reuse queued
+    or running jobs.
+
+    Handlers are called as ``handler(params, context)`` in a worker thread
+    and should call ``context.progress`` regularly, which is also where
+    cancellation takes effect.
+    """
+
+    def __init__(self, path: str = ":memory:", workers: int = 2, max_queued: int = 1000,
+                 lease_seconds: float = 30.0, progress_interval: float = 0.5):
+        """
+        Initialize the queue.
+
+        The database is opened on first use, so building a queue has no
+        side effects on the filesystem.
+
+        Args:
+            path: SQLite database file (":memory:" for a non-persistent queue)
+            workers: Number of jobs run at once
+            max_queued: Queued jobs above which submissions are refused
+            lease_seconds: Time without a lease renewal after which a running job is queued again
+            progress_interval: Minimum seconds between progress writes of one job
+        """
+        self.path = path
+        self.workers = workers
+        self.max_queued = max_queued
+        self.lease_seconds = lease_seconds
+        self.progress_interval = progress_interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._handlers: Dict[str, Tuple[Callable[..., Any], Optional[Callable[[Dict[str, Any]], Dict[str, Any]]],
+                                        Optional[Callable[[Dict[str, Any]], bool]]]] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._connect_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._threads: List[threading.Thread] = []
+        self._lease_thread: Optional[threading.Thread] = None
+        self._lease_stop = threading.Event()
+        self._stopping = False
+        # Latest progress of this process's running jobs and when it was last written
+        self._progress: Dict[str, Tuple[float, Optional[str]]] = {}
+        self._progress_written: Dict[str, float] = {}
+        self._cancel_requested: set = set()
+        self._running: set = set()
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        """The database connection, opened on first use."""
+        if self._conn is None:
+            with self._connect_lock:
+                if self._conn is None:
+                    self._conn = self._open()
+        return self._conn
+
+    def _open(self) -> sqlite3.Connection:
+        """Open the database, creating or upgrading its schema."""
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30.0)
+        db.row_factory = sqlite3.Row
+        if self.path != ":memory:":
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            for statement in _SCHEMA.split(";"):
+                if statement.strip():
+                    db.execute(statement)
+            columns = {row["name"] for row in db.execute("PRAGMA table_info(jobs)")}
+            for name, declaration in _ADDED_COLUMNS.items():
+                if name not in columns:
+                    db.execute(f"ALTER TABLE jobs ADD COLUMN {name} {declaration}")
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return db
+
+    @classmethod
+    def from_env(cls) -> "JobQueue":
+        """
+        Build a queue from environment variables.
+
+        JOB_DB_PATH sets the database file, JOB_WORKERS the number of
+        workers, JOB_MAX_QUEUED the queue limit and JOB_LEASE_SECONDS the
+        lease after which jobs of a dead process run again.
+
+        Returns:
+            Configured queue
+        """
+        return cls(path=os.environ.get("JOB_DB_PATH", os.path.join("data", "jobs.sqlite3")),
+                   workers=int(os.environ.get("JOB_WORKERS", 2)),
+                   max_queued=int(os.environ.get("JOB_MAX_QUEUED", 1000)),
+                   lease_seconds=float(os.environ.get("JOB_LEASE_SECONDS", 30)))
+
+    def register(self, kind: str, handler: Callable[[Dict[str, Any], JobContext], Any],
+                 validate: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+                 side_effects: Optional[Callable[[Dict[str, Any]], bool]] = None) -> None:
+        """
+        Register a job kind.
+
+        Args:
+            kind: Job kind name
+            handler: Runs the job and returns its result
+            validate: Checks and normalizes parameters at submission, raising ValueError
+            side_effects: Tells whether a job does more than return its result (e.g.
+                publishes a model); such jobs are only deduplicated while queued or
+                running, so resubmitting a finished one runs it again
+        """
+        self._handlers[kind] = (handler, validate, side_effects)
+
+    @property
+    def kinds(self) -> List[str]:
+        """Registered job kinds."""
+        return sorted(self._handlers)
+
+    def start(self) -> None:
+        """Start the worker threads (idempotent)."""
+        with self._lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            self._stopping = False
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f"job-worker-{len(self._threads)}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            if self._lease_thread is None or not self._lease_thread.is_alive():
+                self._lease_stop.clear()
+                self._lease_thread = threading.Thread(target=self._renew_leases, name="job-leases", daemon=True)
+                self._lease_thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the workers; running jobs are cancelled and queued again on restart.
+
+        Args:
+            timeout: Seconds to wait for each worker
+        """
+        with self._lock:
+            self._stopping = True
+            self._cancel_requested.update(self._running)
+            self._wakeup.notify_all()
+            threads = list(self._threads)
+        for thread in threads:
+            thread.join(timeout)
+        self._threads = []
+        # Leases are held until the workers have let go of their jobs
+        self._lease_stop.set()
+        if self._lease_thread is not None:
+            self._lease_thread.join(timeout)
+            self._lease_thread = None
+
+    def submit(self, kind: str, params: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """
+        Submit a job, or find the identical one submitted before.
+
+        Args:
+            kind: Registered job kind
+            params: Job parameters
+
+        Returns:
+            Tuple of the job's status and whether it was newly created
+
+        Raises:
+            ValueError: If the kind is unknown or the parameters are invalid
+            JobQueueFull: If too many jobs are queued
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind '{kind}'. Use one of {self.kinds}")
+        _, validate, side_effects = self._handlers[kind]
+        if validate is not None:
+            params = validate(params)
+        key = canonical_key(kind, params)
+        reusable = (QUEUED, RUNNING) if side_effects is not None and side_effects(params) \
+            else (QUEUED, RUNNING, SUCCEEDED)
+
+        with self._lock:
+            # The lookup and insert form one write transaction, so processes
+            # sharing the database cannot both create the same job
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    f"SELECT id FROM jobs WHERE dedupe_key = ? AND state IN ({', '.join('?' * len(reusable))}) "
+                    "ORDER BY seq DESC LIMIT 1",
+                    (key, *reusable)
+                ).fetchone()
+                if row is not None:
+                    job_id, created = row["id"], False
+                else:
+                    (queued,) = self._db.execute("SELECT COUNT(*) FROM jobs WHERE state = ?", (QUEUED,)).fetchone()
+                    if queued >= self.max_queued:
+                        raise JobQueueFull(f"{queued} jobs are already queued")
+                    job_id, created = uuid.uuid4().hex, True
+                    self._db.execute(
+                        "INSERT INTO jobs (id, kind, dedupe_key, params, state, created) VALUES (?, ?, ?, ?, ?, ?)",
+                        (job_id, kind, key, json.dumps(params, default=_plain), QUEUED, time.time())
+                    )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            if created:
+                self._wakeup.notify()
+            return self._status(job_id), created
+
+    def _status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._db.execute(
+            "SELECT id, kind, state, progress, message, error, created, started, finished, cancel_requested "
+            "FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        status = dict(row)
+        if status["state"] == RUNNING and job_id in self._progress:
+            # Running here: the latest report may not have been written yet
+            status["progress"], status["message"] = self._progress[job_id]
+        status["cancel_requested"] = bool(status["cancel_requested"]) or job_id in self._cancel_requested
+        return status
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a job's state and progress.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Status dictionary, or None if the job does not exist
+        """
+        with self._lock:
+            return self._status(job_id)
+
+    def list(self, state: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        List jobs, newest first.
+
+        Args:
+            state: Only jobs in this state (all if None)
+            limit: Maximum number of jobs
+
+        Returns:
+            Status dictionaries
+        """
+        with self._lock:
+            if state is None:
+                rows = self._db.execute("SELECT id FROM jobs ORDER BY seq DESC LIMIT ?", (limit,)).fetchall()
+            else:
+                rows = self._db.execute("SELECT id FROM jobs WHERE state = ? ORDER BY seq DESC LIMIT ?",
+                                        (state, limit)).fetchall()
+            return [self._status(row["id"]) for row in rows]
+
+    def result(self, job_id: str) -> Any:
+        """
+        Get a succeeded job's result.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Decoded result
+
+        Raises:
+            KeyError: If the job does not exist
+            ValueError: If the job has not succeeded
+        """
+        with self._lock:
+            row = self._db.execute("SELECT state, result, result_format FROM jobs WHERE id = ?",
+                                   (job_id,)).fetchone()
+        if row is None:
+            raise KeyError(job_id)
+        if row["state"] != SUCCEEDED:
+            raise ValueError(f"Job {job_id} is {row['state']}, not {SUCCEEDED}")
+        return decode_result(row["result"], row["result_format"])
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a job: queued jobs never run, running jobs stop at their next progress report.
+
+        The request is stored in the database, so it reaches jobs running in
+        other processes within a lease renewal interval.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Updated status, or None if the job does not exist
+        """
+        with self._lock:
+            cursor = self._db.execute("UPDATE jobs SET state = ?, finished = ? WHERE id = ? AND state = ?",
+                                      (CANCELLED, time.time(), job_id, QUEUED))
+            if cursor.rowcount == 0:
+                self._db.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND state = ?",
+                                 (job_id, RUNNING))
+                if job_id in self._running:
+                    self._cancel_requested.add(job_id)
+            return self._status(job_id)
+
+    def prune(self, max_age: float) -> int:
+        """
+        Delete finished jobs older than ``max_age`` seconds.
+
+        Returns:
+            Number of jobs deleted
+        """
+        with self._lock:
+            cursor = self._db.execute(
+                "DELETE FROM jobs WHERE state IN (?, ?, ?) AND finished < ?",
+                (*FINISHED, time.time() - max_age)
+            )
+            return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the number of jobs per state.
+
+        Returns:
+            Dictionary of counts keyed by state
+        """
+        with self._lock:
+            rows = self._db.execute("SELECT state, COUNT(*) AS n FROM jobs GROUP BY state").fetchall()
+        return {row["state"]: row["n"] for row in rows}
+
+    def _requeue_expired(self) -> int:
+        """Queue again the running jobs whose owner stopped renewing its lease."""
+        cursor = self._db.execute(
+            "UPDATE jobs SET state = ?, owner = NULL, started = NULL, heartbeat = NULL "
+            "WHERE state = ? AND (heartbeat IS NULL OR heartbeat < ?)",
+            (QUEUED, RUNNING, time.time() - self.lease_seconds)
+        )
+        if cursor.rowcount:
+            logger.warning(f"Queued {cursor.rowcount} jobs again after their lease expired")
+        return cursor.rowcount
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        """Take the oldest queued job, waiting for one if needed; None when stopping."""
+        with self._lock:
+            while not self._stopping:
+                self._requeue_expired()
+                row = self._db.execute(
+                    "SELECT id, kind, params FROM jobs WHERE state = ? ORDER BY seq LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    self._wakeup.wait(1.0)
+                    continue
+                # Another process may have claimed the job since it was read
+                now = time.time()
+                cursor = self._db.execute(
+                    "UPDATE jobs SET state = ?, owner = ?, started = ?, heartbeat = ?, progress = 0, message = NULL "
+                    "WHERE id = ? AND state = ?",
+                    (RUNNING, self.owner, now, now, row["id"], QUEUED)
+                )
+                if cursor.rowcount == 1:
+                    self._running.add(row["id"])
+                    return row
+            return None
+
+    def _report(self, job_id: str, progress: float, message: Optional[str]) -> None:
+        """Record a running job's progress, writing it at most every ``progress_interval`` seconds."""
+        self._progress[job_id] = (progress, message)
+        now = time.time()
+        if now - self._progress_written.get(job_id, 0.0) < self.progress_interval:
+            return
+        self._progress_written[job_id] = now
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET progress = ?, message = ?, heartbeat = ? WHERE id = ? AND owner = ? AND state = ?",
+                (progress, message, now, job_id, self.owner, RUNNING)
+            )
+            row = self._db.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            # A lost lease means the job was queued again elsewhere: stop this copy
+            if cursor.rowcount == 0 or row is None or row["cancel_requested"]:
+                self._cancel_requested.add(job_id)
+
+    def _renew_leases(self) -> None:
+        """Lease thread: keep this process's running jobs alive and pick up cancellations."""
+        while not self._lease_stop.wait(self.lease_seconds / 3):
+            with self._lock:
+                if not self._running:
+                    continue
+                self._db.execute("UPDATE jobs SET heartbeat = ? WHERE owner = ? AND state = ?",
+                                 (time.time(), self.owner, RUNNING))
+                owned = {row["id"]: row["cancel_requested"] for row in self._db.execute(
+                    "SELECT id, cancel_requested FROM jobs WHERE owner = ? AND state = ?", (self.owner, RUNNING)
+                )}
+                for job_id in self._running:
+                    if owned.get(job_id, 1):
+                        self._cancel_requested.add(job_id)
+
+    def _release(self, job_id: str) -> Tuple[float, Optional[str]]:
+        """Forget a job's local state; returns its latest progress. Call with the lock held."""
+        self._running.discard(job_id)
+        self._cancel_requested.discard(job_id)
+        self._progress_written.pop(job_id, None)
+        return self._progress.pop(job_id, (0.0, None))
+
+    def _finish(self, job_id: str, state: str, result: Optional[Tuple[bytes, str]] = None,
+                error: Optional[str] = None) -> None:
+        with self._lock:
+            progress, message = self._release(job_id)
+            if state == SUCCEEDED:
+                progress, message = 1.0, None
+            # Only the owner records the outcome; a job whose lease was lost belongs to its new owner
+            self._db.execute(
+                "UPDATE jobs SET state = ?, progress = ?, message = ?, error = ?, result = ?, result_format = ?, "
+                "finished = ?, heartbeat = NULL WHERE id = ? AND owner = ? AND state = ?",
+                (state, progress, message, error, result[0] if result else None,
+                 result[1] if result else None, time.time(), job_id, self.owner, RUNNING)
+            )
+
+    def _work(self) -> None:
+        """Worker thread: run queued jobs one at a time."""
+        while True:
+            row = self._claim()
+            if row is None:
+                return
+            job_id, kind = row["id"], row["kind"]
+            handler = self._handlers.get(kind, (None, None, None))[0]
+            if handler is None:
+                self._finish(job_id, FAILED, error=f"No handler for job kind '{kind}'")
+                continue
+            context = JobContext(self, job_id, json.loads(row["params"]))
+            try:
+                result = handler(context.params, context)
+                self._finish(job_id, SUCCEEDED, result=encode_result(result))
+            except JobCancelled:
+                if self._stopping:
+                    # Interrupted by shutdown rather than by a user: run again later
+                    with self._lock:
+                        cursor = self._db.execute(
+                            "UPDATE jobs SET state = ?, owner = NULL, started = NULL, heartbeat = NULL "
+                            "WHERE id = ? AND owner = ? AND state = ? AND cancel_requested = 0",
+                            (QUEUED, job_id, self.owner, RUNNING)
+                        )
+                        if cursor.rowcount:
+                            self._release(job_id)
+                            continue
+                self._finish(job_id, CANCELLED)
+            except ValueError as e:
+                self._finish(job_id, FAILED, error=str(e))
+            except Exception as e:
+                logger.exception(f"Job {job_id} ({kind}) failed")
+                self._finish(job_id, FAILED, error=f"{type(e).__name__}: {e}")
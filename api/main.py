@@ -1,7 +1,8 @@
-from fastapi import FastAPI, HTTPException, Depends, Query, WebSocket, WebSocketDisconnect, status
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response, WebSocket, WebSocketDisconnect, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from fastapi.responses import StreamingResponse
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from pydantic import BaseModel, Field, validator, conlist
 import numpy as np
 import sys
@@ -10,6 +11,8 @@ from typing import List, Dict, Any, Optional
 import logging
 import uvicorn
 import json
+import asyncio
+import threading
 from datetime import datetime, timedelta
 import jwt
 from jwt.exceptions import PyJWTError
@@ -20,7 +23,36 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import from other project modules
 from power_grid.grid import Node, Line, PowerGrid
+from power_grid.session import GridSessionStore
+from power_grid.arrays import ArrayGrid
+from power_grid.visualization import VisualizationStore, load_visualization_data
+from api.broadcast import ConnectionManager
+from api.auth import ServiceKeyStore, TokenCache
+from api.metrics import REGISTRY, MetricsMiddleware
+from api.profiling import CPROFILE, ProfilingMiddleware, RequestProfiler
+from api.jobs import JobQueue, JobQueueFull
+from api.shared_state import SharedState, SharedStateStore
+from api.ingest import IngestBackpressure, LineSplitter, TelemetryIngestor, decode_frame, parse_ndjson_records
+from api.executor import ComputeExecutor, ComputeTimeout
+from api.codecs import (
+    FastJSONResponse, read_grid_payload, read_voltage_payload, read_priority_payload, encode_response,
+    request_body_spec, grid_from_document, voltage_from_document
+)
+from api.batch import NDJSON, read_batch_payload, stream_batch
+from api.singleflight import SingleFlight, canonical_grid_key
+from api.compute import (
+    create_power_grid, grid_currents, grid_validation, forecast_voltage, anomaly_report,
+    sample_grid_visualization, baseline_forecasters, contingency_sweep, anomaly_reprocess,
+    train_voltage_predictor, to_array_grid, array_grid_currents, forecast_lstm,
+    publish_voltage_predictor, shared_predictor, PREDICTOR_STATE
+)
 from ml_pipeline.models import VoltagePredictor, AnomalyDetector
+from ml_pipeline.cache import ResultCache
+from ml_pipeline.features import FeatureStore
+from ml_pipeline.timeseries import TimeSeriesStore
+from ml_pipeline.archive import VoltageArchive
+from ml_pipeline import __version__ as ml_pipeline_version
+from load_scheduler import Load, LoadScheduler
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -30,7 +62,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Smart Grid Optimization API",
     description="API for power grid simulation, load scheduling, and anomaly detection",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # Add CORS middleware
@@ -42,6 +75,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency and payload size histograms, served on /metrics
+app.add_middleware(MetricsMiddleware, registry=REGISTRY)
+
 # Mount static files from frontend build
 app.mount("/static", StaticFiles(directory="frontend/dist"), name="static")
 
@@ -53,13 +89,21 @@ REFRESH_TOKEN_EXPIRE_DAYS = 7
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
+# Bearer tokens and service API keys are both optional so either can be used
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+
+# Verified access tokens, cached until their own expiry
+token_cache = TokenCache(max_entries=int(os.environ.get("TOKEN_CACHE_SIZE", 10000)))
+# Long-lived machine client keys: SERVICE_API_KEYS="scheduler:<key>,dashboard:<key>"
+service_keys = ServiceKeyStore.from_env(os.environ.get("SERVICE_API_KEYS"))
 
 # Pydantic models for request/response validation
 class NodeModel(BaseModel):
     """Pydantic model for a node in the electrical grid."""
     node_id: str
     voltage: float
+    region: Optional[str] = None  # Used by /grid/updates region subscriptions
     
     @validator('voltage')
     def voltage_must_be_positive(cls, v):
@@ -135,16 +179,64 @@ class ValidationResponse(BaseModel):
     errors: List[str]
 
 
+class GridDeltaModel(BaseModel):
+    """Pydantic model for a partial update of a resident grid session."""
+    voltages: Dict[str, float] = {}
+    resistances: Dict[str, float] = {}
+    
+    class Config:
+        schema_extra = {
+            "example": {
+                "voltages": {"N2": 120.0},
+                "resistances": {"L1": 12.0}
+            }
+        }
+
+
+class GridSessionResponse(BaseModel):
+    """Pydantic model for a created grid session."""
+    session_id: str
+    node_count: int
+    line_count: int
+
+
+class GridDeltaResponse(BaseModel):
+    """Pydantic model for the result of a grid session update."""
+    version: int
+    currents: Dict[str, float]
+    total_power: float
+
+
+class LossesResponse(BaseModel):
+    """Pydantic model for resistive losses of a grid."""
+    line_losses: Dict[str, float]
+    total_power: float
+
+
 class VoltageDataModel(BaseModel):
     """Pydantic model for voltage time series data."""
     values: conlist(float, min_items=1)
     sequence_length: int = Field(24, ge=1)
+    model: str = "naive"
     
     class Config:
         schema_extra = {
             "example": {
                 "values": [230.1, 229.8, 230.2, 230.0, 229.9],
-                "sequence_length": 3
+                "sequence_length": 3,
+                "model": "naive"
+            }
+        }
+
+
+class NodeSamplesModel(BaseModel):
+    """Pydantic model for new voltage readings of a single node."""
+    values: conlist(float, min_items=1)
+    
+    class Config:
+        schema_extra = {
+            "example": {
+                "values": [230.1, 229.8, 230.2]
             }
         }
 
@@ -162,6 +254,77 @@ class AnomalyResponse(BaseModel):
     anomaly_percentage: float
 
 
+# Background job models
+class JobSubmission(BaseModel):
+    """Pydantic model for a background job request."""
+    kind: str
+    params: Dict[str, Any] = {}
+    
+    class Config:
+        schema_extra = {
+            "example": {
+                "kind": "anomaly_reprocess",
+                "params": {"node_id": "N1", "source": "archive", "window_seconds": 86400}
+            }
+        }
+
+
+class ContingencySweepParams(BaseModel):
+    """Parameters of an N-1 contingency sweep job."""
+    grid: GridModel
+
+
+class HistoryRangeParams(BaseModel):
+    """Voltage history of a node read by a job."""
+    node_id: str
+    start: Optional[float] = None
+    end: Optional[float] = None
+    source: str = Field("store", regex="^(store|archive)$")
+
+
+class AnomalyReprocessParams(HistoryRangeParams):
+    """Parameters of an anomaly reprocessing job."""
+    window_seconds: float = Field(86400, gt=0)
+    eps: float = Field(0.3, gt=0)
+    min_samples: int = Field(5, ge=1)
+
+
+class TrainPredictorParams(HistoryRangeParams):
+    """Parameters of a VoltagePredictor training job."""
+    sequence_length: int = Field(24, ge=1)
+    lstm_units: conlist(int, min_items=2, max_items=2) = [50, 30]
+    epochs: int = Field(10, ge=1, le=1000)
+    batch_size: int = Field(32, ge=1)
+    publish: bool = False
+
+
+# Load scheduler models
+class LoadModel(BaseModel):
+    """Pydantic model for a schedulable load."""
+    load_id: str
+    power_requirement: float = Field(..., gt=0)
+    priority: int
+    
+    class Config:
+        schema_extra = {
+            "example": {
+                "load_id": "L1",
+                "power_requirement": 1500.0,
+                "priority": 2
+            }
+        }
+
+
+class LoadBatchModel(BaseModel):
+    """Pydantic model for adding many loads at once."""
+    loads: List[LoadModel]
+
+
+class PriorityModel(BaseModel):
+    """Pydantic model for a load priority change."""
+    priority: int
+
+
 # Authentication models
 class Token(BaseModel):
     access_token: str
@@ -179,23 +342,36 @@ class User(BaseModel):
 
 
 class UserInDB(User):
-    hashed_password: str
+    hashed_password: Optional[str] = None
 
 
-# Mock user database - in production, use a real database
+# Mock user database - in production, use a real database. A missing hash
+# is filled in on first login (ADMIN_PASSWORD_HASH avoids hashing entirely),
+# so importing the app does not pay for a bcrypt round.
 users_db = {
     "admin": {
         "username": "admin",
-        "hashed_password": pwd_context.hash("admin"),
+        "hashed_password": os.environ.get("ADMIN_PASSWORD_HASH"),
         "disabled": False
     }
 }
+DEFAULT_PASSWORDS = {"admin": "admin"}
+_password_lock = threading.Lock()
+
+# UserInDB records built once per users_db entry
+_user_records: Dict[str, Any] = {}
 
 
 # Grid visualization models
 class GridVisualizationResponse(BaseModel):
     nodes: List[Dict[str, Any]]
     links: List[Dict[str, Any]]
+    version: Optional[int] = None
+    lod: Optional[str] = None
+    total_nodes: Optional[int] = None
+    total_links: Optional[int] = None
+    offset: Optional[int] = None
+    limit: Optional[int] = None
 
 
 class RefreshRequest(BaseModel):
@@ -203,26 +379,17 @@ class RefreshRequest(BaseModel):
 
 
 # WebSocket connection manager
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
-
-    async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
-
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+manager = ConnectionManager(
+    max_queue=int(os.environ.get("WS_MAX_QUEUE", 32)),
+    tick_interval=float(os.environ.get("WS_TICK_SECONDS", 0.5))
+)
 
 
-manager = ConnectionManager()
+# Scrape-time gauges: nothing is recorded on the hot path
+REGISTRY.gauge("smartgrid_websocket_clients", "Connected WebSocket clients",
+               callback=lambda: {(): manager.stats()["clients"]})
+REGISTRY.gauge("smartgrid_websocket_queue_depth", "Messages waiting in WebSocket client queues",
+               callback=lambda: {(): manager.stats()["queued"]})
 
 
 # Authentication functions
@@ -231,15 +398,32 @@ def verify_password(plain_password, hashed_password):
 
 
 def get_user(db, username: str):
-    if username in db:
-        user_dict = db[username]
-        return UserInDB(**user_dict)
-    return None
+    user_dict = db.get(username)
+    if user_dict is None:
+        return None
+    # Reuse the record built for this exact entry instead of revalidating it
+    cached = _user_records.get(username)
+    if cached is not None and cached[0] is user_dict:
+        return cached[1]
+    user = UserInDB(**user_dict)
+    _user_records[username] = (user_dict, user)
+    return user
+
+
+def ensure_password_hash(db, username: str):
+    """Hash a default password on first use instead of at import time."""
+    user_dict = db.get(username)
+    if user_dict is not None and user_dict.get("hashed_password") is None:
+        with _password_lock:
+            if user_dict.get("hashed_password") is None and username in DEFAULT_PASSWORDS:
+                user_dict["hashed_password"] = pwd_context.hash(DEFAULT_PASSWORDS[username])
+                _user_records.pop(username, None)
 
 
 def authenticate_user(fake_db, username: str, password: str):
+    ensure_password_hash(fake_db, username)
     user = get_user(fake_db, username)
-    if not user:
+    if not user or user.hashed_password is None:
         return False
     if not verify_password(password, user.hashed_password):
         return False
@@ -265,14 +449,36 @@ def create_refresh_token(data: dict):
     return encoded_jwt
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
+def decode_token(token: str) -> dict:
+    """
+    Verify a JWT, skipping the signature check for recently verified tokens.
+    
+    Raises:
+        PyJWTError: If the token is invalid or expired
+    """
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        token_cache.set(token, payload)
+    return payload
+
+
+async def get_current_user(token: Optional[str] = Depends(oauth2_scheme),
+                           api_key: Optional[str] = Depends(api_key_header)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    if api_key:
+        service = service_keys.authenticate(api_key)
+        if service is None:
+            raise credentials_exception
+        return User(username=f"service:{service}", disabled=False)
+    if not token:
+        raise credentials_exception
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
@@ -291,50 +497,124 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
     return current_user
 
 
+def credentials_valid(api_key: Optional[str], token: Optional[str]) -> bool:
+    """Check a service API key or bearer token outside of FastAPI dependencies."""
+    if api_key:
+        return service_keys.authenticate(api_key) is not None
+    if not token:
+        return False
+    try:
+        username = decode_token(token).get("sub")
+    except PyJWTError:
+        return False
+    user = get_user(users_db, username) if username else None
+    return user is not None and not user.disabled
+
+
+def profiling_authorized(headers: Dict[str, str]) -> bool:
+    """Check the credentials of a request asking to be profiled."""
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    return credentials_valid(headers.get("x-api-key"), token if scheme.lower() == "bearer" else None)
+
+
+# Opt-in profiling: authorized requests with an X-Profile header, plus
+# PROFILE_SAMPLE_RATE of all requests
+profiler = RequestProfiler.from_env()
+app.add_middleware(ProfilingMiddleware, profiler=profiler, authorize=profiling_authorized)
+
+
 # Global objects (in a real app, you might use dependency injection)
-power_grid = PowerGrid()
 anomaly_detector = AnomalyDetector(eps=0.3, min_samples=5)
-voltage_predictor = VoltagePredictor(input_size=24, hidden_size_1=50, hidden_size_2=30)
+compute = ComputeExecutor.from_env()
+# Large read-mostly state (the reference grid, trained model weights) is
+# published once to memory-mapped files that every worker process maps
+# read-only; workers switch to a new version within SHARED_STATE_CHECK_SECONDS
+SHARED_STATE_DIR = os.environ.get("SHARED_STATE_DIR", os.path.join("data", "shared"))
+SHARED_STATE_CHECK_SECONDS = float(os.environ.get("SHARED_STATE_CHECK_SECONDS", 1.0))
+shared_state = SharedStateStore(SHARED_STATE_DIR, keep_versions=int(os.environ.get("SHARED_STATE_VERSIONS", 3)))
+shared_grid = SharedState(shared_state, "grid", lambda snapshot: ArrayGrid.from_arrays(snapshot.arrays),
+                          check_interval=SHARED_STATE_CHECK_SECONDS)
+voltage_predictor = shared_predictor(SHARED_STATE_DIR)
+voltage_predictor.check_interval = SHARED_STATE_CHECK_SECONDS
+# Saved model published at startup when no predictor has been published yet
+VOLTAGE_MODEL_PATH = os.environ.get("VOLTAGE_MODEL_PATH")
+grid_sessions = GridSessionStore(
+    max_sessions=int(os.environ.get("GRID_SESSION_LIMIT", 64)),
+    idle_timeout=float(os.environ.get("GRID_SESSION_IDLE_SECONDS", 900)),
+    on_remove=manager.remove_session
+)
+feature_store = FeatureStore(capacity=168, rolling_windows=(24,))
+# Visualization snapshot: a JSON file shaped like test_data/sample_grid.json,
+# or the built-in sample grid
+def load_visualization_source():
+    path = os.environ.get("GRID_VISUALIZATION_SOURCE")
+    if path:
+        return load_visualization_data(path)
+    sample = sample_grid_visualization()
+    return sample["nodes"], sample["links"]
+
+
+visualization_store = VisualizationStore(load_visualization_source)
+# Identical concurrent computations share one run
+single_flight = SingleFlight()
+# Compressed voltage history with 1-minute and 1-hour rollups
+timeseries_store = TimeSeriesStore(
+    chunk_size=int(os.environ.get("TIMESERIES_CHUNK_SIZE", 1024)),
+    max_chunks=int(os.environ.get("TIMESERIES_MAX_CHUNKS", 128))
+)
 
-# Function to convert Pydantic models to internal objects
-def create_power_grid(grid_model: GridModel) -> PowerGrid:
-    """
-    Convert a GridModel to a PowerGrid object.
-    
-    Args:
-        grid_model: Pydantic model of the grid
-        
-    Returns:
-        PowerGrid object
-    """
-    grid = PowerGrid()
-    
-    # Add nodes
-    for node_model in grid_model.nodes:
-        node = Node(node_model.node_id, node_model.voltage)
-        grid.add_node(node)
-    
-    # Add lines
-    for line_model in grid_model.lines:
-        from_node = grid.get_node(line_model.from_node_id)
-        to_node = grid.get_node(line_model.to_node_id)
-        
-        if from_node is None or to_node is None:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Nodes {line_model.from_node_id} and/or {line_model.to_node_id} not found"
-            )
-        
-        line = Line(line_model.line_id, from_node, to_node, line_model.resistance)
-        grid.add_line(line)
-    
-    return grid
 
+# Streaming telemetry: samples are buffered and written to the stores in bulk
+def feature_sink(node_id: str, timestamps: np.ndarray, values: np.ndarray) -> None:
+    feature_store.append(node_id, values)
+
+
+ingestor = TelemetryIngestor(
+    sinks=[feature_sink, timeseries_store.append],
+    max_pending=int(os.environ.get("INGEST_MAX_PENDING", 1_000_000)),
+    flush_interval=float(os.environ.get("INGEST_FLUSH_SECONDS", 0.05))
+)
+# NDJSON lines parsed per batch, and how long a full buffer may stall a request
+INGEST_BATCH_LINES = int(os.environ.get("INGEST_BATCH_LINES", 5000))
+INGEST_BACKPRESSURE_TIMEOUT = float(os.environ.get("INGEST_BACKPRESSURE_SECONDS", 5))
+REGISTRY.gauge("smartgrid_ingest_pending_samples", "Telemetry samples waiting to be written",
+               callback=lambda: {(): ingestor.pending})
+REGISTRY.gauge("smartgrid_compute_in_flight", "Computations running per endpoint class",
+               ["endpoint_class"],
+               callback=lambda: {(name,): count for name, count in compute.stats()["in_flight"].items()})
+# Batch endpoints: largest accepted batch and items processed at once
+BATCH_MAX_ITEMS = int(os.environ.get("BATCH_MAX_ITEMS", 10000))
+BATCH_CONCURRENCY = int(os.environ.get("BATCH_CONCURRENCY", 2 * compute.max_workers))
+result_cache = ResultCache(
+    max_entries=int(os.environ.get("RESULT_CACHE_ENTRIES", 1024)),
+    max_bytes=int(os.environ.get("RESULT_CACHE_BYTES", 64 * 1024 * 1024)),
+    ttl=float(os.environ.get("RESULT_CACHE_TTL", 300)),
+    disk_dir=os.environ.get("RESULT_CACHE_DIR"),
+    disk_max_entries=int(os.environ.get("RESULT_CACHE_DISK_ENTRIES", 16384)),
+    disk_max_bytes=int(os.environ.get("RESULT_CACHE_DISK_BYTES", 1024 * 1024 * 1024))
+)
+# Long-running work (training, contingency sweeps, reprocessing history) runs
+# as background jobs; finished jobs are kept for JOB_RETENTION_SECONDS
+job_queue = JobQueue.from_env()
+JOB_RETENTION_SECONDS = float(os.environ.get("JOB_RETENTION_SECONDS", 7 * 86400))
+# Trained models are saved here (not saved if unset)
+JOB_MODEL_DIR = os.environ.get("JOB_MODEL_DIR")
+# Long voltage histories converted with ``python -m ml_pipeline.archive``
+VOLTAGE_ARCHIVE_PATH = os.environ.get("VOLTAGE_ARCHIVE_PATH")
+REGISTRY.gauge("smartgrid_jobs", "Background jobs per state", ["state"],
+               callback=lambda: {(state,): count for state, count in job_queue.stats().items()})
+# Loads waiting to be dispatched, in priority order
+scheduler = LoadScheduler()
+REGISTRY.gauge("smartgrid_scheduled_loads", "Loads waiting in the scheduler",
+               callback=lambda: {(): len(scheduler)})
 
 # Authentication endpoints
 @app.post("/auth/login", response_model=Token)
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
-    user = authenticate_user(users_db, form_data.username, form_data.password)
+    # bcrypt is deliberately slow; keep it off the event loop
+    user = await asyncio.get_running_loop().run_in_executor(
+        None, authenticate_user, users_db, form_data.username, form_data.password
+    )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -387,7 +667,7 @@ async def websocket_endpoint(websocket: WebSocket):
     
     try:
         # Validate token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         username: str = payload.get("sub")
         if username is None:
             await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
@@ -402,80 +682,111 @@ async def websocket_endpoint(websocket: WebSocket):
     
     await manager.connect(websocket)
     try:
-        # Send initial data
+        # Send initial data; the first grid message is a full snapshot
         initial_data = {
             "type": "connection_established",
             "message": "Connected to grid updates WebSocket"
         }
         await manager.send_personal_message(json.dumps(initial_data), websocket)
         
-        # In a real implementation, you'd have a loop here that sends real-time updates
-        # For now, just wait for client to disconnect
+        # Clients can ping and narrow their subscription to one grid session
+        # and to nodes or regions of it:
+        # {"type": "subscribe", "session": "<session_id>", "nodes": ["N1"], "regions": ["north"]}
         while True:
             data = await websocket.receive_text()
             if data == "ping":
                 await manager.send_personal_message(json.dumps({"type": "pong"}), websocket)
+                continue
+            try:
+                message = json.loads(data)
+            except ValueError:
+                continue
+            if not isinstance(message, dict):
+                continue
+            channel = manager.channels.get(websocket)
+            if channel is None:
+                break
+            if message.get("type") == "subscribe":
+                session_id = message.get("session")
+                if session_id is not None and session_id not in manager.sessions:
+                    await manager.send_personal_message(json.dumps(
+                        {"type": "error", "detail": f"Grid session {session_id} not found or expired"}
+                    ), websocket)
+                    continue
+                channel.subscribe(message.get("nodes"), message.get("regions"), session_id)
+            elif message.get("type") == "unsubscribe":
+                channel.subscribe(None, None)
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(websocket)
 
 
+@app.on_event("startup")
+async def start_broadcast():
+    """Start the periodic grid update broadcast."""
+    manager.start()
+    ingestor.start()
+    job_queue.prune(JOB_RETENTION_SECONDS)
+    job_queue.start()
+    if VOLTAGE_MODEL_PATH and shared_state.version(PREDICTOR_STATE) is None:
+        publish_voltage_predictor(shared_state, VoltagePredictor.load_model(VOLTAGE_MODEL_PATH))
+    # Build the visualization snapshot before the first dashboard asks for it
+    visualization_store.snapshot
+
+
+@app.on_event("shutdown")
+async def stop_broadcast():
+    """Stop the grid update broadcast and all WebSocket senders."""
+    await manager.stop()
+    ingestor.stop()
+    job_queue.stop(timeout=10)
+    compute.shutdown()
+
+
 # Grid visualization endpoint
 @app.get("/grid/visualization", response_model=GridVisualizationResponse)
-async def get_grid_visualization(current_user: User = Depends(get_current_active_user)):
+async def get_grid_visualization(
+    request: Request,
+    lod: str = Query("full", description="full, substation or geographic"),
+    zoom: int = Query(8, ge=0, le=22, description="Map zoom level for geographic clusters"),
+    min_lat: Optional[float] = Query(None, ge=-90, le=90),
+    min_lng: Optional[float] = Query(None, ge=-180, le=180),
+    max_lat: Optional[float] = Query(None, ge=-90, le=90),
+    max_lng: Optional[float] = Query(None, ge=-180, le=180),
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=10000),
+    current_user: User = Depends(get_current_active_user)
+):
     """
     Get grid nodes and links data for visualization
+    
+    Served from the precomputed grid snapshot. At low zoom, nodes can be
+    aggregated into substation or geographic clusters; a lat/lng viewport
+    and offset/limit paging bound the payload for large grids. Responses
+    carry an ETag; a matching If-None-Match gets 304 Not Modified.
     """
+    bounds = (min_lat, min_lng, max_lat, max_lng)
+    if any(bound is not None for bound in bounds) and any(bound is None for bound in bounds):
+        raise HTTPException(status_code=400, detail="Viewport needs min_lat, min_lng, max_lat and max_lng")
+    bbox = bounds if min_lat is not None else None
+    
     try:
-        # In a real app, this would come from the database or a real grid
-        # Here we'll create a sample grid
-        sample_grid = PowerGrid()
-        
-        # Create nodes
-        nodes = [
-            Node("N1", 230.0),  # Source
-            Node("N2", 115.0),  # Intermediate
-            Node("N3", 110.0),  # Intermediate
-            Node("N4", 0.0),    # Ground
-        ]
-        
-        for node in nodes:
-            sample_grid.add_node(node)
-        
-        # Create lines
-        lines = [
-            Line("L1", nodes[0], nodes[1], 10.0),
-            Line("L2", nodes[1], nodes[2], 5.0),
-            Line("L3", nodes[1], nodes[3], 20.0),
-            Line("L4", nodes[2], nodes[3], 15.0),
-        ]
-        
-        for line in lines:
-            sample_grid.add_line(line)
-        
-        # Calculate currents
-        currents = sample_grid.calculate_all_currents()
-        
-        # Format data for visualization
-        nodes_data = [
-            {
-                "id": node.id,
-                "voltage": node.voltage
-            }
-            for node in nodes
-        ]
-        
-        links_data = [
-            {
-                "id": line.id,
-                "source": line.from_node.id,
-                "target": line.to_node.id,
-                "resistance": line.resistance,
-                "current": currents.get(line.id, 0.0)
-            }
-            for line in lines
-        ]
-        
-        return {"nodes": nodes_data, "links": links_data}
+        snapshot = visualization_store.snapshot
+        etag = snapshot.view_etag(lod, zoom, bbox, offset, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [
+            tag.strip() for tag in if_none_match.split(",")]):
+        return Response(status_code=304, headers=headers)
+    
+    try:
+        response = encode_response(request, snapshot.view(lod, zoom, bbox, offset, limit))
+        response.headers.update(headers)
+        return response
     
     except Exception as e:
         logger.error(f"Error in grid visualization: {str(e)}")
@@ -492,40 +803,63 @@ async def root():
         "endpoints": {
             "/grid/currents": "Calculate currents in a grid",
             "/grid/validate": "Validate a grid configuration",
+            "/grid/currents/batch": "Calculate currents in many grids (NDJSON stream)",
+            "/grid/validate/batch": "Validate many grid configurations (NDJSON stream)",
             "/ml/predict": "Predict future voltage values",
-            "/ml/anomalies": "Detect anomalies in voltage data"
+            "/ml/anomalies": "Detect anomalies in voltage data",
+            "/ml/anomalies/batch": "Detect anomalies in many voltage series (NDJSON stream)",
+            "/ingest/telemetry": "Stream voltage samples as NDJSON",
+            "/ingest/stream": "Stream binary voltage sample frames (WebSocket)",
+            "/jobs": "Submit and track background jobs",
+            "/state": "Versions of the grid and model shared by all workers",
+            "/scheduler/loads": "Add, update and remove loads waiting to be dispatched",
+            "/scheduler/top": "Get the highest priority load"
         }
     }
 
 
-@app.post("/grid/currents", response_model=CurrentsResponse)
-async def calculate_currents(grid_model: GridModel):
+# Grid bodies may be sent as JSON or MessagePack, object-style or columnar
+GRID_BODY = request_body_spec({"$ref": "#/components/schemas/GridModel"})
+# Voltage series may also be sent as raw little-endian floats or .npy
+VOLTAGE_BODY = request_body_spec(VoltageDataModel.schema(), arrays=True)
+# Batches are lists of the above, answered with one NDJSON line per item
+GRID_BATCH_BODY = request_body_spec({"type": "array", "items": {"$ref": "#/components/schemas/GridModel"}})
+VOLTAGE_BATCH_BODY = request_body_spec({"type": "array", "items": VoltageDataModel.schema()})
+
+
+async def coalesced_grid_run(func, grid_model):
+    """
+    Run a grid computation, sharing it with identical in-flight requests.
+    
+    Args:
+        func: Compute function taking the grid model
+        grid_model: Grid configuration, or decoded columnar grid payload
+        
+    Returns:
+        The function's result
+    """
+    key = canonical_grid_key(func.__name__, grid_model)
+    return await single_flight.do(key, lambda: compute.run("grid", func, grid_model))
+
+
+@app.post("/grid/currents", response_model=CurrentsResponse, openapi_extra=GRID_BODY)
+async def calculate_currents(request: Request):
     """
     Calculate currents in all lines of a grid.
     
     Args:
-        grid_model: Grid configuration
+        request: Grid configuration (see GRID_BODY for the accepted encodings)
         
     Returns:
         Dictionary of line currents and total power
     """
+    grid_model = await read_grid_payload(request, GridModel)
     try:
-        # Convert Pydantic model to internal objects
-        grid = create_power_grid(grid_model)
-        
-        # Calculate currents
-        currents = grid.calculate_all_currents()
-        
-        # Calculate total power (P = I²R)
-        total_power = 0.0
-        for line_id, current in currents.items():
-            line = grid.get_line(line_id)
-            if line:
-                power = current**2 * line.resistance
-                total_power += power
-        
-        return {"currents": currents, "total_power": total_power}
+        result = await coalesced_grid_run(grid_currents, grid_model)
+        return encode_response(request, result)
     
+    except ComputeTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except ValueError as e:
         logger.error(f"Value error in current calculation: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -534,87 +868,281 @@ async def calculate_currents(grid_model: GridModel):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@app.post("/grid/validate", response_model=ValidationResponse)
-async def validate_grid(grid_model: GridModel):
+@app.post("/grid/validate", response_model=ValidationResponse, openapi_extra=GRID_BODY)
+async def validate_grid(request: Request):
     """
     Validate a grid configuration.
     
     Args:
-        grid_model: Grid configuration
+        request: Grid configuration (see GRID_BODY for the accepted encodings)
         
     Returns:
         Validation result with any errors
     """
+    grid_model = await read_grid_payload(request, GridModel)
     try:
-        # Convert Pydantic model to internal objects
-        grid = create_power_grid(grid_model)
+        errors = await coalesced_grid_run(grid_validation, grid_model)
         
-        # Validate the grid
-        errors = grid.validate_grid()
-        
-        return {"valid": len(errors) == 0, "errors": errors}
+        return encode_response(request, {"valid": len(errors) == 0, "errors": errors})
     
+    except ComputeTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except ValueError as e:
         logger.error(f"Value error in grid validation: {str(e)}")
-        return {"valid": False, "errors": [str(e)]}
+        return encode_response(request, {"valid": False, "errors": [str(e)]})
     except Exception as e:
         logger.error(f"Error in grid validation: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@app.post("/ml/predict", response_model=PredictionResponse)
-async def predict_voltage(data: VoltageDataModel):
+@app.post("/grid/currents/batch", openapi_extra=GRID_BATCH_BODY)
+async def calculate_currents_batch(request: Request):
     """
-    Predict future voltage values based on historical data.
+    Calculate currents in many grids.
+    
+    Results are streamed as NDJSON, one line per grid in completion order;
+    an invalid or failing grid only produces an error line.
     
     Args:
-        data: Voltage data and parameters
+        request: List of grid configurations (or {"items": [...]}), object-style or columnar
         
     Returns:
-        Predicted voltage values
+        Streaming NDJSON response
     """
-    try:
-        # Convert to numpy array
-        values = np.array(data.values)
-        sequence_length = data.sequence_length
+    items = await read_batch_payload(request, BATCH_MAX_ITEMS)
+    
+    async def process(item):
+        return await coalesced_grid_run(grid_currents, grid_from_document(item, GridModel))
+    
+    return StreamingResponse(stream_batch(items, process, BATCH_CONCURRENCY), media_type=NDJSON)
+
+
+@app.post("/grid/validate/batch", openapi_extra=GRID_BATCH_BODY)
+async def validate_grid_batch(request: Request):
+    """
+    Validate many grid configurations.
+    
+    Results are streamed as NDJSON, one line per grid in completion order.
+    Grids that cannot be built are reported as invalid, like /grid/validate;
+    undecodable items produce an error line.
+    
+    Args:
+        request: List of grid configurations (or {"items": [...]}), object-style or columnar
         
-        # Check if we have enough data
-        if len(values) <= sequence_length:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Not enough data points. Need more than {sequence_length} values."
-            )
+    Returns:
+        Streaming NDJSON response
+    """
+    items = await read_batch_payload(request, BATCH_MAX_ITEMS)
+    
+    async def process(item):
+        grid_model = grid_from_document(item, GridModel)
+        try:
+            errors = await coalesced_grid_run(grid_validation, grid_model)
+        except ValueError as e:
+            return {"valid": False, "errors": [str(e)]}
+        return {"valid": len(errors) == 0, "errors": errors}
+    
+    return StreamingResponse(stream_batch(items, process, BATCH_CONCURRENCY), media_type=NDJSON)
+
+
+def get_grid_session(session_id: str):
+    """
+    Look up a grid session or fail with 404.
+    
+    Args:
+        session_id: Session handle
         
-        # Create and configure the predictor
-        predictor = VoltagePredictor(sequence_length=sequence_length)
+    Returns:
+        The grid session
+    """
+    session = grid_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Grid session {session_id} not found or expired")
+    return session
+
+
+@app.post("/grid/sessions", response_model=GridSessionResponse, status_code=201)
+async def create_grid_session(grid_model: GridModel, current_user: User = Depends(get_current_active_user)):
+    """
+    Upload a grid once and keep it resident for incremental updates.
+    
+    Args:
+        grid_model: Grid configuration
         
-        # Normalize data
-        mean = np.mean(values)
-        std = np.std(values)
-        values_normalized = (values - mean) / std
+    Returns:
+        Handle of the new session
+    """
+    try:
+        grid = await compute.run("grid", create_power_grid, grid_model)
+    except ComputeTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    session_id, session = grid_sessions.create(grid)
+    manager.set_topology(
+        session_id,
+        node_regions={node.node_id: node.region for node in grid_model.nodes if node.region is not None},
+        line_nodes={
+            line_id: (line.from_node.node_id, line.to_node.node_id)
+            for line_id, line in grid.lines.items()
+        }
+    )
+    manager.publish(
+        session_id,
+        voltages={node_id: node.voltage for node_id, node in grid.nodes.items()},
+        currents=session.currents()
+    )
+    return {"session_id": session_id, "node_count": len(grid.nodes), "line_count": len(grid.lines)}
+
+
+@app.patch("/grid/sessions/{session_id}", response_model=GridDeltaResponse)
+async def update_grid_session(session_id: str, delta: GridDeltaModel,
+                              current_user: User = Depends(get_current_active_user)):
+    """
+    Apply voltage and resistance changes to a resident grid.
+    
+    Args:
+        session_id: Session handle
+        delta: New voltages and resistances
         
-        # Prepare sequences
-        X, _ = predictor.prepare_sequences(values_normalized)
+    Returns:
+        Currents of the affected lines and the new total power loss
+    """
+    session = get_grid_session(session_id)
+    try:
+        currents = session.apply_delta(delta.voltages, delta.resistances)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Pushed to /grid/updates subscribers on the next tick
+    manager.publish(session_id, voltages=delta.voltages, currents=currents)
+    return {"version": session.version, "currents": currents, "total_power": session.total_power}
+
+
+@app.get("/grid/sessions/{session_id}/currents", response_model=CurrentsResponse)
+async def get_session_currents(session_id: str, current_user: User = Depends(get_current_active_user)):
+    """
+    Get the currents of every line of a resident grid.
+    
+    Args:
+        session_id: Session handle
         
-        # Reshape for LSTM [samples, time steps, features]
-        X = X.reshape(X.shape[0], X.shape[1], 1)
+    Returns:
+        Dictionary of line currents and total power
+    """
+    session = get_grid_session(session_id)
+    return {"currents": session.currents(), "total_power": session.total_power}
+
+
+@app.get("/grid/sessions/{session_id}/losses", response_model=LossesResponse)
+async def get_session_losses(session_id: str, current_user: User = Depends(get_current_active_user)):
+    """
+    Get the resistive losses of a resident grid.
+    
+    Args:
+        session_id: Session handle
         
-        # We're using a pre-trained model here for the example
-        # In a real app, you'd either train the model first or load a saved model
-        # For simplicity, we'll make a simple prediction without training
+    Returns:
+        Loss per line and total loss
+    """
+    session = get_grid_session(session_id)
+    line_losses, total_power = session.losses()
+    return {"line_losses": line_losses, "total_power": total_power}
+
+
+@app.get("/grid/sessions/{session_id}/validate", response_model=ValidationResponse)
+async def validate_grid_session(session_id: str, current_user: User = Depends(get_current_active_user)):
+    """
+    Validate a resident grid.
+    
+    Args:
+        session_id: Session handle
         
-        # Make predictions (this won't be accurate without training)
-        # In a real app, you would use predictor.predict(X)
-        # For this example, we'll just use a simple autoregressive model
-        predictions = []
-        for i in range(min(10, len(X))):  # Predict up to 10 future values
-            # Simple prediction: next value is average of last 3 values
-            next_val = np.mean(values[-3:])
-            predictions.append(next_val)
-            values = np.append(values, next_val)
+    Returns:
+        Validation result with any errors
+    """
+    errors = get_grid_session(session_id).validate()
+    return {"valid": len(errors) == 0, "errors": errors}
+
+
+@app.delete("/grid/sessions/{session_id}", status_code=204)
+async def delete_grid_session(session_id: str, current_user: User = Depends(get_current_active_user)):
+    """
+    Release a resident grid.
+    
+    Args:
+        session_id: Session handle
+    """
+    if not grid_sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail=f"Grid session {session_id} not found or expired")
+
+
+async def cached_computation(cache_key: str, endpoint_class: str, func, *args):
+    """
+    Serve a result from the result cache, or compute it off the event loop.
+    
+    Concurrent misses for the same key share one computation, whose result
+    is cached once.
+    
+    Args:
+        cache_key: Key from ``result_cache.make_key``
+        endpoint_class: Compute executor concurrency class
+        func: Compute function
+        *args: Arguments for func
         
-        return {"predictions": predictions}
+    Returns:
+        The (possibly cached) result
+    """
+    result = result_cache.get(cache_key)
+    if result is not None:
+        return result
     
+    async def run():
+        result = await compute.run(endpoint_class, func, *args)
+        result_cache.set(cache_key, result)
+        return result
+    
+    return await single_flight.do(cache_key, run)
+
+
+@app.post("/ml/predict", response_model=PredictionResponse, openapi_extra=VOLTAGE_BODY)
+async def predict_voltage(request: Request):
+    """
+    Predict future voltage values based on historical data.
+    
+    Args:
+        request: Voltage data and parameters (see VOLTAGE_BODY for the accepted encodings)
+        
+    Returns:
+        Predicted voltage values
+    """
+    values, sequence_length, model_name = await read_voltage_payload(request, VoltageDataModel)
+    # "lstm" uses the published VoltagePredictor and "auto" may pick it, so
+    # its version is part of their cache keys
+    model_version = None
+    func, args = forecast_voltage, (values, sequence_length, model_name)
+    if model_name == "auto":
+        model_version = shared_state.version(PREDICTOR_STATE)
+        args = (values, sequence_length, model_name, SHARED_STATE_DIR)
+    elif model_name == "lstm":
+        model_version = shared_state.version(PREDICTOR_STATE)
+        if model_version is None:
+            raise HTTPException(status_code=400, detail="No voltage predictor has been published")
+        func, args = forecast_lstm, (values, sequence_length, SHARED_STATE_DIR)
+    try:
+        cache_key = result_cache.make_key(
+            values, "predict",
+            version=ml_pipeline_version, model=model_name, sequence_length=sequence_length,
+            model_version=model_version
+        )
+        result = await cached_computation(cache_key, "ml", func, *args)
+        return encode_response(request, result, array_key="predictions")
+    
+    except ComputeTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except ValueError as e:
         logger.error(f"Value error in voltage prediction: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -623,31 +1151,43 @@ async def predict_voltage(data: VoltageDataModel):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@app.post("/ml/anomalies", response_model=AnomalyResponse)
-async def detect_anomalies(data: VoltageDataModel):
+async def cached_anomaly_report(values: np.ndarray) -> Dict[str, Any]:
+    """
+    Detect anomalies off the event loop, serving repeated windows from the result cache.
+    
+    Args:
+        values: Voltage measurements
+        
+    Returns:
+        Detected anomalies and statistics
+    """
+    cache_key = result_cache.make_key(
+        values, "anomalies",
+        version=ml_pipeline_version,
+        eps=anomaly_detector.eps, min_samples=anomaly_detector.min_samples
+    )
+    return await cached_computation(
+        cache_key, "ml", anomaly_report, values, anomaly_detector.eps, anomaly_detector.min_samples
+    )
+
+
+@app.post("/ml/anomalies", response_model=AnomalyResponse, openapi_extra=VOLTAGE_BODY)
+async def detect_anomalies(request: Request):
     """
     Detect anomalies in voltage data.
     
     Args:
-        data: Voltage data
+        request: Voltage data (see VOLTAGE_BODY for the accepted encodings)
         
     Returns:
         Detected anomalies and statistics
     """
+    values, _, _ = await read_voltage_payload(request, VoltageDataModel)
     try:
-        # Convert to numpy array
-        values = np.array(data.values)
-        
-        # Detect anomalies
-        anomaly_stats = anomaly_detector.get_anomaly_stats(values)
-        
-        return {
-            "anomaly_indices": anomaly_stats["anomaly_indices"],
-            "anomaly_values": anomaly_stats["anomaly_values"],
-            "anomaly_count": anomaly_stats["anomaly_count"],
-            "anomaly_percentage": anomaly_stats["anomaly_percentage"]
-        }
+        return encode_response(request, await cached_anomaly_report(values))
     
+    except ComputeTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except ValueError as e:
         logger.error(f"Value error in anomaly detection: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -656,5 +1196,689 @@ async def detect_anomalies(data: VoltageDataModel):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@app.post("/ml/anomalies/batch", openapi_extra=VOLTAGE_BATCH_BODY)
+async def detect_anomalies_batch(request: Request):
+    """
+    Detect anomalies in many voltage series.
+    
+    Results are streamed as NDJSON, one line per series in completion order;
+    an invalid or failing series only produces an error line.
+    
+    Args:
+        request: List of voltage data documents (or {"items": [...]})
+        
+    Returns:
+        Streaming NDJSON response
+    """
+    items = await read_batch_payload(request, BATCH_MAX_ITEMS)
+    
+    async def process(item):
+        values, _, _ = voltage_from_document(item, VoltageDataModel)
+        return await cached_anomaly_report(values)
+    
+    return StreamingResponse(stream_batch(items, process, BATCH_CONCURRENCY), media_type=NDJSON)
+
+
+@app.post("/ml/nodes/{node_id}/samples")
+async def append_node_samples(node_id: str, samples: NodeSamplesModel):
+    """
+    Append voltage readings to a node's rolling feature store.
+    
+    Args:
+        node_id: ID of the node
+        samples: New readings in chronological order
+        
+    Returns:
+        Updated feature summary of the node
+    """
+    node = feature_store.append(node_id, samples.values)
+    return node.summary()
+
+
+@app.get("/ml/nodes/{node_id}/features")
+async def get_node_features(node_id: str):
+    """
+    Get running statistics and rolling aggregates of a node.
+    
+    Args:
+        node_id: ID of the node
+        
+    Returns:
+        Feature summary of the node
+    """
+    node = feature_store.get(node_id)
+    if node is None:
+        raise HTTPException(status_code=404, detail=f"Node {node_id} has no feature history")
+    return node.summary()
+
+
+@app.post("/ml/nodes/{node_id}/predict", response_model=PredictionResponse)
+async def predict_node_voltage(node_id: str, horizon: int = Query(10, ge=1, le=100), model: str = "naive",
+                               sequence_length: int = Query(24, ge=1)):
+    """
+    Predict future voltage values from a node's buffered readings.
+    
+    Only the tail of the node's ring buffer that the model needs is copied,
+    so the cost does not grow with the length of its history.
+    
+    Args:
+        node_id: ID of the node
+        horizon: Number of future values
+        model: Baseline forecaster name, or "lstm" for the published VoltagePredictor
+        sequence_length: Input window length of the "lstm" model
+        
+    Returns:
+        Predicted voltage values
+    """
+    node = feature_store.get(node_id)
+    if node is None:
+        raise HTTPException(status_code=404, detail=f"Node {node_id} has no feature history")
+    if model != "lstm" and model not in baseline_forecasters:
+        raise HTTPException(status_code=400, detail=f"Unknown model '{model}'")
+    
+    try:
+        if model == "lstm":
+            if shared_state.version(PREDICTOR_STATE) is None:
+                raise HTTPException(status_code=400, detail="No voltage predictor has been published")
+            return await compute.run("ml", forecast_lstm, node.latest(sequence_length), sequence_length,
+                                     SHARED_STATE_DIR, horizon)
+        forecaster = baseline_forecasters[model]
+        history = node.latest(forecaster.history_length() or node.buffer.capacity)
+        forecasts = forecaster.forecast(history, horizon)
+    except ComputeTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"predictions": forecasts[0].tolist()}
+
+
+def stored_series(node_id: str):
+    """Get a node's stored voltage history or raise 404."""
+    series = timeseries_store.get(node_id)
+    if series is None:
+        raise HTTPException(status_code=404, detail=f"Node {node_id} has no stored history")
+    return series
+
+
+def history_range(series, start: Optional[float], end: Optional[float]):
+    """Resolve an optional query range, defaulting to the last 24 hours of data."""
+    end = series.last_timestamp if end is None else end
+    start = end - 86400 if start is None else start
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    return start, end
+
+
+@app.get("/ml/nodes/{node_id}/history")
+async def get_node_history(request: Request, node_id: str,
+                           start: Optional[float] = None, end: Optional[float] = None,
+                           resolution: float = Query(0, ge=0)):
+    """
+    Get a node's stored voltage history.
+    
+    With ``resolution`` 0 the raw samples are returned; otherwise min/max/mean
+    buckets of a configured rollup resolution (60 or 3600 seconds by
+    default). Only the compressed chunks overlapping the range are decoded.
+    
+    Args:
+        node_id: ID of the node
+        start: Range start in Unix seconds (default: 24 hours before end)
+        end: Range end in Unix seconds (default: newest sample)
+        resolution: Bucket width in seconds, 0 for raw samples
+        
+    Returns:
+        Timestamps with values, or with min, max, mean and count per bucket
+    """
+    series = stored_series(node_id)
+    start, end = history_range(series, start, end)
+    if resolution == 0:
+        timestamps, values = series.range(start, end)
+        content = {"node_id": node_id, "resolution": 0, "timestamps": timestamps, "values": values}
+        return encode_response(request, content, array_key="values")
+    try:
+        buckets = series.rollup(resolution, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return encode_response(request, {"node_id": node_id, "resolution": resolution, **buckets}, array_key="mean")
+
+
+@app.post("/ml/nodes/{node_id}/anomalies", response_model=AnomalyResponse)
+async def detect_node_anomalies(node_id: str, start: Optional[float] = None, end: Optional[float] = None):
+    """
+    Detect anomalies in a node's stored voltage history.
+    
+    The readings go from the time-series store to the detector as an
+    array, without a JSON round trip.
+    
+    Args:
+        node_id: ID of the node
+        start: Range start in Unix seconds (default: 24 hours before end)
+        end: Range end in Unix seconds (default: newest sample)
+        
+    Returns:
+        Detected anomalies and statistics (indices refer to the range's samples)
+    """
+    series = stored_series(node_id)
+    _, values = series.range(*history_range(series, start, end))
+    if len(values) == 0:
+        raise HTTPException(status_code=400, detail="No samples in the requested range")
+    try:
+        return await cached_anomaly_report(values)
+    except ComputeTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+
+@app.post("/ingest/telemetry", openapi_extra={"requestBody": {"required": True, "content": {
+    NDJSON: {"schema": {"type": "string"}, "example": '{"node_id": "N1", "value": 230.1, "timestamp": 1700000000.0}'}
+}}})
+async def ingest_telemetry(request: Request, current_user: User = Depends(get_current_active_user)):
+    """
+    Ingest a (chunked) NDJSON stream of voltage samples.
+    
+    Each line is ``{"node_id", "value", "timestamp"}`` or
+    ``{"node_id", "values", "timestamps"}``. The body is parsed as it
+    arrives, so streams of any length use constant memory; reading pauses
+    while the ingestion buffer is full.
+    
+    Returns:
+        Bulk acknowledgement with accepted and rejected line counts
+    """
+    splitter = LineSplitter()
+    accepted = lines_seen = 0
+    errors: List[Dict[str, Any]] = []
+    rejected = 0
+    batch: List[bytes] = []
+
+    async def submit(lines: List[bytes]) -> None:
+        nonlocal accepted, lines_seen, rejected
+        series, line_errors = parse_ndjson_records(lines)
+        for error in line_errors:
+            error["line"] += lines_seen
+        rejected += len(line_errors)
+        errors.extend(line_errors[:max(0, 10 - len(errors))])
+        lines_seen += len(lines)
+        try:
+            await ingestor.wait_for_capacity(INGEST_BACKPRESSURE_TIMEOUT)
+        except IngestBackpressure as e:
+            raise HTTPException(status_code=503, detail={"error": str(e), "accepted": accepted},
+                                headers={"Retry-After": "1"})
+        accepted += ingestor.submit(series)
+
+    async for chunk in request.stream():
+        batch.extend(splitter.feed(chunk))
+        if len(batch) >= INGEST_BATCH_LINES:
+            await submit(batch)
+            batch = []
+    batch.extend(splitter.close())
+    if batch:
+        await submit(batch)
+    return {"accepted": accepted, "rejected": rejected, "errors": errors, "pending": ingestor.pending}
+
+
+@app.websocket("/ingest/stream")
+async def ingest_stream(websocket: WebSocket):
+    """
+    Ingest binary telemetry frames (see api.ingest.encode_frame).
+    
+    Authenticate with a ``token`` query parameter or an X-API-Key header.
+    Every frame is acknowledged with ``{"type": "ack", "seq", "accepted",
+    "pending"}``. While the ingestion buffer is full the server sends
+    ``{"type": "pause"}``, stops reading frames, and sends
+    ``{"type": "resume"}`` once there is room again.
+    """
+    if not credentials_valid(websocket.headers.get("x-api-key"), websocket.query_params.get("token")):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    seq = 0
+    try:
+        while True:
+            if not ingestor.has_capacity():
+                await websocket.send_json({"type": "pause", "pending": ingestor.pending})
+                await ingestor.wait_for_capacity()
+                await websocket.send_json({"type": "resume"})
+            frame = await websocket.receive_bytes()
+            seq += 1
+            try:
+                series = decode_frame(frame)
+            except ValueError as e:
+                await websocket.send_json({"type": "error", "seq": seq, "error": str(e)})
+                continue
+            accepted = ingestor.submit(series)
+            await websocket.send_json({"type": "ack", "seq": seq, "accepted": accepted,
+                                       "pending": ingestor.pending})
+    except WebSocketDisconnect:
+        pass
+
+
+@app.get("/ingest/stats")
+async def get_ingest_stats(current_user: User = Depends(get_current_active_user)):
+    """
+    Get telemetry ingestion counters.
+    
+    Returns:
+        Accepted, pending and flushed sample counts, and time-series store usage
+    """
+    return {**ingestor.stats(), "store": timeseries_store.stats()}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """
+    Prometheus metrics: per-route latency and payload sizes, internal stage
+    timings and WebSocket queue depth.
+    """
+    return Response(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/profiles")
+async def list_profiles(current_user: User = Depends(get_current_active_user)):
+    """
+    List the stored request profiles, newest first.
+    
+    Returns:
+        Profile summaries
+    """
+    return {"profiles": profiler.store.list()}
+
+
+@app.get("/profiles/{request_id}")
+async def get_profile(request_id: str,
+                      format: Optional[str] = Query(None, regex="^(collapsed|pstats|text|summary)$"),
+                      current_user: User = Depends(get_current_active_user)):
+    """
+    Get the profile of a request by its X-Profile-Id.
+    
+    Sampled profiles are returned as collapsed stacks (flamegraph.pl,
+    speedscope), cProfile profiles as a pstats dump or a text report.
+    
+    Returns:
+        Profile in the requested format
+    """
+    profile = profiler.store.get(request_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Profile {request_id} not found")
+    if format is None:
+        format = "pstats" if profile.mode == CPROFILE else "collapsed"
+    try:
+        if format == "summary":
+            return profile.summary()
+        if format == "collapsed":
+            return Response(profile.collapsed(), media_type="text/plain; charset=utf-8")
+        if format == "text":
+            return Response(profile.text(), media_type="text/plain; charset=utf-8")
+        return Response(profile.pstats_dump(), media_type="application/octet-stream", headers={
+            "Content-Disposition": f'attachment; filename="{request_id}.pstats"'
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def current_shared_grid() -> ArrayGrid:
+    """Get the published reference grid or raise 404."""
+    grid = shared_grid.get()
+    if grid is None:
+        raise HTTPException(status_code=404, detail="No grid has been published")
+    return grid
+
+
+@app.put("/state/grid", openapi_extra=GRID_BODY)
+async def publish_grid(request: Request, current_user: User = Depends(get_current_active_user)):
+    """
+    Publish the reference grid to all worker processes.
+    
+    The grid's columns are written once to a memory-mapped snapshot that
+    every worker maps read-only, replacing the previous version atomically.
+    
+    Args:
+        request: Grid configuration (see GRID_BODY for the accepted encodings)
+        
+    Returns:
+        Published version and grid size
+    """
+    grid_model = await read_grid_payload(request, GridModel)
+    try:
+        grid = await compute.run("grid", to_array_grid, grid_model)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    loop = asyncio.get_running_loop()
+    version = await loop.run_in_executor(None, shared_state.publish, "grid", grid.to_arrays())
+    return {"version": version, "nodes": len(grid.node_ids), "lines": len(grid.line_ids)}
+
+
+@app.get("/state")
+async def get_shared_state(current_user: User = Depends(get_current_active_user)):
+    """
+    Get the versions of the shared state.
+    
+    Returns:
+        Published version and the version this worker uses, per state
+    """
+    return {view.name: {"published": shared_state.version(view.name), "attached": view.version}
+            for view in (shared_grid, voltage_predictor)}
+
+
+@app.get("/state/grid/currents", response_model=CurrentsResponse)
+async def shared_grid_currents(response: Response):
+    """
+    Calculate currents in all lines of the published reference grid.
+    
+    Returns:
+        Dictionary of line currents and total power
+    """
+    grid = current_shared_grid()
+    response.headers["X-State-Version"] = str(shared_grid.version)
+    try:
+        return await compute.run("grid", array_grid_currents, grid)
+    except ComputeTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+
+@app.get("/state/grid/validate", response_model=ValidationResponse)
+async def shared_grid_validation(response: Response):
+    """
+    Validate the published reference grid.
+    
+    Returns:
+        Validation result
+    """
+    grid = current_shared_grid()
+    response.headers["X-State-Version"] = str(shared_grid.version)
+    errors = grid.validate_grid()
+    return {"valid": len(errors) == 0, "errors": errors}
+
+
+def job_history(params: Dict[str, Any]):
+    """Read the voltage history range of a job from the time-series store or the archive."""
+    start = -np.inf if params["start"] is None else params["start"]
+    end = np.inf if params["end"] is None else params["end"]
+    if params["source"] == "archive":
+        if not VOLTAGE_ARCHIVE_PATH:
+            raise ValueError("No voltage archive is configured (VOLTAGE_ARCHIVE_PATH)")
+        archive = VoltageArchive(VOLTAGE_ARCHIVE_PATH)
+        if params["node_id"] not in archive:
+            raise ValueError(f"Node {params['node_id']} is not archived")
+        return archive.read(params["node_id"], start, end)
+    if params["node_id"] not in timeseries_store:
+        raise ValueError(f"Node {params['node_id']} has no stored history")
+    return timeseries_store.range(params["node_id"], start, end)
+
+
+def history_job_params(model):
+    """
+    Build a parameter validator for jobs reading a node's history.
+    
+    An open-ended range is pinned to the newest sample of its source (the
+    time-series store or the archive), so that a later submission after new
+    data arrived is not answered with the earlier job's result.
+    """
+    def validate(params: Dict[str, Any]) -> Dict[str, Any]:
+        params = model.parse_obj(params).dict()
+        if params["end"] is not None:
+            return params
+        if params["source"] == "store" and params["node_id"] in timeseries_store:
+            params["end"] = timeseries_store.get(params["node_id"]).last_timestamp
+        elif params["source"] == "archive" and VOLTAGE_ARCHIVE_PATH:
+            archive = VoltageArchive(VOLTAGE_ARCHIVE_PATH)
+            if params["node_id"] in archive:
+                params["end"] = archive.node(params["node_id"]).end
+        return params
+    return validate
+
+
+def run_contingency_sweep(params, context):
+    return contingency_sweep(GridModel.parse_obj(params["grid"]), context.progress)
+
+
+def run_anomaly_reprocess(params, context):
+    context.progress(0.0, "Reading history")
+    timestamps, values = job_history(params)
+    return anomaly_reprocess(timestamps, values, params["window_seconds"], params["eps"],
+                             params["min_samples"], context.progress)
+
+
+def run_train_predictor(params, context):
+    context.progress(0.0, "Building training sequences")
+    _, values = job_history(params)
+    n = len(values) - params["sequence_length"]
+    if n <= 0:
+        raise ValueError(f"Not enough data points. Need more than {params['sequence_length']} values.")
+    windows = np.lib.stride_tricks.sliding_window_view(values[:-1], params["sequence_length"])
+    X = windows.reshape(n, params["sequence_length"], 1)
+    y = values[params["sequence_length"]:].reshape(n, 1)
+    model_path = None
+    if JOB_MODEL_DIR:
+        os.makedirs(JOB_MODEL_DIR, exist_ok=True)
+        model_path = os.path.join(JOB_MODEL_DIR, f"{context.job_id}.keras")
+    return train_voltage_predictor(X, y, params["epochs"], params["batch_size"], params["lstm_units"],
+                                   model_path, context.progress, shared_state if params["publish"] else None)
+
+
+job_queue.register("contingency_sweep", run_contingency_sweep,
+                   lambda params: ContingencySweepParams.parse_obj(params).dict())
+job_queue.register("anomaly_reprocess", run_anomaly_reprocess, history_job_params(AnomalyReprocessParams))
+job_queue.register("train_predictor", run_train_predictor, history_job_params(TrainPredictorParams),
+                   side_effects=lambda params: params["publish"])
+
+
+def get_job_status(job_id: str) -> Dict[str, Any]:
+    """Get a job's status or raise 404."""
+    job = job_queue.status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(submission: JobSubmission, current_user: User = Depends(get_current_active_user)):
+    """
+    Submit a background job.
+    
+    Kinds are ``contingency_sweep`` (N-1 outage of every line of ``grid``),
+    ``anomaly_reprocess`` (windowed anomaly detection over a node's stored
+    or archived history) and ``train_predictor`` (VoltagePredictor training).
+    Submitting the same kind and parameters as a queued, running or
+    succeeded job returns that job.
+    
+    Returns:
+        Job status, with ``deduplicated`` set if an existing job was returned
+    """
+    try:
+        job, created = job_queue.submit(submission.kind, submission.params)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "60"})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {**job, "deduplicated": not created}
+
+
+@app.get("/jobs")
+async def list_jobs(state: Optional[str] = Query(None, regex="^(queued|running|succeeded|failed|cancelled)$"),
+                    limit: int = Query(100, ge=1, le=1000),
+                    current_user: User = Depends(get_current_active_user)):
+    """
+    List background jobs, newest first.
+    
+    Returns:
+        Job statuses
+    """
+    return {"jobs": job_queue.list(state, limit)}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, current_user: User = Depends(get_current_active_user)):
+    """
+    Get a job's state and progress.
+    
+    Returns:
+        Job status
+    """
+    return get_job_status(job_id)
+
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(request: Request, job_id: str, current_user: User = Depends(get_current_active_user)):
+    """
+    Get the result of a succeeded job, as JSON or MessagePack.
+    
+    Returns:
+        Job result
+    """
+    job = get_job_status(job_id)
+    if job["state"] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job['state']}")
+    return encode_response(request, job_queue.result(job_id))
+
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str, current_user: User = Depends(get_current_active_user)):
+    """
+    Cancel a job. Queued jobs never run; running jobs stop at their next progress report.
+    
+    Returns:
+        Job status
+    """
+    job = job_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+# Load scheduler endpoints
+# Bulk operations run in a thread so large batches don't stall the event loop
+PRIORITY_BODY = request_body_spec({
+    "type": "object",
+    "properties": {
+        "load_ids": {"type": "array", "items": {"type": "string"}},
+        "priorities": {"oneOf": [
+            {"type": "array", "items": {"type": "integer"}},
+            {"type": "object", "additionalProperties": {"type": "integer"}}
+        ]}
+    },
+    "required": ["priorities"]
+})
+
+
+def get_scheduled_load(load_id: str) -> Load:
+    """Look up a scheduled load, raising 404 if it is not found."""
+    load = scheduler.get_load_by_id(load_id)
+    if load is None:
+        raise HTTPException(status_code=404, detail=f"Load {load_id} not found")
+    return load
+
+
+@app.post("/scheduler/loads", status_code=201)
+async def add_loads(batch: LoadBatchModel, current_user: User = Depends(get_current_active_user)):
+    """
+    Add loads to the scheduler.
+    
+    Returns:
+        Number of loads added and the IDs that were already scheduled
+    """
+    loads = [Load(load.load_id, load.power_requirement, load.priority) for load in batch.loads]
+    loop = asyncio.get_running_loop()
+    duplicates = await loop.run_in_executor(None, scheduler.add_loads, loads)
+    return {"added": len(loads) - len(duplicates), "duplicates": duplicates}
+
+
+@app.get("/scheduler/loads/{load_id}")
+async def get_load(load_id: str, current_user: User = Depends(get_current_active_user)):
+    """
+    Get a scheduled load.
+    
+    Returns:
+        Load ID, power requirement and priority
+    """
+    return get_scheduled_load(load_id).to_dict()
+
+
+@app.patch("/scheduler/loads/{load_id}")
+async def update_load_priority(load_id: str, update: PriorityModel,
+                               current_user: User = Depends(get_current_active_user)):
+    """
+    Change the priority of a scheduled load.
+    
+    Returns:
+        The updated load
+    """
+    if not scheduler.update_priority(load_id, update.priority):
+        raise HTTPException(status_code=404, detail=f"Load {load_id} not found")
+    return get_scheduled_load(load_id).to_dict()
+
+
+@app.delete("/scheduler/loads/{load_id}", status_code=204)
+async def remove_load(load_id: str, current_user: User = Depends(get_current_active_user)):
+    """Remove a load from the scheduler."""
+    if not scheduler.remove_load(load_id):
+        raise HTTPException(status_code=404, detail=f"Load {load_id} not found")
+    return Response(status_code=204)
+
+
+@app.patch("/scheduler/priorities", openapi_extra=PRIORITY_BODY)
+async def update_priorities(request: Request, current_user: User = Depends(get_current_active_user)):
+    """
+    Change the priorities of many loads in one call.
+    
+    The body is JSON or MessagePack, either ``{"priorities": {load_id: priority}}``
+    or columnar ``{"load_ids": [...], "priorities": [...]}`` with priorities
+    optionally as raw little-endian int64 bytes.
+    
+    Returns:
+        Number of loads updated and the IDs that were not found
+    """
+    updates = await read_priority_payload(request)
+    loop = asyncio.get_running_loop()
+    missing = await loop.run_in_executor(None, scheduler.update_priorities, updates)
+    return {"updated": len(updates) - len(missing), "missing": missing}
+
+
+@app.get("/scheduler/top")
+async def peek_top_load(current_user: User = Depends(get_current_active_user)):
+    """
+    Get the highest priority load without removing it.
+    
+    Returns:
+        The load
+    """
+    load = scheduler.peek_top_load()
+    if load is None:
+        raise HTTPException(status_code=404, detail="No loads are scheduled")
+    return load.to_dict()
+
+
+@app.post("/scheduler/pop")
+async def pop_top_loads(count: int = Query(1, ge=1, le=10000),
+                        current_user: User = Depends(get_current_active_user)):
+    """
+    Remove and return the highest priority loads for dispatch.
+    
+    Returns:
+        Up to ``count`` loads, highest priority first
+    """
+    return {"loads": [load.to_dict() for load in scheduler.pop_top_loads(count)]}
+
+
+@app.get("/scheduler/stats")
+async def get_scheduler_stats(current_user: User = Depends(get_current_active_user)):
+    """
+    Get scheduler statistics.
+    
+    Returns:
+        Number of loads, their total power and the top priority
+    """
+    return scheduler.stats()
+
+
+@app.get("/ml/cache/stats")
+async def get_cache_stats(current_user: User = Depends(get_current_active_user)):
+    """
+    Get hit/miss counters of the forecast and anomaly result cache.
+    
+    Returns:
+        Cache statistics
+    """
+    return result_cache.stats()
+
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
@@ -0,0 +1,404 @@
+import contextvars
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Profiling modes: statistical stack sampling or deterministic cProfile
+SAMPLE = "sample"
+CPROFILE = "cprofile"
+MODES = (SAMPLE, CPROFILE)
+
+PROFILE_HEADER = "x-profile"
+REQUEST_ID_HEADER = "x-request-id"
+PROFILE_ID_HEADER = "x-profile-id"
+
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+class _StatsHolder:
+    """Adapter letting pstats.Stats load a raw cProfile stats dict."""
+
+    def __init__(self, stats: Dict[Any, Any]):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+def _frame_label(frame: Any) -> str:
+    """Flame graph label of a frame, e.g. "power_grid.grid:calculate_current"."""
+    return f'{frame.f_globals.get("__name__", "?")}:{frame.f_code.co_name}'
+
+
+def _profiled(func: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+    """Root frame of sampled stacks: only frames above it are recorded."""
+    return func(*args, **kwargs)
+
+
+def _sample_thread(thread_id: int, interval: float, stop: threading.Event, stacks: Counter) -> None:
+    """Sample the stack of one thread until stopped."""
+    while not stop.wait(interval):
+        frame = sys._current_frames().get(thread_id)
+        labels = []
+        while frame is not None and frame.f_code is not _profiled.__code__:
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+        # Samples taken before or after the profiled call have no root frame
+        if frame is not None and labels:
+            stacks[";".join(reversed(labels))] += 1
+
+
+def profile_call(mode: str, interval: float, func: Callable[..., Any],
+                 *args: Any, **kwargs: Any) -> Tuple[Any, Dict[Any, Any]]:
+    """
+    Run a function under a profiler in the calling thread.
+
+    This is a module-level function so that it can be shipped to a process
+    pool worker together with the profiled function.
+
+    Args:
+        mode: "sample" or "cprofile"
+        interval: Seconds between stack samples (sample mode)
+        func: Function to run
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Tuple of the function's return value and the raw profile: collapsed
+        stack counts (sample mode) or a cProfile stats dict
+
+    Raises:
+        Whatever func raises; the partial profile is discarded
+    """
+    if mode == CPROFILE:
+        profiler = cProfile.Profile()
+        result = profiler.runcall(func, *args, **kwargs)
+        profiler.create_stats()
+        return result, profiler.stats
+
+    stacks: Counter = Counter()
+    stop = threading.Event()
+    sampler = threading.Thread(
+        target=_sample_thread,
+        args=(threading.get_ident(), interval, stop, stacks),
+        name="profile-sampler", daemon=True
+    )
+    sampler.start()
+    try:
+        result = _profiled(func, args, kwargs)
+    finally:
+        stop.set()
+        sampler.join()
+    return result, dict(stacks)
+
+
+class RequestProfile:
+    """
+    Profile of the compute work done on behalf of one request.
+
+    Every executor call made while handling the request adds to the same
+    profile, so a batch request yields one combined profile.
+    """
+
+    def __init__(self, request_id: str, mode: str, interval: float):
+        """
+        Initialize an empty profile.
+
+        Args:
+            request_id: Identifier the profile is stored under
+            mode: "sample" or "cprofile"
+            interval: Seconds between stack samples (sample mode)
+        """
+        self.request_id = request_id
+        self.mode = mode
+        self.interval = interval
+        self.started = time.time()
+        self.method = ""
+        self.path = ""
+        self.status = 0
+        self.duration = 0.0
+        self.calls = 0
+        self._stacks: Counter = Counter()
+        self._stats: Optional[pstats.Stats] = None
+        self._lock = threading.Lock()
+
+    def add(self, data: Dict[Any, Any]) -> None:
+        """
+        Merge the raw profile of one executor call.
+
+        Args:
+            data: Second element of a profile_call result
+        """
+        with self._lock:
+            self.calls += 1
+            if self.mode == CPROFILE:
+                if self._stats is None:
+                    self._stats = pstats.Stats(_StatsHolder(data))
+                else:
+                    self._stats.add(_StatsHolder(data))
+            else:
+                self._stacks.update(data)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Get the profile's metadata.
+
+        Returns:
+            Dictionary with the request, mode, duration and number of profiled calls
+        """
+        return {
+            "request_id": self.request_id,
+            "mode": self.mode,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "started": self.started,
+            "duration_seconds": self.duration,
+            "profiled_calls": self.calls,
+            "formats": ["collapsed"] if self.mode == SAMPLE else ["pstats", "text"]
+        }
+
+    def collapsed(self) -> str:
+        """
+        Render sampled stacks in the collapsed format of flamegraph.pl and speedscope.
+
+        Returns:
+            One "frame;frame;frame count" line per distinct stack
+
+        Raises:
+            ValueError: If the profile was not sampled
+        """
+        if self.mode != SAMPLE:
+            raise ValueError("Collapsed stacks are only available for sampled profiles")
+        with self._lock:
+            items = sorted(self._stacks.items())
+        return "".join(f"{stack} {count}\n" for stack, count in items)
+
+    def pstats_dump(self) -> bytes:
+        """
+        Serialize a deterministic profile in the format of pstats.Stats.dump_stats.
+
+        Returns:
+            Marshalled stats, loadable with pstats, snakeviz and similar tools
+
+        Raises:
+            ValueError: If the profile was not made with cProfile
+        """
+        if self.mode != CPROFILE:
+            raise ValueError("pstats output is only available for cprofile profiles")
+        with self._lock:
+            return marshal.dumps(self._stats.stats if self._stats is not None else {})
+
+    def text(self, limit: int = 50) -> str:
+        """
+        Render a deterministic profile as a table sorted by cumulative time.
+
+        Args:
+            limit: Maximum number of functions listed
+
+        Returns:
+            pstats report
+
+        Raises:
+            ValueError: If the profile was not made with cProfile
+        """
+        if self.mode != CPROFILE:
+            raise ValueError("Text reports are only available for cprofile profiles")
+        stream = io.StringIO()
+        with self._lock:
+            if self._stats is None:
+                return "No profiled compute calls\n"
+            self._stats.stream = stream
+            self._stats.sort_stats("cumulative").print_stats(limit)
+        return stream.getvalue()
+
+
+class ProfileStore:
+    """Bounded store of finished request profiles, oldest evicted first."""
+
+    def __init__(self, max_profiles: int = 100):
+        """
+        Initialize the store.
+
+        Args:
+            max_profiles: Maximum number of profiles kept
+        """
+        self.max_profiles = max_profiles
+        self._profiles: 'OrderedDict[str, RequestProfile]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def put(self, profile: RequestProfile) -> None:
+        """Store a finished profile under its request id."""
+        with self._lock:
+            self._profiles[profile.request_id] = profile
+            self._profiles.move_to_end(profile.request_id)
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+
+    def get(self, request_id: str) -> Optional[RequestProfile]:
+        """Look up a profile by request id."""
+        return self._profiles.get(request_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Summaries of the stored profiles, newest first."""
+        with self._lock:
+            profiles = list(self._profiles.values())
+        return [profile.summary() for profile in reversed(profiles)]
+
+
+# Profile of the request being handled, visible to the compute executor
+_active_profile: contextvars.ContextVar[Optional[RequestProfile]] = contextvars.ContextVar(
+    "active_profile", default=None
+)
+
+
+def active_profile() -> Optional[RequestProfile]:
+    """Profile of the current request, or None if it is not profiled."""
+    return _active_profile.get()
+
+
+class RequestProfiler:
+    """
+    Decides which requests are profiled and keeps their profiles.
+
+    A request is profiled when it carries an ``X-Profile`` header and the
+    authorization callback accepts it, or when it is picked by the
+    configured sampling rate. Only work submitted to the compute executor is
+    profiled, since that is where ``power_grid`` and ``ml_pipeline`` run;
+    the shared event loop thread would mix in other requests.
+    """
+
+    def __init__(self, sample_rate: float = 0.0, mode: str = SAMPLE, interval: float = 0.005,
+                 store: Optional[ProfileStore] = None, rng: Optional[random.Random] = None):
+        """
+        Initialize the profiler.
+
+        Args:
+            sample_rate: Fraction of all requests profiled without a header
+            mode: Default mode, "sample" or "cprofile"
+            interval: Seconds between stack samples
+            store: Store for finished profiles
+            rng: Random source of the sampling decision
+
+        Raises:
+            ValueError: If the mode is unknown or the rate is not in [0, 1]
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("Profiling sample rate must be between 0 and 1")
+        self.sample_rate = sample_rate
+        self.mode = mode
+        self.interval = interval
+        self.store = store or ProfileStore()
+        self.rng = rng or random.Random()
+
+    @classmethod
+    def from_env(cls) -> "RequestProfiler":
+        """
+        Build a profiler from environment variables.
+
+        PROFILE_SAMPLE_RATE sets the fraction of requests profiled without a
+        header, PROFILE_MODE the default mode, PROFILE_INTERVAL_SECONDS the
+        sampling interval and PROFILE_MAX_STORED the number of profiles kept.
+
+        Returns:
+            Configured profiler
+        """
+        return cls(sample_rate=float(os.environ.get("PROFILE_SAMPLE_RATE", 0.0)),
+                   mode=os.environ.get("PROFILE_MODE", SAMPLE),
+                   interval=float(os.environ.get("PROFILE_INTERVAL_SECONDS", 0.005)),
+                   store=ProfileStore(int(os.environ.get("PROFILE_MAX_STORED", 100))))
+
+    def select(self, requested: Optional[str], authorized: Callable[[], bool]) -> Optional[str]:
+        """
+        Decide whether and how to profile a request.
+
+        Args:
+            requested: Value of the X-Profile header (None if absent)
+            authorized: Checks the request's credentials; only called for a header
+
+        Returns:
+            Profiling mode, or None if the request is not profiled
+        """
+        if requested is not None:
+            mode = requested.strip().lower()
+            if mode in ("1", "true", "yes"):
+                mode = self.mode
+            if mode in MODES and authorized():
+                return mode
+        if self.sample_rate and self.rng.random() < self.sample_rate:
+            return self.mode
+        return None
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware running selected requests under a RequestProfiler.
+
+    The profile id (the client's X-Request-ID if valid, otherwise a random
+    id) is returned in the X-Profile-Id response header.
+    """
+
+    def __init__(self, app: Any, profiler: RequestProfiler,
+                 authorize: Callable[[Dict[str, str]], bool]):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: Wrapped ASGI application
+            profiler: Profiler selecting requests and storing profiles
+            authorize: Returns whether request headers carry valid credentials
+        """
+        self.app = app
+        self.profiler = profiler
+        self.authorize = authorize
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        mode = self.profiler.select(headers.get(PROFILE_HEADER), lambda: self.authorize(headers))
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        request_id = headers.get(REQUEST_ID_HEADER, "")
+        if not _REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+        profile = RequestProfile(request_id, mode, self.profiler.interval)
+        profile.method = scope.get("method", "")
+        profile.path = scope.get("path", "")
+
+        async def tagging_send(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (PROFILE_ID_HEADER.encode(), request_id.encode())
+                ]
+            await send(message)
+
+        token = _active_profile.set(profile)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, tagging_send)
+        finally:
+            _active_profile.reset(token)
+            profile.duration = time.perf_counter() - start
+            self.profiler.store.put(profile)
@@ -0,0 +1,284 @@
+import json
+import mmap
+import os
+import re
+import struct
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Generic, List, Optional, TypeVar
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+# Snapshot file, little-endian:
+#   "SGSS" | u32 header length | JSON header | arrays, each aligned to 64 bytes
+# The header lists every array's dtype, shape and offset, and the metadata.
+SNAPSHOT_MAGIC = b"SGSS"
+_SNAPSHOT_HEADER = struct.Struct("<4sI")
+_ALIGNMENT = 64
+_CURRENT = "CURRENT"
+_VERSION_FILE = re.compile(r"^v(\d{8})\.bin$")
+_NAME = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+T = TypeVar("T")
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+class SharedSnapshot:
+    """
+    One published version of a named state, mapped read-only into memory.
+
+    The arrays are views of a single file mapping, so every process that
+    loads the same version shares the same physical pages. The mapping
+    stays valid while any array still references it, even after the
+    version is replaced and its file deleted.
+    """
+
+    def __init__(self, name: str, version: int, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        self.name = name
+        self.version = version
+        self.arrays = arrays
+        self.meta = meta
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the snapshot's arrays in bytes."""
+        return sum(array.nbytes for array in self.arrays.values())
+
+
+class SharedStateStore:
+    """
+    Versioned, read-mostly state shared by all worker processes of a host.
+
+    Each named state is a directory of immutable snapshot files, one per
+    version, plus a ``CURRENT`` file naming the live version. Publishing
+    writes a new snapshot file and then replaces ``CURRENT`` with
+    ``os.replace``, so readers see either the old or the new version,
+    never a partial one. Old versions beyond ``keep_versions`` are deleted;
+    processes that still map them keep reading them until they switch.
+    """
+
+    def __init__(self, directory: str, keep_versions: int = 3):
+        """
+        Initialize the store.
+
+        Args:
+            directory: Directory shared by the worker processes
+            keep_versions: Snapshot files kept per state, including the live one
+        """
+        self.directory = directory
+        self.keep_versions = max(1, keep_versions)
+        os.makedirs(directory, exist_ok=True)
+
+    def _state_directory(self, name: str) -> str:
+        if not _NAME.match(name):
+            raise ValueError(f"Invalid state name: {name!r}")
+        return os.path.join(self.directory, name)
+
+    def names(self) -> List[str]:
+        """Names of the published states."""
+        return sorted(name for name in os.listdir(self.directory)
+                      if os.path.exists(os.path.join(self.directory, name, _CURRENT)))
+
+    def version(self, name: str) -> Optional[int]:
+        """
+        Get the live version of a state.
+
+        Args:
+            name: State name
+
+        Returns:
+            Version number, or None if nothing was published
+        """
+        try:
+            with open(os.path.join(self._state_directory(name), _CURRENT)) as f:
+                return int(f.read().strip())
+        except FileNotFoundError:
+            return None
+
+    def publish(self, name: str, arrays: Dict[str, np.ndarray], meta: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Publish a new version of a state.
+
+        Args:
+            name: State name
+            arrays: Arrays of the state (numeric, boolean or fixed-width string dtypes)
+            meta: JSON-serializable metadata
+
+        Returns:
+            The new version number
+
+        Raises:
+            ValueError: If the name is invalid or an array has object dtype
+        """
+        directory = self._state_directory(name)
+        os.makedirs(directory, exist_ok=True)
+        arrays = {key: np.ascontiguousarray(array) for key, array in arrays.items()}
+        for key, array in arrays.items():
+            if array.dtype.hasobject:
+                raise ValueError(f"Array {key} has object dtype and cannot be shared")
+
+        with open(os.path.join(directory, ".lock"), "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            existing = [int(match.group(1)) for match in map(_VERSION_FILE.match, os.listdir(directory)) if match]
+            version = max(existing + [self.version(name) or 0]) + 1
+            self._write_snapshot(os.path.join(directory, f"v{version:08d}.bin"), version, arrays, meta or {})
+            self._write_current(directory, version)
+            for old in sorted(existing)[:max(0, len(existing) + 1 - self.keep_versions)]:
+                try:
+                    os.remove(os.path.join(directory, f"v{old:08d}.bin"))
+                except OSError:
+                    pass
+        return version
+
+    def _write_snapshot(self, path: str, version: int, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]) -> None:
+        """Write a snapshot file under a temporary name, then move it into place."""
+        layout = {}
+        # Offsets are relative to the end of the header, which is aligned itself
+        offset = 0
+        for key, array in arrays.items():
+            layout[key] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+            offset = _aligned(offset + array.nbytes)
+        header = json.dumps({"version": version, "meta": meta, "arrays": layout}).encode()
+        data_start = _aligned(_SNAPSHOT_HEADER.size + len(header))
+
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as f:
+                f.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, len(header)) + header)
+                for key, array in arrays.items():
+                    f.seek(data_start + layout[key]["offset"])
+                    f.write(array.reshape(-1).view(np.uint8))
+                f.truncate(data_start + offset)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+
+    def _write_current(self, directory: str, version: int) -> None:
+        """Point CURRENT at a version atomically."""
+        descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(descriptor, "w") as f:
+            f.write(f"{version}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, os.path.join(directory, _CURRENT))
+
+    def load(self, name: str, version: Optional[int] = None) -> Optional[SharedSnapshot]:
+        """
+        Map a version of a state into memory.
+
+        Args:
+            name: State name
+            version: Version to load (the live one if None)
+
+        Returns:
+            Read-only snapshot, or None if nothing was published
+
+        Raises:
+            FileNotFoundError: If a requested version no longer exists
+            ValueError: If the snapshot file is corrupt
+        """
+        directory = self._state_directory(name)
+        # The live version may be replaced and deleted between reading CURRENT and opening it
+        for attempt in range(5):
+            live = self.version(name) if version is None else version
+            if live is None:
+                return None
+            try:
+                return self._map(name, os.path.join(directory, f"v{live:08d}.bin"))
+            except FileNotFoundError:
+                if version is not None or attempt == 4:
+                    raise
+
+    def _map(self, name: str, path: str) -> SharedSnapshot:
+        with open(path, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_length = _SNAPSHOT_HEADER.unpack_from(mapping, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a shared state snapshot")
+        header = json.loads(mapping[_SNAPSHOT_HEADER.size:_SNAPSHOT_HEADER.size + header_length])
+        data_start = _aligned(_SNAPSHOT_HEADER.size + header_length)
+        arrays = {}
+        for key, spec in header["arrays"].items():
+            dtype = np.dtype(spec["dtype"])
+            count = int(np.prod(spec["shape"], dtype=np.int64))
+            arrays[key] = np.frombuffer(mapping, dtype=dtype, count=count,
+                                        offset=data_start + spec["offset"]).reshape(spec["shape"])
+        return SharedSnapshot(name, header["version"], arrays, header["meta"])
+
+
+class SharedState(Generic[T]):
+    """
+    A worker's view of one shared state, rebuilt when a new version is published.
+
+    ``get`` checks the live version at most every ``check_interval``
+    seconds and, when it changed, maps the new snapshot and passes it to
+    ``build``; the previous object is dropped once no request uses it.
+    """
+
+    def __init__(self, store: SharedStateStore, name: str, build: Callable[[SharedSnapshot], T],
+                 check_interval: float = 1.0):
+        """
+        Initialize the view.
+
+        Args:
+            store: Shared state store
+            name: State name
+            build: Creates the object used by the worker from a snapshot
+            check_interval: Seconds between checks for a new version
+        """
+        self.store = store
+        self.name = name
+        self.build = build
+        self.check_interval = check_interval
+        self._value: Optional[T] = None
+        self._version: Optional[int] = None
+        self._checked = -float("inf")
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> Optional[int]:
+        """Version this worker currently uses (None before the first load)."""
+        return self._version
+
+    def get(self) -> Optional[T]:
+        """
+        Get the object built from the live version.
+
+        Returns:
+            Built object, or None if nothing was published
+        """
+        if time.monotonic() - self._checked < self.check_interval:
+            return self._value
+        with self._lock:
+            if time.monotonic() - self._checked >= self.check_interval:
+                self._refresh()
+            return self._value
+
+    def refresh(self) -> Optional[T]:
+        """Switch to the live version now, without waiting for the check interval."""
+        with self._lock:
+            self._refresh()
+            return self._value
+
+    def _refresh(self) -> None:
+        """Load and build the live version if it changed (caller holds the lock)."""
+        live = self.store.version(self.name)
+        if live is not None and live != self._version:
+            snapshot = self.store.load(self.name)
+            self._value = self.build(snapshot)
+            self._version = snapshot.version
+        self._checked = time.monotonic()
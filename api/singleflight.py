@@ -0,0 +1,133 @@
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+
+def _feed(digest: Any, value: Any) -> None:
+    """Add a canonical encoding of a value to a running digest."""
+    if isinstance(value, BaseModel):
+        value = value.dict()
+    if isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        digest.update(f'a{array.dtype.str}{array.shape}'.encode())
+        digest.update(memoryview(array).cast('B'))
+    elif isinstance(value, dict):
+        digest.update(b'{')
+        for key in sorted(value, key=str):
+            _feed(digest, str(key))
+            _feed(digest, value[key])
+        digest.update(b'}')
+    elif isinstance(value, (list, tuple)):
+        digest.update(b'[')
+        for item in value:
+            _feed(digest, item)
+        digest.update(b']')
+    else:
+        # Length-prefixed so that adjacent scalars cannot run together
+        data = f'{type(value).__name__}:{value!r}'.encode()
+        digest.update(len(data).to_bytes(8, 'little'))
+        digest.update(data)
+
+
+def canonical_key(namespace: str, document: Any) -> str:
+    """
+    Build a key identifying a request payload regardless of its encoding.
+
+    Dictionary key order is ignored and NumPy arrays are hashed by content,
+    so a JSON payload and the equivalent binary payload share a key.
+
+    Args:
+        namespace: Kind of computation
+        document: Decoded payload (models, dicts, lists, arrays and scalars)
+
+    Returns:
+        Key string
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    _feed(digest, document)
+    return f'{namespace}:{digest.hexdigest()}'
+
+
+def canonical_grid_key(namespace: str, grid_model: Any) -> str:
+    """
+    Build a key for a grid payload that ignores node and line order.
+
+    Args:
+        namespace: Kind of computation
+        grid_model: Grid model or decoded columnar grid payload
+
+    Returns:
+        Key string
+    """
+    if isinstance(grid_model, dict):
+        return canonical_key(namespace, grid_model)
+    return canonical_key(namespace, {
+        "nodes": sorted((node.dict() for node in grid_model.nodes), key=lambda n: n["node_id"]),
+        "lines": sorted((line.dict() for line in grid_model.lines), key=lambda l: l["line_id"])
+    })
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent computations.
+
+    The first caller for a key starts the computation; callers arriving with
+    the same key while it is running wait for the same result (or exception)
+    instead of starting their own. Nothing is kept once the computation
+    finishes, so this complements rather than replaces the result cache.
+
+    The computation runs as its own task: a caller that is cancelled (e.g. a
+    client disconnecting) does not cancel it for the others.
+    """
+
+    def __init__(self):
+        """Initialize with no computations in flight."""
+        self._flights: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Task]] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run a computation, or join the identical one already in flight.
+
+        Args:
+            key: Canonical key of the computation
+            func: Coroutine function performing it
+
+        Returns:
+            The computation's result
+        """
+        loop = asyncio.get_running_loop()
+        flight = self._flights.get(key)
+        if flight is not None and flight[0] is loop:
+            self.coalesced += 1
+            task = flight[1]
+        else:
+            self.started += 1
+            task = loop.create_task(func())
+            self._flights[key] = (loop, task)
+            task.add_done_callback(lambda t: self._finish(key, t))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        """Forget a finished computation."""
+        if self._flights.get(key, (None, None))[1] is task:
+            del self._flights[key]
+        # Mark the exception as retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get coalescing statistics.
+
+        Returns:
+            Dictionary with computations in flight, started and joined
+        """
+        return {"in_flight": len(self._flights), "started": self.started, "coalesced": self.coalesced}
@@ -0,0 +1,14 @@
+# Load Scheduler Package
+"""
+This package provides priority scheduling of electrical loads.
+
+It mirrors the C++ scheduler in ``scheduler.hpp`` with an indexed binary
+heap, so priority updates and removals take O(log n) time. Day-ahead
+dispatch planning under generation capacity lives in
+``load_scheduler.dispatch``, which also runs as
+``python -m load_scheduler.dispatch``.
+"""
+
+from load_scheduler.scheduler import Load, LoadScheduler
+
+__version__ = '1.0.0'
@@ -0,0 +1,618 @@
+import argparse
+import json
+import time
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence
+
+# Day-ahead dispatch of loads under generation capacity:
+# ``python -m load_scheduler.dispatch scenario.json``.
+#
+# Loads draw ``consumption`` kW while running. Fixed loads run in all their
+# ``hours`` (default: all day); shiftable loads need ``duration`` hours
+# (default 1) anywhere in their ``allowed_hours``, preferably in their
+# ``preferred_hours``. Generators supply up to ``capacity`` kW scaled by an
+# hourly ``profile`` (default: a daylight curve for solar, flat otherwise).
+#
+# Both solvers minimize the same objective: the value of unserved energy
+# (weighted by priority) + a penalty for running outside preferred hours
+# + the merit-order generation cost.
+
+GENERATION_KINDS = ("solar", "wind", "hydro", "battery")
+HOURS_PER_DAY = 24
+
+# Cost per kWh of unserved energy for the lowest priority; each priority
+# level above it adds the same amount again
+VALUE_OF_LOST_LOAD = 1000.0
+# Cost per kWh of running a shiftable load outside its preferred hours
+PREFERENCE_PENALTY = 1.0
+# "auto" uses the exact solver up to this many load/interval variables
+EXACT_MAX_VARIABLES = 2000
+
+
+def generator_kind(generator: Dict[str, Any]) -> str:
+    """Kind of a generator from its ``type``, or the first kind named in its ``name``."""
+    kind = generator.get("type")
+    if kind:
+        return str(kind).lower()
+    name = str(generator.get("name", "")).lower()
+    for kind in GENERATION_KINDS:
+        if kind in name:
+            return kind
+    return "other"
+
+
+def interval_hours(intervals: int) -> np.ndarray:
+    """Hour of day at the start of each interval."""
+    return np.arange(intervals) * (HOURS_PER_DAY / intervals)
+
+
+def hours_mask(hours: Optional[Sequence[int]], intervals: int) -> np.ndarray:
+    """Intervals falling in the given hours of day (all intervals if hours is None)."""
+    if hours is None:
+        return np.ones(intervals, dtype=bool)
+    return np.isin(np.floor(interval_hours(intervals)).astype(np.int64), np.asarray(hours, dtype=np.int64))
+
+
+def availability_profile(kind: str, intervals: int) -> np.ndarray:
+    """
+    Default share of capacity available in each interval.
+
+    Args:
+        kind: Generator kind
+        intervals: Intervals per day
+
+    Returns:
+        Factors between 0 and 1
+    """
+    if kind == "solar":
+        # Daylight between 05:00 and 20:00, peaking at midday
+        midpoints = interval_hours(intervals) + HOURS_PER_DAY / intervals / 2
+        return np.clip(np.sin(np.pi * (midpoints - 5.0) / 15.0), 0.0, 1.0)
+    return np.ones(intervals)
+
+
+def _resample(profile: Sequence[float], intervals: int) -> np.ndarray:
+    """Repeat an hourly profile for each interval, or take it as is if it has one value per interval."""
+    profile = np.asarray(profile, dtype=np.float64)
+    if profile.shape == (intervals,):
+        return profile
+    if profile.shape == (HOURS_PER_DAY,):
+        return profile[np.floor(interval_hours(intervals)).astype(np.int64)]
+    raise ValueError(f"Profile needs {HOURS_PER_DAY} or {intervals} values, got {profile.size}")
+
+
+class DispatchProblem:
+    """
+    Loads and generation of one day, as arrays.
+
+    Per load there is a row of ``allowed`` and ``preferred`` intervals; a
+    load is served if it runs in exactly ``durations`` of its allowed
+    intervals (fixed loads are allowed only where they must run).
+    """
+
+    def __init__(self, load_ids: Sequence[str], priorities: Sequence[int], consumption: Sequence[float],
+                 durations: Sequence[int], allowed: np.ndarray, preferred: np.ndarray,
+                 generator_ids: Sequence[str], generator_kinds: Sequence[str], availability: np.ndarray,
+                 costs: Sequence[float], co2: Optional[Sequence[float]] = None):
+        """
+        Initialize the problem.
+
+        Args:
+            load_ids: Load identifiers
+            priorities: Priority per load (lower values have higher priority)
+            consumption: Power drawn per load while running (in kW)
+            durations: Intervals each load has to run
+            allowed: (loads, intervals) boolean matrix of intervals a load may run in
+            preferred: (loads, intervals) boolean matrix of preferred intervals
+            generator_ids: Generator identifiers
+            generator_kinds: Kind per generator (solar, wind, ...)
+            availability: (generators, intervals) available power (in kW)
+            costs: Generation cost per kWh
+            co2: Emissions per kWh (zero if omitted)
+
+        Raises:
+            ValueError: If the arrays are inconsistent or a load can never be served
+        """
+        self.load_ids = list(load_ids)
+        self.priorities = np.asarray(priorities, dtype=np.int64)
+        self.consumption = np.asarray(consumption, dtype=np.float64)
+        self.durations = np.asarray(durations, dtype=np.int64)
+        self.allowed = np.asarray(allowed, dtype=bool)
+        self.preferred = np.asarray(preferred, dtype=bool) & self.allowed
+        self.generator_ids = list(generator_ids)
+        self.generator_kinds = list(generator_kinds)
+        self.availability = np.asarray(availability, dtype=np.float64)
+        self.costs = np.asarray(costs, dtype=np.float64)
+        self.co2 = np.zeros(len(self.generator_ids)) if co2 is None else np.asarray(co2, dtype=np.float64)
+
+        n = len(self.load_ids)
+        self.intervals = self.availability.shape[1] if self.availability.ndim == 2 else 0
+        if self.intervals == 0 or HOURS_PER_DAY * 60 % self.intervals:
+            raise ValueError("Intervals must divide the day into whole minutes")
+        if self.allowed.shape != (n, self.intervals) or self.preferred.shape != (n, self.intervals):
+            raise ValueError(f"Interval masks must have shape ({n}, {self.intervals})")
+        if any(len(column) != n for column in (self.priorities, self.consumption, self.durations)):
+            raise ValueError("Load columns must have the same length")
+        if len(self.generator_ids) != self.availability.shape[0] or \
+                any(len(column) != len(self.generator_ids) for column in (self.generator_kinds, self.costs, self.co2)):
+            raise ValueError("Generator columns must have the same length")
+        if np.any(self.consumption <= 0):
+            raise ValueError("Consumption must be positive")
+        if np.any(self.availability < 0):
+            raise ValueError("Available generation must not be negative")
+        if np.any(self.durations < 1) or np.any(self.durations > self.allowed.sum(axis=1)):
+            bad = np.flatnonzero((self.durations < 1) | (self.durations > self.allowed.sum(axis=1)))[0]
+            raise ValueError(f"Load {self.load_ids[bad]} needs between 1 and its number of allowed intervals")
+
+    @classmethod
+    def from_scenario(cls, scenario: Dict[str, Any], intervals: int = HOURS_PER_DAY) -> 'DispatchProblem':
+        """
+        Create a problem from a scenario like ``test_data/optimization_scenario.json``.
+
+        Args:
+            scenario: Dictionary with ``loads`` and ``generation``
+            intervals: Intervals per day (24 for hourly, 96 for 15 minutes)
+
+        Returns:
+            The problem
+
+        Raises:
+            ValueError: If the scenario is incomplete or invalid
+        """
+        if intervals < 1 or HOURS_PER_DAY * 60 % intervals:
+            raise ValueError("Intervals must divide the day into whole minutes")
+        steps_per_hour = intervals / HOURS_PER_DAY
+        loads, generation = scenario.get("loads", []), scenario.get("generation", [])
+        n = len(loads)
+        allowed = np.zeros((n, intervals), dtype=bool)
+        preferred = np.zeros((n, intervals), dtype=bool)
+        durations = np.zeros(n, dtype=np.int64)
+        # Many loads share the same hours, so each distinct set is converted once
+        masks = {}
+
+        def mask(hours):
+            key = None if hours is None else tuple(hours)
+            if key not in masks:
+                masks[key] = hours_mask(hours, intervals)
+            return masks[key]
+
+        try:
+            for i, load in enumerate(loads):
+                if load.get("shiftable", False):
+                    allowed[i] = mask(load.get("allowed_hours"))
+                    preferred[i] = mask(load.get("preferred_hours", load.get("allowed_hours")))
+                    durations[i] = max(1, int(round(float(load.get("duration", 1)) * steps_per_hour)))
+                else:
+                    allowed[i] = preferred[i] = mask(load.get("hours"))
+                    durations[i] = allowed[i].sum()
+            kinds = [generator_kind(generator) for generator in generation]
+            availability = np.array([
+                float(generator["capacity"]) * np.clip(
+                    _resample(generator["profile"], intervals) if "profile" in generator
+                    else availability_profile(kind, intervals), 0.0, 1.0)
+                for generator, kind in zip(generation, kinds)
+            ]).reshape(len(generation), intervals)
+            return cls(
+                [str(load["id"]) for load in loads],
+                [int(load.get("priority", 1)) for load in loads],
+                [float(load["consumption"]) for load in loads],
+                durations, allowed, preferred,
+                [str(generator["id"]) for generator in generation], kinds, availability,
+                [float(generator.get("cost", 0.0)) for generator in generation],
+                [float(generator.get("co2", 0.0)) for generator in generation]
+            )
+        except KeyError as e:
+            raise ValueError(f"Scenario entry is missing '{e.args[0]}'")
+        except TypeError as e:
+            raise ValueError(f"Malformed scenario: {str(e)}")
+
+    @property
+    def interval_hours(self) -> float:
+        """Length of an interval in hours."""
+        return HOURS_PER_DAY / self.intervals
+
+    @property
+    def capacity(self) -> np.ndarray:
+        """Total available generation per interval."""
+        return self.availability.sum(axis=0)
+
+    def priority_weights(self) -> np.ndarray:
+        """Weight of each load's unserved energy: 1 for the lowest priority, more for higher ones."""
+        if len(self.priorities) == 0:
+            return np.zeros(0)
+        return (self.priorities.max() - self.priorities + 1).astype(np.float64)
+
+    def total_load(self, assignment: np.ndarray) -> np.ndarray:
+        """Power drawn in each interval by a (loads, intervals) assignment."""
+        rows, columns = np.nonzero(assignment)
+        return np.bincount(columns, weights=self.consumption[rows], minlength=self.intervals)
+
+    def generation_dispatch(self, total_load: np.ndarray) -> np.ndarray:
+        """
+        Cover the load of each interval from the cheapest generators first.
+
+        Args:
+            total_load: Power per interval
+
+        Returns:
+            (generators, intervals) dispatched power
+        """
+        order = np.argsort(self.costs, kind="stable")
+        available = self.availability[order]
+        band_start = np.cumsum(available, axis=0) - available
+        dispatch = np.empty_like(self.availability)
+        dispatch[order] = np.clip(total_load[None, :] - band_start, 0.0, available)
+        return dispatch
+
+    def objective(self, assignment: np.ndarray) -> float:
+        """
+        Value minimized by both solvers.
+
+        Args:
+            assignment: (loads, intervals) boolean matrix of running intervals
+
+        Returns:
+            Unserved energy value + preference penalty + generation cost
+        """
+        served = assignment.any(axis=1)
+        energy = self.consumption * self.durations * self.interval_hours
+        unserved = VALUE_OF_LOST_LOAD * float(np.dot(self.priority_weights()[~served], energy[~served]))
+        rows, columns = np.nonzero(assignment & ~self.preferred)
+        penalty = PREFERENCE_PENALTY * self.interval_hours * float(self.consumption[rows].sum())
+        dispatch = self.generation_dispatch(self.total_load(assignment))
+        cost = float((self.costs[:, None] * dispatch).sum()) * self.interval_hours
+        return unserved + penalty + cost
+
+
+def greedy_schedule(problem: DispatchProblem, strategy: str = "best_fit") -> np.ndarray:
+    """
+    Place loads one by one in priority order.
+
+    Higher priority loads go first, fixed loads before shiftable ones of the
+    same priority, then larger loads first. With ``best_fit`` a shiftable
+    load takes the intervals with spare capacity that leave room for the
+    fixed loads still to come, then preferred, then cheapest at the margin,
+    then least loaded; ``first_fit`` takes the earliest preferred intervals
+    instead, as an unoptimized baseline. A load that does not fit is left
+    unserved. Capacity, reserved capacity and marginal prices are kept as
+    per-interval arrays, so each placement costs O(intervals) vector work.
+
+    Args:
+        problem: Dispatch problem
+        strategy: ``best_fit`` or ``first_fit``
+
+    Returns:
+        (loads, intervals) boolean matrix of running intervals
+    """
+    if strategy not in ("best_fit", "first_fit"):
+        raise ValueError(f"Unknown strategy '{strategy}'")
+    intervals = problem.intervals
+    assignment = np.zeros(problem.allowed.shape, dtype=bool)
+    remaining = problem.capacity.copy()
+    committed = np.zeros(intervals)
+
+    # Merit-order position of the generator serving the next kW in each
+    # interval; since generators are sorted by cost it ranks marginal prices
+    order = np.argsort(problem.costs, kind="stable")
+    band_end = np.cumsum(problem.availability[order], axis=0)
+    tolerance = 1e-9 * max(1.0, float(remaining.max(initial=0.0)))
+    marginal = (band_end <= committed + tolerance).sum(axis=0).astype(np.float64)
+
+    # Candidates are ranked by one float key: cutting into reserved capacity
+    # (best_fit), not preferred, then the marginal generator (best_fit), then
+    # the load already committed (best_fit) or the position (first_fit),
+    # scaled to [0, 1)
+    best_fit = strategy == "best_fit"
+    preference_step = float(len(order) + 2)
+    reserve_step = 2.0 * preference_step
+    tie_scale = 1.0 / (float(remaining.sum()) + 1.0) if best_fit else 1.0 / intervals
+    tie_break = committed if best_fit else np.arange(intervals, dtype=np.float64)
+
+    allowed, not_preferred = problem.allowed, ~problem.preferred
+    fixed = problem.durations == allowed.sum(axis=1)
+    load_order = np.lexsort((-problem.consumption * problem.durations, ~fixed, problem.priorities))
+    # Capacity needed by fixed loads not placed yet; shiftable loads only use
+    # it if nothing else is left, so they don't push out fixed loads needlessly
+    reserved = problem.consumption[fixed] @ allowed[fixed] if best_fit else np.zeros(intervals)
+    consumptions, durations, fixed = problem.consumption.tolist(), problem.durations.tolist(), fixed.tolist()
+    band_end = np.ascontiguousarray(band_end.T)
+    for load in load_order.tolist():
+        consumption = consumptions[load]
+        duration = durations[load]
+        if best_fit and fixed[load]:
+            reserved -= consumption * allowed[load]
+        candidates = (allowed[load] & (remaining >= consumption - tolerance)).nonzero()[0]
+        if candidates.size < duration:
+            continue
+        if candidates.size > duration:
+            key = not_preferred[load][candidates] * preference_step + tie_break[candidates] * tie_scale
+            if best_fit:
+                key += marginal[candidates]
+                key += (remaining[candidates] - reserved[candidates] < consumption - tolerance) * reserve_step
+            if duration == 1:
+                candidates = candidates[[key.argmin()]]
+            else:
+                candidates = candidates[key.argpartition(duration - 1)[:duration]]
+        assignment[load][candidates] = True
+        remaining[candidates] -= consumption
+        committed[candidates] += consumption
+        if best_fit:
+            marginal[candidates] = (band_end[candidates] <= committed[candidates, None] + tolerance).sum(axis=1)
+    return assignment
+
+
+def exact_schedule(problem: DispatchProblem, time_limit: Optional[float] = 60.0) -> np.ndarray:
+    """
+    Solve the dispatch problem to optimality as a mixed-integer program.
+
+    Variables are x[l, t] (load l runs in allowed interval t), u[l] (load l
+    is unserved) and g[k, t] (output of generator k); constraints are
+    sum_t x[l, t] + duration[l] * u[l] = duration[l] and
+    sum_l consumption[l] * x[l, t] = sum_k g[k, t] with g[k, t] <=
+    availability[k, t]. Only practical for small problems (see
+    ``EXACT_MAX_VARIABLES``).
+
+    Args:
+        problem: Dispatch problem
+        time_limit: Solver time limit in seconds (None for no limit)
+
+    Returns:
+        (loads, intervals) boolean matrix of running intervals
+
+    Raises:
+        ImportError: If SciPy is not installed
+        RuntimeError: If the solver finds no solution
+    """
+    try:
+        from scipy.optimize import Bounds, LinearConstraint, milp
+        from scipy.sparse import coo_matrix
+    except ImportError as e:
+        raise ImportError("The exact dispatch solver requires scipy") from e
+
+    n, intervals = problem.allowed.shape
+    generators = len(problem.generator_ids)
+    hours = problem.interval_hours
+    rows, columns = np.nonzero(problem.allowed)
+    num_x = rows.size
+    u_offset, g_offset = num_x, num_x + n
+    num_vars = g_offset + generators * intervals
+
+    energy = problem.consumption * problem.durations * hours
+    objective = np.concatenate([
+        PREFERENCE_PENALTY * hours * problem.consumption[rows] * ~problem.preferred[rows, columns],
+        VALUE_OF_LOST_LOAD * problem.priority_weights() * energy,
+        np.repeat(problem.costs * hours, intervals)
+    ])
+
+    # Each served load runs for exactly its duration
+    durations = problem.durations.astype(np.float64)
+    run_matrix = coo_matrix((
+        np.concatenate([np.ones(num_x), durations]),
+        (np.concatenate([rows, np.arange(n)]), np.concatenate([np.arange(num_x), u_offset + np.arange(n)]))
+    ), shape=(n, num_vars))
+    # Generation matches the load in every interval
+    generator_index, generator_interval = np.divmod(np.arange(generators * intervals), intervals)
+    balance_matrix = coo_matrix((
+        np.concatenate([problem.consumption[rows], -np.ones(generators * intervals)]),
+        (np.concatenate([columns, generator_interval]), np.concatenate([np.arange(num_x), g_offset + np.arange(generators * intervals)]))
+    ), shape=(intervals, num_vars))
+
+    upper = np.concatenate([np.ones(num_x + n), problem.availability.ravel()])
+    integrality = np.concatenate([np.ones(num_x + n), np.zeros(generators * intervals)])
+    result = milp(objective, integrality=integrality, bounds=Bounds(np.zeros(num_vars), upper),
+                  constraints=[LinearConstraint(run_matrix.tocsr(), durations, durations),
+                               LinearConstraint(balance_matrix.tocsr(), 0.0, 0.0)],
+                  options={"time_limit": time_limit} if time_limit is not None else {})
+    if result.x is None:
+        raise RuntimeError(f"Exact dispatch found no solution: {result.message}")
+
+    assignment = np.zeros((n, intervals), dtype=bool)
+    assignment[rows, columns] = result.x[:num_x] > 0.5
+    return assignment
+
+
+def _summary(problem: DispatchProblem, assignment: np.ndarray) -> Dict[str, Any]:
+    """Load, generation, cost and emissions of an assignment."""
+    total_load = problem.total_load(assignment)
+    dispatch = problem.generation_dispatch(total_load)
+    hours = problem.interval_hours
+    unserved = ~assignment.any(axis=1)
+    return {
+        "total_load": total_load,
+        "unserved_energy": float(np.dot(problem.consumption[unserved], problem.durations[unserved])) * hours,
+        "dispatch": dispatch,
+        "cost": float((problem.costs[:, None] * dispatch).sum()) * hours,
+        "co2": float((problem.co2[:, None] * dispatch).sum()) * hours,
+        "peak": float(total_load.max(initial=0.0))
+    }
+
+
+def _reduction(before: float, after: float) -> float:
+    """Reduction from before to after, in percent."""
+    return round(100.0 * (before - after) / before, 1) if before > 0 else 0.0
+
+
+def optimization_results(problem: DispatchProblem, assignment: np.ndarray,
+                         baseline: Optional[np.ndarray] = None,
+                         include_loads: bool = True) -> Dict[str, Any]:
+    """
+    Report a schedule in the shape of the scenarios' ``optimization_results``.
+
+    Args:
+        problem: Dispatch problem
+        assignment: Optimized (loads, intervals) assignment
+        baseline: Assignment to compare against (first-fit placement if omitted)
+        include_loads: Whether to list the intervals of every load
+
+    Returns:
+        Costs, savings and reductions against the baseline, the load balance
+        index (mean over peak load), ``hourly_schedule`` with the load and
+        the generation per kind in each interval, and the unserved loads and
+        energy of both schedules (costs only compare like for like if these match)
+    """
+    if baseline is None:
+        baseline = greedy_schedule(problem, "first_fit")
+    original, optimized = _summary(problem, baseline), _summary(problem, assignment)
+
+    kinds = sorted(set(problem.generator_kinds), key=lambda kind: (
+        GENERATION_KINDS.index(kind) if kind in GENERATION_KINDS else len(GENERATION_KINDS), kind))
+    kind_index = np.array([kinds.index(kind) for kind in problem.generator_kinds], dtype=np.int64)
+    by_kind = np.zeros((len(kinds), problem.intervals))
+    np.add.at(by_kind, kind_index, optimized["dispatch"])
+
+    # Whole hours are reported as integers, like in the scenarios
+    starts = interval_hours(problem.intervals)
+    if problem.intervals == HOURS_PER_DAY:
+        starts = starts.astype(np.int64)
+    start_list = starts.tolist()
+    hourly_schedule = []
+    for t in range(problem.intervals):
+        entry = {"hour": start_list[t], "total_load": round(float(optimized["total_load"][t]), 3)}
+        entry.update((kind, round(float(by_kind[k, t]), 3)) for k, kind in enumerate(kinds))
+        hourly_schedule.append(entry)
+
+    served = assignment.any(axis=1)
+    total = optimized["total_load"]
+    results = {
+        "original_cost": round(original["cost"], 2),
+        "optimized_cost": round(optimized["cost"], 2),
+        "cost_savings": round(original["cost"] - optimized["cost"], 2),
+        "co2_reduction": _reduction(original["co2"], optimized["co2"]),
+        "peak_demand_reduction": _reduction(original["peak"], optimized["peak"]),
+        "load_balance_index": round(float(total.mean() / optimized["peak"]), 3) if optimized["peak"] > 0 else 0.0,
+        "hourly_schedule": hourly_schedule,
+        "unserved_loads": [problem.load_ids[i] for i in np.flatnonzero(~served)],
+        "unserved_energy": round(optimized["unserved_energy"], 3),
+        "original_unserved_energy": round(original["unserved_energy"], 3),
+        "objective": round(problem.objective(assignment), 2)
+    }
+    if include_loads:
+        rows, columns = np.nonzero(assignment)
+        hours = np.split(starts[columns], np.cumsum(np.bincount(rows, minlength=len(problem.load_ids)))[:-1])
+        preferred = served & ~(assignment & ~problem.preferred).any(axis=1)
+        results["load_schedule"] = [
+            {"id": load_id, "priority": priority, "hours": load_hours.tolist(), "preferred": is_preferred}
+            for load_id, priority, load_hours, is_preferred in zip(
+                problem.load_ids, problem.priorities.tolist(), hours, preferred.tolist())
+        ]
+    return results
+
+
+def optimize_dispatch(scenario: Dict[str, Any], intervals: int = HOURS_PER_DAY, method: str = "auto",
+                      include_loads: bool = True, time_limit: Optional[float] = 60.0) -> Dict[str, Any]:
+    """
+    Schedule a scenario's loads under its generation capacity.
+
+    Args:
+        scenario: Dictionary with ``loads`` and ``generation``
+        intervals: Intervals per day (24 for hourly, 96 for 15 minutes)
+        method: ``greedy``, ``exact`` or ``auto`` (exact for small problems if SciPy is installed)
+        include_loads: Whether to list the intervals of every load
+        time_limit: Time limit of the exact solver in seconds
+
+    Returns:
+        Results in the shape of ``optimization_results`` (see ``optimization_results``),
+        with the method used and the solve time
+    """
+    if method not in ("auto", "greedy", "exact"):
+        raise ValueError(f"Unknown method '{method}'")
+    problem = DispatchProblem.from_scenario(scenario, intervals)
+    if method == "auto":
+        method = "exact" if problem.allowed.sum() <= EXACT_MAX_VARIABLES and _exact_available() else "greedy"
+
+    start = time.perf_counter()
+    if method == "exact":
+        assignment = exact_schedule(problem, time_limit)
+    else:
+        assignment = greedy_schedule(problem)
+    solve_seconds = time.perf_counter() - start
+
+    results = optimization_results(problem, assignment, include_loads=include_loads)
+    results["method"] = method
+    results["solve_seconds"] = round(solve_seconds, 4)
+    return results
+
+
+def _exact_available() -> bool:
+    """Whether the exact solver's dependencies are installed."""
+    try:
+        from scipy.optimize import milp  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def synthetic_scenario(num_loads: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    Random scenario for benchmarks: a fifth of the loads fixed, the rest shiftable.
+
+    Generation is sized to about 90% of the average demand plus the fixed load,
+    so the schedule has to shift load away from the evening and shed some.
+
+    Args:
+        num_loads: Number of loads
+        seed: Random seed
+
+    Returns:
+        Scenario dictionary
+    """
+    rng = np.random.default_rng(seed)
+    consumption = np.round(rng.uniform(1.0, 50.0, num_loads), 1)
+    priorities = rng.integers(1, 5, num_loads)
+    shiftable = rng.random(num_loads) >= 0.2
+    durations = rng.integers(1, 5, num_loads)
+    window_start = rng.integers(0, 24, num_loads)
+    window_length = rng.integers(4, 13, num_loads)
+
+    loads = []
+    for i in range(num_loads):
+        load = {"id": f"L{i}", "priority": int(priorities[i]), "consumption": float(consumption[i]),
+                "shiftable": bool(shiftable[i])}
+        if shiftable[i]:
+            load["duration"] = int(durations[i])
+            load["preferred_hours"] = [int(h) % 24 for h in range(window_start[i], window_start[i] + window_length[i])]
+        loads.append(load)
+
+    energy = float(np.sum(np.where(shiftable, consumption * durations, consumption * 24)))
+    capacity = 0.9 * energy / 24
+    generation = [
+        {"id": "G1", "name": "Solar", "capacity": round(0.8 * capacity, 1), "cost": 0.03, "co2": 0.0},
+        {"id": "G2", "name": "Wind", "capacity": round(0.3 * capacity, 1), "cost": 0.04, "co2": 0.0},
+        {"id": "G3", "name": "Hydro", "capacity": round(0.4 * capacity, 1), "cost": 0.05, "co2": 0.0},
+        {"id": "G4", "name": "Gas Peaker", "capacity": round(0.2 * capacity, 1), "cost": 0.12, "co2": 0.45}
+    ]
+    return {"scenario_name": f"Synthetic ({num_loads} loads)", "loads": loads, "generation": generation}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Schedule loads under generation capacity for one day.")
+    parser.add_argument("scenario", nargs="?", help="Scenario JSON file (see test_data/optimization_scenario.json)")
+    parser.add_argument("--synthetic", type=int, metavar="LOADS", help="Use a random scenario with this many loads")
+    parser.add_argument("--intervals", type=int, default=HOURS_PER_DAY, help="Intervals per day (default: 24)")
+    parser.add_argument("--method", choices=["auto", "greedy", "exact"], default="auto")
+    parser.add_argument("--time-limit", type=float, default=60.0, help="Exact solver time limit in seconds")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args(argv)
+    if (args.scenario is None) == (args.synthetic is None):
+        parser.error("Give either a scenario file or --synthetic")
+
+    if args.scenario is not None:
+        with open(args.scenario) as f:
+            scenario = json.load(f)
+    else:
+        scenario = synthetic_scenario(args.synthetic)
+    include_loads = args.output is not None
+    results = optimize_dispatch(scenario, args.intervals, args.method, include_loads, args.time_limit)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(json.dumps(results))
+    summary = {key: value for key, value in results.items() if key not in ("hourly_schedule", "load_schedule")}
+    summary["unserved_loads"] = len(results["unserved_loads"])
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,11 +3,28 @@
 #include <thread>
 #include <chrono>
 #include <vector>
+#include <queue>
+#include <random>
+#include <atomic>
+#include <cstdint>
+#include <string>
+#include <cstdlib>
 
 /**
  * This example demonstrates the thread-safe load scheduler for power grid management.
  * It simulates a scenario where different loads with different priorities are added
  * to the scheduler, and then processed based on their priority.
+ * 
+ * Run with --benchmark to compare priority update throughput of the indexed heap
+ * against the previous scheduler, which rebuilt its queue on every update:
+ * 
+ *   g++ -std=c++17 -O2 -pthread example.cpp -o output/example
+ *   ./output/example --benchmark [max_loads]
+ * 
+ * Run with --stress to measure how monitoring threads reading the scheduler
+ * scale alongside a dispatcher thread that changes priorities:
+ * 
+ *   ./output/example --stress [max_readers] [seconds]
  */
 
 // Function to simulate processing a load
@@ -83,7 +100,259 @@ void adjustPriorities(smart_grid::LoadScheduler& scheduler) {
     }
 }
 
-int main() {
+/**
+ * @brief The previous scheduler, kept as the benchmark baseline
+ * 
+ * Every update and removal rebuilt the std::priority_queue from the load map.
+ */
+class RebuildingLoadScheduler {
+public:
+    bool addLoad(std::shared_ptr<smart_grid::Load> load) {
+        std::lock_guard<std::mutex> lock(mutex_);
+        if (!load_map_.emplace(load->getId(), load).second) {
+            return false;
+        }
+        load_queue_.push(load);
+        return true;
+    }
+
+    bool updatePriority(const std::string& load_id, int new_priority) {
+        std::lock_guard<std::mutex> lock(mutex_);
+        auto it = load_map_.find(load_id);
+        if (it == load_map_.end()) {
+            return false;
+        }
+        it->second->setPriority(new_priority);
+        rebuildQueue();
+        return true;
+    }
+
+    std::shared_ptr<smart_grid::Load> popTopLoad() {
+        std::lock_guard<std::mutex> lock(mutex_);
+        if (load_queue_.empty()) {
+            return nullptr;
+        }
+        std::shared_ptr<smart_grid::Load> top_load = load_queue_.top();
+        load_queue_.pop();
+        load_map_.erase(top_load->getId());
+        return top_load;
+    }
+
+private:
+    void rebuildQueue() {
+        std::priority_queue<std::shared_ptr<smart_grid::Load>,
+                            std::vector<std::shared_ptr<smart_grid::Load>>,
+                            smart_grid::LoadComparator> new_queue;
+        for (const auto& pair : load_map_) {
+            new_queue.push(pair.second);
+        }
+        load_queue_.swap(new_queue);
+    }
+
+    std::mutex mutex_;
+    std::priority_queue<std::shared_ptr<smart_grid::Load>,
+                        std::vector<std::shared_ptr<smart_grid::Load>>,
+                        smart_grid::LoadComparator> load_queue_;
+    std::unordered_map<std::string, std::shared_ptr<smart_grid::Load>> load_map_;
+};
+
+/**
+ * @brief Fill a scheduler, apply random priority updates and drain it
+ * 
+ * @param num_loads Number of loads to add
+ * @param num_updates Number of priority updates to time
+ * @param seed Seed of the load priorities and the update sequence
+ * @param updates_per_second Set to the measured update throughput
+ * @return Priorities in the order the loads were popped, to check the orders agree
+ */
+template <typename Scheduler>
+std::vector<int> runUpdateBenchmark(std::size_t num_loads, std::size_t num_updates,
+                                    unsigned seed, double& updates_per_second) {
+    Scheduler scheduler;
+    std::mt19937 rng(seed);
+    std::uniform_int_distribution<int> priority(0, 1000);
+    std::uniform_int_distribution<std::size_t> pick(0, num_loads - 1);
+
+    std::vector<std::string> ids;
+    ids.reserve(num_loads);
+    for (std::size_t i = 0; i < num_loads; ++i) {
+        ids.push_back("L" + std::to_string(i));
+        scheduler.addLoad(std::make_shared<smart_grid::Load>(ids.back(), 100.0, priority(rng)));
+    }
+
+    auto start = std::chrono::steady_clock::now();
+    for (std::size_t i = 0; i < num_updates; ++i) {
+        scheduler.updatePriority(ids[pick(rng)], priority(rng));
+    }
+    std::chrono::duration<double> elapsed = std::chrono::steady_clock::now() - start;
+    updates_per_second = num_updates / elapsed.count();
+
+    std::vector<int> order;
+    order.reserve(num_loads);
+    while (auto load = scheduler.popTopLoad()) {
+        order.push_back(load->getPriority());
+    }
+    return order;
+}
+
+/**
+ * @brief Compare update throughput of the indexed heap and the rebuilding scheduler
+ * 
+ * @param max_loads Largest number of loads to benchmark
+ * @return Process exit code (non-zero if the two schedulers disagree)
+ */
+int runBenchmark(std::size_t max_loads) {
+    std::cout << "=== Priority update benchmark ===" << std::endl;
+    std::cout << "loads\tindexed heap (updates/s)\trebuild (updates/s)\tspeedup" << std::endl;
+
+    for (std::size_t num_loads = 1000; num_loads <= max_loads; num_loads *= 10) {
+        // The rebuilding scheduler is O(n log n) per update, so it gets fewer updates
+        std::size_t heap_updates = 1000000;
+        std::size_t rebuild_updates = std::max<std::size_t>(10, 2000000 / num_loads);
+        double heap_rate = 0.0;
+        double rebuild_rate = 0.0;
+
+        runUpdateBenchmark<smart_grid::LoadScheduler>(num_loads, heap_updates, 42, heap_rate);
+        runUpdateBenchmark<RebuildingLoadScheduler>(num_loads, rebuild_updates, 42, rebuild_rate);
+
+        // After the same updates both schedulers must pop the same priority sequence
+        double check_rate = 0.0;
+        std::size_t check_loads = std::min<std::size_t>(num_loads, 1000);
+        if (runUpdateBenchmark<smart_grid::LoadScheduler>(check_loads, 100, 7, check_rate) !=
+            runUpdateBenchmark<RebuildingLoadScheduler>(check_loads, 100, 7, check_rate)) {
+            std::cerr << "Schedulers disagree on the pop order" << std::endl;
+            return 1;
+        }
+
+        std::cout << num_loads << "\t" << static_cast<long long>(heap_rate)
+                  << "\t\t\t" << static_cast<long long>(rebuild_rate)
+                  << "\t\t\t" << heap_rate / rebuild_rate << "x" << std::endl;
+    }
+    return 0;
+}
+
+/**
+ * @brief Run one dispatcher thread and several reader threads against a scheduler
+ * 
+ * The dispatcher changes priorities (in batches or one call per load) and
+ * dispatches and re-adds the top loads; readers poll the top load, random
+ * loads by ID and the queue size.
+ * 
+ * @param num_readers Number of reader threads
+ * @param seconds Duration of the run
+ * @param batched Whether the dispatcher uses updatePriorities/addLoads
+ * @param reads_per_second Set to the total read throughput of all readers
+ * @param updates_per_second Set to the dispatcher's priority update throughput
+ */
+void runStress(std::size_t num_readers, double seconds, bool batched,
+               double& reads_per_second, double& updates_per_second) {
+    const std::size_t num_loads = 100000;
+    const std::size_t batch_size = 1000;
+    const std::size_t dispatch_size = 100;
+
+    smart_grid::LoadScheduler scheduler;
+    std::mt19937 rng(42);
+    std::uniform_int_distribution<int> priority(0, 1000);
+    std::uniform_int_distribution<std::size_t> pick(0, num_loads - 1);
+    std::vector<std::string> ids;
+    std::vector<std::shared_ptr<smart_grid::Load>> loads;
+    for (std::size_t i = 0; i < num_loads; ++i) {
+        ids.push_back("L" + std::to_string(i));
+        loads.push_back(std::make_shared<smart_grid::Load>(ids.back(), 100.0, priority(rng)));
+    }
+    scheduler.addLoads(loads);
+
+    std::atomic<bool> stop{false};
+    std::atomic<std::uint64_t> reads{0};
+    std::vector<std::thread> readers;
+    for (std::size_t r = 0; r < num_readers; ++r) {
+        readers.emplace_back([&, r] {
+            std::mt19937 reader_rng(static_cast<unsigned>(r));
+            std::uint64_t local_reads = 0;
+            while (!stop.load(std::memory_order_relaxed)) {
+                scheduler.peekTopLoad();
+                scheduler.getLoadById(ids[pick(reader_rng)]);
+                scheduler.size();
+                local_reads += 3;
+            }
+            reads += local_reads;
+        });
+    }
+
+    std::uint64_t updates = 0;
+    std::vector<std::pair<std::string, int>> batch(batch_size);
+    auto start = std::chrono::steady_clock::now();
+    std::chrono::duration<double> elapsed(0.0);
+    while (elapsed.count() < seconds) {
+        for (auto& update : batch) {
+            update = {ids[pick(rng)], priority(rng)};
+        }
+        if (batched) {
+            scheduler.updatePriorities(batch);
+            scheduler.addLoads(scheduler.popTopK(dispatch_size));
+        } else {
+            for (const auto& update : batch) {
+                scheduler.updatePriority(update.first, update.second);
+            }
+            std::vector<std::shared_ptr<smart_grid::Load>> dispatched;
+            for (std::size_t i = 0; i < dispatch_size; ++i) {
+                dispatched.push_back(scheduler.popTopLoad());
+            }
+            for (const auto& load : dispatched) {
+                scheduler.addLoad(load);
+            }
+        }
+        updates += batch_size;
+        elapsed = std::chrono::steady_clock::now() - start;
+    }
+    stop = true;
+    for (auto& reader : readers) {
+        reader.join();
+    }
+    elapsed = std::chrono::steady_clock::now() - start;
+
+    reads_per_second = reads / elapsed.count();
+    updates_per_second = updates / elapsed.count();
+}
+
+/**
+ * @brief Show how reads and dispatcher updates scale with the number of reader threads
+ * 
+ * @param max_readers Largest number of reader threads
+ * @param seconds Duration of each run
+ * @return Process exit code
+ */
+int runStressBenchmark(std::size_t max_readers, double seconds) {
+    std::cout << "=== Concurrent stress benchmark (" << std::thread::hardware_concurrency()
+              << " hardware threads) ===" << std::endl;
+    std::cout << "readers\treads/s\t\tbatched updates/s\tsingle-call updates/s" << std::endl;
+
+    for (std::size_t num_readers = 1; num_readers <= max_readers; num_readers *= 2) {
+        double reads = 0.0;
+        double batched_updates = 0.0;
+        double single_reads = 0.0;
+        double single_updates = 0.0;
+        runStress(num_readers, seconds, true, reads, batched_updates);
+        runStress(num_readers, seconds, false, single_reads, single_updates);
+
+        std::cout << num_readers << "\t" << static_cast<long long>(reads)
+                  << "\t" << static_cast<long long>(batched_updates)
+                  << "\t\t\t" << static_cast<long long>(single_updates) << std::endl;
+    }
+    return 0;
+}
+
+int main(int argc, char* argv[]) {
+    if (argc > 1 && std::string(argv[1]) == "--benchmark") {
+        std::size_t max_loads = argc > 2 ? std::strtoul(argv[2], nullptr, 10) : 100000;
+        return runBenchmark(max_loads);
+    }
+    if (argc > 1 && std::string(argv[1]) == "--stress") {
+        std::size_t max_readers = argc > 2 ? std::strtoul(argv[2], nullptr, 10) : 8;
+        double seconds = argc > 3 ? std::strtod(argv[3], nullptr) : 1.0;
+        return runStressBenchmark(max_readers, seconds);
+    }
+
     std::cout << "=== Smart Grid Load Scheduler Example ===" << std::endl;
     
     // Create the load scheduler
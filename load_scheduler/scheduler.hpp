@@ -1,14 +1,20 @@
 #pragma once
 
-#include <queue>
 #include <vector>
 #include <string>
 #include <unordered_map>
 #include <mutex>
+#include <shared_mutex>
+#include <atomic>
+#include <thread>
 #include <algorithm>
 #include <iostream>
 #include <memory>
 #include <functional>
+#include <cstddef>
+#include <cstdint>
+#include <stdexcept>
+#include <utility>
 
 namespace smart_grid {
 
@@ -44,6 +50,9 @@ public:
     /**
      * @brief Set the priority value of this load
      * 
+     * Loads held by a LoadScheduler must be re-prioritised through
+     * LoadScheduler::updatePriority so the scheduler can reorder them.
+     * 
      * @param priority New priority value (lower values have higher priority)
      */
     void setPriority(int priority) { priority_ = priority; }
@@ -69,11 +78,26 @@ struct LoadComparator {
  * @brief Thread-safe priority queue for scheduling electrical loads
  * 
  * Implements a thread-safe priority queue that schedules loads based on their
- * priority. Supports dynamic priority adjustment with O(n) update capability.
+ * priority; loads of equal priority are served in the order they were added.
+ * 
+ * The queue is an indexed d-ary heap: every load's map entry records its
+ * position in the heap array, so priority changes and removals only sift that
+ * one entry (O(log n)) instead of rebuilding the whole queue.
+ * 
+ * Read-only calls (peekTopLoad, getLoadById, size, empty) take a shared lock
+ * and run concurrently; modifications take it exclusively. New readers wait
+ * while a writer is waiting, so busy monitoring threads cannot starve the
+ * dispatcher. The batch calls apply many changes under a single exclusive
+ * lock acquisition.
  */
 class LoadScheduler {
 public:
+    /// Children per heap node; a wider heap is shallower and more cache friendly
+    static constexpr std::size_t kArity = 4;
+
     LoadScheduler() = default;
+    LoadScheduler(const LoadScheduler&) = delete;
+    LoadScheduler& operator=(const LoadScheduler&) = delete;
     
     /**
      * @brief Add a load to the scheduler
@@ -82,16 +106,17 @@ public:
      * @return true if the load was added successfully, false if a load with the same ID already exists
      */
     bool addLoad(std::shared_ptr<Load> load) {
-        std::lock_guard<std::mutex> lock(mutex_);
+        auto lock = writeLock();
         
         // Check if a load with this ID already exists
-        if (load_map_.find(load->getId()) != load_map_.end()) {
+        auto inserted = load_map_.emplace(load->getId(), Slot{load, heap_.size()});
+        if (!inserted.second) {
             return false;
         }
         
-        // Add the load to the map and priority queue
-        load_map_[load->getId()] = load;
-        load_queue_.push(load);
+        // Append to the heap and move the load up to its place
+        heap_.push_back(HeapEntry{load->getPriority(), next_sequence_++, &inserted.first->second});
+        siftUp(heap_.size() - 1);
         return true;
     }
     
@@ -102,18 +127,15 @@ public:
      * @return true if the load was removed, false if it wasn't found
      */
     bool removeLoad(const std::string& load_id) {
-        std::lock_guard<std::mutex> lock(mutex_);
+        auto lock = writeLock();
         
         auto it = load_map_.find(load_id);
         if (it == load_map_.end()) {
             return false;
         }
         
-        // Remove from map
+        eraseAt(it->second.position);
         load_map_.erase(it);
-        
-        // Need to rebuild queue as std::priority_queue doesn't support removal
-        rebuildQueue();
         return true;
     }
     
@@ -125,19 +147,18 @@ public:
      * @return true if the load was found and updated, false otherwise
      */
     bool updatePriority(const std::string& load_id, int new_priority) {
-        std::lock_guard<std::mutex> lock(mutex_);
+        auto lock = writeLock();
         
         auto it = load_map_.find(load_id);
         if (it == load_map_.end()) {
             return false;
         }
         
-        // Update priority in the Load object
-        it->second->setPriority(new_priority);
-        
-        // Need to rebuild queue as std::priority_queue doesn't maintain heap property
-        // after updating an element
-        rebuildQueue();
+        // Update priority in the Load object and its heap entry, then sift that entry
+        Slot& slot = it->second;
+        slot.load->setPriority(new_priority);
+        heap_[slot.position].priority = new_priority;
+        restore(slot.position);
         return true;
     }
     
@@ -146,14 +167,14 @@ public:
      * 
      * @return std::shared_ptr<Load> to the highest priority load, or nullptr if queue is empty
      */
-    std::shared_ptr<Load> peekTopLoad() {
-        std::lock_guard<std::mutex> lock(mutex_);
+    std::shared_ptr<Load> peekTopLoad() const {
+        auto lock = readLock();
         
-        if (load_queue_.empty()) {
+        if (heap_.empty()) {
             return nullptr;
         }
         
-        return load_queue_.top();
+        return heap_.front().slot->load;
     }
     
     /**
@@ -162,34 +183,116 @@ public:
      * @return std::shared_ptr<Load> to the highest priority load, or nullptr if queue is empty
      */
     std::shared_ptr<Load> popTopLoad() {
-        std::lock_guard<std::mutex> lock(mutex_);
+        auto lock = writeLock();
         
-        if (load_queue_.empty()) {
+        if (heap_.empty()) {
             return nullptr;
         }
         
-        std::shared_ptr<Load> top_load = load_queue_.top();
-        load_queue_.pop();
+        std::shared_ptr<Load> top_load = heap_.front().slot->load;
+        eraseAt(0);
         load_map_.erase(top_load->getId());
         
         return top_load;
     }
     
+    /**
+     * @brief Get and remove up to k of the highest priority loads
+     * 
+     * @param k Maximum number of loads to remove
+     * @return Loads in priority order, highest priority first
+     */
+    std::vector<std::shared_ptr<Load>> popTopK(std::size_t k) {
+        auto lock = writeLock();
+        
+        std::vector<std::shared_ptr<Load>> loads;
+        loads.reserve(std::min(k, heap_.size()));
+        while (loads.size() < k && !heap_.empty()) {
+            loads.push_back(heap_.front().slot->load);
+            eraseAt(0);
+            load_map_.erase(loads.back()->getId());
+        }
+        return loads;
+    }
+    
+    /**
+     * @brief Add many loads under one lock acquisition
+     * 
+     * @param loads Loads to add; they keep their order among equal priorities
+     * @return IDs of the loads that were not added because the ID already exists
+     */
+    std::vector<std::string> addLoads(const std::vector<std::shared_ptr<Load>>& loads) {
+        auto lock = writeLock();
+        
+        std::vector<std::string> rejected;
+        const std::size_t first_added = heap_.size();
+        heap_.reserve(heap_.size() + loads.size());
+        for (const auto& load : loads) {
+            auto inserted = load_map_.emplace(load->getId(), Slot{load, heap_.size()});
+            if (!inserted.second) {
+                rejected.push_back(load->getId());
+                continue;
+            }
+            heap_.push_back(HeapEntry{load->getPriority(), next_sequence_++, &inserted.first->second});
+        }
+        
+        // One fix-up for the whole batch
+        if (heapifyIsCheaper(heap_.size() - first_added)) {
+            heapify();
+        } else {
+            for (std::size_t position = first_added; position < heap_.size(); ++position) {
+                siftUp(position);
+            }
+        }
+        return rejected;
+    }
+    
+    /**
+     * @brief Update the priorities of many loads under one lock acquisition
+     * 
+     * @param updates (load ID, new priority) pairs; later pairs win for repeated IDs
+     * @return IDs that were not found
+     */
+    std::vector<std::string> updatePriorities(const std::vector<std::pair<std::string, int>>& updates) {
+        auto lock = writeLock();
+        
+        std::vector<std::string> missing;
+        // One fix-up for the whole batch if that is cheaper than sifting every entry
+        const bool rebuild = heapifyIsCheaper(updates.size());
+        for (const auto& update : updates) {
+            auto it = load_map_.find(update.first);
+            if (it == load_map_.end()) {
+                missing.push_back(update.first);
+                continue;
+            }
+            Slot& slot = it->second;
+            slot.load->setPriority(update.second);
+            heap_[slot.position].priority = update.second;
+            if (!rebuild) {
+                restore(slot.position);
+            }
+        }
+        if (rebuild) {
+            heapify();
+        }
+        return missing;
+    }
+    
     /**
      * @brief Get a load by its ID
      * 
      * @param load_id ID of the load to find
      * @return std::shared_ptr<Load> to the load if found, nullptr otherwise
      */
-    std::shared_ptr<Load> getLoadById(const std::string& load_id) {
-        std::lock_guard<std::mutex> lock(mutex_);
+    std::shared_ptr<Load> getLoadById(const std::string& load_id) const {
+        auto lock = readLock();
         
         auto it = load_map_.find(load_id);
         if (it == load_map_.end()) {
             return nullptr;
         }
         
-        return it->second;
+        return it->second.load;
     }
     
     /**
@@ -198,8 +301,8 @@ public:
      * @return size_t Number of loads
      */
     size_t size() const {
-        std::lock_guard<std::mutex> lock(mutex_);
-        return load_queue_.size();
+        auto lock = readLock();
+        return heap_.size();
     }
     
     /**
@@ -208,38 +311,147 @@ public:
      * @return true if empty, false otherwise
      */
     bool empty() const {
-        std::lock_guard<std::mutex> lock(mutex_);
-        return load_queue_.empty();
+        auto lock = readLock();
+        return heap_.empty();
     }
 
 private:
     /**
-     * @brief Rebuild the priority queue after modifications
-     * 
-     * This is an O(n) operation required after changing priorities or removing elements
+     * @brief Take the lock for reading, after any writer that is already waiting
      */
-    void rebuildQueue() {
-        // Create a new queue with the updated elements
-        std::priority_queue<std::shared_ptr<Load>, 
-                            std::vector<std::shared_ptr<Load>>, 
-                            LoadComparator> new_queue;
-        
-        for (const auto& pair : load_map_) {
-            new_queue.push(pair.second);
+    std::shared_lock<std::shared_mutex> readLock() const {
+        while (waiting_writers_.load(std::memory_order_acquire) != 0) {
+            std::this_thread::yield();
+        }
+        return std::shared_lock<std::shared_mutex>(mutex_);
+    }
+
+    /**
+     * @brief Take the lock for writing
+     */
+    std::unique_lock<std::shared_mutex> writeLock() {
+        waiting_writers_.fetch_add(1, std::memory_order_acq_rel);
+        std::unique_lock<std::shared_mutex> lock(mutex_);
+        waiting_writers_.fetch_sub(1, std::memory_order_acq_rel);
+        return lock;
+    }
+
+    /// Map entry of a load: the load and its current position in heap_
+    struct Slot {
+        std::shared_ptr<Load> load;
+        std::size_t position;
+    };
+
+    /// Heap element; the priority is copied here so comparisons stay in the array
+    struct HeapEntry {
+        int priority;
+        std::uint64_t sequence;  ///< Insertion order, breaks priority ties
+        Slot* slot;              ///< Stable: unordered_map never moves its elements
+    };
+
+    static bool before(const HeapEntry& a, const HeapEntry& b) {
+        return a.priority < b.priority || (a.priority == b.priority && a.sequence < b.sequence);
+    }
+
+    /**
+     * @brief Store an entry at a heap position and record that position
+     */
+    void place(std::size_t position, const HeapEntry& entry) {
+        heap_[position] = entry;
+        entry.slot->position = position;
+    }
+
+    void siftUp(std::size_t position) {
+        HeapEntry entry = heap_[position];
+        while (position > 0) {
+            std::size_t parent = (position - 1) / kArity;
+            if (!before(entry, heap_[parent])) {
+                break;
+            }
+            place(position, heap_[parent]);
+            position = parent;
+        }
+        place(position, entry);
+    }
+
+    void siftDown(std::size_t position) {
+        HeapEntry entry = heap_[position];
+        const std::size_t size = heap_.size();
+        while (true) {
+            std::size_t first_child = position * kArity + 1;
+            if (first_child >= size) {
+                break;
+            }
+            std::size_t last_child = std::min(first_child + kArity, size);
+            std::size_t best = first_child;
+            for (std::size_t child = first_child + 1; child < last_child; ++child) {
+                if (before(heap_[child], heap_[best])) {
+                    best = child;
+                }
+            }
+            if (!before(heap_[best], entry)) {
+                break;
+            }
+            place(position, heap_[best]);
+            position = best;
+        }
+        place(position, entry);
+    }
+
+    /**
+     * @brief Move the entry at a position up or down to its place
+     */
+    void restore(std::size_t position) {
+        if (position > 0 && before(heap_[position], heap_[(position - 1) / kArity])) {
+            siftUp(position);
+        } else {
+            siftDown(position);
+        }
+    }
+
+    /**
+     * @brief Restore the heap property of the whole array bottom-up in O(n)
+     */
+    void heapify() {
+        if (heap_.size() < 2) {
+            return;
+        }
+        for (std::size_t position = (heap_.size() - 2) / kArity + 1; position-- > 0;) {
+            siftDown(position);
+        }
+    }
+
+    /**
+     * @brief Whether one O(n) heapify is cheaper than sifting each changed entry
+     */
+    bool heapifyIsCheaper(std::size_t changes) const {
+        std::size_t depth = 1;
+        for (std::size_t level = kArity; level < heap_.size(); level *= kArity) {
+            ++depth;
+        }
+        return changes * depth >= heap_.size();
+    }
+
+    /**
+     * @brief Remove the heap entry at a position (the map entry is left to the caller)
+     */
+    void eraseAt(std::size_t position) {
+        HeapEntry last = heap_.back();
+        heap_.pop_back();
+        if (position < heap_.size()) {
+            place(position, last);
+            restore(position);
         }
-        
-        // Swap with the old queue
-        load_queue_.swap(new_queue);
     }
 
-    // Thread synchronization
-    mutable std::mutex mutex_;
+    // Thread synchronization (shared for reads, exclusive for modifications)
+    mutable std::shared_mutex mutex_;
+    std::atomic<std::size_t> waiting_writers_{0};
     
     // Data structures
-    std::priority_queue<std::shared_ptr<Load>, 
-                         std::vector<std::shared_ptr<Load>>, 
-                         LoadComparator> load_queue_;
-    std::unordered_map<std::string, std::shared_ptr<Load>> load_map_;
+    std::vector<HeapEntry> heap_;
+    std::unordered_map<std::string, Slot> load_map_;
+    std::uint64_t next_sequence_ = 0;
 };
 
 } // namespace smart_grid 
\ No newline at end of file
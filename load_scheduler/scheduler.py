@@ -0,0 +1,307 @@
+import threading
+from itertools import count
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class Load:
+    """
+    An electrical load waiting to be dispatched.
+
+    Lower priority values are served first; loads of equal priority are
+    served in the order they were added.
+    """
+
+    __slots__ = ("load_id", "power_requirement", "priority", "_sequence", "_index")
+
+    def __init__(self, load_id: str, power_requirement: float, priority: int):
+        """
+        Initialize a load.
+
+        Args:
+            load_id: Unique identifier of the load
+            power_requirement: Power required by the load (in Watts)
+            priority: Priority value (lower values have higher priority)
+
+        Raises:
+            ValueError: If the power requirement is not positive
+        """
+        if not power_requirement > 0:
+            raise ValueError("Power requirement must be positive")
+        self.load_id = load_id
+        self.power_requirement = float(power_requirement)
+        self.priority = int(priority)
+        self._sequence = 0
+        self._index = -1
+
+    def to_dict(self) -> Dict[str, object]:
+        """Plain representation of the load."""
+        return {"load_id": self.load_id, "power_requirement": self.power_requirement, "priority": self.priority}
+
+    def __repr__(self) -> str:
+        return f"Load({self.load_id!r}, {self.power_requirement}, {self.priority})"
+
+
+_SORT_KEY = attrgetter("priority", "_sequence")
+
+
+class LoadScheduler:
+    """
+    Thread-safe priority queue of loads with updates and removals by ID.
+
+    The loads form an indexed binary heap: every load stores its position
+    in the heap array, so a priority change or removal only sifts that one
+    entry instead of rebuilding the queue (O(log n) rather than O(n)).
+
+    Bulk operations take the lock once for the whole batch, which is what
+    lets dispatch apply hundreds of thousands of changes per second.
+    """
+
+    def __init__(self):
+        self._heap: List[Load] = []
+        self._loads: Dict[str, Load] = {}
+        self._sequence = count()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, load_id: str) -> bool:
+        return load_id in self._loads
+
+    def empty(self) -> bool:
+        """Whether no loads are waiting."""
+        return not self._heap
+
+    # Heap primitives (caller holds the lock)
+
+    def _sift_up(self, index: int) -> None:
+        heap = self._heap
+        load = heap[index]
+        priority, sequence = load.priority, load._sequence
+        while index > 0:
+            parent_index = (index - 1) >> 1
+            parent = heap[parent_index]
+            if parent.priority < priority or (parent.priority == priority and parent._sequence < sequence):
+                break
+            heap[index] = parent
+            parent._index = index
+            index = parent_index
+        heap[index] = load
+        load._index = index
+
+    def _sift_down(self, index: int) -> None:
+        heap = self._heap
+        size = len(heap)
+        load = heap[index]
+        priority, sequence = load.priority, load._sequence
+        while True:
+            child_index = 2 * index + 1
+            if child_index >= size:
+                break
+            child = heap[child_index]
+            right_index = child_index + 1
+            if right_index < size:
+                right = heap[right_index]
+                if right.priority < child.priority or (right.priority == child.priority
+                                                       and right._sequence < child._sequence):
+                    child_index, child = right_index, right
+            if priority < child.priority or (priority == child.priority and sequence < child._sequence):
+                break
+            heap[index] = child
+            child._index = index
+            index = child_index
+        heap[index] = load
+        load._index = index
+
+    def _restore(self, index: int) -> None:
+        """Move the entry at index up or down to its place."""
+        if index > 0:
+            parent = self._heap[(index - 1) >> 1]
+            load = self._heap[index]
+            if load.priority < parent.priority or (load.priority == parent.priority
+                                                   and load._sequence < parent._sequence):
+                self._sift_up(index)
+                return
+        self._sift_down(index)
+
+    def _delete_at(self, index: int) -> Load:
+        heap = self._heap
+        load = heap[index]
+        last = heap.pop()
+        if last is not load:
+            heap[index] = last
+            last._index = index
+            self._restore(index)
+        del self._loads[load.load_id]
+        load._index = -1
+        return load
+
+    # Single-load operations
+
+    def add_load(self, load: Load) -> bool:
+        """
+        Add a load.
+
+        Args:
+            load: Load to add
+
+        Returns:
+            True if the load was added, False if a load with the same ID exists
+        """
+        with self._lock:
+            if load.load_id in self._loads:
+                return False
+            load._sequence = next(self._sequence)
+            self._loads[load.load_id] = load
+            self._heap.append(load)
+            self._sift_up(len(self._heap) - 1)
+            return True
+
+    def remove_load(self, load_id: str) -> bool:
+        """
+        Remove a load.
+
+        Args:
+            load_id: ID of the load
+
+        Returns:
+            True if the load was removed, False if it was not found
+        """
+        with self._lock:
+            load = self._loads.get(load_id)
+            if load is None:
+                return False
+            self._delete_at(load._index)
+            return True
+
+    def update_priority(self, load_id: str, priority: int) -> bool:
+        """
+        Change the priority of a load.
+
+        Args:
+            load_id: ID of the load
+            priority: New priority value
+
+        Returns:
+            True if the load was found and updated, False otherwise
+        """
+        with self._lock:
+            load = self._loads.get(load_id)
+            if load is None:
+                return False
+            load.priority = int(priority)
+            self._restore(load._index)
+            return True
+
+    def peek_top_load(self) -> Optional[Load]:
+        """Get the highest priority load without removing it (None if empty)."""
+        with self._lock:
+            return self._heap[0] if self._heap else None
+
+    def pop_top_load(self) -> Optional[Load]:
+        """Remove and return the highest priority load (None if empty)."""
+        with self._lock:
+            return self._delete_at(0) if self._heap else None
+
+    def pop_top_loads(self, k: int) -> List[Load]:
+        """
+        Remove and return up to k loads in priority order.
+
+        Args:
+            k: Maximum number of loads
+
+        Returns:
+            Loads, highest priority first
+        """
+        with self._lock:
+            return [self._delete_at(0) for _ in range(min(k, len(self._heap)))]
+
+    def get_load_by_id(self, load_id: str) -> Optional[Load]:
+        """Look up a load by ID (None if not found)."""
+        return self._loads.get(load_id)
+
+    # Bulk operations
+
+    def add_loads(self, loads: Iterable[Load]) -> List[str]:
+        """
+        Add many loads under one lock acquisition.
+
+        Args:
+            loads: Loads to add; they keep their order among equal priorities
+
+        Returns:
+            IDs of the loads that were not added because the ID already exists
+        """
+        rejected = []
+        with self._lock:
+            for load in loads:
+                if load.load_id in self._loads:
+                    rejected.append(load.load_id)
+                    continue
+                load._sequence = next(self._sequence)
+                self._loads[load.load_id] = load
+                self._heap.append(load)
+                self._sift_up(len(self._heap) - 1)
+        return rejected
+
+    def update_priorities(self, updates: Iterable[Tuple[str, int]]) -> List[str]:
+        """
+        Change the priorities of many loads under one lock acquisition.
+
+        Args:
+            updates: (load ID, new priority) pairs; later pairs win for repeated IDs
+
+        Returns:
+            IDs that were not found
+        """
+        missing = []
+        loads = self._loads
+        with self._lock:
+            for load_id, priority in updates:
+                load = loads.get(load_id)
+                if load is None:
+                    missing.append(load_id)
+                    continue
+                load.priority = int(priority)
+                self._restore(load._index)
+        return missing
+
+    def remove_loads(self, load_ids: Iterable[str]) -> List[str]:
+        """
+        Remove many loads under one lock acquisition.
+
+        Args:
+            load_ids: IDs of the loads
+
+        Returns:
+            IDs that were not found
+        """
+        missing = []
+        with self._lock:
+            for load_id in load_ids:
+                load = self._loads.get(load_id)
+                if load is None:
+                    missing.append(load_id)
+                else:
+                    self._delete_at(load._index)
+        return missing
+
+    def loads(self) -> List[Load]:
+        """All loads in priority order."""
+        with self._lock:
+            return sorted(self._heap, key=_SORT_KEY)
+
+    def stats(self) -> Dict[str, object]:
+        """
+        Get queue statistics.
+
+        Returns:
+            Number of loads, their total power and the top priority
+        """
+        with self._lock:
+            return {
+                "loads": len(self._heap),
+                "total_power": sum(load.power_requirement for load in self._heap),
+                "top_priority": self._heap[0].priority if self._heap else None
+            }
@@ -0,0 +1,425 @@
+import argparse
+import bisect
+import json
+import os
+from urllib.parse import quote
+import numpy as np
+from typing import Tuple, Dict, List, Optional, Any, Iterator
+
+# Fixed-width archive record: Unix time in seconds and reading, little-endian
+RECORD_DTYPE = np.dtype([('timestamp', '<f8'), ('value', '<f8')])
+ARCHIVE_VERSION = 1
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Replace a file so that readers never see a partial write."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class NodeArchive:
+    """
+    Append-only history of one node, split into fixed-size segment files.
+
+    Each segment is a headerless array of ``RECORD_DTYPE`` records that is
+    memory-mapped for reading. Next to it, an index file keeps the timestamp
+    of every ``index_stride``-th record; with the segments' time bounds this
+    finds any time in O(log n) while touching a single block of records.
+    """
+
+    def __init__(self, directory: str, segment_rows: int, index_stride: int,
+                 segments: Optional[List[Dict[str, Any]]] = None):
+        """
+        Initialize the node archive.
+
+        Args:
+            directory: Directory holding the node's segments
+            segment_rows: Records per segment file
+            index_stride: Records between sparse index entries
+            segments: Segment descriptors from the manifest
+        """
+        self.directory = directory
+        self.segment_rows = segment_rows
+        self.index_stride = index_stride
+        self.segments = [dict(segment) for segment in (segments or [])]
+        self._indexes: Dict[int, np.ndarray] = {}
+        self._maps: Dict[int, Tuple[int, np.memmap]] = {}
+
+    @property
+    def rows(self) -> int:
+        """Total number of records."""
+        return sum(segment['rows'] for segment in self.segments)
+
+    @property
+    def start(self) -> Optional[float]:
+        """Timestamp of the oldest record."""
+        return self.segments[0]['start'] if self.segments else None
+
+    @property
+    def end(self) -> Optional[float]:
+        """Timestamp of the newest record."""
+        return self.segments[-1]['end'] if self.segments else None
+
+    def _path(self, position: int, extension: str) -> str:
+        return os.path.join(self.directory, f"{self.segments[position]['id']:08d}.{extension}")
+
+    def _records(self, position: int) -> np.memmap:
+        """Memory-map a segment (re-mapped if it grew since the last read)."""
+        rows = self.segments[position]['rows']
+        cached = self._maps.get(position)
+        if cached is None or cached[0] != rows:
+            cached = (rows, np.memmap(self._path(position, 'seg'), dtype=RECORD_DTYPE, mode='r', shape=(rows,)))
+            self._maps[position] = cached
+        return cached[1]
+
+    def _index(self, position: int) -> np.ndarray:
+        index = self._indexes.get(position)
+        if index is None:
+            # Entries past the committed rows belong to an unflushed append
+            committed = -(-self.segments[position]['rows'] // self.index_stride)
+            index = np.fromfile(self._path(position, 'idx'), dtype='<f8')[:committed]
+            self._indexes[position] = index
+        return index
+
+    def append(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        """
+        Append records after the newest one.
+
+        Args:
+            timestamps: Unix times in seconds, non-decreasing and not older than the archive
+            values: Readings, one per timestamp
+
+        Raises:
+            ValueError: If lengths differ or the timestamps go back in time
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64).ravel()
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if len(timestamps) != len(values):
+            raise ValueError(f"{len(timestamps)} timestamps for {len(values)} values")
+        if len(timestamps) == 0:
+            return
+        if np.any(np.diff(timestamps) < 0) or (self.segments and timestamps[0] < self.segments[-1]['end']):
+            raise ValueError("Archive records must be appended in time order")
+
+        os.makedirs(self.directory, exist_ok=True)
+        offset = 0
+        while offset < len(values):
+            if not self.segments or self.segments[-1]['rows'] >= self.segment_rows:
+                next_id = self.segments[-1]['id'] + 1 if self.segments else 0
+                self.segments.append({'id': next_id, 'rows': 0, 'start': float(timestamps[offset]),
+                                      'end': float(timestamps[offset])})
+            position = len(self.segments) - 1
+            segment = self.segments[position]
+            take = min(self.segment_rows - segment['rows'], len(values) - offset)
+
+            records = np.empty(take, dtype=RECORD_DTYPE)
+            records['timestamp'] = timestamps[offset:offset + take]
+            records['value'] = values[offset:offset + take]
+            # Drop rows a previous writer appended but never flushed to the manifest
+            path = self._path(position, 'seg')
+            with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+                f.truncate(segment['rows'] * RECORD_DTYPE.itemsize)
+                f.seek(0, os.SEEK_END)
+                f.write(records.tobytes())
+
+            # Index entries for the rows at multiples of the stride
+            first_row = segment['rows']
+            rows = np.arange(-(-first_row // self.index_stride) * self.index_stride,
+                             first_row + take, self.index_stride)
+            if len(rows):
+                index = np.concatenate([self._index(position) if first_row else np.empty(0),
+                                        records['timestamp'][rows - first_row]])
+                _write_atomic(self._path(position, 'idx'), index.astype('<f8').tobytes())
+                self._indexes[position] = index
+
+            segment['rows'] += take
+            segment['end'] = float(timestamps[offset + take - 1])
+            offset += take
+
+    def locate(self, timestamp: float, side: str = 'left') -> Tuple[int, int]:
+        """
+        Find the first record at (``side='left'``) or after (``'right'``) a time.
+
+        Binary search over segment end times, then over the segment's sparse
+        index, then within one ``index_stride`` block of memory-mapped records.
+
+        Args:
+            timestamp: Unix time in seconds
+            side: "left" for the first record >= timestamp, "right" for > timestamp
+
+        Returns:
+            Tuple of (segment position, row); (len(segments), 0) if past the end
+        """
+        ends = [segment['end'] for segment in self.segments]
+        position = bisect.bisect_left(ends, timestamp) if side == 'left' else bisect.bisect_right(ends, timestamp)
+        if position == len(self.segments):
+            return position, 0
+
+        block = int(np.searchsorted(self._index(position), timestamp, side=side))
+        low = max(0, (block - 1) * self.index_stride)
+        high = min(self.segments[position]['rows'], block * self.index_stride)
+        if high <= low:
+            return position, low
+        times = self._records(position)['timestamp'][low:high]
+        return position, low + int(np.searchsorted(times, timestamp, side=side))
+
+    def read(self, start: float = -np.inf, end: float = np.inf) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Read the records in a time range.
+
+        A range inside one segment is returned as views of the memory map, so
+        only the pages actually used are read from disk.
+
+        Args:
+            start: Range start (Unix seconds, inclusive)
+            end: Range end (Unix seconds, inclusive)
+
+        Returns:
+            Tuple of (timestamps, values)
+        """
+        if not self.segments or start > end:
+            return np.empty(0), np.empty(0)
+        first, first_row = self.locate(start, 'left')
+        last, last_row = self.locate(end, 'right')
+        if last == len(self.segments):
+            last, last_row = len(self.segments) - 1, self.segments[-1]['rows']
+
+        parts = []
+        for position in range(first, last + 1):
+            low = first_row if position == first else 0
+            high = last_row if position == last else self.segments[position]['rows']
+            if high > low:
+                parts.append(self._records(position)[low:high])
+        if not parts:
+            return np.empty(0), np.empty(0)
+        records = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        return np.asarray(records['timestamp']), np.asarray(records['value'])
+
+    def describe(self) -> Dict[str, Any]:
+        """Summary of the node's history."""
+        return {'rows': self.rows, 'segments': len(self.segments), 'start': self.start, 'end': self.end}
+
+
+class VoltageArchive:
+    """
+    Directory of memory-mapped per-node voltage histories.
+
+    Layout::
+
+        manifest.json              segment size, index stride, segments per node
+        nodes/<node id>/00000000.seg   fixed-width records (RECORD_DTYPE)
+        nodes/<node id>/00000000.idx   timestamp of every index_stride-th record
+
+    There is a single writer; readers opening the archive see the segments
+    listed in the manifest at that time.
+    """
+
+    def __init__(self, path: str, segment_rows: int = 1 << 20, index_stride: int = 1024):
+        """
+        Open an archive, creating it if the directory has no manifest.
+
+        Args:
+            path: Archive directory
+            segment_rows: Records per segment file (new archives only)
+            index_stride: Records between sparse index entries (new archives only)
+
+        Raises:
+            ValueError: If the manifest has an unsupported version
+        """
+        self.path = path
+        manifest_path = os.path.join(path, 'manifest.json')
+        manifest = {'version': ARCHIVE_VERSION, 'segment_rows': segment_rows,
+                    'index_stride': index_stride, 'nodes': {}}
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            if manifest.get('version') != ARCHIVE_VERSION:
+                raise ValueError(f"Unsupported archive version: {manifest.get('version')}")
+        else:
+            os.makedirs(path, exist_ok=True)
+        self.segment_rows = manifest['segment_rows']
+        self.index_stride = manifest['index_stride']
+        self._nodes = {
+            node_id: NodeArchive(self._node_directory(node_id), self.segment_rows, self.index_stride, segments)
+            for node_id, segments in manifest['nodes'].items()
+        }
+
+    def __enter__(self) -> 'VoltageArchive':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.flush()
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._nodes
+
+    def _node_directory(self, node_id: str) -> str:
+        return os.path.join(self.path, 'nodes', quote(node_id, safe=''))
+
+    def node_ids(self) -> List[str]:
+        """Get the IDs of all archived nodes."""
+        return list(self._nodes)
+
+    def node(self, node_id: str) -> NodeArchive:
+        """
+        Get a node's history.
+
+        Raises:
+            KeyError: If the node is not archived
+        """
+        node = self._nodes.get(node_id)
+        if node is None:
+            raise KeyError(f"Node {node_id} is not archived")
+        return node
+
+    def append(self, node_id: str, timestamps: np.ndarray, values: np.ndarray) -> None:
+        """
+        Append a node's records (call ``flush`` to publish them in the manifest).
+
+        Args:
+            node_id: ID of the node
+            timestamps: Unix times in seconds, in time order
+            values: Readings, one per timestamp
+        """
+        node = self._nodes.get(node_id)
+        if node is None:
+            node = NodeArchive(self._node_directory(node_id), self.segment_rows, self.index_stride)
+            self._nodes[node_id] = node
+        node.append(timestamps, values)
+
+    def read(self, node_id: str, start: float = -np.inf, end: float = np.inf) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Read a node's records in a time range (see ``NodeArchive.read``).
+
+        Raises:
+            KeyError: If the node is not archived
+        """
+        return self.node(node_id).read(start, end)
+
+    def flush(self) -> None:
+        """Write the manifest so that new readers see every appended record."""
+        manifest = {
+            'version': ARCHIVE_VERSION,
+            'segment_rows': self.segment_rows,
+            'index_stride': self.index_stride,
+            'nodes': {node_id: node.segments for node_id, node in self._nodes.items()}
+        }
+        _write_atomic(os.path.join(self.path, 'manifest.json'), json.dumps(manifest, indent=2).encode())
+
+    def describe(self) -> Dict[str, Dict[str, Any]]:
+        """Summary of every node's history."""
+        return {node_id: node.describe() for node_id, node in self._nodes.items()}
+
+
+def _to_unix_seconds(timestamps: Any) -> np.ndarray:
+    """Parse ISO 8601 timestamps (naive ones are taken as UTC) to Unix seconds."""
+    import pandas as pd
+
+    parsed = pd.to_datetime(pd.Series(timestamps), utc=True)
+    # Independent of the datetime unit pandas picked
+    return ((parsed - pd.Timestamp(0, tz='UTC')) / pd.Timedelta(seconds=1)).to_numpy(dtype=np.float64)
+
+
+def iter_source_series(source: str, node_id: Optional[str] = None,
+                       timestamp_column: str = 'timestamp',
+                       chunk_size: int = 100_000) -> Iterator[Tuple[str, np.ndarray, np.ndarray]]:
+    """
+    Read telemetry in the repository's text layouts as per-node arrays.
+
+    CSV files follow ``sample_data/voltage_data.csv`` (a timestamp column and
+    one voltage column per node) and are read in ``chunk_size`` rows. JSON
+    files follow ``test_data/voltage_data.json`` (``node_id`` plus a
+    ``voltage_series`` of timestamp/value records), or are a list of such
+    documents.
+
+    Args:
+        source: Path to a ``.csv`` or ``.json`` file
+        node_id: Node ID for a single-column CSV or a JSON document without one
+        timestamp_column: Name of the CSV timestamp column
+        chunk_size: CSV rows per chunk
+
+    Yields:
+        Tuples of (node ID, Unix timestamps, values)
+
+    Raises:
+        ValueError: If the file format is not supported
+    """
+    extension = os.path.splitext(source)[1].lower()
+
+    if extension == '.csv':
+        import pandas as pd
+
+        for frame in pd.read_csv(source, chunksize=chunk_size):
+            timestamps = _to_unix_seconds(frame.pop(timestamp_column))
+            for column in frame.columns:
+                name = node_id if node_id is not None and len(frame.columns) == 1 else str(column)
+                yield name, timestamps, frame[column].to_numpy(dtype=np.float64)
+
+    elif extension == '.json':
+        with open(source) as f:
+            documents = json.load(f)
+        if isinstance(documents, dict):
+            documents = [documents]
+        for document in documents:
+            series = document.get('voltage_series', [])
+            name = document.get('node_id', node_id)
+            if name is None:
+                raise ValueError(f"No node_id in {source}")
+            yield (name, _to_unix_seconds([record['timestamp'] for record in series]),
+                   np.array([record['value'] for record in series], dtype=np.float64))
+
+    else:
+        raise ValueError(f"Unsupported telemetry format: {extension}")
+
+
+def convert_to_archive(sources: List[str], archive_path: str, node_id: Optional[str] = None,
+                       timestamp_column: str = 'timestamp', chunk_size: int = 100_000,
+                       segment_rows: int = 1 << 20, index_stride: int = 1024) -> VoltageArchive:
+    """
+    Bulk-convert CSV/JSON telemetry files into an archive.
+
+    Each node's records are sorted by time within a file, and files must be
+    given in time order per node.
+
+    Args:
+        sources: Paths of ``.csv`` and ``.json`` files (see ``iter_source_series``)
+        archive_path: Archive directory (created or appended to)
+        node_id: Node ID for single-column CSVs or JSON documents without one
+        timestamp_column: Name of the CSV timestamp column
+        chunk_size: CSV rows per chunk
+        segment_rows: Records per segment file (new archives only)
+        index_stride: Records between sparse index entries (new archives only)
+
+    Returns:
+        The archive, with its manifest written
+    """
+    archive = VoltageArchive(archive_path, segment_rows, index_stride)
+    for source in sources:
+        for name, timestamps, values in iter_source_series(source, node_id, timestamp_column, chunk_size):
+            order = np.argsort(timestamps, kind='stable')
+            archive.append(name, timestamps[order], values[order])
+    archive.flush()
+    return archive
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point: ``python -m ml_pipeline.archive SOURCE... ARCHIVE``."""
+    parser = argparse.ArgumentParser(description="Convert CSV/JSON voltage telemetry into a memory-mapped archive")
+    parser.add_argument('sources', nargs='+', help="CSV or JSON telemetry files")
+    parser.add_argument('archive', help="Archive directory")
+    parser.add_argument('--node-id', help="Node ID for single-column CSV files")
+    parser.add_argument('--timestamp-column', default='timestamp')
+    parser.add_argument('--segment-rows', type=int, default=1 << 20)
+    parser.add_argument('--index-stride', type=int, default=1024)
+    args = parser.parse_args(argv)
+
+    archive = convert_to_archive(args.sources, args.archive, args.node_id, args.timestamp_column,
+                                 segment_rows=args.segment_rows, index_stride=args.index_stride)
+    for name, summary in archive.describe().items():
+        print(f"{name}: {summary['rows']} records in {summary['segments']} segment(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,430 @@
+import numpy as np
+from typing import Tuple, Dict, List, Optional, Any
+
+
+def _as_2d(history: np.ndarray) -> np.ndarray:
+    """Convert a single series or a batch of series to a (n_series, n_time) float array."""
+    history = np.asarray(history, dtype=np.float64)
+    if history.ndim == 1:
+        history = history.reshape(1, -1)
+    return history
+
+
+class BaselineForecaster:
+    """
+    Base class for vectorized statistical forecasters.
+
+    Every forecaster takes a 2-D array of shape (n_series, n_time), one row per
+    node, and forecasts all rows at once. Loops, where unavoidable, run over
+    time steps or the horizon, never over series.
+    """
+
+    name = 'baseline'
+
+    def forecast(self, history: np.ndarray, horizon: int) -> np.ndarray:
+        """
+        Forecast the next values of every series.
+
+        Args:
+            history: Array of shape (n_series, n_time) or (n_time,)
+            horizon: Number of future steps to forecast
+
+        Returns:
+            Array of shape (n_series, horizon)
+        """
+        raise NotImplementedError
+
+    def min_history(self) -> int:
+        """Minimum number of observations needed to forecast."""
+        return 1
+
+    def history_length(self) -> Optional[int]:
+        """Number of trailing observations the forecast depends on (None for the whole history)."""
+        return None
+
+
+class NaiveMeanForecaster(BaselineForecaster):
+    """
+    Recursive mean of the last few observations.
+
+    This is the rule ``/ml/predict`` has always used: each forecast is the mean
+    of the previous ``window`` values, with forecasts fed back as inputs.
+    """
+
+    name = 'naive'
+
+    def __init__(self, window: int = 3):
+        """
+        Initialize the forecaster.
+
+        Args:
+            window: Number of trailing values averaged per step
+        """
+        self.window = window
+
+    def history_length(self) -> Optional[int]:
+        return self.window
+
+    def forecast(self, history: np.ndarray, horizon: int) -> np.ndarray:
+        history = _as_2d(history)
+        window = min(self.window, history.shape[1])
+        buffer = np.concatenate([history[:, -window:], np.empty((history.shape[0], horizon))], axis=1)
+        for h in range(horizon):
+            buffer[:, window + h] = buffer[:, h:window + h].mean(axis=1)
+        return buffer[:, window:]
+
+
+class EWMAForecaster(BaselineForecaster):
+    """
+    Simple exponential smoothing with a flat forecast.
+
+    The smoothed level is a fixed weighted sum of past values, so it is computed
+    for all series with a single matrix-vector product.
+    """
+
+    name = 'ewma'
+
+    def __init__(self, alpha: float = 0.3):
+        """
+        Initialize the forecaster.
+
+        Args:
+            alpha: Smoothing factor in (0, 1]; higher values track recent data closer
+
+        Raises:
+            ValueError: If alpha is outside (0, 1]
+        """
+        if not 0 < alpha <= 1:
+            raise ValueError(f"alpha must be in (0, 1]: {alpha}")
+        self.alpha = alpha
+
+    def forecast(self, history: np.ndarray, horizon: int) -> np.ndarray:
+        history = _as_2d(history)
+        n_time = history.shape[1]
+        # level_T = sum_k alpha (1 - alpha)^k x_{T-k}, with the first value seeding the rest
+        decay = (1 - self.alpha) ** np.arange(n_time - 1, -1, -1)
+        weights = self.alpha * decay
+        weights[0] = decay[0]
+        level = history @ weights
+        return np.repeat(level[:, None], horizon, axis=1)
+
+
+class SeasonalNaiveForecaster(BaselineForecaster):
+    """Repeat the last observed season (e.g. the same hour yesterday)."""
+
+    name = 'seasonal_naive'
+
+    def __init__(self, season_length: int = 24):
+        """
+        Initialize the forecaster.
+
+        Args:
+            season_length: Number of time steps per season
+        """
+        self.season_length = season_length
+
+    def min_history(self) -> int:
+        return self.season_length
+
+    def history_length(self) -> Optional[int]:
+        return self.season_length
+
+    def forecast(self, history: np.ndarray, horizon: int) -> np.ndarray:
+        history = _as_2d(history)
+        if history.shape[1] < self.season_length:
+            raise ValueError(f"Seasonal naive needs at least {self.season_length} observations")
+        last_season = history[:, -self.season_length:]
+        return last_season[:, np.arange(horizon) % self.season_length]
+
+
+class HoltWintersForecaster(BaselineForecaster):
+    """
+    Additive Holt-Winters (level, trend and seasonality) exponential smoothing.
+
+    The smoothing recursion runs once over time with every series updated
+    together, so its cost is O(n_time) vectorized steps.
+    """
+
+    name = 'holt_winters'
+
+    def __init__(self, alpha: float = 0.3, beta: float = 0.05, gamma: float = 0.1,
+                 season_length: int = 24):
+        """
+        Initialize the forecaster.
+
+        Args:
+            alpha: Level smoothing factor
+            beta: Trend smoothing factor
+            gamma: Seasonal smoothing factor
+            season_length: Number of time steps per season
+        """
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.season_length = season_length
+
+    def min_history(self) -> int:
+        return 2 * self.season_length
+
+    def forecast(self, history: np.ndarray, horizon: int) -> np.ndarray:
+        history = _as_2d(history)
+        m = self.season_length
+        if history.shape[1] < 2 * m:
+            raise ValueError(f"Holt-Winters needs at least {2 * m} observations")
+
+        # Initialize from the first two seasons
+        first, second = history[:, :m], history[:, m:2 * m]
+        level = first.mean(axis=1)
+        trend = (second.mean(axis=1) - level) / m
+        season = first - level[:, None]
+
+        for t in range(m, history.shape[1]):
+            idx = t % m
+            value = history[:, t]
+            previous_level = level
+            level = self.alpha * (value - season[:, idx]) + (1 - self.alpha) * (level + trend)
+            trend = self.beta * (level - previous_level) + (1 - self.beta) * trend
+            season[:, idx] = self.gamma * (value - level) + (1 - self.gamma) * season[:, idx]
+
+        steps = np.arange(1, horizon + 1)
+        season_idx = (history.shape[1] + steps - 1) % m
+        return level[:, None] + trend[:, None] * steps + season[:, season_idx]
+
+
+class ARForecaster(BaselineForecaster):
+    """
+    Autoregressive model fitted per series by least squares.
+
+    The lag matrices of all series are stacked and the normal equations are
+    solved as one batched linear system.
+    """
+
+    name = 'ar'
+
+    def __init__(self, order: int = 3, ridge: float = 1e-6):
+        """
+        Initialize the forecaster.
+
+        Args:
+            order: Number of lagged values (p in AR(p))
+            ridge: Small diagonal regularizer keeping the normal equations solvable
+        """
+        self.order = order
+        self.ridge = ridge
+
+    def min_history(self) -> int:
+        return 2 * self.order + 2
+
+    def fit(self, history: np.ndarray) -> np.ndarray:
+        """
+        Fit AR coefficients for every series.
+
+        Args:
+            history: Array of shape (n_series, n_time)
+
+        Returns:
+            Coefficients of shape (n_series, order + 1); the last column is the intercept
+        """
+        history = _as_2d(history)
+        p = self.order
+        lags = np.lib.stride_tricks.sliding_window_view(history, p + 1, axis=1)
+        X = np.concatenate([lags[:, :, :p], np.ones(lags.shape[:2] + (1,))], axis=2)
+        y = lags[:, :, p]
+
+        XtX = np.einsum('sti,stj->sij', X, X) + self.ridge * np.eye(p + 1)
+        Xty = np.einsum('sti,st->si', X, y)
+        return np.linalg.solve(XtX, Xty[:, :, None])[:, :, 0]
+
+    def forecast(self, history: np.ndarray, horizon: int) -> np.ndarray:
+        history = _as_2d(history)
+        coefficients = self.fit(history)
+        p = self.order
+        buffer = np.concatenate([history[:, -p:], np.empty((history.shape[0], horizon))], axis=1)
+        for h in range(horizon):
+            buffer[:, p + h] = np.einsum('si,si->s', buffer[:, h:p + h], coefficients[:, :p]) \
+                + coefficients[:, p]
+        return buffer[:, p:]
+
+
+class PredictorForecaster(BaselineForecaster):
+    """
+    Adapter exposing a trained ``VoltagePredictor`` through the forecaster interface.
+
+    The last ``sequence_length`` values of all series are predicted in one
+    batch, and predictions are fed back recursively for multi-step horizons.
+    Models trained on standardized data get each series normalized with its
+    own history; models trained on raw readings get the raw window.
+    """
+
+    name = 'lstm'
+
+    def __init__(self, predictor: Any, normalize: bool = True):
+        """
+        Initialize the adapter.
+
+        Args:
+            predictor: Trained ``VoltagePredictor`` instance
+            normalize: Whether the model expects standardized inputs
+        """
+        self.predictor = predictor
+        self.normalize = normalize
+
+    def min_history(self) -> int:
+        return self.predictor.sequence_length
+
+    def history_length(self) -> Optional[int]:
+        return None if self.normalize else self.predictor.sequence_length
+
+    def forecast(self, history: np.ndarray, horizon: int) -> np.ndarray:
+        history = _as_2d(history)
+        length = self.predictor.sequence_length
+        if self.normalize:
+            mean = history.mean(axis=1, keepdims=True)
+            std = history.std(axis=1, keepdims=True)
+            std[std == 0] = 1.0
+        else:
+            mean, std = np.zeros((history.shape[0], 1)), np.ones((history.shape[0], 1))
+
+        window = (history[:, -length:] - mean) / std
+        outputs = np.empty((history.shape[0], horizon))
+        for h in range(horizon):
+            next_values = np.asarray(self.predictor.predict(window[:, :, None])).reshape(-1)
+            outputs[:, h] = next_values
+            window = np.concatenate([window[:, 1:], next_values[:, None]], axis=1)
+        return outputs * std + mean
+
+
+def default_baselines(season_length: int = 24) -> List[BaselineForecaster]:
+    """
+    Build the standard set of cheap candidate forecasters.
+
+    Args:
+        season_length: Number of time steps per season (24 for hourly data)
+
+    Returns:
+        List of forecasters
+    """
+    return [
+        NaiveMeanForecaster(window=3),
+        EWMAForecaster(alpha=0.3),
+        SeasonalNaiveForecaster(season_length=season_length),
+        HoltWintersForecaster(season_length=season_length),
+        ARForecaster(order=3),
+    ]
+
+
+class ForecasterSelector:
+    """
+    Per-series model selection by rolling-origin backtest.
+
+    Every candidate forecasts the last ``n_folds`` blocks of ``horizon`` values
+    from the data preceding each block. The candidate with the lowest mean
+    absolute error wins for each series. Expensive candidates (listed in
+    ``expensive``) must beat the best cheap model by ``margin`` to be chosen.
+    """
+
+    def __init__(self,
+                 candidates: Optional[List[BaselineForecaster]] = None,
+                 horizon: int = 10,
+                 n_folds: int = 3,
+                 expensive: Tuple[str, ...] = ('lstm',),
+                 margin: float = 0.05):
+        """
+        Initialize the selector.
+
+        Args:
+            candidates: Forecasters to choose from (``default_baselines()`` if None)
+            horizon: Backtest forecast horizon per fold
+            n_folds: Number of backtest folds
+            expensive: Names of candidates that must clearly beat the cheap ones
+            margin: Required relative MAE improvement for expensive candidates
+        """
+        self.candidates = candidates if candidates is not None else default_baselines()
+        self.horizon = horizon
+        self.n_folds = n_folds
+        self.expensive = expensive
+        self.margin = margin
+        self.scores: Optional[np.ndarray] = None
+        self.choices: Optional[np.ndarray] = None
+
+    def backtest(self, history: np.ndarray) -> np.ndarray:
+        """
+        Score every candidate on every series.
+
+        Args:
+            history: Array of shape (n_series, n_time)
+
+        Returns:
+            Mean absolute errors of shape (n_candidates, n_series); candidates
+            without enough history score ``inf``
+        """
+        history = _as_2d(history)
+        n_time = history.shape[1]
+        scores = np.full((len(self.candidates), history.shape[0]), np.inf)
+
+        for c, candidate in enumerate(self.candidates):
+            errors = []
+            for fold in range(self.n_folds, 0, -1):
+                cut = n_time - fold * self.horizon
+                if cut < candidate.min_history():
+                    continue
+                forecast = candidate.forecast(history[:, :cut], self.horizon)
+                errors.append(np.abs(forecast - history[:, cut:cut + self.horizon]).mean(axis=1))
+            if errors:
+                scores[c] = np.mean(errors, axis=0)
+        return scores
+
+    def select(self, history: np.ndarray) -> List[str]:
+        """
+        Choose a forecaster for every series.
+
+        Args:
+            history: Array of shape (n_series, n_time)
+
+        Returns:
+            Name of the chosen forecaster per series
+        """
+        scores = self.backtest(history)
+        is_expensive = np.array([c.name in self.expensive for c in self.candidates])
+        penalized = scores.copy()
+        penalized[is_expensive] *= 1 + self.margin
+
+        if np.all(np.isinf(penalized), axis=0).any():
+            raise ValueError("Not enough history to backtest any candidate")
+
+        self.scores = scores
+        self.choices = np.argmin(penalized, axis=0)
+        return [self.candidates[i].name for i in self.choices]
+
+    def forecast(self, history: np.ndarray, horizon: int) -> Tuple[np.ndarray, List[str]]:
+        """
+        Select per series, then forecast each series with its chosen model.
+
+        Each candidate runs once on the subset of series it won.
+
+        Args:
+            history: Array of shape (n_series, n_time)
+            horizon: Number of future steps to forecast
+
+        Returns:
+            Tuple of (forecasts of shape (n_series, horizon), chosen model names)
+        """
+        history = _as_2d(history)
+        names = self.select(history)
+        forecasts = np.empty((history.shape[0], horizon))
+        for c in np.unique(self.choices):
+            rows = self.choices == c
+            forecasts[rows] = self.candidates[c].forecast(history[rows], horizon)
+        return forecasts, names
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize the last selection.
+
+        Returns:
+            Dictionary with the number of series assigned to each candidate
+        """
+        if self.choices is None:
+            return {}
+        counts = np.bincount(self.choices, minlength=len(self.candidates))
+        return {c.name: int(n) for c, n in zip(self.candidates, counts)}
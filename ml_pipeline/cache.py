@@ -0,0 +1,294 @@
+import hashlib
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from typing import Tuple, Dict, List, Optional, Any
+
+
+def hash_array(values: np.ndarray) -> str:
+    """
+    Compute a fast content hash of an array.
+
+    The dtype and shape are part of the digest so that equal bytes with a
+    different interpretation do not collide.
+
+    Args:
+        values: Array to hash
+
+    Returns:
+        Hex digest
+    """
+    values = np.ascontiguousarray(values)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f'{values.dtype.str}{values.shape}'.encode())
+    digest.update(memoryview(values).cast('B'))
+    return digest.hexdigest()
+
+
+def _estimate_size(value: Any) -> int:
+    """Approximate memory footprint of a cached result in bytes."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_estimate_size(k) + _estimate_size(v)
+                                          for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """
+    Content-addressed LRU cache for forecast and anomaly results.
+
+    Entries are keyed by a hash of the input array plus the model version and
+    parameters that influence the result, so identical queries skip
+    normalization, windowing and DBSCAN entirely. Memory is bounded by entry
+    count and approximate size; entries expire after ``ttl`` seconds. An
+    optional on-disk tier keeps results across restarts and memory evictions;
+    it is bounded by its own entry count and file size, evicting the least
+    recently used files first.
+    """
+
+    def __init__(self,
+                 max_entries: int = 1024,
+                 max_bytes: int = 64 * 1024 * 1024,
+                 ttl: Optional[float] = 300.0,
+                 disk_dir: Optional[str] = None,
+                 disk_max_entries: int = 16384,
+                 disk_max_bytes: int = 1024 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of in-memory entries
+            max_bytes: Maximum approximate in-memory size in bytes
+            ttl: Time to live in seconds (None for no expiry)
+            disk_dir: Directory for the on-disk tier (disabled if None)
+            disk_max_entries: Maximum number of files in the on-disk tier
+            disk_max_bytes: Maximum total file size of the on-disk tier in bytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.disk_max_entries = disk_max_entries
+        self.disk_max_bytes = disk_max_bytes
+
+        self._entries: 'OrderedDict[str, Tuple[Optional[float], int, Any]]' = OrderedDict()
+        self._size = 0
+        # On-disk file sizes by path, least recently used first
+        self._disk_files: 'OrderedDict[str, int]' = OrderedDict()
+        self._disk_size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._scan_disk()
+
+    @staticmethod
+    def make_key(values: np.ndarray, namespace: str, **params: Any) -> str:
+        """
+        Build a cache key for a computation.
+
+        Args:
+            values: Input array
+            namespace: Kind of computation (e.g. "predict" or "anomalies")
+            **params: Model version and parameters that affect the result
+
+        Returns:
+            Cache key
+        """
+        param_str = json.dumps(params, sort_keys=True, default=str)
+        return f'{namespace}:{hash_array(values)}:{hashlib.blake2b(param_str.encode(), digest_size=8).hexdigest()}'
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Key from ``make_key``
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, size, value = entry
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+
+        found = self._disk_get(key)
+        if found is not None:
+            expires_at, value = found
+            with self._lock:
+                self.disk_hits += 1
+            # Keep the expiry the entry was written with rather than a fresh TTL
+            if expires_at is not None:
+                expires_at = time.monotonic() + (expires_at - time.time())
+            self._put_memory(key, value, expires_at)
+            return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a result.
+
+        Args:
+            key: Key from ``make_key``
+            value: Result to cache (treated as immutable by callers)
+        """
+        self._put_memory(key, value, None if self.ttl is None else time.monotonic() + self.ttl)
+        self._disk_set(key, value)
+
+    def _put_memory(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        """Insert into the in-memory tier (expiring at a ``time.monotonic`` time) and evict LRU entries."""
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, size, value)
+            self._size += size
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        """Drop an in-memory entry (caller holds the lock)."""
+        _, size, _ = self._entries.pop(key)
+        self._size -= size
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key.replace(':', '_') + '.pkl')
+
+    def _scan_disk(self) -> None:
+        """Index the files left by an earlier run, oldest first, and trim them to the limits."""
+        files = []
+        for entry in os.scandir(self.disk_dir):
+            if entry.name.endswith('.pkl'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, entry.path, stat.st_size))
+        for _, path, size in sorted(files):
+            self._disk_files[path] = size
+            self._disk_size += size
+        self._remove_files(self._trim_disk())
+
+    def _trim_disk(self) -> List[str]:
+        """
+        Drop least recently used files from the index until it fits the limits (caller holds the lock).
+
+        Expired files need no sweep: reads delete them, and unread ones age
+        out of the index like any other file.
+
+        Returns:
+            Paths of the dropped files, to be deleted outside the lock
+        """
+        victims = []
+        while self._disk_files and (len(self._disk_files) > self.disk_max_entries or
+                                    self._disk_size > self.disk_max_bytes):
+            path, size = self._disk_files.popitem(last=False)
+            self._disk_size -= size
+            self.disk_evictions += 1
+            victims.append(path)
+        return victims
+
+    @staticmethod
+    def _remove_files(paths: List[str]) -> None:
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _disk_get(self, key: str) -> Optional[Tuple[Optional[float], Any]]:
+        """
+        Read an entry from the on-disk tier, discarding it if expired.
+
+        Returns:
+            Tuple of (wall-clock expiry or None, value), or None on a miss
+        """
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                expires_at, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if expires_at is not None and expires_at <= time.time():
+            with self._lock:
+                self._disk_size -= self._disk_files.pop(path, 0)
+            self._remove_files([path])
+            return None
+        with self._lock:
+            if path in self._disk_files:
+                self._disk_files.move_to_end(path)
+        return expires_at, value
+
+    def _disk_set(self, key: str, value: Any) -> None:
+        """Write an entry to the on-disk tier atomically and evict files beyond the limits."""
+        if not self.disk_dir:
+            return
+        expires_at = None if self.ttl is None else time.time() + self.ttl
+        path = self._disk_path(key)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((expires_at, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            size = f.tell()
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._disk_size += size - self._disk_files.pop(path, 0)
+            self._disk_files[path] = size
+            victims = self._trim_disk()
+        self._remove_files(victims)
+
+    def clear(self) -> None:
+        """Remove every in-memory entry (the on-disk tier is left untouched)."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dictionary with hit/miss counters, hit rate and current size
+        """
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'disk_entries': len(self._disk_files),
+                'disk_bytes': self._disk_size,
+                'disk_evictions': self.disk_evictions,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0
+            }
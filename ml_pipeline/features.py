@@ -0,0 +1,254 @@
+import threading
+import numpy as np
+from typing import Tuple, Dict, List, Optional, Any, Iterable
+
+from ml_pipeline.streaming import RunningStats
+
+
+class RingBuffer:
+    """
+    Fixed-capacity circular buffer of float readings.
+
+    Appends overwrite the oldest readings once the buffer is full, so memory
+    stays constant no matter how long a node has been reporting.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Initialize the buffer.
+
+        Args:
+            capacity: Maximum number of readings kept
+
+        Raises:
+            ValueError: If capacity is not positive
+        """
+        if capacity <= 0:
+            raise ValueError(f"Capacity must be positive: {capacity}")
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.float64)
+        self._head = 0  # Index of the next write
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def extend(self, values: np.ndarray) -> np.ndarray:
+        """
+        Append readings, oldest first.
+
+        Args:
+            values: Readings to append
+
+        Returns:
+            The readings that were overwritten, oldest first
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if len(values) >= self.capacity:
+            evicted = np.concatenate([self.latest(self._count), values[:-self.capacity]])
+            self._data[:] = values[-self.capacity:]
+            self._head = 0
+            self._count = self.capacity
+            return evicted
+
+        n_evicted = max(0, self._count + len(values) - self.capacity)
+        evicted = self.latest(self._count)[:n_evicted]
+
+        end = self._head + len(values)
+        if end <= self.capacity:
+            self._data[self._head:end] = values
+        else:
+            split = self.capacity - self._head
+            self._data[self._head:] = values[:split]
+            self._data[:end - self.capacity] = values[split:]
+        self._head = end % self.capacity
+        self._count = min(self.capacity, self._count + len(values))
+        return evicted
+
+    def latest(self, n: int) -> np.ndarray:
+        """
+        Get the most recent readings in chronological order.
+
+        Args:
+            n: Number of readings (capped at the number stored)
+
+        Returns:
+            Copy of the last ``n`` readings
+        """
+        n = min(n, self._count)
+        start = self._head - n
+        if start >= 0:
+            return self._data[start:self._head].copy()
+        return np.concatenate([self._data[start:], self._data[:self._head]])
+
+
+class NodeFeatures:
+    """
+    Incrementally maintained forecaster inputs for a single node.
+
+    Keeps running normalization statistics (Welford) and the most recent
+    readings in a ring buffer, all updated in O(new samples) as readings
+    arrive. Rolling aggregates are computed from the buffer on demand.
+
+    Appends and reads take a per-node lock, so readers never see a buffer
+    half-way through an update.
+    """
+
+    def __init__(self, capacity: int = 168, rolling_windows: Tuple[int, ...] = (24,)):
+        """
+        Initialize the node state.
+
+        Args:
+            capacity: Number of recent readings kept (must cover the longest window)
+            rolling_windows: Window lengths for rolling aggregates
+        """
+        self.rolling_windows = tuple(rolling_windows)
+        self.buffer = RingBuffer(max(capacity, *self.rolling_windows))
+        self.stats = RunningStats(1)
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def append(self, values: Iterable[float]) -> None:
+        """
+        Add new readings.
+
+        Non-finite readings are dropped so they cannot poison the running
+        statistics or the buffered window.
+
+        Args:
+            values: Readings in chronological order
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return
+        with self._lock:
+            self.stats.update(values)
+            self.buffer.extend(values)
+            self._total += len(values)
+
+    def latest(self, n: int) -> np.ndarray:
+        """
+        Get a consistent copy of the most recent readings.
+
+        Args:
+            n: Number of readings (capped at the number buffered)
+
+        Returns:
+            The last ``n`` readings in chronological order
+        """
+        with self._lock:
+            return self.buffer.latest(n)
+
+    @property
+    def count(self) -> int:
+        """Total number of readings seen."""
+        return self._total
+
+    @property
+    def mean(self) -> float:
+        """Running mean of every reading seen."""
+        return float(self.stats.mean[0])
+
+    @property
+    def std(self) -> float:
+        """Running standard deviation of every reading seen (1.0 if undefined)."""
+        return float(self.stats.std[0]) or 1.0
+
+    def rolling(self, window: int) -> Dict[str, float]:
+        """
+        Get rolling aggregates over the last ``window`` readings.
+
+        Args:
+            window: One of the configured rolling windows
+
+        Returns:
+            Dictionary with mean, min and max of the window
+        """
+        with self._lock:
+            return self._rolling(window)
+
+    def _rolling(self, window: int) -> Dict[str, float]:
+        if window not in self.rolling_windows:
+            raise ValueError(f"Rolling window {window} is not tracked")
+        recent = self.buffer.latest(window)
+        if len(recent) == 0:
+            return {'mean': 0.0, 'min': 0.0, 'max': 0.0}
+        return {
+            'mean': float(recent.mean()),
+            'min': float(recent.min()),
+            'max': float(recent.max())
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize the node's features.
+
+        Returns:
+            Dictionary with counts, normalization statistics and rolling aggregates
+        """
+        with self._lock:
+            return {
+                'count': self.count,
+                'buffered': len(self.buffer),
+                'mean': self.mean,
+                'std': self.std,
+                'rolling': {str(w): self._rolling(w) for w in self.rolling_windows}
+            }
+
+
+class FeatureStore:
+    """
+    Thread-safe collection of ``NodeFeatures`` keyed by node ID.
+    """
+
+    def __init__(self, capacity: int = 168, rolling_windows: Tuple[int, ...] = (24,)):
+        """
+        Initialize the store.
+
+        Args:
+            capacity: Readings kept per node
+            rolling_windows: Window lengths for rolling aggregates
+        """
+        self.capacity = capacity
+        self.rolling_windows = rolling_windows
+        self._nodes: Dict[str, NodeFeatures] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._nodes
+
+    def node_ids(self) -> List[str]:
+        """Get the IDs of all tracked nodes."""
+        return list(self._nodes)
+
+    def get(self, node_id: str) -> Optional[NodeFeatures]:
+        """
+        Get a node's features.
+
+        Args:
+            node_id: ID of the node
+
+        Returns:
+            The node's features if tracked, None otherwise
+        """
+        return self._nodes.get(node_id)
+
+    def append(self, node_id: str, values: Iterable[float]) -> NodeFeatures:
+        """
+        Add readings for a node, creating its state on first use.
+
+        Args:
+            node_id: ID of the node
+            values: Readings in chronological order
+
+        Returns:
+            The node's updated features
+        """
+        with self._lock:
+            node = self._nodes.get(node_id)
+            if node is None:
+                node = NodeFeatures(self.capacity, self.rolling_windows)
+                self._nodes[node_id] = node
+        node.append(values)
+        return node
@@ -116,6 +116,96 @@ class VoltagePredictor:
         )
         
         return self.history.history
+
+    def train_streaming(self,
+                        dataset: 'WindowDataset',
+                        epochs: int = 50,
+                        steps_per_epoch: Optional[int] = None,
+                        validation_dataset: Optional['WindowDataset'] = None,
+                        validation_steps: Optional[int] = None,
+                        num_workers: int = 2,
+                        max_prefetch: int = 8) -> Dict[str, List[float]]:
+        """
+        Train the model on windows streamed from an out-of-core dataset.
+
+        Unlike ``train``, the training windows are never materialized: batches
+        are sampled from a memory-mapped telemetry matrix by background workers
+        while the model trains.
+
+        Args:
+            dataset: Training windows (see ``ml_pipeline.streaming.WindowDataset``)
+            epochs: Number of training epochs
+            steps_per_epoch: Batches per epoch (defaults to ``len(dataset)``)
+            validation_dataset: Optional held-out windows, e.g. from ``dataset.split``
+            validation_steps: Validation batches per epoch (defaults to ``len(validation_dataset)``)
+            num_workers: Number of batch producer threads per dataset
+            max_prefetch: Maximum number of batches buffered ahead of training
+
+        Returns:
+            Training history
+        """
+        from ml_pipeline.streaming import BatchPrefetcher
+
+        train_batches = BatchPrefetcher(dataset, num_workers, max_prefetch)
+        validation_batches = None
+        if validation_dataset is not None:
+            validation_batches = BatchPrefetcher(validation_dataset, num_workers, max_prefetch)
+
+        try:
+            self.history = self.model.fit(
+                train_batches,
+                epochs=epochs,
+                steps_per_epoch=steps_per_epoch or len(dataset),
+                validation_data=validation_batches,
+                validation_steps=(validation_steps or len(validation_dataset)) if validation_dataset else None,
+                verbose=1
+            )
+        finally:
+            train_batches.close()
+            if validation_batches is not None:
+                validation_batches.close()
+
+        return self.history.history
+
+    def get_config(self) -> Dict[str, Any]:
+        """
+        Get the constructor arguments of this predictor.
+        
+        Returns:
+            Dictionary of constructor arguments
+        """
+        return {
+            "sequence_length": self.sequence_length,
+            "n_features": self.n_features,
+            "lstm_units": list(self.lstm_units),
+            "dropout_rate": self.dropout_rate,
+            "learning_rate": self.learning_rate
+        }
+    
+    def get_weights(self) -> List[np.ndarray]:
+        """
+        Get the model weights as arrays.
+        
+        Returns:
+            Weight arrays in layer order
+        """
+        return self.model.get_weights()
+    
+    @classmethod
+    def from_weights(cls, config: Dict[str, Any], weights: List[np.ndarray]) -> 'VoltagePredictor':
+        """
+        Build a predictor from a configuration and weight arrays.
+        
+        Args:
+            config: Constructor arguments (see ``get_config``)
+            weights: Weight arrays in layer order (see ``get_weights``)
+            
+        Returns:
+            VoltagePredictor instance with the given weights
+        """
+        predictor = cls(**{**config, "lstm_units": tuple(config["lstm_units"])})
+        predictor.model.set_weights(weights)
+        return predictor
     
     def predict(self, X: np.ndarray) -> np.ndarray:
         """
@@ -143,14 +233,30 @@ class VoltagePredictor:
         """
         Load a model from a file.
         
+        The configuration (window length, features, LSTM units, dropout and
+        learning rate) is read back from the saved network, so ``get_config``
+        describes the loaded model rather than the defaults.
+        
         Args:
             filepath: Path to the saved model
             
         Returns:
             VoltagePredictor instance with loaded model
         """
-        predictor = cls()
-        predictor.model = tf.keras.models.load_model(filepath)
+        model = tf.keras.models.load_model(filepath)
+        _, sequence_length, n_features = model.input_shape
+        config = {
+            "sequence_length": int(sequence_length),
+            "n_features": int(n_features),
+            "lstm_units": tuple(layer.units for layer in model.layers if isinstance(layer, LSTM))
+        }
+        dropout_rates = [layer.rate for layer in model.layers if isinstance(layer, Dropout)]
+        if dropout_rates:
+            config["dropout_rate"] = float(dropout_rates[0])
+        if model.optimizer is not None:
+            config["learning_rate"] = float(tf.keras.backend.get_value(model.optimizer.learning_rate))
+        predictor = cls(**config)
+        predictor.model = model
         return predictor
 
 
@@ -0,0 +1,413 @@
+import json
+import os
+import queue
+import threading
+import numpy as np
+from typing import Tuple, Dict, List, Optional, Iterator, Any
+
+
+class RunningStats:
+    """
+    Streaming mean and variance accumulator.
+
+    Uses Welford's algorithm with Chan's parallel merge so that normalization
+    statistics for arbitrarily large telemetry files can be computed in a single
+    pass over fixed-size chunks, one value per column (node).
+    """
+
+    def __init__(self, n_features: int = 1):
+        """
+        Initialize an empty accumulator.
+
+        Args:
+            n_features: Number of independent columns tracked (e.g. one per node)
+        """
+        self.n_features = n_features
+        self.count = np.zeros(n_features, dtype=np.int64)
+        self.mean = np.zeros(n_features, dtype=np.float64)
+        self.m2 = np.zeros(n_features, dtype=np.float64)
+
+    def update(self, batch: np.ndarray) -> None:
+        """
+        Fold a chunk of observations into the running statistics.
+
+        Args:
+            batch: Array of shape (n_samples,) or (n_samples, n_features).
+                   NaN values are ignored.
+        """
+        batch = np.asarray(batch, dtype=np.float64)
+        if batch.ndim == 1:
+            batch = batch.reshape(-1, 1)
+        if batch.shape[0] == 0:
+            return
+
+        valid = ~np.isnan(batch)
+        batch_count = valid.sum(axis=0)
+        filled = np.where(valid, batch, 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            batch_mean = np.where(batch_count > 0, filled.sum(axis=0) / batch_count, 0.0)
+        batch_m2 = (np.where(valid, batch - batch_mean, 0.0) ** 2).sum(axis=0)
+
+        self._merge(batch_count, batch_mean, batch_m2)
+
+    def merge(self, other: 'RunningStats') -> None:
+        """
+        Merge another accumulator into this one.
+
+        Args:
+            other: Statistics computed over a disjoint set of observations
+        """
+        self._merge(other.count, other.mean, other.m2)
+
+    def _merge(self, count: np.ndarray, mean: np.ndarray, m2: np.ndarray) -> None:
+        """Combine partial statistics using Chan's pairwise update."""
+        total = self.count + count
+        delta = mean - self.mean
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(total > 0, count / np.maximum(total, 1), 0.0)
+        self.mean = self.mean + delta * weight
+        self.m2 = self.m2 + m2 + delta ** 2 * self.count * weight
+        self.count = total
+
+    @property
+    def variance(self) -> np.ndarray:
+        """Population variance of each column (matches ``np.var``)."""
+        return np.where(self.count > 0, self.m2 / np.maximum(self.count, 1), 0.0)
+
+    @property
+    def std(self) -> np.ndarray:
+        """Population standard deviation of each column (matches ``np.std``)."""
+        return np.sqrt(self.variance)
+
+    def to_dict(self) -> Dict[str, List[float]]:
+        """Serialize the statistics to plain lists."""
+        return {
+            'count': self.count.tolist(),
+            'mean': self.mean.tolist(),
+            'm2': self.m2.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, List[float]]) -> 'RunningStats':
+        """Restore statistics produced by ``to_dict``."""
+        stats = cls(len(state['mean']))
+        stats.count = np.asarray(state['count'], dtype=np.int64)
+        stats.mean = np.asarray(state['mean'], dtype=np.float64)
+        stats.m2 = np.asarray(state['m2'], dtype=np.float64)
+        return stats
+
+
+def iter_telemetry_chunks(source: str,
+                          value_columns: Optional[List[str]] = None,
+                          timestamp_column: str = 'timestamp',
+                          chunk_size: int = 100_000) -> Iterator[Tuple[List[str], np.ndarray]]:
+    """
+    Read a telemetry file in fixed-size row chunks.
+
+    The layout follows ``sample_data/voltage_data.csv``: one timestamp column
+    followed by one voltage column per node. CSV and Parquet files are read
+    incrementally; ``.npy`` files are memory-mapped and, having no header,
+    name their columns by position (``'0'``, ``'1'``, ...).
+
+    Args:
+        source: Path to a ``.csv``, ``.parquet`` or ``.npy`` file
+        value_columns: Node columns to read (all non-timestamp columns if None)
+        timestamp_column: Name of the timestamp column to skip
+        chunk_size: Number of rows per chunk
+
+    Yields:
+        Tuples of (column names, float32 array of shape (rows, n_columns))
+
+    Raises:
+        ValueError: If the file format is not supported, or a ``.npy`` column does not exist
+        ImportError: If an optional reader (pandas, pyarrow) is not installed
+    """
+    extension = os.path.splitext(source)[1].lower()
+
+    if extension == '.csv':
+        import pandas as pd
+
+        usecols = None
+        if value_columns is not None:
+            usecols = list(value_columns)
+        for frame in pd.read_csv(source, chunksize=chunk_size, usecols=usecols):
+            if timestamp_column in frame.columns:
+                frame = frame.drop(columns=[timestamp_column])
+            yield list(frame.columns), frame.to_numpy(dtype=np.float32)
+
+    elif extension == '.parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Reading Parquet telemetry requires pyarrow") from e
+
+        parquet_file = pq.ParquetFile(source)
+        columns = value_columns
+        if columns is None:
+            columns = [name for name in parquet_file.schema_arrow.names
+                       if name != timestamp_column]
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            values = np.column_stack([
+                batch.column(i).to_numpy(zero_copy_only=False) for i in range(batch.num_columns)
+            ]).astype(np.float32, copy=False)
+            yield list(columns), values
+
+    elif extension == '.npy':
+        data = np.load(source, mmap_mode='r')
+        if data.ndim == 1:
+            data = data.reshape(-1, 1)
+        names = [str(i) for i in range(data.shape[1])]
+        columns = names if value_columns is None else list(value_columns)
+        unknown = [name for name in columns if name not in names]
+        if unknown:
+            raise ValueError(f"Columns {unknown} not in a .npy file with {data.shape[1]} columns")
+        indices = slice(None) if columns == names else [names.index(name) for name in columns]
+        for start in range(0, data.shape[0], chunk_size):
+            yield columns, np.asarray(data[start:start + chunk_size, indices], dtype=np.float32)
+
+    else:
+        raise ValueError(f"Unsupported telemetry format: {extension}")
+
+
+def materialize_telemetry(source: str,
+                          output_path: str,
+                          value_columns: Optional[List[str]] = None,
+                          timestamp_column: str = 'timestamp',
+                          chunk_size: int = 100_000) -> Tuple[np.memmap, RunningStats, List[str]]:
+    """
+    Convert a telemetry file into a memory-mapped float32 matrix in one pass.
+
+    Rows are appended to ``output_path`` chunk by chunk while normalization
+    statistics are accumulated, so peak memory is bounded by ``chunk_size``
+    regardless of the file size. A JSON sidecar (``output_path + '.json'``)
+    records the shape, column names and statistics so the conversion only has
+    to happen once.
+
+    Args:
+        source: Path to the telemetry file (see ``iter_telemetry_chunks``)
+        output_path: Path of the raw float32 matrix to write
+        value_columns: Node columns to keep (all non-timestamp columns if None)
+        timestamp_column: Name of the timestamp column to skip
+        chunk_size: Number of rows per chunk
+
+    Returns:
+        Tuple of (read-only memmap of shape (rows, nodes), statistics, column names)
+    """
+    stats = None
+    columns: List[str] = []
+    n_rows = 0
+
+    with open(output_path, 'wb') as f:
+        for columns, chunk in iter_telemetry_chunks(source, value_columns,
+                                                    timestamp_column, chunk_size):
+            if stats is None:
+                stats = RunningStats(chunk.shape[1])
+            stats.update(chunk)
+            f.write(np.ascontiguousarray(chunk, dtype='<f4').tobytes())
+            n_rows += chunk.shape[0]
+
+    if stats is None:
+        raise ValueError(f"No telemetry rows found in {source}")
+
+    with open(output_path + '.json', 'w') as f:
+        json.dump({'shape': [n_rows, len(columns)], 'columns': columns,
+                   'stats': stats.to_dict()}, f)
+
+    return open_telemetry(output_path)[0], stats, columns
+
+
+def open_telemetry(path: str) -> Tuple[np.memmap, RunningStats, List[str]]:
+    """
+    Open a matrix previously written by ``materialize_telemetry``.
+
+    Args:
+        path: Path of the raw float32 matrix
+
+    Returns:
+        Tuple of (read-only memmap, statistics, column names)
+    """
+    with open(path + '.json') as f:
+        meta = json.load(f)
+    data = np.memmap(path, dtype='<f4', mode='r', shape=tuple(meta['shape']))
+    return data, RunningStats.from_dict(meta['stats']), meta['columns']
+
+
+class WindowDataset:
+    """
+    Shuffled sliding-window sampler over a (time, nodes) telemetry matrix.
+
+    Each sample is a window of ``sequence_length`` consecutive readings from a
+    single node plus the reading that follows it, matching
+    ``VoltagePredictor.prepare_sequences``. Windows are drawn at random from
+    the memory-mapped matrix, so only the pages touched by a batch are read.
+    """
+
+    def __init__(self,
+                 data: np.ndarray,
+                 sequence_length: int = 24,
+                 batch_size: int = 32,
+                 mean: Optional[np.ndarray] = None,
+                 std: Optional[np.ndarray] = None,
+                 time_range: Optional[Tuple[int, int]] = None,
+                 seed: Optional[int] = None):
+        """
+        Initialize the dataset.
+
+        Args:
+            data: Array or memmap of shape (time,) or (time, nodes)
+            sequence_length: Number of time steps in each input sequence
+            batch_size: Number of windows per batch
+            mean: Per-node mean used for normalization (no centering if None)
+            std: Per-node standard deviation used for normalization (no scaling if None)
+            time_range: Half-open (start, stop) row range windows are drawn from
+            seed: Seed for the window sampler
+
+        Raises:
+            ValueError: If the time range is too short for a single window
+        """
+        if data.ndim == 1:
+            data = data.reshape(-1, 1)
+        self.data = data
+        self.sequence_length = sequence_length
+        self.batch_size = batch_size
+        self.n_nodes = data.shape[1]
+
+        self.mean = np.zeros(self.n_nodes) if mean is None else np.asarray(mean, dtype=np.float64)
+        std = np.ones(self.n_nodes) if std is None else np.asarray(std, dtype=np.float64)
+        self.std = np.where(std > 0, std, 1.0)
+
+        self.time_range = time_range or (0, data.shape[0])
+        self.n_starts = self.time_range[1] - self.time_range[0] - sequence_length
+        if self.n_starts <= 0:
+            raise ValueError(
+                f"Time range {self.time_range} is too short for sequence length {sequence_length}"
+            )
+        self._seed = seed
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        """Number of batches that cover every window once on average."""
+        return max(1, (self.n_starts * self.n_nodes) // self.batch_size)
+
+    def split(self, validation_split: float) -> Tuple['WindowDataset', 'WindowDataset']:
+        """
+        Split the dataset by time into training and validation datasets.
+
+        Args:
+            validation_split: Fraction of the time range used for validation
+
+        Returns:
+            Tuple of (training dataset, validation dataset)
+        """
+        start, stop = self.time_range
+        cut = stop - int((stop - start) * validation_split)
+        seed = None if self._seed is None else self._seed + 1
+        train = WindowDataset(self.data, self.sequence_length, self.batch_size,
+                              self.mean, self.std, (start, cut), self._seed)
+        validation = WindowDataset(self.data, self.sequence_length, self.batch_size,
+                                   self.mean, self.std, (cut - self.sequence_length, stop), seed)
+        return train, validation
+
+    def sample_batch(self, rng: Optional[np.random.Generator] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Draw one batch of random windows.
+
+        Args:
+            rng: Random generator to use (the dataset's own generator if None)
+
+        Returns:
+            Tuple of (X, y) with X shaped [batch, time steps, 1] and y shaped [batch]
+        """
+        rng = rng or self._rng
+        starts = self.time_range[0] + rng.integers(0, self.n_starts, size=self.batch_size)
+        nodes = rng.integers(0, self.n_nodes, size=self.batch_size)
+
+        # Sorting the rows keeps the gather close to sequential on the memmap
+        order = np.argsort(starts, kind='stable')
+        starts, nodes = starts[order], nodes[order]
+
+        rows = starts[:, None] + np.arange(self.sequence_length + 1)
+        windows = np.asarray(self.data[rows, nodes[:, None]], dtype=np.float64)
+        windows = (windows - self.mean[nodes, None]) / self.std[nodes, None]
+
+        X = windows[:, :-1].reshape(self.batch_size, self.sequence_length, 1).astype(np.float32)
+        y = windows[:, -1].astype(np.float32)
+        return X, y
+
+
+class BatchPrefetcher:
+    """
+    Background batch producer for a ``WindowDataset``.
+
+    Worker threads sample batches into a bounded queue so that window gathering
+    and normalization overlap with model training. NumPy releases the GIL for
+    the heavy indexing work, so a few threads are enough to keep ``fit`` fed.
+    """
+
+    def __init__(self,
+                 dataset: WindowDataset,
+                 num_workers: int = 2,
+                 max_prefetch: int = 8,
+                 seed: Optional[int] = None):
+        """
+        Initialize and start the prefetcher.
+
+        Args:
+            dataset: Dataset to sample from
+            num_workers: Number of producer threads
+            max_prefetch: Maximum number of batches buffered ahead of the consumer
+            seed: Base seed for the per-worker generators
+        """
+        self.dataset = dataset
+        self._queue: queue.Queue = queue.Queue(maxsize=max_prefetch)
+        self._stop = threading.Event()
+        seeds = np.random.SeedSequence(seed).spawn(num_workers)
+        self._workers = [
+            threading.Thread(target=self._produce, args=(np.random.default_rng(s),), daemon=True)
+            for s in seeds
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def _produce(self, rng: np.random.Generator) -> None:
+        """Worker loop: sample batches until stopped."""
+        while not self._stop.is_set():
+            try:
+                batch = self.dataset.sample_batch(rng)
+            except Exception as e:  # Surface sampling errors to the consumer
+                batch = e
+            while not self._stop.is_set():
+                try:
+                    self._queue.put(batch, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    def __iter__(self) -> 'BatchPrefetcher':
+        return self
+
+    def __next__(self) -> Tuple[np.ndarray, np.ndarray]:
+        # Poll so that a consumer waiting when close() is called stops too
+        while True:
+            try:
+                batch = self._queue.get(timeout=0.1)
+                break
+            except queue.Empty:
+                if self._stop.is_set():
+                    raise StopIteration
+        if isinstance(batch, Exception):
+            self.close()
+            raise batch
+        return batch
+
+    def close(self) -> None:
+        """Stop the worker threads; iteration ends once the buffered batches are used up."""
+        self._stop.set()
+        for worker in self._workers:
+            worker.join(timeout=1.0)
+
+    def __enter__(self) -> 'BatchPrefetcher':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,584 @@
+import bisect
+import threading
+import numpy as np
+from typing import Tuple, Dict, List, Optional, Any, Iterable
+
+# Default rollups: resolution in seconds -> number of buckets kept
+DEFAULT_ROLLUPS = {60: 1440, 3600: 720}
+
+_ONE = np.uint64(1)
+
+# Bucket id of an unused rollup slot; no real bucket can have it
+_NO_BUCKET = np.iinfo(np.int64).min
+
+
+def _bit_length(words: np.ndarray) -> np.ndarray:
+    """Number of significant bits of each uint64 (0 for zero)."""
+    # frexp is exact for integers below 2**53, so split into 32-bit halves
+    high = (words >> np.uint64(32)).astype(np.float64)
+    low = (words & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1]).astype(np.int64)
+
+
+def _trailing_zeros(words: np.ndarray) -> np.ndarray:
+    """Number of trailing zero bits of each non-zero uint64."""
+    lowest = words & (~words + _ONE)
+    # Powers of two are exact in float64
+    return np.frexp(lowest.astype(np.float64))[1].astype(np.int64) - 1
+
+
+def _pack(words: np.ndarray, width: int) -> bytes:
+    """Bit-pack the low ``width`` bits of each uint64, most significant first."""
+    if width == 0 or len(words) == 0:
+        return b""
+    shifts = np.arange(width - 1, -1, -1, dtype=np.uint64)
+    bits = ((words[:, None] >> shifts) & _ONE).astype(np.uint8)
+    return np.packbits(bits.ravel()).tobytes()
+
+
+def _unpack(data: bytes, count: int, width: int) -> np.ndarray:
+    """Inverse of ``_pack``."""
+    if width == 0 or count == 0:
+        return np.zeros(count, dtype=np.uint64)
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=count * width).reshape(count, width)
+    weights = _ONE << np.arange(width - 1, -1, -1, dtype=np.uint64)
+    return (bits.astype(np.uint64) * weights).sum(axis=1, dtype=np.uint64)
+
+
+def _pack_sparse(words: np.ndarray, shift: int = 0) -> Tuple[bytes, int, bytes]:
+    """
+    Encode words as a non-zero bitmap plus the non-zero words at a common width.
+
+    Returns:
+        Tuple of (bitmap, width, payload)
+    """
+    nonzero = words != 0
+    packed = words[nonzero] >> np.uint64(shift)
+    width = int(_bit_length(packed).max()) if len(packed) else 0
+    return np.packbits(nonzero).tobytes(), width, _pack(packed, width)
+
+
+def _unpack_sparse(bitmap: bytes, width: int, payload: bytes, count: int, shift: int = 0) -> np.ndarray:
+    """Inverse of ``_pack_sparse``."""
+    nonzero = np.unpackbits(np.frombuffer(bitmap, dtype=np.uint8), count=count).astype(bool)
+    words = np.zeros(count, dtype=np.uint64)
+    words[nonzero] = _unpack(payload, int(nonzero.sum()), width) << np.uint64(shift)
+    return words
+
+
+class CompressedChunk:
+    """
+    Immutable block of consecutive samples, compressed Gorilla-style.
+
+    Timestamps (in milliseconds) are stored as delta-of-deltas, values as
+    the XOR of each float's bits with the previous one's. Regular sampling
+    makes most delta-of-deltas zero and slowly changing voltages share sign,
+    exponent and high mantissa bits, so both streams are mostly zero bits.
+
+    Unlike Gorilla's per-sample control bits, a chunk stores a bitmap of the
+    non-zero words plus every non-zero word at one width (for values, after
+    dropping the trailing zero bits they all share). That keeps encoding and
+    decoding vectorized in NumPy at a small cost in compression ratio.
+    """
+
+    __slots__ = ("count", "start", "end", "min", "max", "sum", "_first_time", "_first_delta",
+                 "_time_bitmap", "_time_width", "_time_payload", "_first_bits", "_value_bitmap",
+                 "_value_shift", "_value_width", "_value_payload")
+
+    def __init__(self, timestamps: np.ndarray, values: np.ndarray):
+        """
+        Compress a block of samples.
+
+        Args:
+            timestamps: Non-decreasing Unix times in seconds (kept to the millisecond)
+            values: Readings, one per timestamp
+        """
+        millis = np.round(np.asarray(timestamps, dtype=np.float64) * 1000).astype(np.int64)
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        self.count = len(values)
+        self.start = float(timestamps[0])
+        self.end = float(timestamps[-1])
+        self.min = float(values.min())
+        self.max = float(values.max())
+        self.sum = float(values.sum())
+
+        deltas = np.diff(millis)
+        self._first_time = int(millis[0])
+        self._first_delta = int(deltas[0]) if len(deltas) else 0
+        dod = np.diff(deltas)
+        # Zigzag so that small negative jitter also has few significant bits
+        zigzag = ((dod << 1) ^ (dod >> 63)).view(np.uint64)
+        self._time_bitmap, self._time_width, self._time_payload = _pack_sparse(zigzag)
+
+        bits = values.view(np.uint64)
+        xors = bits[1:] ^ bits[:-1]
+        nonzero = xors[xors != 0]
+        self._first_bits = int(bits[0])
+        self._value_shift = int(_trailing_zeros(nonzero).min()) if len(nonzero) else 0
+        self._value_bitmap, self._value_width, self._value_payload = _pack_sparse(xors, self._value_shift)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by the compressed samples."""
+        return 72 + sum(len(part) for part in (self._time_bitmap, self._time_payload,
+                                                self._value_bitmap, self._value_payload))
+
+    def decode(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Decompress the chunk.
+
+        Returns:
+            Tuple of (timestamps in seconds, values)
+        """
+        zigzag = _unpack_sparse(self._time_bitmap, self._time_width, self._time_payload,
+                                max(0, self.count - 2))
+        dod = (zigzag >> _ONE).astype(np.int64) ^ -(zigzag & _ONE).astype(np.int64)
+        deltas = self._first_delta + np.concatenate([[0], np.cumsum(dod)])[:max(0, self.count - 1)]
+        millis = self._first_time + np.concatenate([[0], np.cumsum(deltas)])
+
+        xors = _unpack_sparse(self._value_bitmap, self._value_width, self._value_payload,
+                              self.count - 1, self._value_shift)
+        bits = np.bitwise_xor.accumulate(np.concatenate([[np.uint64(self._first_bits)], xors]))
+        return millis / 1000.0, bits.view(np.float64)
+
+
+class Rollup:
+    """
+    Min/max/mean aggregates of fixed-width time buckets.
+
+    Buckets live in a ring indexed by ``bucket id % capacity``: a slot is
+    reused once time has moved ``capacity`` buckets past it, so memory is
+    constant and updates and range reads are vectorized.
+    """
+
+    def __init__(self, resolution: float, capacity: int):
+        """
+        Initialize an empty rollup.
+
+        Args:
+            resolution: Bucket width in seconds
+            capacity: Number of most recent buckets kept
+        """
+        self.resolution = resolution
+        self.capacity = capacity
+        self._ids = np.full(capacity, _NO_BUCKET, dtype=np.int64)
+        self._min = np.zeros(capacity, dtype=np.float64)
+        self._max = np.zeros(capacity, dtype=np.float64)
+        self._sum = np.zeros(capacity, dtype=np.float64)
+        self._count = np.zeros(capacity, dtype=np.int64)
+
+    def update(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        """
+        Fold samples into their buckets.
+
+        Args:
+            timestamps: Non-decreasing Unix times in seconds
+            values: Readings, one per timestamp
+        """
+        if len(timestamps) == 0:
+            return
+        ids = np.floor(timestamps / self.resolution).astype(np.int64)
+        keep = ids > ids[-1] - self.capacity
+        ids, values = ids[keep], values[keep]
+
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(ids)) + 1])
+        buckets = ids[starts]
+        slots = buckets % self.capacity
+
+        stale = self._ids[slots] != buckets
+        reset = slots[stale]
+        self._ids[reset] = buckets[stale]
+        self._min[reset] = np.inf
+        self._max[reset] = -np.inf
+        self._sum[reset] = 0.0
+        self._count[reset] = 0
+
+        self._min[slots] = np.minimum(self._min[slots], np.minimum.reduceat(values, starts))
+        self._max[slots] = np.maximum(self._max[slots], np.maximum.reduceat(values, starts))
+        self._sum[slots] += np.add.reduceat(values, starts)
+        self._count[slots] += np.diff(np.concatenate([starts, [len(ids)]]))
+
+    def query(self, start: float, end: float) -> Dict[str, np.ndarray]:
+        """
+        Get the buckets overlapping a time range.
+
+        Args:
+            start: Range start (Unix seconds, inclusive, -inf for the oldest bucket)
+            end: Range end (Unix seconds, inclusive, inf for the newest bucket)
+
+        Returns:
+            Dictionary of arrays: bucket start times, min, max, mean and count
+            (all empty if nothing was stored in the range)
+        """
+        newest = int(self._ids.max())
+        if newest == _NO_BUCKET:
+            wanted = np.empty(0, dtype=np.int64)
+        else:
+            last = int(np.floor(end / self.resolution)) if np.isfinite(end) else newest
+            first = last - self.capacity + 1
+            if np.isfinite(start):
+                first = max(first, int(np.floor(start / self.resolution)))
+            wanted = np.arange(first, last + 1, dtype=np.int64)
+        slots = wanted % self.capacity
+        present = self._ids[slots] == wanted
+        slots = slots[present]
+        return {
+            "timestamps": wanted[present] * self.resolution,
+            "min": self._min[slots],
+            "max": self._max[slots],
+            "mean": self._sum[slots] / self._count[slots],
+            "count": self._count[slots]
+        }
+
+
+class NodeSeries:
+    """
+    Voltage history of one node.
+
+    New samples go to an uncompressed head block; every ``chunk_size``
+    samples the head is compressed into a chunk. The oldest chunks are
+    dropped beyond ``max_chunks``, so raw history is a ring of chunks.
+    Rollups are updated on append and outlive the raw samples.
+    """
+
+    def __init__(self, chunk_size: int = 1024, max_chunks: int = 128,
+                 rollups: Optional[Dict[float, int]] = None):
+        """
+        Initialize an empty series.
+
+        Args:
+            chunk_size: Samples per compressed chunk
+            max_chunks: Compressed chunks kept
+            rollups: Bucket count kept per rollup resolution (seconds)
+        """
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self.rollups = {resolution: Rollup(resolution, capacity)
+                        for resolution, capacity in (DEFAULT_ROLLUPS if rollups is None else rollups).items()}
+        self._chunks: List[CompressedChunk] = []
+        self._chunk_ends: List[float] = []
+        self._head_times = np.empty(chunk_size, dtype=np.float64)
+        self._head_values = np.empty(chunk_size, dtype=np.float64)
+        self._head_count = 0
+        self.last_timestamp = -np.inf
+        self.total = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of raw samples currently stored."""
+        return sum(chunk.count for chunk in self._chunks) + self._head_count
+
+    def append(self, timestamps: Iterable[float], values: Iterable[float]) -> int:
+        """
+        Add samples.
+
+        Samples older than the newest stored one and non-finite readings
+        are dropped, since the compression assumes time order. Timestamps
+        are rounded to the millisecond up front, so a sample reads back with
+        the same time before and after its head block is compressed.
+
+        Args:
+            timestamps: Unix times in seconds, non-decreasing
+            values: Readings, one per timestamp
+
+        Returns:
+            Number of samples stored
+
+        Raises:
+            ValueError: If timestamps and values differ in length
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64).ravel()
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if len(timestamps) != len(values):
+            raise ValueError(f"{len(timestamps)} timestamps for {len(values)} values")
+        timestamps = np.round(timestamps * 1000) / 1000.0
+
+        with self._lock:
+            # Keep the samples that extend the series in time order
+            running_max = np.maximum.accumulate(np.concatenate([[self.last_timestamp], timestamps]))
+            keep = (timestamps >= running_max[:-1]) & np.isfinite(values) & np.isfinite(timestamps)
+            self.dropped += int(len(values) - keep.sum())
+            timestamps, values = timestamps[keep], values[keep]
+            if len(values) == 0:
+                return 0
+
+            for rollup in self.rollups.values():
+                rollup.update(timestamps, values)
+            self.last_timestamp = float(timestamps[-1])
+            self.total += len(values)
+
+            offset = 0
+            while offset < len(values):
+                take = min(self.chunk_size - self._head_count, len(values) - offset)
+                end = self._head_count + take
+                self._head_times[self._head_count:end] = timestamps[offset:offset + take]
+                self._head_values[self._head_count:end] = values[offset:offset + take]
+                self._head_count = end
+                offset += take
+                if self._head_count == self.chunk_size:
+                    self._seal()
+            return len(values)
+
+    def _seal(self) -> None:
+        """Compress the full head block into a chunk."""
+        chunk = CompressedChunk(self._head_times, self._head_values)
+        self._chunks.append(chunk)
+        self._chunk_ends.append(chunk.end)
+        if len(self._chunks) > self.max_chunks:
+            del self._chunks[0]
+            del self._chunk_ends[0]
+        self._head_count = 0
+
+    def range(self, start: float = -np.inf, end: float = np.inf) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the raw samples in a time range, decompressing only the chunks that overlap it.
+
+        Args:
+            start: Range start (Unix seconds, inclusive)
+            end: Range end (Unix seconds, inclusive)
+
+        Returns:
+            Tuple of (timestamps, values)
+        """
+        with self._lock:
+            first = bisect.bisect_left(self._chunk_ends, start)
+            chunks = [chunk for chunk in self._chunks[first:] if chunk.start <= end]
+            head = (self._head_times[:self._head_count].copy(), self._head_values[:self._head_count].copy())
+
+        parts = [chunk.decode() for chunk in chunks] + [head]
+        timestamps = np.concatenate([part[0] for part in parts])
+        values = np.concatenate([part[1] for part in parts])
+        inside = (timestamps >= start) & (timestamps <= end)
+        return timestamps[inside], values[inside]
+
+    def latest(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the most recent samples, decompressing only the chunks they span.
+
+        Args:
+            n: Number of samples (capped at the number stored)
+
+        Returns:
+            Tuple of (timestamps, values) in time order
+        """
+        with self._lock:
+            head = (self._head_times[:self._head_count].copy(), self._head_values[:self._head_count].copy())
+            needed = n - self._head_count
+            chunks = []
+            for chunk in reversed(self._chunks):
+                if needed <= 0:
+                    break
+                chunks.append(chunk)
+                needed -= chunk.count
+
+        parts = [chunk.decode() for chunk in reversed(chunks)] + [head]
+        timestamps = np.concatenate([part[0] for part in parts])[-n:] if n > 0 else np.empty(0)
+        values = np.concatenate([part[1] for part in parts])[-n:] if n > 0 else np.empty(0)
+        return timestamps, values
+
+    def rollup(self, resolution: float, start: float, end: float) -> Dict[str, np.ndarray]:
+        """
+        Get aggregated buckets of a time range.
+
+        Args:
+            resolution: One of the configured rollup resolutions (seconds)
+            start: Range start (Unix seconds, inclusive)
+            end: Range end (Unix seconds, inclusive)
+
+        Returns:
+            Dictionary of arrays: bucket start times, min, max, mean and count
+
+        Raises:
+            ValueError: If the resolution is not configured
+        """
+        rollup = self.rollups.get(resolution)
+        if rollup is None:
+            raise ValueError(f"No rollup at {resolution}s resolution. Available: {sorted(self.rollups)}")
+        with self._lock:
+            return rollup.query(start, end)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get storage statistics.
+
+        Returns:
+            Dictionary with sample counts and compressed size
+        """
+        with self._lock:
+            compressed = sum(chunk.nbytes for chunk in self._chunks)
+            chunked = sum(chunk.count for chunk in self._chunks)
+            return {
+                "samples": chunked + self._head_count,
+                "total": self.total,
+                "dropped": self.dropped,
+                "chunks": len(self._chunks),
+                "compressed_bytes": compressed,
+                "compression_ratio": 16 * chunked / compressed if compressed else None,
+                "first_timestamp": self._chunks[0].start if self._chunks else
+                (float(self._head_times[0]) if self._head_count else None),
+                "last_timestamp": self.last_timestamp if self.total else None
+            }
+
+
+class TimeSeriesStore:
+    """
+    Thread-safe collection of ``NodeSeries`` keyed by node ID.
+
+    ``append`` matches the telemetry ingestion sink signature, and reads
+    return NumPy arrays ready for ``AnomalyDetector`` and ``VoltagePredictor``.
+    """
+
+    def __init__(self, chunk_size: int = 1024, max_chunks: int = 128,
+                 rollups: Optional[Dict[float, int]] = None):
+        """
+        Initialize the store.
+
+        Args:
+            chunk_size: Samples per compressed chunk
+            max_chunks: Compressed chunks kept per node
+            rollups: Bucket count kept per rollup resolution (seconds)
+        """
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self.rollups = dict(DEFAULT_ROLLUPS if rollups is None else rollups)
+        self._nodes: Dict[str, NodeSeries] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._nodes
+
+    def node_ids(self) -> List[str]:
+        """Get the IDs of all stored nodes."""
+        return list(self._nodes)
+
+    def get(self, node_id: str) -> Optional[NodeSeries]:
+        """
+        Get a node's series.
+
+        Args:
+            node_id: ID of the node
+
+        Returns:
+            The node's series if stored, None otherwise
+        """
+        return self._nodes.get(node_id)
+
+    def _series(self, node_id: str) -> NodeSeries:
+        series = self._nodes.get(node_id)
+        if series is None:
+            raise KeyError(f"Node {node_id} has no stored history")
+        return series
+
+    def append(self, node_id: str, timestamps: Iterable[float], values: Iterable[float]) -> int:
+        """
+        Add samples for a node, creating its series on first use.
+
+        Args:
+            node_id: ID of the node
+            timestamps: Unix times in seconds, non-decreasing
+            values: Readings, one per timestamp
+
+        Returns:
+            Number of samples stored
+        """
+        series = self._nodes.get(node_id)
+        if series is None:
+            with self._lock:
+                series = self._nodes.get(node_id)
+                if series is None:
+                    series = NodeSeries(self.chunk_size, self.max_chunks, self.rollups)
+                    self._nodes[node_id] = series
+        return series.append(timestamps, values)
+
+    def range(self, node_id: str, start: float = -np.inf, end: float = np.inf) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get a node's raw samples in a time range.
+
+        Raises:
+            KeyError: If the node is not stored
+        """
+        return self._series(node_id).range(start, end)
+
+    def rollup(self, node_id: str, resolution: float, start: float, end: float) -> Dict[str, np.ndarray]:
+        """
+        Get a node's aggregated buckets in a time range.
+
+        Raises:
+            KeyError: If the node is not stored
+            ValueError: If the resolution is not configured
+        """
+        return self._series(node_id).rollup(resolution, start, end)
+
+    def latest_values(self, node_id: str, n: int) -> np.ndarray:
+        """
+        Get a node's most recent readings, e.g. for ``AnomalyDetector.detect``.
+
+        Raises:
+            KeyError: If the node is not stored
+        """
+        return self._series(node_id).latest(n)[1]
+
+    def input_window(self, node_id: str, sequence_length: int) -> np.ndarray:
+        """
+        Build an input window for ``VoltagePredictor.predict`` from the latest readings.
+
+        Args:
+            node_id: ID of the node
+            sequence_length: Number of time steps the model expects
+
+        Returns:
+            Array shaped [1, sequence_length, 1]
+
+        Raises:
+            KeyError: If the node is not stored
+            ValueError: If fewer than ``sequence_length`` readings are stored
+        """
+        values = self.latest_values(node_id, sequence_length)
+        if len(values) < sequence_length:
+            raise ValueError(f"Not enough data points. Need {sequence_length} values, have {len(values)}.")
+        return values.reshape(1, sequence_length, 1)
+
+    def training_sequences(self, node_id: str, sequence_length: int, start: float = -np.inf,
+                           end: float = np.inf) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Build (X, y) training pairs for ``VoltagePredictor.train`` from a time range.
+
+        Equivalent to ``VoltagePredictor.prepare_sequences`` on the range's
+        readings, but built as a strided view instead of a Python loop.
+
+        Args:
+            node_id: ID of the node
+            sequence_length: Number of time steps per input sequence
+            start: Range start (Unix seconds, inclusive)
+            end: Range end (Unix seconds, inclusive)
+
+        Returns:
+            Tuple of X shaped [n, sequence_length, 1] and y shaped [n, 1]
+
+        Raises:
+            KeyError: If the node is not stored
+        """
+        _, values = self.range(node_id, start, end)
+        n = len(values) - sequence_length
+        if n <= 0:
+            return np.empty((0, sequence_length, 1)), np.empty((0, 1))
+        windows = np.lib.stride_tricks.sliding_window_view(values[:-1], sequence_length)
+        return windows.reshape(n, sequence_length, 1), values[sequence_length:].reshape(n, 1)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get storage statistics of the whole store.
+
+        Returns:
+            Dictionary with node count, samples and compressed size
+        """
+        per_node = [series.stats() for series in list(self._nodes.values())]
+        compressed = sum(s["compressed_bytes"] for s in per_node)
+        return {
+            "nodes": len(per_node),
+            "samples": sum(s["samples"] for s in per_node),
+            "dropped": sum(s["dropped"] for s in per_node),
+            "compressed_bytes": compressed,
+            "rollups": sorted(self.rollups)
+        }
@@ -0,0 +1,412 @@
+import hashlib
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+import numpy as np
+from typing import Tuple, Dict, List, Optional, Any, Callable
+
+
+# Search space mirroring the parameters hand-tuned in test_data/*_scenario.json
+DEFAULT_SEARCH_SPACE: Dict[str, List[Any]] = {
+    'lstm_units': [(32, 16), (50, 30), (64, 32), (128, 64)],
+    'dropout_rate': [0.0, 0.1, 0.2, 0.3],
+    'learning_rate': [0.0003, 0.001, 0.003],
+}
+
+
+def regression_metrics(actual: np.ndarray, predicted: np.ndarray) -> Dict[str, float]:
+    """
+    Compute the error metrics reported in the model scenario files.
+
+    Args:
+        actual: Observed values
+        predicted: Model predictions
+
+    Returns:
+        Dictionary with r_squared, mean_absolute_error and mean_squared_error
+    """
+    actual = np.asarray(actual, dtype=np.float64).ravel()
+    predicted = np.asarray(predicted, dtype=np.float64).ravel()
+    errors = actual - predicted
+    mse = float(np.mean(errors ** 2))
+    variance = float(np.var(actual))
+    return {
+        'r_squared': 1.0 - mse / variance if variance > 0 else 0.0,
+        'mean_absolute_error': float(np.mean(np.abs(errors))),
+        'mean_squared_error': mse
+    }
+
+
+def configure_worker_threads(n_threads: int) -> None:
+    """
+    Limit the number of threads a trial process may use.
+
+    Without this every worker spawns one BLAS/TensorFlow thread per core and
+    the pool oversubscribes the machine. Must run before TensorFlow is imported
+    to fully take effect, which is why it is used as the pool initializer.
+
+    Args:
+        n_threads: Threads allowed per process
+    """
+    for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                'TF_NUM_INTRAOP_THREADS', 'TF_NUM_INTEROP_THREADS'):
+        os.environ[var] = str(n_threads)
+    try:
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(n_threads)
+        tf.config.threading.set_inter_op_parallelism_threads(n_threads)
+    except (ImportError, RuntimeError):
+        # RuntimeError: TensorFlow was already initialized in this process
+        pass
+
+
+class WindowCache:
+    """
+    On-disk cache of windowed training data shared between trials.
+
+    Windows are built once per (series, sequence_length, validation_split) and
+    stored as ``.npy`` files; trial processes memory-map them, so concurrent
+    trials share the same pages instead of each rebuilding their own copy.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory for cached arrays (a temporary directory if None)
+        """
+        self.cache_dir = cache_dir or tempfile.mkdtemp(prefix='voltage_windows_')
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get(self, series: np.ndarray, sequence_length: int,
+            validation_split: float) -> Dict[str, Any]:
+        """
+        Get (building if needed) the cached windows for a series.
+
+        Args:
+            series: Raw voltage measurements
+            sequence_length: Number of time steps in each input sequence
+            validation_split: Fraction of windows held out for validation
+
+        Returns:
+            Dictionary with paths of X_train, y_train, X_val, y_val and the
+            normalization mean/std
+        """
+        series = np.ascontiguousarray(series, dtype=np.float64)
+        digest = hashlib.blake2b(series.tobytes(), digest_size=16)
+        digest.update(f'{sequence_length}:{validation_split}'.encode())
+        entry_dir = os.path.join(self.cache_dir, digest.hexdigest())
+        meta_path = os.path.join(entry_dir, 'meta.json')
+
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                return json.load(f)
+
+        # Normalize with training-period statistics only
+        n_windows = len(series) - sequence_length
+        if n_windows < 2:
+            raise ValueError(
+                f"Not enough data points. Need more than {sequence_length + 1} values."
+            )
+        split = n_windows - max(1, int(n_windows * validation_split))
+        train_values = series[:split + sequence_length]
+        mean = float(np.mean(train_values))
+        std = float(np.std(train_values)) or 1.0
+        normalized = (series - mean) / std
+
+        windows = np.lib.stride_tricks.sliding_window_view(normalized, sequence_length + 1)
+        X = windows[:, :-1, None].astype(np.float32)
+        y = windows[:, -1].astype(np.float32)
+
+        os.makedirs(entry_dir, exist_ok=True)
+        meta: Dict[str, Any] = {'mean': mean, 'std': std}
+        for name, array in (('X_train', X[:split]), ('y_train', y[:split]),
+                            ('X_val', X[split:]), ('y_val', y[split:])):
+            path = os.path.join(entry_dir, f'{name}.npy')
+            np.save(path, array)
+            meta[name] = path
+
+        # Write metadata last so a partially built entry is never reused
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump(meta, f)
+        os.replace(meta_path + '.tmp', meta_path)
+        return meta
+
+
+def _train_trial(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Train one configuration up to its rung budget (runs in a worker process).
+
+    Training resumes from the weights saved by the previous rung, and Keras
+    early stopping ends the rung once validation loss stops improving.
+
+    Args:
+        task: Trial description built by ``HyperparameterTuner``
+
+    Returns:
+        Trial result with denormalized training and validation metrics
+    """
+    from tensorflow.keras.callbacks import EarlyStopping
+    from ml_pipeline.models import VoltagePredictor
+
+    params = task['params']
+    data = task['data']
+    X_train = np.load(data['X_train'], mmap_mode='r')
+    y_train = np.load(data['y_train'], mmap_mode='r')
+    X_val = np.load(data['X_val'], mmap_mode='r')
+    y_val = np.load(data['y_val'], mmap_mode='r')
+
+    predictor = VoltagePredictor(sequence_length=params['sequence_length'],
+                                 lstm_units=tuple(params['lstm_units']),
+                                 dropout_rate=params['dropout_rate'],
+                                 learning_rate=params['learning_rate'])
+    if os.path.exists(task['weights_path']):
+        predictor.model.load_weights(task['weights_path'])
+
+    early_stopping = EarlyStopping(monitor='val_loss', patience=task['patience'],
+                                   restore_best_weights=True)
+    history = predictor.model.fit(X_train, y_train,
+                                  validation_data=(X_val, y_val),
+                                  initial_epoch=task['initial_epoch'],
+                                  epochs=task['epochs'],
+                                  batch_size=task['batch_size'],
+                                  callbacks=[early_stopping],
+                                  verbose=0)
+    predictor.model.save_weights(task['weights_path'])
+
+    mean, std = data['mean'], data['std']
+    train_pred = predictor.predict(X_train).ravel() * std + mean
+    val_pred = predictor.predict(X_val).ravel() * std + mean
+    val_actual = np.asarray(y_val) * std + mean
+    epochs_run = task['initial_epoch'] + len(history.history['loss'])
+
+    return {
+        'trial_id': task['trial_id'],
+        'params': params,
+        'epochs_trained': epochs_run,
+        'stopped_early': epochs_run < task['epochs'],
+        'training_metrics': dict(regression_metrics(np.asarray(y_train) * std + mean, train_pred),
+                                 training_samples=len(y_train)),
+        'validation_metrics': dict(regression_metrics(val_actual, val_pred),
+                                   validation_samples=len(y_val)),
+        'actual_vs_predicted': [
+            {'actual': float(a), 'predicted': float(p), 'error': float(a - p)}
+            for a, p in zip(val_actual[-24:], val_pred[-24:])
+        ]
+    }
+
+
+class HyperparameterTuner:
+    """
+    Successive-halving hyperparameter search for ``VoltagePredictor``.
+
+    All sampled configurations are trained for a small epoch budget; only the
+    best ``1 / reduction_factor`` of them continue to the next rung with a
+    larger budget, up to ``max_epochs``. Trials run in a process pool with a
+    fixed number of threads per process.
+    """
+
+    def __init__(self,
+                 series: np.ndarray,
+                 search_space: Optional[Dict[str, List[Any]]] = None,
+                 sequence_length: int = 24,
+                 validation_split: float = 0.2,
+                 min_epochs: int = 3,
+                 max_epochs: int = 50,
+                 reduction_factor: int = 3,
+                 patience: int = 5,
+                 batch_size: int = 32,
+                 max_workers: Optional[int] = None,
+                 threads_per_worker: int = 1,
+                 cache_dir: Optional[str] = None,
+                 seed: Optional[int] = None,
+                 trial_function: Callable[[Dict[str, Any]], Dict[str, Any]] = _train_trial):
+        """
+        Initialize the tuner.
+
+        Args:
+            series: Raw voltage measurements used for training and validation
+            search_space: Candidate values per parameter; may include sequence_length
+            sequence_length: Sequence length used when not part of the search space
+            validation_split: Fraction of windows held out for validation
+            min_epochs: Epoch budget of the first rung
+            max_epochs: Epoch budget of the final rung
+            reduction_factor: Fraction (1/n) of trials promoted at each rung
+            patience: Early-stopping patience in epochs
+            batch_size: Training batch size
+            max_workers: Number of trial processes (CPU count / threads if None);
+                         1 runs trials in the current process
+            threads_per_worker: Threads allowed per trial process
+            cache_dir: Directory for windowed datasets and trial weights
+            seed: Seed for configuration sampling
+            trial_function: Callable that trains one trial task
+        """
+        self.series = np.asarray(series, dtype=np.float64)
+        self.search_space = dict(search_space or DEFAULT_SEARCH_SPACE)
+        self.search_space.setdefault('sequence_length', [sequence_length])
+        self.validation_split = validation_split
+        self.min_epochs = min_epochs
+        self.max_epochs = max_epochs
+        self.reduction_factor = reduction_factor
+        self.patience = patience
+        self.batch_size = batch_size
+        self.threads_per_worker = threads_per_worker
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 1) // threads_per_worker)
+        self.cache = WindowCache(cache_dir)
+        self.rng = np.random.default_rng(seed)
+        self.trial_function = trial_function
+        self.leaderboard: List[Dict[str, Any]] = []
+
+    def sample_configurations(self, n_trials: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Sample configurations from the search space without replacement.
+
+        Args:
+            n_trials: Number of configurations (the full grid if None)
+
+        Returns:
+            List of parameter dictionaries
+        """
+        names = sorted(self.search_space)
+        grid = [dict(zip(names, values))
+                for values in itertools.product(*(self.search_space[n] for n in names))]
+        if n_trials is None or n_trials >= len(grid):
+            return grid
+        picks = self.rng.choice(len(grid), size=n_trials, replace=False)
+        return [grid[i] for i in sorted(picks)]
+
+    def rung_budgets(self) -> List[int]:
+        """
+        Epoch budgets for each successive-halving rung.
+
+        Returns:
+            Increasing list of cumulative epoch counts ending at ``max_epochs``
+        """
+        budgets = []
+        budget = self.min_epochs
+        while budget < self.max_epochs:
+            budgets.append(budget)
+            budget *= self.reduction_factor
+        budgets.append(self.max_epochs)
+        return budgets
+
+    def run(self, n_trials: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Run the search.
+
+        Args:
+            n_trials: Number of configurations to sample (the full grid if None)
+
+        Returns:
+            Leaderboard sorted by validation mean squared error
+        """
+        configs = self.sample_configurations(n_trials)
+        weights_dir = os.path.join(self.cache.cache_dir, 'weights')
+        os.makedirs(weights_dir, exist_ok=True)
+
+        # Windowed data is built once per sequence length and shared by all trials
+        datasets = {
+            length: self.cache.get(self.series, length, self.validation_split)
+            for length in sorted({c['sequence_length'] for c in configs})
+        }
+
+        results: Dict[int, Dict[str, Any]] = {}
+        active = list(range(len(configs)))
+        previous_budget = 0
+
+        executor = None
+        if self.max_workers > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=configure_worker_threads,
+                initargs=(self.threads_per_worker,)
+            )
+        try:
+            for rung, budget in enumerate(self.rung_budgets()):
+                tasks = [{
+                    'trial_id': trial_id,
+                    'rung': rung,
+                    'params': configs[trial_id],
+                    'data': datasets[configs[trial_id]['sequence_length']],
+                    'initial_epoch': previous_budget,
+                    'epochs': budget,
+                    'patience': self.patience,
+                    'batch_size': self.batch_size,
+                    'weights_path': os.path.join(weights_dir, f'trial_{trial_id}.weights.h5')
+                } for trial_id in active]
+
+                if executor is None:
+                    rung_results = [self.trial_function(task) for task in tasks]
+                else:
+                    rung_results = list(executor.map(self.trial_function, tasks))
+
+                for result in rung_results:
+                    result['rung'] = rung
+                    results[result['trial_id']] = result
+
+                # Trials that stopped early have converged and are not promoted
+                candidates = sorted(
+                    (r for r in rung_results if not r['stopped_early']),
+                    key=lambda r: r['validation_metrics']['mean_squared_error']
+                )
+                n_promoted = max(1, math.ceil(len(rung_results) / self.reduction_factor))
+                active = [r['trial_id'] for r in candidates[:n_promoted]]
+                previous_budget = budget
+                if not active:
+                    break
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        self.leaderboard = sorted(results.values(),
+                                  key=lambda r: r['validation_metrics']['mean_squared_error'])
+        return self.leaderboard
+
+    def to_scenarios(self, scenario_name: str = 'VoltagePredictor Hyperparameter Search') -> List[Dict[str, Any]]:
+        """
+        Format the leaderboard like ``test_data/*_scenario.json``.
+
+        Args:
+            scenario_name: Prefix for each entry's scenario name
+
+        Returns:
+            List of scenario dictionaries, best first
+        """
+        timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        scenarios = []
+        for rank, result in enumerate(self.leaderboard, start=1):
+            params = result['params']
+            units = tuple(params['lstm_units'])
+            scenarios.append({
+                'scenario_name': f'{scenario_name} #{rank}',
+                'timestamp': timestamp,
+                'model_type': 'lstm',
+                'architecture': (f"2 LSTM layers, {units[0]}/{units[1]} units, "
+                                 f"dropout={params['dropout_rate']}, "
+                                 f"learning_rate={params['learning_rate']}"),
+                'hyperparameters': dict(params, lstm_units=list(units)),
+                'epochs_trained': result['epochs_trained'],
+                'training_metrics': result['training_metrics'],
+                'validation_metrics': result['validation_metrics'],
+                'actual_vs_predicted': result['actual_vs_predicted']
+            })
+        return scenarios
+
+    def write_leaderboard(self, filepath: str,
+                          scenario_name: str = 'VoltagePredictor Hyperparameter Search') -> None:
+        """
+        Write the leaderboard to a JSON file.
+
+        Args:
+            filepath: Output path
+            scenario_name: Prefix for each entry's scenario name
+        """
+        with open(filepath, 'w') as f:
+            json.dump({'leaderboard': self.to_scenarios(scenario_name)}, f, indent=2)
@@ -0,0 +1,221 @@
+from typing import Dict, List, Sequence, Optional
+import numpy as np
+
+from power_grid.grid import Node, Line, PowerGrid
+
+
+class ArrayGrid:
+    """
+    Column-oriented (structure of arrays) representation of a power grid.
+
+    Node voltages and line resistances are stored in NumPy arrays and lines
+    reference nodes by integer index, so Ohm's Law and P = I²R can be applied
+    to every line at once instead of walking ``Node``/``Line`` objects. This is
+    the layout used for large grids and binary payloads.
+    """
+
+    def __init__(self,
+                 node_ids: Sequence[str],
+                 voltages: np.ndarray,
+                 line_ids: Sequence[str],
+                 from_index: np.ndarray,
+                 to_index: np.ndarray,
+                 resistances: np.ndarray):
+        """
+        Initialize the grid from columns.
+
+        Args:
+            node_ids: Node identifiers
+            voltages: Node voltages (in Volts), aligned with node_ids
+            line_ids: Line identifiers
+            from_index: Index into node_ids of each line's source node
+            to_index: Index into node_ids of each line's destination node
+            resistances: Line resistances (in Ohms), aligned with line_ids
+
+        Raises:
+            ValueError: If columns have mismatched lengths, IDs are duplicated,
+                        indices are out of range, or values violate physical constraints
+        """
+        self.node_ids = list(node_ids)
+        self.voltages = np.asarray(voltages, dtype=np.float64)
+        self.line_ids = list(line_ids)
+        self.from_index = np.asarray(from_index, dtype=np.int64)
+        self.to_index = np.asarray(to_index, dtype=np.int64)
+        self.resistances = np.asarray(resistances, dtype=np.float64)
+
+        if len(self.voltages) != len(self.node_ids):
+            raise ValueError("Node IDs and voltages must have the same length")
+        if not (len(self.line_ids) == len(self.from_index) == len(self.to_index) == len(self.resistances)):
+            raise ValueError("Line columns must have the same length")
+        if len(set(self.node_ids)) != len(self.node_ids):
+            raise ValueError("Node IDs must be unique")
+        if len(set(self.line_ids)) != len(self.line_ids):
+            raise ValueError("Line IDs must be unique")
+        if np.any(self.voltages < 0):
+            raise ValueError(f"Voltage cannot be negative: {self.voltages.min()}V")
+        if np.any(self.resistances <= 0):
+            raise ValueError(f"Resistance must be positive: {self.resistances.min()}Ω")
+        n_nodes = len(self.node_ids)
+        for index in (self.from_index, self.to_index):
+            if len(index) and (index.min() < 0 or index.max() >= n_nodes):
+                raise ValueError("Both connecting nodes must exist in the grid")
+
+        self._node_index: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def from_columns(cls,
+                     node_ids: Sequence[str],
+                     voltages: np.ndarray,
+                     line_ids: Sequence[str],
+                     from_node_ids: Sequence[str],
+                     to_node_ids: Sequence[str],
+                     resistances: np.ndarray) -> 'ArrayGrid':
+        """
+        Build a grid from columns that reference nodes by ID.
+
+        Args:
+            node_ids: Node identifiers
+            voltages: Node voltages, aligned with node_ids
+            line_ids: Line identifiers
+            from_node_ids: Source node ID of each line
+            to_node_ids: Destination node ID of each line
+            resistances: Line resistances, aligned with line_ids
+
+        Returns:
+            ArrayGrid instance
+
+        Raises:
+            ValueError: If a line references a missing node
+        """
+        position = {node_id: i for i, node_id in enumerate(node_ids)}
+        try:
+            from_index = np.fromiter((position[n] for n in from_node_ids), dtype=np.int64,
+                                     count=len(from_node_ids))
+            to_index = np.fromiter((position[n] for n in to_node_ids), dtype=np.int64,
+                                   count=len(to_node_ids))
+        except KeyError as e:
+            raise ValueError(f"Node {e.args[0]} not found")
+        grid = cls(node_ids, voltages, line_ids, from_index, to_index, resistances)
+        grid._node_index = position
+        return grid
+
+    @classmethod
+    def from_power_grid(cls, grid: PowerGrid) -> 'ArrayGrid':
+        """
+        Convert an object-based grid into columns.
+
+        Args:
+            grid: Power grid to convert
+
+        Returns:
+            ArrayGrid instance
+        """
+        node_ids = list(grid.nodes)
+        lines = list(grid.lines.values())
+        return cls.from_columns(
+            node_ids,
+            np.array([grid.nodes[n].voltage for n in node_ids], dtype=np.float64),
+            [line.line_id for line in lines],
+            [line.from_node.node_id for line in lines],
+            [line.to_node.node_id for line in lines],
+            np.array([line.resistance for line in lines], dtype=np.float64)
+        )
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Get all columns as arrays, with IDs as fixed-width strings.
+
+        Returns:
+            Arrays keyed by column name, suitable for ``from_arrays``
+        """
+        return {
+            "node_ids": np.array(self.node_ids, dtype=str),
+            "voltages": self.voltages,
+            "line_ids": np.array(self.line_ids, dtype=str),
+            "from_index": self.from_index,
+            "to_index": self.to_index,
+            "resistances": self.resistances
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> 'ArrayGrid':
+        """
+        Build a grid from the arrays of ``to_arrays``.
+
+        The numeric columns are used without copying, so a grid can be
+        built directly on shared or memory-mapped arrays.
+
+        Args:
+            arrays: Arrays keyed by column name
+
+        Returns:
+            ArrayGrid instance
+        """
+        return cls(arrays["node_ids"].tolist(), arrays["voltages"], arrays["line_ids"].tolist(),
+                   arrays["from_index"], arrays["to_index"], arrays["resistances"])
+
+    def to_power_grid(self) -> PowerGrid:
+        """
+        Convert back into an object-based grid.
+
+        Returns:
+            PowerGrid instance
+        """
+        grid = PowerGrid()
+        nodes = [Node(node_id, float(v)) for node_id, v in zip(self.node_ids, self.voltages)]
+        for node in nodes:
+            grid.add_node(node)
+        for line_id, f, t, r in zip(self.line_ids, self.from_index, self.to_index, self.resistances):
+            grid.add_line(Line(line_id, nodes[f], nodes[t], float(r)))
+        return grid
+
+    @property
+    def node_index(self) -> Dict[str, int]:
+        """Mapping from node ID to its position in the columns."""
+        if self._node_index is None:
+            self._node_index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        return self._node_index
+
+    def line_currents(self) -> np.ndarray:
+        """
+        Calculate the current of every line using Ohm's Law.
+
+        Returns:
+            Currents in Amperes, aligned with line_ids
+        """
+        return (self.voltages[self.from_index] - self.voltages[self.to_index]) / self.resistances
+
+    def calculate_all_currents(self) -> Dict[str, float]:
+        """
+        Calculate currents in all lines of the grid (batch calculation).
+
+        Returns:
+            Dictionary mapping line IDs to their respective currents
+        """
+        return dict(zip(self.line_ids, self.line_currents().tolist()))
+
+    def total_power(self, currents: Optional[np.ndarray] = None) -> float:
+        """
+        Calculate the total resistive power loss (P = I²R).
+
+        Args:
+            currents: Precomputed line currents (computed if None)
+
+        Returns:
+            Total power in Watts
+        """
+        if currents is None:
+            currents = self.line_currents()
+        return float(np.dot(currents * currents, self.resistances))
+
+    def validate_grid(self) -> List[str]:
+        """
+        Validate the grid for consistency and physical constraints.
+
+        Returns:
+            List of validation errors, empty if grid is valid
+        """
+        degree = np.bincount(self.from_index, minlength=len(self.node_ids)) \
+            + np.bincount(self.to_index, minlength=len(self.node_ids))
+        return [f"Node {self.node_ids[i]} is isolated (not connected to any line)"
+                for i in np.flatnonzero(degree == 0)]
@@ -0,0 +1,231 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Tuple, Optional
+
+from power_grid.grid import PowerGrid
+
+
+class GridSession:
+    """
+    A resident power grid with incrementally maintained results.
+
+    Line currents and resistive losses (P = I²R) are computed once when the
+    session is created. Voltage and resistance changes then only recompute the
+    lines that touch the changed elements, so the cost of an update scales with
+    the size of the change rather than the size of the grid.
+    """
+
+    def __init__(self, grid: PowerGrid):
+        """
+        Initialize the session and compute the initial results.
+
+        Args:
+            grid: Fully built power grid (owned by the session from now on)
+        """
+        self.grid = grid
+        self.version = 0
+        self.last_access = time.monotonic()
+        self._lock = threading.Lock()
+
+        # Node ID -> IDs of the lines connected to it
+        self._incident_lines: Dict[str, List[str]] = {node_id: [] for node_id in grid.nodes}
+        for line_id, line in grid.lines.items():
+            self._incident_lines[line.from_node.node_id].append(line_id)
+            self._incident_lines[line.to_node.node_id].append(line_id)
+
+        self._currents = grid.calculate_all_currents()
+        self._losses = {line_id: current ** 2 * grid.lines[line_id].resistance
+                        for line_id, current in self._currents.items()}
+        self._total_power = sum(self._losses.values())
+
+    def touch(self) -> None:
+        """Mark the session as recently used."""
+        self.last_access = time.monotonic()
+
+    def _refresh_line(self, line_id: str) -> None:
+        """Recompute the current and loss of one line."""
+        line = self.grid.lines[line_id]
+        current = line.calculate_current()
+        loss = current ** 2 * line.resistance
+        self._total_power += loss - self._losses[line_id]
+        self._currents[line_id] = current
+        self._losses[line_id] = loss
+
+    def apply_delta(self,
+                    voltages: Optional[Dict[str, float]] = None,
+                    resistances: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+        """
+        Apply voltage and resistance changes.
+
+        The whole delta is validated before anything is changed, so a rejected
+        delta leaves the session untouched.
+
+        Args:
+            voltages: New voltages keyed by node ID
+            resistances: New resistances keyed by line ID
+
+        Returns:
+            New currents of every line affected by the change
+
+        Raises:
+            KeyError: If a node or line does not exist
+            ValueError: If a value violates physical constraints
+        """
+        voltages = voltages or {}
+        resistances = resistances or {}
+
+        for node_id, voltage in voltages.items():
+            if node_id not in self.grid.nodes:
+                raise KeyError(f"Node {node_id} not found")
+            if voltage < 0:
+                raise ValueError(f"Voltage cannot be negative: {voltage}V")
+        for line_id, resistance in resistances.items():
+            if line_id not in self.grid.lines:
+                raise KeyError(f"Line {line_id} not found")
+            if resistance <= 0:
+                raise ValueError(f"Resistance must be positive: {resistance}Ω")
+
+        with self._lock:
+            affected = set(resistances)
+            for node_id, voltage in voltages.items():
+                self.grid.nodes[node_id].set_voltage(voltage)
+                affected.update(self._incident_lines[node_id])
+            for line_id, resistance in resistances.items():
+                self.grid.lines[line_id].set_resistance(resistance)
+
+            for line_id in affected:
+                self._refresh_line(line_id)
+            self.version += 1
+            return {line_id: self._currents[line_id] for line_id in affected}
+
+    def currents(self) -> Dict[str, float]:
+        """Get the current of every line."""
+        with self._lock:
+            return dict(self._currents)
+
+    def losses(self) -> Tuple[Dict[str, float], float]:
+        """
+        Get resistive losses.
+
+        Returns:
+            Tuple of (loss per line in Watts, total loss in Watts)
+        """
+        with self._lock:
+            return dict(self._losses), self._total_power
+
+    @property
+    def total_power(self) -> float:
+        """Total resistive loss of the grid in Watts."""
+        return self._total_power
+
+    def validate(self) -> List[str]:
+        """
+        Validate the resident grid.
+
+        Deltas never change the topology, so isolated nodes are found from the
+        precomputed line incidence without scanning every line.
+
+        Returns:
+            List of validation errors, empty if grid is valid
+        """
+        return [f"Node {node_id} is isolated (not connected to any line)"
+                for node_id, lines in self._incident_lines.items() if not lines]
+
+
+class GridSessionStore:
+    """
+    Bounded collection of grid sessions with idle eviction.
+
+    Sessions are addressed by an opaque handle. Sessions idle for longer than
+    ``idle_timeout`` are dropped, and when ``max_sessions`` is reached the
+    least recently used session is evicted to make room.
+    """
+
+    def __init__(self, max_sessions: int = 64, idle_timeout: float = 900.0,
+                 on_remove: Optional[Callable[[str], None]] = None):
+        """
+        Initialize the store.
+
+        Args:
+            max_sessions: Maximum number of resident sessions
+            idle_timeout: Seconds without access before a session expires
+            on_remove: Called with the handle of every deleted, expired or evicted session
+        """
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.on_remove = on_remove
+        self._sessions: 'OrderedDict[str, GridSession]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def create(self, grid: PowerGrid) -> Tuple[str, GridSession]:
+        """
+        Register a new session.
+
+        Args:
+            grid: Fully built power grid
+
+        Returns:
+            Tuple of (session handle, session)
+        """
+        session = GridSession(grid)
+        session_id = uuid.uuid4().hex
+        with self._lock:
+            self._evict_idle()
+            while len(self._sessions) >= self.max_sessions:
+                self._removed(self._sessions.popitem(last=False)[0])
+            self._sessions[session_id] = session
+        return session_id, session
+
+    def get(self, session_id: str) -> Optional[GridSession]:
+        """
+        Look up a session and mark it as used.
+
+        Args:
+            session_id: Session handle
+
+        Returns:
+            The session if it exists and has not expired, None otherwise
+        """
+        with self._lock:
+            self._evict_idle()
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.touch()
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        """
+        Remove a session.
+
+        Args:
+            session_id: Session handle
+
+        Returns:
+            True if the session existed
+        """
+        with self._lock:
+            if self._sessions.pop(session_id, None) is None:
+                return False
+            self._removed(session_id)
+            return True
+
+    def _evict_idle(self) -> None:
+        """Drop expired sessions (caller holds the lock)."""
+        cutoff = time.monotonic() - self.idle_timeout
+        # Sessions are ordered by last access, so expired ones are at the front
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.last_access > cutoff:
+                break
+            del self._sessions[session_id]
+            self._removed(session_id)
+
+    def _removed(self, session_id: str) -> None:
+        if self.on_remove is not None:
+            self.on_remove(session_id)
@@ -0,0 +1,339 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Levels of detail served by GridSnapshot.view
+LOD_LEVELS = ("full", "substation", "geographic")
+
+
+def load_visualization_data(path: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Load grid visualization data from a JSON file.
+
+    The file is shaped like ``test_data/sample_grid.json``: a "nodes" list
+    (id, voltage, optional type, lat and lng) and a "links" list (id, source,
+    target, resistance).
+
+    Args:
+        path: Path to the JSON file
+
+    Returns:
+        Tuple of (nodes, links)
+    """
+    with open(path, 'r') as f:
+        data = json.load(f)
+    return data["nodes"], data["links"]
+
+
+class GridSnapshot:
+    """
+    Immutable, precomputed view model of a grid for visualization.
+
+    Line currents, node coordinates and substation membership are computed
+    once when the snapshot is built. Views (level of detail, viewport and
+    page) are rendered from NumPy arrays and memoized, so repeated dashboard
+    requests only cost a dictionary lookup.
+    """
+
+    def __init__(self, nodes: List[Dict[str, Any]], links: List[Dict[str, Any]],
+                 version: int, max_views: int = 128):
+        """
+        Build the snapshot.
+
+        Args:
+            nodes: Node records with at least "id" and "voltage"
+            links: Link records with at least "id", "source" and "target"
+            version: Monotonic snapshot version
+            max_views: Number of rendered views to memoize
+
+        Raises:
+            ValueError: If a link references a missing node
+        """
+        self.version = version
+        self.max_views = max_views
+        self._views: 'OrderedDict[Tuple, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.nodes = [dict(node) for node in nodes]
+        self.node_position = {node["id"]: i for i, node in enumerate(self.nodes)}
+        n_nodes = len(self.nodes)
+
+        self.lat = np.array([node.get("lat", np.nan) for node in self.nodes], dtype=np.float64)
+        self.lng = np.array([node.get("lng", np.nan) for node in self.nodes], dtype=np.float64)
+        self.voltage = np.array([node.get("voltage", 0.0) for node in self.nodes], dtype=np.float64)
+        self.types = sorted({node.get("type", "node") for node in self.nodes})
+        type_code = {name: i for i, name in enumerate(self.types)}
+        self.type_index = np.array([type_code[node.get("type", "node")] for node in self.nodes],
+                                   dtype=np.int64)
+
+        try:
+            self.source = np.array([self.node_position[link["source"]] for link in links], dtype=np.int64)
+            self.target = np.array([self.node_position[link["target"]] for link in links], dtype=np.int64)
+        except KeyError as e:
+            raise ValueError(f"Node {e.args[0]} not found")
+
+        # Ohm's Law for every link with a resistance; others keep their reported current
+        resistance = np.array([link.get("resistance", np.nan) for link in links], dtype=np.float64)
+        reported = np.array([link.get("current", 0.0) for link in links], dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            computed = (self.voltage[self.source] - self.voltage[self.target]) / resistance
+        self.current = np.where(resistance > 0, computed, reported)
+        self.links = [dict(link, current=float(current)) for link, current in zip(links, self.current)]
+
+        self.substation = self._assign_substations(n_nodes)
+
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(json.dumps([self.nodes, self.links], sort_keys=True, default=str).encode())
+        self.etag = f'"{version}-{digest.hexdigest()}"'
+
+    def _assign_substations(self, n_nodes: int) -> np.ndarray:
+        """
+        Assign every node to its topologically nearest substation.
+
+        Multi-source breadth-first search from all substations; nodes that no
+        substation reaches get -1.
+
+        Returns:
+            Position of each node's substation, or -1
+        """
+        assignment = np.full(n_nodes, -1, dtype=np.int64)
+        adjacency: List[List[int]] = [[] for _ in range(n_nodes)]
+        for a, b in zip(self.source.tolist(), self.target.tolist()):
+            adjacency[a].append(b)
+            adjacency[b].append(a)
+
+        queue = deque()
+        for i, node in enumerate(self.nodes):
+            if node.get("type") == "substation":
+                assignment[i] = i
+                queue.append(i)
+        while queue:
+            current = queue.popleft()
+            for neighbor in adjacency[current]:
+                if assignment[neighbor] < 0:
+                    assignment[neighbor] = assignment[current]
+                    queue.append(neighbor)
+        return assignment
+
+    def _view_key(self, lod: str, zoom: int, bbox: Optional[Tuple[float, float, float, float]],
+                  offset: int, limit: Optional[int]) -> Tuple:
+        """Normalized view parameters (zoom only matters for geographic clusters)."""
+        if lod not in LOD_LEVELS:
+            raise ValueError(f"Unknown level of detail '{lod}', use one of {list(LOD_LEVELS)}")
+        return (lod, zoom if lod == "geographic" else None, bbox, offset, limit)
+
+    def view_etag(self,
+                  lod: str = "full",
+                  zoom: int = 8,
+                  bbox: Optional[Tuple[float, float, float, float]] = None,
+                  offset: int = 0,
+                  limit: Optional[int] = None) -> str:
+        """
+        Entity tag of a view, without rendering it.
+
+        Args:
+            lod, zoom, bbox, offset, limit: View parameters as for ``view``
+
+        Returns:
+            Quoted ETag value, unique per snapshot content and view
+        """
+        key = self._view_key(lod, zoom, bbox, offset, limit)
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=6).hexdigest()
+        return f'{self.etag[:-1]}-{digest}"'
+
+    def view(self,
+             lod: str = "full",
+             zoom: int = 8,
+             bbox: Optional[Tuple[float, float, float, float]] = None,
+             offset: int = 0,
+             limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Render (or fetch the memoized) view of the grid.
+
+        Args:
+            lod: "full" for every node, "substation" or "geographic" for clusters
+            zoom: Map zoom level for geographic clusters (cells of 360 / 2**zoom degrees)
+            bbox: Viewport as (min_lat, min_lng, max_lat, max_lng), None for everything
+            offset: Index of the first node or cluster of the page
+            limit: Page size (None for all)
+
+        Returns:
+            Dictionary with nodes, links, totals and paging information
+
+        Raises:
+            ValueError: If the level of detail is unknown
+        """
+        key = self._view_key(lod, zoom, bbox, offset, limit)
+        with self._lock:
+            if key in self._views:
+                self._views.move_to_end(key)
+                return self._views[key]
+
+        visible = np.ones(len(self.nodes), dtype=bool)
+        if bbox is not None:
+            min_lat, min_lng, max_lat, max_lng = bbox
+            # Nodes without coordinates compare False and are left out
+            visible = ((self.lat >= min_lat) & (self.lat <= max_lat)
+                       & (self.lng >= min_lng) & (self.lng <= max_lng))
+
+        if lod == "full":
+            result = self._full_view(visible, offset, limit)
+        else:
+            result = self._cluster_view(self._cluster_labels(lod, zoom), visible, offset, limit)
+        result.update({"version": self.version, "lod": lod, "offset": offset, "limit": limit})
+
+        with self._lock:
+            self._views[key] = result
+            while len(self._views) > self.max_views:
+                self._views.popitem(last=False)
+        return result
+
+    def _full_view(self, visible: np.ndarray, offset: int, limit: Optional[int]) -> Dict[str, Any]:
+        """Individual nodes, paged; a link is on the page of its source node."""
+        selected = np.flatnonzero(visible)
+        page = selected[offset:None if limit is None else offset + limit]
+        on_page = np.zeros(len(self.nodes), dtype=bool)
+        on_page[page] = True
+        link_mask = visible[self.source] & visible[self.target]
+        page_links = np.flatnonzero(link_mask & on_page[self.source])
+        return {
+            "nodes": [self.nodes[i] for i in page],
+            "links": [self.links[i] for i in page_links],
+            "total_nodes": int(len(selected)),
+            "total_links": int(link_mask.sum())
+        }
+
+    def _cluster_labels(self, lod: str, zoom: int) -> Tuple[np.ndarray, Callable[[int], str]]:
+        """Cluster label of every node and a function naming a label."""
+        if lod == "substation":
+            # Unassigned nodes share one extra label
+            labels = np.where(self.substation >= 0, self.substation, len(self.nodes))
+            return labels, lambda label: (f"cluster:{self.nodes[label]['id']}"
+                                          if label < len(self.nodes) else "cluster:unassigned")
+
+        cells = 2 ** zoom
+        size = 360.0 / cells
+        placed = ~(np.isnan(self.lat) | np.isnan(self.lng))
+        row = np.floor((np.nan_to_num(self.lat) + 90.0) / size).astype(np.int64)
+        col = np.floor((np.nan_to_num(self.lng) + 180.0) / size).astype(np.int64)
+        labels = np.where(placed, row * cells + col, -1)
+        return labels, lambda label: (f"cell:{zoom}:{label // cells}:{label % cells}"
+                                      if label >= 0 else "cell:unplaced")
+
+    def _cluster_view(self, clustering: Tuple[np.ndarray, Callable[[int], str]],
+                      visible: np.ndarray, offset: int, limit: Optional[int]) -> Dict[str, Any]:
+        """Aggregated clusters of visible nodes and the links between them."""
+        labels, name = clustering
+        members = np.flatnonzero(visible)
+        unique, inverse = np.unique(labels[members], return_inverse=True)
+        n_clusters = len(unique)
+
+        count = np.bincount(inverse, minlength=n_clusters)
+        voltage = np.bincount(inverse, weights=self.voltage[members], minlength=n_clusters) / np.maximum(count, 1)
+        lat, lng = self.lat[members], self.lng[members]
+        placed = ~(np.isnan(lat) | np.isnan(lng))
+        placed_count = np.bincount(inverse, weights=placed, minlength=n_clusters)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_lat = np.bincount(inverse, weights=np.where(placed, lat, 0.0), minlength=n_clusters) / placed_count
+            mean_lng = np.bincount(inverse, weights=np.where(placed, lng, 0.0), minlength=n_clusters) / placed_count
+        n_types = len(self.types)
+        type_counts = np.bincount(inverse * n_types + self.type_index[members],
+                                  minlength=n_clusters * n_types).reshape(n_clusters, n_types)
+
+        # Links between different visible clusters, merged per cluster pair
+        cluster_of = np.full(len(self.nodes), -1, dtype=np.int64)
+        cluster_of[members] = inverse
+        a, b = cluster_of[self.source], cluster_of[self.target]
+        crossing = np.flatnonzero((a >= 0) & (b >= 0) & (a != b))
+        low, high = np.minimum(a[crossing], b[crossing]), np.maximum(a[crossing], b[crossing])
+        pairs, pair_inverse = np.unique(low * n_clusters + high, return_inverse=True)
+        magnitude = np.abs(self.current[crossing])
+        pair_count = np.bincount(pair_inverse, minlength=len(pairs))
+        pair_current = np.bincount(pair_inverse, weights=magnitude, minlength=len(pairs))
+        pair_max = np.zeros(len(pairs))
+        np.maximum.at(pair_max, pair_inverse, magnitude)
+
+        page = np.arange(n_clusters)[offset:None if limit is None else offset + limit]
+        on_page = np.zeros(n_clusters, dtype=bool)
+        on_page[page] = True
+        cluster_ids = [name(int(label)) for label in unique]
+
+        nodes = [{
+            "id": cluster_ids[i],
+            "cluster": True,
+            "count": int(count[i]),
+            "voltage": float(voltage[i]),
+            "lat": None if placed_count[i] == 0 else float(mean_lat[i]),
+            "lng": None if placed_count[i] == 0 else float(mean_lng[i]),
+            "types": {self.types[t]: int(type_counts[i, t]) for t in np.flatnonzero(type_counts[i])}
+        } for i in page]
+        links = []
+        for j, pair in enumerate(pairs.tolist()):
+            source, target = divmod(pair, n_clusters)
+            if on_page[source]:
+                links.append({
+                    "id": f"{cluster_ids[source]}|{cluster_ids[target]}",
+                    "source": cluster_ids[source],
+                    "target": cluster_ids[target],
+                    "count": int(pair_count[j]),
+                    "current": float(pair_current[j]),
+                    "max_current": float(pair_max[j])
+                })
+        return {"nodes": nodes, "links": links,
+                "total_nodes": int(n_clusters), "total_links": int(len(pairs))}
+
+
+class VisualizationStore:
+    """
+    Holds the current grid snapshot and swaps in new versions atomically.
+
+    The first snapshot is built from ``loader`` on first use.
+    """
+
+    def __init__(self, loader: Callable[[], Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]):
+        """
+        Initialize the store.
+
+        Args:
+            loader: Function returning the initial (nodes, links)
+        """
+        self.loader = loader
+        self._snapshot: Optional[GridSnapshot] = None
+        self._version = 0
+        self._lock = threading.Lock()
+
+    @property
+    def snapshot(self) -> GridSnapshot:
+        """The current snapshot, built from the loader if none was published."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._publish(*self.loader())
+                snapshot = self._snapshot
+        return snapshot
+
+    def publish(self, nodes: List[Dict[str, Any]], links: List[Dict[str, Any]]) -> GridSnapshot:
+        """
+        Build and publish a new snapshot version.
+
+        Args:
+            nodes: Node records
+            links: Link records
+
+        Returns:
+            The new snapshot
+        """
+        with self._lock:
+            return self._publish(nodes, links)
+
+    def _publish(self, nodes: List[Dict[str, Any]], links: List[Dict[str, Any]]) -> GridSnapshot:
+        """Build a snapshot (caller holds the lock)."""
+        snapshot = GridSnapshot(nodes, links, self._version + 1)
+        self._version = snapshot.version
+        self._snapshot = snapshot
+        return snapshot
@@ -0,0 +1,72 @@
+import sys
+import os
+import unittest
+
+# Add parent directory to path to import from modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.auth import ServiceKeyStore, TokenCache
+
+
+class FakeClock:
+    """Manually advanced Unix time."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenCache(unittest.TestCase):
+    """Tests for the verified-token cache."""
+
+    def test_entries_expire_with_the_token(self):
+        """Test that cached claims are dropped at the token's exp."""
+        clock = FakeClock()
+        cache = TokenCache(clock=clock)
+        cache.set("t1", {"sub": "admin", "exp": 1060})
+        self.assertEqual(cache.get("t1")["sub"], "admin")
+        clock.now = 1060
+        self.assertIsNone(cache.get("t1"))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats(), {"size": 0, "hits": 1, "misses": 1})
+
+    def test_tokens_without_expiry_are_not_cached(self):
+        """Test that a token without exp is always re-verified."""
+        cache = TokenCache(clock=FakeClock())
+        cache.set("t1", {"sub": "admin"})
+        self.assertIsNone(cache.get("t1"))
+
+    def test_least_recently_used_is_evicted(self):
+        """Test the size bound."""
+        cache = TokenCache(max_entries=2, clock=FakeClock())
+        cache.set("a", {"exp": 2000})
+        cache.set("b", {"exp": 2000})
+        cache.get("a")
+        cache.set("c", {"exp": 2000})
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("c"))
+
+
+class TestServiceKeyStore(unittest.TestCase):
+    """Tests for service API keys."""
+
+    def test_authenticate(self):
+        """Test that only registered keys map to their service."""
+        store = ServiceKeyStore.from_env("scheduler:abc123, dashboard:xyz,broken")
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store.authenticate("abc123"), "scheduler")
+        self.assertEqual(store.authenticate("xyz"), "dashboard")
+        self.assertIsNone(store.authenticate("abc12"))
+        self.assertIsNone(store.authenticate(""))
+
+    def test_plain_keys_are_not_stored(self):
+        """Test that the store only keeps digests."""
+        store = ServiceKeyStore({"scheduler": "abc123"})
+        self.assertNotIn("abc123", repr(store.__dict__))
+
+
+if __name__ == '__main__':
+    unittest.main()
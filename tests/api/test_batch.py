@@ -0,0 +1,72 @@
+import sys
+import os
+import asyncio
+import json
+import unittest
+
+# Add parent directory to path to import from modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from fastapi import HTTPException
+
+from api.batch import batch_items, stream_batch
+
+
+async def collect(items, process, max_concurrency=4):
+    """Run a batch and decode its NDJSON lines."""
+    return [json.loads(line) async for line in stream_batch(items, process, max_concurrency)]
+
+
+class TestStreamBatch(unittest.TestCase):
+    """Tests for streamed batch processing."""
+
+    def test_results_stream_in_completion_order(self):
+        """Test that a slow item does not hold back faster ones."""
+        async def process(delay):
+            await asyncio.sleep(delay)
+            return delay
+
+        lines = asyncio.run(collect([0.05, 0.0, 0.01], process))
+        self.assertEqual([line["index"] for line in lines], [1, 2, 0])
+        self.assertEqual(lines[-1], {"index": 0, "status": "ok", "result": 0.05})
+
+    def test_errors_are_isolated(self):
+        """Test that a failing item yields an error line and the rest succeed."""
+        async def process(value):
+            if value < 0:
+                raise ValueError("negative")
+            return value * 2
+
+        lines = sorted(asyncio.run(collect([1, -1, 3], process)), key=lambda line: line["index"])
+        self.assertEqual([line["status"] for line in lines], ["ok", "error", "ok"])
+        self.assertEqual(lines[1]["error"], "negative")
+        self.assertEqual(lines[2]["result"], 6)
+
+    def test_concurrency_is_bounded(self):
+        """Test that no more than max_concurrency items run at once."""
+        running = {"now": 0, "peak": 0}
+
+        async def process(value):
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+            await asyncio.sleep(0.001)
+            running["now"] -= 1
+            return value
+
+        lines = asyncio.run(collect(list(range(20)), process, max_concurrency=3))
+        self.assertEqual(len(lines), 20)
+        self.assertEqual(running["peak"], 3)
+
+    def test_batch_items(self):
+        """Test accepted batch shapes and limits."""
+        self.assertEqual(batch_items({"items": [1, 2]}, 10), [1, 2])
+        self.assertEqual(batch_items([1], 10), [1])
+        with self.assertRaises(HTTPException) as context:
+            batch_items([1, 2, 3], 2)
+        self.assertEqual(context.exception.status_code, 413)
+        with self.assertRaises(HTTPException):
+            batch_items({"values": []}, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import sys
+import os
+import asyncio
+import json
+import unittest
+
+import numpy as np
+from fastapi import FastAPI, Form, HTTPException, WebSocket, WebSocketDisconnect
+
+# Add parent directory to path to import from modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.benchmark import PayloadFactory, compare_reports, format_report, parse_mix, run_benchmark
+
+
+def build_app():
+    """Stand-in for the API with the benchmarked routes."""
+    app = FastAPI()
+    app.state.started = False
+
+    @app.on_event("startup")
+    async def startup():
+        app.state.started = True
+
+    @app.post("/grid/currents")
+    async def currents(body: dict):
+        return {"currents": {line["line_id"]: 1.0 for line in body["lines"]}, "total_power": 0.0}
+
+    @app.post("/grid/validate")
+    async def validate(body: dict):
+        return {"valid": True, "errors": []}
+
+    @app.post("/ml/predict")
+    async def predict(body: dict):
+        return {"predictions": body["values"][-1:]}
+
+    @app.post("/ml/anomalies")
+    async def anomalies(body: dict):
+        if len(body["values"]) > 100:
+            raise HTTPException(status_code=400, detail="too long")
+        return {"anomaly_count": 0}
+
+    @app.post("/auth/login")
+    async def login(username: str = Form(...), password: str = Form(...)):
+        return {"access_token": "token", "token_type": "bearer"}
+
+    @app.websocket("/grid/updates")
+    async def updates(websocket: WebSocket):
+        if websocket.query_params.get("token") != "token":
+            await websocket.close(code=1008)
+            return
+        await websocket.accept()
+        await websocket.send_text(json.dumps({"type": "connection_established"}))
+        try:
+            while True:
+                if await websocket.receive_text() == "ping":
+                    await websocket.send_text(json.dumps({"type": "snapshot"}))
+                    await websocket.send_text(json.dumps({"type": "pong"}))
+        except WebSocketDisconnect:
+            pass
+
+    return app
+
+
+class TestPayloads(unittest.TestCase):
+    """Test cases for generated request bodies."""
+
+    def test_bodies_follow_sample_data(self):
+        """Test that grids and series are shaped like the sample data and vary per request."""
+        payloads = PayloadFactory(series_length=50, grid_copies=2)
+        rng = np.random.default_rng(0)
+        grid = payloads.grid(rng)
+        self.assertEqual(len(grid["nodes"]), 2 * len(payloads.node_ids))
+        self.assertEqual(len(grid["lines"]), 2 * len(payloads.links) + 1)
+        node_ids = {node["node_id"] for node in grid["nodes"]}
+        for line in grid["lines"]:
+            self.assertIn(line["from_node_id"], node_ids)
+            self.assertIn(line["to_node_id"], node_ids)
+
+        body = payloads.body("ml_predict", rng)
+        self.assertEqual(len(body["values"]), 50)
+        self.assertEqual(body["sequence_length"], 24)
+        self.assertNotEqual(body["values"], payloads.body("ml_anomalies", rng)["values"])
+
+    def test_parse_mix(self):
+        """Test parsing of endpoint weights."""
+        self.assertEqual(parse_mix("grid_currents=4, ml_predict"), {"grid_currents": 4.0, "ml_predict": 1.0})
+        with self.assertRaises(ValueError):
+            parse_mix("grid/currents=1")
+
+
+class TestRunBenchmark(unittest.TestCase):
+    """Test cases for the load driver and its report."""
+
+    def test_report(self):
+        """Test that all endpoints are driven and summarized, including WebSocket clients."""
+        app = build_app()
+        report = asyncio.run(run_benchmark(
+            app=app, concurrency=4, duration=0.5, warmup=0.1, ws_clients=2, ws_interval=0.01,
+            payloads=PayloadFactory(series_length=48)
+        ))
+        self.assertTrue(app.state.started)
+        self.assertEqual(set(report["endpoints"]),
+                         {"grid_currents", "grid_validate", "ml_predict", "ml_anomalies", "ws_ping"})
+        total = report["total"]
+        self.assertEqual(total["requests"], sum(stats["requests"] for name, stats in report["endpoints"].items()
+                                                if name != "ws_ping"))
+        self.assertEqual(total["errors"], 0)
+        self.assertGreater(total["throughput_rps"], 0)
+        latency = total["latency_ms"]
+        self.assertLessEqual(latency["p50"], latency["p95"])
+        self.assertLessEqual(latency["p95"], latency["p99"])
+        self.assertGreater(report["ws_messages"]["snapshot"], 0)
+        json.dumps(report)
+        self.assertIn("ws_ping", format_report(report))
+
+    def test_errors_and_comparison(self):
+        """Test that failed requests are counted and reports can be compared."""
+        report = asyncio.run(run_benchmark(
+            app=build_app(), concurrency=2, duration=0.2, warmup=0, mix={"ml_anomalies": 1, "ml_predict": 0},
+            payloads=PayloadFactory(series_length=200)
+        ))
+        self.assertEqual(list(report["endpoints"]), ["ml_anomalies"])
+        stats = report["endpoints"]["ml_anomalies"]
+        self.assertGreater(stats["requests"], 0)
+        self.assertEqual(stats["errors"], stats["requests"])
+        self.assertEqual(stats["status_codes"], {"400": stats["requests"]})
+
+        comparison = compare_reports(report, report)
+        self.assertEqual(comparison["total"]["throughput"], 1.0)
+        self.assertEqual(comparison["ml_anomalies"]["p99"], 1.0)
+
+        with self.assertRaises(ValueError):
+            asyncio.run(run_benchmark())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import sys
+import os
+import asyncio
+import json
+import unittest
+
+# Add parent directory to path to import from modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.broadcast import ClientChannel, ConnectionManager
+
+
+class FakeWebSocket:
+    """Minimal stand-in for a FastAPI WebSocket that records sent messages."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(message))
+
+
+class TestConnectionManager(unittest.TestCase):
+    """Tests for the /grid/updates fan-out pipeline."""
+
+    def run_async(self, coroutine):
+        return asyncio.run(coroutine)
+
+    def test_coalesced_delta_updates(self):
+        """Test that publishes within a tick are merged and unchanged values are skipped."""
+        async def scenario():
+            manager = ConnectionManager()
+            client = FakeWebSocket()
+            await manager.connect(client)
+            await asyncio.sleep(0.01)
+            manager.publish("S1", voltages={"N1": 230.0}, currents={"L1": 11.5})
+            manager.publish("S1", voltages={"N1": 231.0})
+            manager.flush()
+            manager.publish("S1", voltages={"N1": 231.0, "N2": 115.0})
+            manager.flush()
+            await asyncio.sleep(0.01)
+            await manager.stop()
+            return client.sent
+
+        sent = self.run_async(scenario())
+        deltas = [m for m in sent if m["type"] == "delta"]
+        self.assertEqual(deltas[0]["voltages"], {"N1": 231.0})
+        self.assertEqual(deltas[1]["voltages"], {"N2": 115.0})
+
+    def test_subscription_filter(self):
+        """Test that clients only receive the nodes and lines they subscribed to."""
+        async def scenario():
+            manager = ConnectionManager()
+            manager.set_topology("S1", node_regions={"N1": "north", "N2": "south"},
+                                          line_nodes={"L1": ("N1", "N2"), "L2": ("N2", "N3")})
+            client = FakeWebSocket()
+            channel = await manager.connect(client)
+            channel.subscribe(regions=["north"])
+            await asyncio.sleep(0.01)
+            manager.publish("S1", voltages={"N1": 230.0, "N2": 115.0}, currents={"L1": 1.0, "L2": 2.0})
+            manager.flush()
+            await asyncio.sleep(0.01)
+            await manager.stop()
+            return client.sent
+
+        delta = [m for m in self.run_async(scenario()) if m["type"] == "delta"][0]
+        self.assertEqual(delta["voltages"], {"N1": 230.0})
+        self.assertEqual(delta["currents"], {"L1": 1.0})
+
+    def test_slow_client_does_not_block_others(self):
+        """Test that a slow client's full queue is flushed and followed by a resync snapshot."""
+        async def scenario():
+            manager = ConnectionManager(max_queue=2)
+            fast, slow = FakeWebSocket(), FakeWebSocket(delay=0.05)
+            await manager.connect(fast)
+            await manager.connect(slow)
+            await asyncio.sleep(0.01)
+            for i in range(10):
+                manager.publish("S1", voltages={"N1": 230.0 + i})
+                manager.flush()
+                await asyncio.sleep(0.001)
+            await asyncio.sleep(0.3)
+            stats = manager.stats()
+            await manager.stop()
+            return fast.sent, slow.sent, stats
+
+        fast, slow, stats = self.run_async(scenario())
+        self.assertEqual(len([m for m in fast if m["type"] == "delta"]), 10)
+        self.assertGreater(stats["dropped"], 0)
+        self.assertEqual(slow[-1]["type"], "snapshot")
+        self.assertEqual(slow[-1]["voltages"], {"N1": 239.0})
+
+    def test_overflow_counts_every_discarded_message(self):
+        """Test that a full queue is flushed and every discarded message is counted."""
+        async def scenario():
+            channel = ClientChannel(FakeWebSocket(), max_queue=2)
+            channel.needs_snapshot = False
+            for message in ("a", "b", "c"):
+                channel.enqueue(message)
+            return channel
+
+        channel = self.run_async(scenario())
+        self.assertEqual(list(channel.queue), ["c"])
+        self.assertEqual(channel.dropped, 2)
+        self.assertTrue(channel.needs_snapshot)
+
+    def test_sessions_are_kept_apart(self):
+        """Test that each session has its own state and clients can follow one session."""
+        async def scenario():
+            manager = ConnectionManager()
+            everything, one = FakeWebSocket(), FakeWebSocket()
+            await manager.connect(everything)
+            channel = await manager.connect(one)
+            await asyncio.sleep(0.01)
+            manager.publish("S1", voltages={"N1": 230.0})
+            manager.publish("S2", voltages={"N1": 115.0})
+            manager.flush()
+            channel.subscribe(session="S2")
+            await asyncio.sleep(0.01)
+            manager.publish("S1", voltages={"N1": 231.0})
+            manager.flush()
+            manager.remove_session("S2")
+            await asyncio.sleep(0.01)
+            await manager.stop()
+            return everything.sent, one.sent
+
+        everything, one = self.run_async(scenario())
+        deltas = [(m["session"], m["voltages"]) for m in everything if m["type"] == "delta"]
+        self.assertEqual(deltas, [("S1", {"N1": 230.0}), ("S2", {"N1": 115.0}), ("S1", {"N1": 231.0})])
+        subscribed = [i for i, m in enumerate(one) if m["type"] == "snapshot"][-1]
+        self.assertEqual((one[subscribed]["session"], one[subscribed]["voltages"]), ("S2", {"N1": 115.0}))
+        self.assertEqual(one[subscribed + 1:], [{"type": "session_closed", "session": "S2"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import sys
+import os
+import io
+import unittest
+from types import SimpleNamespace
+import numpy as np
+
+# Add parent directory to path to import from modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api import codecs
+
+
+def fake_request(accept=None):
+    """Stand-in for a Starlette request carrying only an Accept header."""
+    return SimpleNamespace(headers={"accept": accept} if accept else {})
+
+
+class TestCodecs(unittest.TestCase):
+    """Tests for binary request decoding and response negotiation."""
+
+    def test_decode_raw_floats(self):
+        """Test that raw little-endian floats are wrapped without copying."""
+        body = np.array([1.5, 2.5], dtype="<f4").tobytes()
+        values = codecs.decode_array(body, codecs.OCTET, "<f4")
+        np.testing.assert_array_equal(values, [1.5, 2.5])
+        self.assertFalse(values.flags.owndata)
+        with self.assertRaises(ValueError):
+            codecs.decode_array(body[:-1], codecs.OCTET, "<f4")
+        with self.assertRaises(ValueError):
+            codecs.decode_array(body, codecs.OCTET, "<i8")
+
+    def test_decode_npy(self):
+        """Test .npy decoding, including Fortran-ordered arrays."""
+        buffer = io.BytesIO()
+        np.save(buffer, np.asfortranarray(np.arange(6.0).reshape(2, 3)))
+        values = codecs.decode_array(buffer.getvalue(), codecs.NPY)
+        np.testing.assert_array_equal(values, np.arange(6.0))
+
+        buffer = io.BytesIO()
+        np.save(buffer, np.arange(3))
+        with self.assertRaises(ValueError):
+            codecs.decode_array(buffer.getvalue(), codecs.NPY)
+
+    def test_column(self):
+        """Test that columns may be lists or raw bytes."""
+        np.testing.assert_array_equal(codecs.column([1, 2]), [1.0, 2.0])
+        raw = np.array([3, 4], dtype="<i8").tobytes()
+        np.testing.assert_array_equal(codecs.column(raw, "<i8"), [3, 4])
+
+    def test_priorities(self):
+        """Test that priority updates may be a mapping or columns."""
+        self.assertEqual(codecs.priorities_from_document({"priorities": {"A": 2, "B": -1}}),
+                         [("A", 2), ("B", -1)])
+        raw = np.array([5, 6], dtype="<i8").tobytes()
+        self.assertEqual(codecs.priorities_from_document({"load_ids": ["A", "B"], "priorities": raw}),
+                         [("A", 5), ("B", 6)])
+        for document in ({"load_ids": ["A"]}, {"priorities": [1]}, {"load_ids": ["A"], "priorities": [1, 2]},
+                         {"load_ids": [1], "priorities": [1]}, {"load_ids": ["A"], "priorities": ["x"]}):
+            with self.assertRaises(ValueError):
+                codecs.priorities_from_document(document)
+
+    def test_accept_negotiation(self):
+        """Test Accept header parsing with quality values."""
+        self.assertEqual(codecs._accepted("application/json;q=0.5, application/x-npy"),
+                         [codecs.NPY, codecs.JSON])
+        response = codecs.encode_response(fake_request(codecs.OCTET), {"predictions": [1.0, 2.0]},
+                                          array_key="predictions")
+        np.testing.assert_array_equal(np.frombuffer(response.body, "<f8"), [1.0, 2.0])
+        # Binary arrays are only offered for documents with a main array
+        response = codecs.encode_response(fake_request(codecs.OCTET), {"valid": True})
+        self.assertEqual(response.media_type, codecs.JSON)
+
+    def test_json_handles_numpy(self):
+        """Test that NumPy values serialize without conversion."""
+        body = codecs.dumps_json({"a": np.arange(2.0), "b": np.float32(1.5)})
+        self.assertEqual(body.replace(b" ", b""), b'{"a":[0.0,1.0],"b":1.5}')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import sys
+import os
+import asyncio
+import time
+import unittest
+
+# Add parent directory to path to import from modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.executor import ComputeExecutor, ComputeTimeout
+
+
+def busy(seconds):
+    """Block the calling thread, standing in for DBSCAN or NumPy work."""
+    time.sleep(seconds)
+    return seconds
+
+
+class TestComputeExecutor(unittest.TestCase):
+    """Tests for off-loop execution of CPU-bound work."""
+
+    def test_event_loop_stays_responsive(self):
+        """Test that blocking work does not stall other coroutines."""
+        async def scenario():
+            executor = ComputeExecutor(max_workers=2)
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            task = asyncio.create_task(ticker())
+            result = await executor.run("ml", busy, 0.2)
+            task.cancel()
+            executor.shutdown()
+            return result, ticks
+
+        result, ticks = asyncio.run(scenario())
+        self.assertEqual(result, 0.2)
+        self.assertGreater(ticks, 5)
+
+    def test_per_class_limit_and_timeout(self):
+        """Test that a saturated class times out while another class still runs."""
+        async def scenario():
+            executor = ComputeExecutor(max_workers=4, limits={"ml": 1})
+            slow = asyncio.create_task(executor.run("ml", busy, 0.3))
+            await asyncio.sleep(0.01)
+            with self.assertRaises(ComputeTimeout):
+                await executor.run("ml", busy, 0.0, timeout=0.05)
+            grid_result = await executor.run("grid", busy, 0.01, timeout=0.5)
+            await slow
+            stats = executor.stats()
+            executor.shutdown()
+            return grid_result, stats
+
+        grid_result, stats = asyncio.run(scenario())
+        self.assertEqual(grid_result, 0.01)
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertEqual(stats["in_flight"], {"ml": 0, "grid": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import sys
+import os
+import asyncio
+import unittest
+
+import numpy as np
+
+# Add parent directory to path to import from modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.ingest import (
+    IngestBackpressure, LineSplitter, TelemetryIngestor, decode_frame, encode_frame, parse_ndjson_records
+)
+
+
+class TestTelemetryFormats(unittest.TestCase):
+    """Tests for the NDJSON and binary telemetry formats."""
+
+    def test_frame_round_trip(self):
+        """Test that frames decode to the encoded samples."""
+        series = {
+            "N1": (np.array([1.0, 2.0, 3.0]), np.array([230.0, 231.5, 229.0])),
+            "Nœud-2": (np.array([4.0]), np.array([115.0]))
+        }
+        decoded = decode_frame(encode_frame(series))
+        self.assertEqual(list(decoded), ["N1", "Nœud-2"])
+        for node_id, (timestamps, values) in series.items():
+            np.testing.assert_array_equal(decoded[node_id][0], timestamps)
+            np.testing.assert_array_equal(decoded[node_id][1], values)
+
+    def test_malformed_frames(self):
+        """Test that truncated or foreign frames are rejected."""
+        frame = encode_frame({"N1": (np.arange(4.0), np.arange(4.0))})
+        for bad in (b"junk", frame[:-8], frame + b"\x00", b"XXXX" + frame[4:]):
+            with self.assertRaises(ValueError):
+                decode_frame(bad)
+
+    def test_ndjson_records(self):
+        """Test single-sample and multi-sample lines, defaults and errors."""
+        lines = [
+            b'{"node_id": "N1", "value": 230.0, "timestamp": 10}',
+            b'{"node_id": "N1", "values": [231, 232], "timestamps": [11, 12]}',
+            b'',
+            b'{"node_id": "N2", "value": 115}',
+            b'{"value": 1}',
+            b'not json'
+        ]
+        series, errors = parse_ndjson_records(lines, now=99.0)
+        np.testing.assert_array_equal(series["N1"][0], [10, 11, 12])
+        np.testing.assert_array_equal(series["N1"][1], [230, 231, 232])
+        np.testing.assert_array_equal(series["N2"][0], [99.0])
+        self.assertEqual([error["line"] for error in errors], [4, 5])
+
+    def test_line_splitter(self):
+        """Test that lines split across chunks are reassembled."""
+        splitter = LineSplitter()
+        self.assertEqual(splitter.feed(b'{"a":'), [])
+        self.assertEqual(splitter.feed(b' 1}\n{"b"'), [b'{"a": 1}'])
+        self.assertEqual(splitter.feed(b': 2}'), [])
+        self.assertEqual(splitter.close(), [b'{"b": 2}'])
+
+
+class TestTelemetryIngestor(unittest.TestCase):
+    """Tests for buffered telemetry ingestion."""
+
+    def test_flush_groups_chunks_per_node(self):
+        """Test that each node reaches the sink in one call per flush."""
+        received = []
+        ingestor = TelemetryIngestor([lambda node, ts, values: received.append((node, values.tolist()))])
+        ingestor._thread = object()  # Flush by hand only
+        ingestor.submit({"N1": (np.array([1.0]), np.array([10.0]))})
+        ingestor.submit({"N1": (np.array([2.0]), np.array([11.0])), "N2": (np.array([1.0]), np.array([5.0]))})
+        self.assertEqual(ingestor.pending, 3)
+        self.assertEqual(ingestor.flush(), 3)
+        self.assertEqual(sorted(received), [("N1", [10.0, 11.0]), ("N2", [5.0])])
+        self.assertEqual(ingestor.stats()["pending"], 0)
+
+    def test_background_flush(self):
+        """Test that the flusher thread drains the buffer."""
+        received = []
+        ingestor = TelemetryIngestor([lambda node, ts, values: received.append(len(values))],
+                                     flush_interval=0.01)
+        ingestor.submit({"N1": (np.zeros(5), np.zeros(5))})
+        ingestor.stop()
+        self.assertEqual(sum(received), 5)
+
+    def test_backpressure(self):
+        """Test that producers wait while the buffer is full."""
+        ingestor = TelemetryIngestor([], max_pending=4)
+        ingestor._thread = object()  # Flush by hand only
+        ingestor.submit({"N1": (np.zeros(4), np.zeros(4))})
+        self.assertFalse(ingestor.has_capacity())
+        with self.assertRaises(IngestBackpressure):
+            asyncio.run(ingestor.wait_for_capacity(timeout=0.02))
+
+        async def wait_while_flushing():
+            asyncio.get_running_loop().call_later(0.01, ingestor.flush)
+            await ingestor.wait_for_capacity(timeout=1.0)
+
+        asyncio.run(wait_while_flushing())
+        self.assertTrue(ingestor.has_capacity())
+
+
+if __name__ == '__main__':
+    unittest.main()
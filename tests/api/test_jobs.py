@@ -0,0 +1,217 @@
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import numpy as np
+
+# Add parent directory to path to import from modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.jobs import (
+    CANCELLED, FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue, JobQueueFull, decode_result, encode_result
+)
+
+
+def wait_for(queue, job_id, states, timeout=5.0):
+    """Poll a job until it reaches one of the states."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = queue.status(job_id)
+        if status["state"] in states:
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} stayed {queue.status(job_id)['state']}")
+
+
+class TestJobQueue(unittest.TestCase):
+    """Test cases for the background job queue."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "jobs.sqlite3")
+        self.queue = JobQueue(self.path, workers=2)
+        self.release = threading.Event()
+
+        def square(params, context):
+            context.progress(0.5, "Squaring")
+            return {"values": np.asarray(params["values"]) ** 2}
+
+        def blocking(params, context):
+            while not self.release.wait(0.01):
+                context.progress(0.25, "Waiting")
+            return params
+
+        def failing(params, context):
+            raise RuntimeError("boom")
+
+        def validate(params):
+            if not params.get("values"):
+                raise ValueError("values must not be empty")
+            return {"values": [float(v) for v in params["values"]]}
+
+        self.queue.register("square", square, validate)
+        self.queue.register("blocking", blocking)
+        self.queue.register("failing", failing)
+
+    def tearDown(self):
+        self.release.set()
+        self.queue.stop(timeout=5)
+        shutil.rmtree(self.directory)
+
+    def test_result_encoding_round_trip(self):
+        """Test that results with arrays survive compact encoding."""
+        data, result_format = encode_result({"a": np.arange(3.0), "b": np.int64(4), "c": "x"})
+        self.assertEqual(decode_result(data, result_format), {"a": [0.0, 1.0, 2.0], "b": 4, "c": "x"})
+
+    def test_job_runs_to_success(self):
+        """Test that a submitted job runs and its result can be read."""
+        self.queue.start()
+        job, created = self.queue.submit("square", {"values": [1, 2, 3]})
+        self.assertTrue(created)
+        status = wait_for(self.queue, job["id"], (SUCCEEDED, FAILED))
+        self.assertEqual(status["state"], SUCCEEDED)
+        self.assertEqual(status["progress"], 1.0)
+        self.assertEqual(self.queue.result(job["id"]), {"values": [1.0, 4.0, 9.0]})
+
+    def test_duplicate_submission_returns_existing_job(self):
+        """Test that identical parameters are deduplicated, also after success."""
+        first, _ = self.queue.submit("square", {"values": [1, 2]})
+        second, created = self.queue.submit("square", {"values": [1.0, 2.0]})
+        self.assertFalse(created)
+        self.assertEqual(first["id"], second["id"])
+
+        self.queue.start()
+        wait_for(self.queue, first["id"], (SUCCEEDED,))
+        third, created = self.queue.submit("square", {"values": [1, 2]})
+        self.assertFalse(created)
+        self.assertEqual(third["id"], first["id"])
+
+        other, created = self.queue.submit("square", {"values": [2, 1]})
+        self.assertTrue(created)
+
+    def test_side_effect_jobs_run_again_after_success(self):
+        """Test that finished jobs with side effects are not answered from their old result."""
+        runs = []
+        self.queue.register("publish", lambda params, context: runs.append(params),
+                            side_effects=lambda params: params["publish"])
+        self.queue.start()
+        for publish, expect_new in ((True, True), (True, True), (False, True), (False, False)):
+            job, created = self.queue.submit("publish", {"publish": publish})
+            self.assertEqual(created, expect_new)
+            wait_for(self.queue, job["id"], (SUCCEEDED,))
+        self.assertEqual(len(runs), 3)
+
+    def test_invalid_submissions(self):
+        """Test that unknown kinds and invalid parameters are rejected."""
+        with self.assertRaises(ValueError):
+            self.queue.submit("unknown", {})
+        with self.assertRaises(ValueError):
+            self.queue.submit("square", {"values": []})
+
+    def test_queue_limit(self):
+        """Test that submissions are refused when too many jobs are queued."""
+        queue = JobQueue(workers=1, max_queued=1)
+        queue.register("noop", lambda params, context: None)
+        queue.submit("noop", {"n": 1})
+        with self.assertRaises(JobQueueFull):
+            queue.submit("noop", {"n": 2})
+
+    def test_failure_is_recorded(self):
+        """Test that a raising handler fails its job without stopping the workers."""
+        self.queue.start()
+        job, _ = self.queue.submit("failing", {})
+        status = wait_for(self.queue, job["id"], (FAILED,))
+        self.assertIn("boom", status["error"])
+        with self.assertRaises(ValueError):
+            self.queue.result(job["id"])
+
+        job, _ = self.queue.submit("square", {"values": [2]})
+        self.assertEqual(wait_for(self.queue, job["id"], (SUCCEEDED, FAILED))["state"], SUCCEEDED)
+
+    def test_cancel_queued_and_running_jobs(self):
+        """Test that queued jobs never run and running jobs stop at a progress report."""
+        queued, _ = self.queue.submit("blocking", {"n": 1})
+        self.assertEqual(self.queue.cancel(queued["id"])["state"], CANCELLED)
+
+        self.queue.start()
+        running, _ = self.queue.submit("blocking", {"n": 2})
+        status = wait_for(self.queue, running["id"], (RUNNING,))
+        while status["progress"] != 0.25:
+            status = self.queue.status(running["id"])
+        self.assertEqual(status["message"], "Waiting")
+        self.queue.cancel(running["id"])
+        self.assertEqual(wait_for(self.queue, running["id"], (CANCELLED,))["state"], CANCELLED)
+        self.assertIsNone(self.queue.cancel("missing"))
+
+        # A cancelled job does not block a new submission of the same work
+        again, created = self.queue.submit("blocking", {"n": 2})
+        self.assertTrue(created)
+        self.assertNotEqual(again["id"], running["id"])
+
+    def test_jobs_survive_restart(self):
+        """Test that queued and interrupted jobs run after reopening the queue."""
+        self.queue.start()
+        running, _ = self.queue.submit("blocking", {"n": 1})
+        wait_for(self.queue, running["id"], (RUNNING,))
+        self.queue.stop(timeout=5)
+        queued, _ = self.queue.submit("square", {"values": [3]})
+        self.assertEqual(self.queue.status(running["id"])["state"], QUEUED)
+
+        reopened = JobQueue(self.path, workers=1)
+        reopened.register("square", self.queue._handlers["square"][0])
+        reopened.register("blocking", self.queue._handlers["blocking"][0])
+        self.release.set()
+        reopened.start()
+        try:
+            self.assertEqual(wait_for(reopened, running["id"], (SUCCEEDED,))["state"], SUCCEEDED)
+            wait_for(reopened, queued["id"], (SUCCEEDED,))
+            self.assertEqual(reopened.result(queued["id"]), {"values": [9.0]})
+            self.assertEqual(reopened.stats(), {SUCCEEDED: 2})
+        finally:
+            reopened.stop(timeout=5)
+
+    def test_expired_lease_is_queued_again(self):
+        """Test that a job left running by a dead process runs again."""
+        job, _ = self.queue.submit("square", {"values": [2]})
+        self.queue._db.execute("UPDATE jobs SET state = ?, owner = 'dead', heartbeat = 0 WHERE id = ?",
+                               (RUNNING, job["id"]))
+        self.queue.start()
+        self.assertEqual(wait_for(self.queue, job["id"], (SUCCEEDED, FAILED))["state"], SUCCEEDED)
+
+    def test_processes_share_running_jobs(self):
+        """Test that another queue on the same file sees progress, cancels, and leaves live jobs alone."""
+        self.queue.start()
+        job, _ = self.queue.submit("blocking", {"n": 1})
+        wait_for(self.queue, job["id"], (RUNNING,))
+
+        other = JobQueue(self.path, workers=1)
+        other.register("blocking", self.queue._handlers["blocking"][0])
+        other.start()
+        try:
+            deadline = time.time() + 5
+            while other.status(job["id"])["message"] != "Waiting" and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(other.status(job["id"])["progress"], 0.25)
+            self.assertEqual(other.status(job["id"])["state"], RUNNING)
+            self.assertTrue(other.cancel(job["id"])["cancel_requested"])
+            self.assertEqual(wait_for(self.queue, job["id"], (CANCELLED,))["state"], CANCELLED)
+        finally:
+            other.stop(timeout=5)
+
+    def test_prune_and_list(self):
+        """Test listing by state and pruning finished jobs."""
+        self.queue.start()
+        job, _ = self.queue.submit("square", {"values": [1]})
+        wait_for(self.queue, job["id"], (SUCCEEDED,))
+        self.assertEqual([j["id"] for j in self.queue.list(SUCCEEDED)], [job["id"]])
+        self.assertEqual(self.queue.prune(3600), 0)
+        self.assertEqual(self.queue.prune(-1), 1)
+        self.assertIsNone(self.queue.status(job["id"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import sys
+import os
+import unittest
+
+# Add parent directory to path to import from modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.metrics import MetricsMiddleware, MetricsRegistry, STAGE_SECONDS, timed
+
+
+class TestMetrics(unittest.TestCase):
+    """Tests for the Prometheus metrics registry and middleware."""
+
+    def test_histogram_exposition(self):
+        """Test cumulative buckets, sum and count in the text format."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency", ["route"], buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value, route="/x")
+        text = registry.render()
+        self.assertIn('# TYPE latency_seconds histogram', text)
+        self.assertIn('latency_seconds_bucket{route="/x",le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{route="/x",le="1.0"} 2', text)
+        self.assertIn('latency_seconds_bucket{route="/x",le="+Inf"} 3', text)
+        self.assertIn('latency_seconds_sum{route="/x"} 5.55', text)
+        self.assertIn('latency_seconds_count{route="/x"} 3', text)
+
+    def test_counter_gauge_and_escaping(self):
+        """Test counters, callback gauges and label value escaping."""
+        registry = MetricsRegistry()
+        counter = registry.counter("requests_total", "Requests", ["path"])
+        counter.inc(path='a"b')
+        counter.inc(path='a"b')
+        registry.gauge("queue_depth", "Depth", callback=lambda: {(): 7})
+        text = registry.render()
+        self.assertIn('requests_total{path="a\\"b"} 2', text)
+        self.assertIn('queue_depth 7', text)
+        self.assertIs(registry.counter("requests_total", "Requests", ["path"]), counter)
+
+    def test_stage_timer(self):
+        """Test that timed blocks are recorded even when they raise."""
+        before = STAGE_SECONDS.count(stage="test_stage")
+        with self.assertRaises(ValueError):
+            with timed("test_stage"):
+                raise ValueError("boom")
+        self.assertEqual(STAGE_SECONDS.count(stage="test_stage"), before + 1)
+
+    def test_middleware_labels_routes_by_template(self):
+        """Test per-route latency and sizes keyed by path template."""
+        registry = MetricsRegistry()
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware, registry=registry)
+
+        @app.post("/items/{item_id}")
+        async def echo(item_id: str, body: dict):
+            return {"item_id": item_id, "body": body}
+
+        client = TestClient(app)
+        client.post("/items/1", json={"a": 1})
+        client.post("/items/2", json={"a": 2})
+        client.get("/missing")
+
+        text = registry.render()
+        self.assertIn('smartgrid_http_requests_total{method="POST",route="/items/{item_id}",status="200"} 2', text)
+        self.assertIn('smartgrid_http_requests_total{method="GET",route="unmatched",status="404"} 1', text)
+        self.assertIn('smartgrid_http_request_size_bytes_sum{method="POST",route="/items/{item_id}"} 16', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import sys
+import os
+import marshal
+import random
+import time
+import unittest
+
+# Add parent directory to path to import from modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.executor import ComputeExecutor
+from api.profiling import (
+    CPROFILE, SAMPLE, ProfileStore, ProfilingMiddleware, RequestProfile, RequestProfiler, profile_call
+)
+
+
+def busy_work(seconds):
+    """Burn CPU for a while so the sampler sees this frame."""
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+
+class TestProfileCall(unittest.TestCase):
+    """Tests for running a function under a profiler."""
+
+    def test_sampled_stacks_start_at_the_profiled_function(self):
+        """Test collapsed stacks rooted at the profiled function."""
+        result, stacks = profile_call(SAMPLE, 0.001, busy_work, 0.05)
+        self.assertGreater(result, 0)
+        self.assertTrue(stacks)
+        for stack in stacks:
+            self.assertTrue(stack.startswith(f"{__name__}:busy_work"))
+
+    def test_cprofile_stats_are_merged(self):
+        """Test that two cProfile runs add up in one request profile."""
+        profile = RequestProfile("r1", CPROFILE, 0.001)
+        for _ in range(2):
+            _, data = profile_call(CPROFILE, 0.001, busy_work, 0.001)
+            profile.add(data)
+        stats = marshal.loads(profile.pstats_dump())
+        calls = [value[1] for key, value in stats.items() if key[2] == "busy_work"]
+        self.assertEqual(calls, [2])
+        self.assertIn("busy_work", profile.text())
+        with self.assertRaises(ValueError):
+            profile.collapsed()
+
+
+class TestRequestProfiler(unittest.TestCase):
+    """Tests for choosing the requests to profile."""
+
+    def test_header_requires_authorization(self):
+        """Test that the profiling header is only honoured for authorized requests."""
+        profiler = RequestProfiler(mode=CPROFILE)
+        self.assertIsNone(profiler.select("sample", lambda: False))
+        self.assertEqual(profiler.select("sample", lambda: True), SAMPLE)
+        self.assertEqual(profiler.select("1", lambda: True), CPROFILE)
+        self.assertIsNone(profiler.select("bogus", lambda: True))
+        self.assertIsNone(profiler.select(None, lambda: True))
+
+    def test_sample_rate(self):
+        """Test that the sampling rate profiles a share of requests without a header."""
+        profiler = RequestProfiler(sample_rate=0.25, rng=random.Random(0))
+        selected = sum(profiler.select(None, lambda: False) is not None for _ in range(4000))
+        self.assertAlmostEqual(selected / 4000, 0.25, delta=0.03)
+        with self.assertRaises(ValueError):
+            RequestProfiler(sample_rate=2.0)
+
+    def test_store_evicts_oldest(self):
+        """Test the bounded profile store."""
+        store = ProfileStore(max_profiles=2)
+        for request_id in ("a", "b", "c"):
+            store.put(RequestProfile(request_id, SAMPLE, 0.001))
+        self.assertIsNone(store.get("a"))
+        self.assertEqual([p["request_id"] for p in store.list()], ["c", "b"])
+
+
+class TestProfilingMiddleware(unittest.TestCase):
+    """Tests for profiling executor work done for a request."""
+
+    def setUp(self):
+        self.profiler = RequestProfiler(interval=0.001)
+        self.executor = ComputeExecutor(kind="thread", max_workers=2)
+        app = FastAPI()
+        app.add_middleware(ProfilingMiddleware, profiler=self.profiler,
+                           authorize=lambda headers: headers.get("x-api-key") == "key")
+
+        @app.get("/work")
+        async def work():
+            return {"total": await self.executor.run("grid", busy_work, 0.03)}
+
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_profile_is_stored_by_request_id(self):
+        """Test that an authorized request's executor work is profiled."""
+        response = self.client.get("/work", headers={
+            "X-Profile": "sample", "X-API-Key": "key", "X-Request-ID": "abc-1"
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["x-profile-id"], "abc-1")
+        profile = self.profiler.store.get("abc-1")
+        self.assertEqual(profile.calls, 1)
+        self.assertEqual(profile.status, 200)
+        self.assertIn("busy_work", profile.collapsed())
+
+    def test_unauthorized_request_is_not_profiled(self):
+        """Test that the header alone does not enable profiling."""
+        response = self.client.get("/work", headers={"X-Profile": "sample"})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("x-profile-id", response.headers)
+        self.assertEqual(len(self.profiler.store), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
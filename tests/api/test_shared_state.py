@@ -0,0 +1,109 @@
+import sys
+import os
+import multiprocessing
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+# Add parent directory to path to import from modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.shared_state import SharedState, SharedStateStore
+
+
+def read_in_child(directory, queue):
+    """Load the live grid state in another process and report what it sees."""
+    snapshot = SharedStateStore(directory).load("grid")
+    queue.put((snapshot.version, float(snapshot.arrays["voltages"].sum()), snapshot.arrays["node_ids"].tolist()))
+
+
+class TestSharedStateStore(unittest.TestCase):
+    """Test cases for versioned shared state."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = SharedStateStore(self.directory, keep_versions=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_publish_and_load(self):
+        """Test that arrays and metadata are read back as read-only views."""
+        self.assertIsNone(self.store.load("grid"))
+        arrays = {"voltages": np.arange(5.0), "index": np.arange(6, dtype=np.int32).reshape(2, 3),
+                  "node_ids": np.array(["N1", "N22"]), "empty": np.empty(0), "flag": np.array(True)}
+        version = self.store.publish("grid", arrays, {"source": "test"})
+        self.assertEqual(version, 1)
+        self.assertEqual(self.store.names(), ["grid"])
+
+        snapshot = self.store.load("grid")
+        self.assertEqual(snapshot.version, 1)
+        self.assertEqual(snapshot.meta, {"source": "test"})
+        for key, array in arrays.items():
+            np.testing.assert_array_equal(snapshot.arrays[key], array)
+            self.assertEqual(snapshot.arrays[key].dtype, array.dtype)
+        self.assertEqual(snapshot.arrays["voltages"].ctypes.data % 64, 0)
+        with self.assertRaises(ValueError):
+            snapshot.arrays["voltages"][0] = 1.0
+
+    def test_versions_swap_and_old_files_are_removed(self):
+        """Test that publishing replaces the live version while loaded snapshots stay valid."""
+        self.store.publish("grid", {"voltages": np.full(3, 1.0)})
+        first = self.store.load("grid")
+        for value in (2.0, 3.0, 4.0):
+            version = self.store.publish("grid", {"voltages": np.full(3, value)})
+        self.assertEqual(version, 4)
+        self.assertEqual(self.store.version("grid"), 4)
+        np.testing.assert_array_equal(self.store.load("grid").arrays["voltages"], np.full(3, 4.0))
+        files = sorted(f for f in os.listdir(os.path.join(self.directory, "grid")) if f.endswith(".bin"))
+        self.assertEqual(files, ["v00000003.bin", "v00000004.bin"])
+        # The first snapshot's file is gone, but its mapping is still readable
+        np.testing.assert_array_equal(first.arrays["voltages"], np.full(3, 1.0))
+        with self.assertRaises(FileNotFoundError):
+            self.store.load("grid", version=1)
+
+    def test_invalid_input(self):
+        """Test that object arrays and unsafe names are rejected."""
+        with self.assertRaises(ValueError):
+            self.store.publish("grid", {"ids": np.array(["a", None], dtype=object)})
+        with self.assertRaises(ValueError):
+            self.store.publish("../grid", {"voltages": np.zeros(1)})
+
+    def test_other_processes_see_published_state(self):
+        """Test that a separate process maps the same published version."""
+        self.store.publish("grid", {"voltages": np.arange(4.0), "node_ids": np.array(["A", "B"])})
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        child = context.Process(target=read_in_child, args=(self.directory, queue))
+        child.start()
+        result = queue.get(timeout=30)
+        child.join(30)
+        self.assertEqual(result, (1, 6.0, ["A", "B"]))
+
+    def test_view_follows_new_versions(self):
+        """Test that a worker's view rebuilds its object when a new version is published."""
+        builds = []
+
+        def build(snapshot):
+            builds.append(snapshot.version)
+            return float(snapshot.arrays["voltages"].sum())
+
+        view = SharedState(self.store, "grid", build, check_interval=3600)
+        self.assertIsNone(view.get())
+        self.store.publish("grid", {"voltages": np.ones(3)})
+        # Within the check interval the view keeps what it had
+        self.assertIsNone(view.get())
+        self.assertEqual(view.refresh(), 3.0)
+        self.assertEqual(view.version, 1)
+
+        view.check_interval = 0
+        self.assertEqual(view.get(), 3.0)
+        self.store.publish("grid", {"voltages": np.ones(5)})
+        self.assertEqual(view.get(), 5.0)
+        self.assertEqual(builds, [1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
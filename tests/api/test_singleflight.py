@@ -0,0 +1,82 @@
+import sys
+import os
+import asyncio
+import unittest
+import numpy as np
+
+# Add parent directory to path to import from modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.singleflight import SingleFlight, canonical_key
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Tests for coalescing identical concurrent computations."""
+
+    def test_concurrent_calls_share_one_run(self):
+        """Test that identical concurrent callers get one computation's result."""
+        flight = SingleFlight()
+        runs = []
+
+        async def compute():
+            runs.append(1)
+            await asyncio.sleep(0.01)
+            return {"value": 42}
+
+        async def main():
+            return await asyncio.gather(*[flight.do("k", compute) for _ in range(5)])
+
+        results = asyncio.run(main())
+        self.assertEqual(len(runs), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(flight.stats(), {"in_flight": 0, "started": 1, "coalesced": 4})
+
+    def test_exceptions_are_shared_and_not_cached(self):
+        """Test that a failure reaches every waiter and the next call retries."""
+        flight = SingleFlight()
+        runs = []
+
+        async def fail():
+            runs.append(1)
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def main():
+            results = await asyncio.gather(flight.do("k", fail), flight.do("k", fail),
+                                           return_exceptions=True)
+            with self.assertRaises(ValueError):
+                await flight.do("k", fail)
+            return results
+
+        results = asyncio.run(main())
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(len(runs), 2)
+
+    def test_cancelled_caller_does_not_cancel_others(self):
+        """Test that a disconnecting caller leaves the shared computation running."""
+        flight = SingleFlight()
+
+        async def compute():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        async def main():
+            first = asyncio.create_task(flight.do("k", compute))
+            second = asyncio.create_task(flight.do("k", compute))
+            await asyncio.sleep(0.005)
+            first.cancel()
+            return await second
+
+        self.assertEqual(asyncio.run(main()), "done")
+
+    def test_canonical_key(self):
+        """Test that key order is ignored and array content matters."""
+        self.assertEqual(canonical_key("x", {"a": 1, "b": [1.0, 2.0]}),
+                         canonical_key("x", {"b": [1.0, 2.0], "a": 1}))
+        self.assertNotEqual(canonical_key("x", {"a": 1}), canonical_key("y", {"a": 1}))
+        self.assertNotEqual(canonical_key("x", np.arange(3.0)), canonical_key("x", np.arange(1.0, 4.0)))
+        self.assertNotEqual(canonical_key("x", ["ab", "c"]), canonical_key("x", ["a", "bc"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
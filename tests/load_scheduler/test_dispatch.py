@@ -0,0 +1,121 @@
+import sys
+import os
+import json
+import unittest
+import numpy as np
+
+# Add parent directory to path to import from modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from load_scheduler.dispatch import (
+    DispatchProblem, greedy_schedule, exact_schedule, optimize_dispatch, synthetic_scenario
+)
+
+SCENARIO_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                             "test_data", "optimization_scenario.json")
+
+
+def check_feasible(test, problem, assignment):
+    """Check that served loads run their full duration in allowed intervals within capacity."""
+    served = assignment.any(axis=1)
+    np.testing.assert_array_equal(assignment.sum(axis=1)[served], problem.durations[served])
+    test.assertFalse(np.any(assignment & ~problem.allowed))
+    test.assertTrue(np.all(problem.total_load(assignment) <= problem.capacity + 1e-6))
+
+
+class TestDispatch(unittest.TestCase):
+    """Tests for the capacity-constrained dispatch optimizer."""
+
+    @classmethod
+    def setUpClass(cls):
+        with open(SCENARIO_PATH) as f:
+            cls.scenario = json.load(f)
+
+    def test_scenario_results(self):
+        """Test that results have the shape of the scenario's optimization_results."""
+        results = optimize_dispatch(self.scenario, method="greedy")
+        expected = self.scenario["optimization_results"]
+        for key in expected:
+            self.assertIn(key, results)
+        self.assertEqual(len(results["hourly_schedule"]), 24)
+        self.assertEqual(set(results["hourly_schedule"][0]), set(expected["hourly_schedule"][0]))
+        for entry in results["hourly_schedule"]:
+            supplied = entry["solar"] + entry["wind"] + entry["hydro"] + entry["battery"]
+            self.assertAlmostEqual(supplied, entry["total_load"], places=2)
+            self.assertGreaterEqual(entry["total_load"], 400.0)  # both fixed loads run all day
+        self.assertEqual(results["unserved_loads"], [])
+        schedule = {load["id"]: load for load in results["load_schedule"]}
+        self.assertTrue(set(schedule["L2"]["hours"]) <= {0, 1, 2, 3, 4, 5, 23})
+        self.assertTrue(set(schedule["L3"]["hours"]) <= set(range(8, 18)))
+        self.assertEqual(len(schedule["L1"]["hours"]), 24)
+
+    def test_quarter_hour_intervals(self):
+        """Test that durations and preferred hours map to 15-minute intervals."""
+        scenario = {**self.scenario, "loads": [dict(load, duration=2) if load["shiftable"] else load
+                                               for load in self.scenario["loads"]]}
+        problem = DispatchProblem.from_scenario(scenario, intervals=96)
+        self.assertEqual(problem.durations.tolist(), [96, 8, 8, 96, 8, 8])
+        self.assertEqual(problem.preferred[1].sum(), 28)
+        results = optimize_dispatch(scenario, intervals=96, method="greedy")
+        self.assertEqual(len(results["hourly_schedule"]), 96)
+        self.assertEqual(results["hourly_schedule"][1]["hour"], 0.25)
+
+    def test_exact_not_worse_than_greedy(self):
+        """Test that the exact solver never does worse than the greedy one."""
+        for seed in range(3):
+            problem = DispatchProblem.from_scenario(synthetic_scenario(15, seed))
+            greedy = greedy_schedule(problem)
+            exact = exact_schedule(problem)
+            check_feasible(self, problem, greedy)
+            check_feasible(self, problem, exact)
+            self.assertLessEqual(problem.objective(exact), problem.objective(greedy) + 1e-6)
+        self.assertEqual(optimize_dispatch(self.scenario)["method"], "exact")
+
+    def test_capacity_shortage(self):
+        """Test that shiftable loads leave room for fixed loads and unplaceable loads are shed."""
+        scenario = {
+            "loads": [
+                {"id": "base", "priority": 3, "consumption": 60, "shiftable": False},
+                {"id": "urgent", "priority": 1, "consumption": 50, "shiftable": True,
+                 "preferred_hours": [0]},
+                {"id": "night", "priority": 4, "consumption": 30, "shiftable": True, "allowed_hours": [0, 1]}
+            ],
+            "generation": [{"id": "G1", "name": "Hydro", "capacity": 70, "cost": 0.05},
+                           {"id": "G2", "name": "Solar", "capacity": 100, "cost": 0.03}]
+        }
+        problem = DispatchProblem.from_scenario(scenario)
+        assignment = greedy_schedule(problem)
+        check_feasible(self, problem, assignment)
+        # "urgent" would prefer midnight, but then "base" would not fit there
+        self.assertEqual(assignment.any(axis=1).tolist(), [True, True, False])
+        self.assertTrue(6 <= np.flatnonzero(assignment[1])[0] <= 18)
+        results = optimize_dispatch(scenario, method="greedy")
+        self.assertEqual(results["unserved_loads"], ["night"])
+        self.assertFalse(results["load_schedule"][1]["preferred"])
+
+    def test_large_problem(self):
+        """Test that the greedy solver handles many loads at 15-minute resolution."""
+        problem = DispatchProblem.from_scenario(synthetic_scenario(2000, seed=1), intervals=96)
+        assignment = greedy_schedule(problem)
+        check_feasible(self, problem, assignment)
+        self.assertGreater(assignment.any(axis=1).mean(), 0.9)
+
+    def test_invalid_scenarios(self):
+        """Test that incomplete or impossible scenarios are rejected."""
+        generation = [{"id": "G1", "capacity": 100}]
+        with self.assertRaises(ValueError):
+            DispatchProblem.from_scenario({"loads": [{"id": "L1"}], "generation": generation})
+        with self.assertRaises(ValueError):
+            DispatchProblem.from_scenario({"loads": [{"id": "L1", "consumption": 0}], "generation": generation})
+        with self.assertRaises(ValueError):
+            DispatchProblem.from_scenario({"loads": [{"id": "L1", "consumption": 5, "shiftable": True,
+                                                      "duration": 3, "allowed_hours": [1]}],
+                                           "generation": generation})
+        with self.assertRaises(ValueError):
+            DispatchProblem.from_scenario(self.scenario, intervals=7)
+        with self.assertRaises(ValueError):
+            optimize_dispatch(self.scenario, method="simplex")
+
+
+if __name__ == '__main__':
+    unittest.main()
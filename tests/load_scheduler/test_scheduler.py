@@ -0,0 +1,105 @@
+import sys
+import os
+import random
+import unittest
+
+# Add parent directory to path to import from modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from load_scheduler import Load, LoadScheduler
+
+
+def assert_heap(test, scheduler):
+    """Check the heap order and the position stored in every load."""
+    heap = scheduler._heap
+    for index, load in enumerate(heap):
+        test.assertEqual(load._index, index)
+        if index:
+            parent = heap[(index - 1) // 2]
+            test.assertLessEqual((parent.priority, parent._sequence), (load.priority, load._sequence))
+    test.assertEqual(len(heap), len(scheduler._loads))
+
+
+class TestLoadScheduler(unittest.TestCase):
+    """Tests for the indexed-heap load scheduler."""
+
+    def test_priority_order(self):
+        """Test that lower priorities come first and ties keep insertion order."""
+        scheduler = LoadScheduler()
+        for load_id, priority in [("A", 2), ("B", 1), ("C", 2), ("D", 0)]:
+            self.assertTrue(scheduler.add_load(Load(load_id, 100.0, priority)))
+        self.assertFalse(scheduler.add_load(Load("A", 50.0, 0)))
+        self.assertEqual(scheduler.peek_top_load().load_id, "D")
+        self.assertEqual([load.load_id for load in scheduler.loads()], ["D", "B", "A", "C"])
+        self.assertEqual([scheduler.pop_top_load().load_id for _ in range(4)], ["D", "B", "A", "C"])
+        self.assertIsNone(scheduler.pop_top_load())
+        self.assertTrue(scheduler.empty())
+
+    def test_update_and_remove(self):
+        """Test priority changes and removals by ID."""
+        scheduler = LoadScheduler()
+        for i in range(10):
+            scheduler.add_load(Load(f"L{i}", 10.0, i))
+        self.assertTrue(scheduler.update_priority("L9", -1))
+        self.assertEqual(scheduler.peek_top_load().load_id, "L9")
+        self.assertTrue(scheduler.update_priority("L9", 100))
+        self.assertTrue(scheduler.remove_load("L0"))
+        self.assertFalse(scheduler.remove_load("L0"))
+        self.assertFalse(scheduler.update_priority("L0", 1))
+        self.assertIsNone(scheduler.get_load_by_id("L0"))
+        self.assertEqual(scheduler.get_load_by_id("L9").priority, 100)
+        self.assertEqual([load.load_id for load in scheduler.pop_top_loads(20)],
+                         [f"L{i}" for i in range(1, 10)])
+
+    def test_random_operations(self):
+        """Test that the heap stays consistent under random operations."""
+        rng = random.Random(7)
+        scheduler = LoadScheduler()
+        reference = {}
+        for step in range(3000):
+            load_id = f"L{rng.randrange(300)}"
+            action = rng.random()
+            if action < 0.4:
+                priority = rng.randrange(50)
+                if scheduler.add_load(Load(load_id, 1.0, priority)):
+                    reference[load_id] = priority
+            elif action < 0.7:
+                priority = rng.randrange(50)
+                if scheduler.update_priority(load_id, priority):
+                    reference[load_id] = priority
+            elif action < 0.9:
+                self.assertEqual(scheduler.remove_load(load_id), reference.pop(load_id, None) is not None)
+            else:
+                top = scheduler.pop_top_load()
+                if top is not None:
+                    self.assertEqual(top.priority, min(reference.values()))
+                    del reference[top.load_id]
+            if step % 100 == 0:
+                assert_heap(self, scheduler)
+        assert_heap(self, scheduler)
+        self.assertEqual({load.load_id: load.priority for load in scheduler.loads()}, reference)
+
+    def test_bulk_operations(self):
+        """Test batch adds, priority updates and removals."""
+        scheduler = LoadScheduler()
+        rejected = scheduler.add_loads([Load(f"L{i}", 1.0 + i, i % 5) for i in range(500)] + [Load("L3", 1.0, 0)])
+        self.assertEqual(rejected, ["L3"])
+        missing = scheduler.update_priorities([(f"L{i}", -i) for i in range(0, 500, 2)] + [("X", 1)])
+        self.assertEqual(missing, ["X"])
+        assert_heap(self, scheduler)
+        self.assertEqual(scheduler.peek_top_load().load_id, "L498")
+        self.assertEqual(scheduler.remove_loads(["L498", "L1", "X"]), ["X"])
+        assert_heap(self, scheduler)
+        stats = scheduler.stats()
+        self.assertEqual(stats["loads"], 498)
+        self.assertEqual(stats["top_priority"], -496)
+        self.assertAlmostEqual(stats["total_power"], sum(1.0 + i for i in range(500)) - 499.0 - 2.0)
+
+    def test_invalid_load(self):
+        """Test that non-positive power requirements are rejected."""
+        with self.assertRaises(ValueError):
+            Load("L1", 0.0, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
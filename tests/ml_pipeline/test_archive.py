@@ -0,0 +1,97 @@
+import sys
+import os
+import tempfile
+import unittest
+import numpy as np
+
+# Add parent directory to path to import from modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from ml_pipeline.archive import VoltageArchive, convert_to_archive
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestVoltageArchive(unittest.TestCase):
+    """Tests for the memory-mapped voltage archive."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'archive')
+        self.timestamps = 1000.0 + np.arange(1000) * 2.0
+        self.values = np.sin(np.arange(1000) / 7.0)
+        with VoltageArchive(self.path, segment_rows=300, index_stride=16) as archive:
+            for offset in range(0, 1000, 170):
+                archive.append('N1', self.timestamps[offset:offset + 170], self.values[offset:offset + 170])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_segments_and_reopen(self):
+        """Test that records are split into segments and visible after reopening."""
+        archive = VoltageArchive(self.path)
+        self.assertEqual(archive.describe()['N1'], {'rows': 1000, 'segments': 4, 'start': 1000.0, 'end': 2998.0})
+        timestamps, values = archive.read('N1')
+        np.testing.assert_array_equal(timestamps, self.timestamps)
+        np.testing.assert_array_equal(values, self.values)
+
+    def test_range_reads(self):
+        """Test range boundaries inside and across segments and index blocks."""
+        archive = VoltageArchive(self.path)
+        for start, end in [(1001, 1031), (1500, 1700), (1598, 1602), (0, 1000), (2998, 5000), (1003, 1003)]:
+            timestamps, values = archive.read('N1', start, end)
+            inside = (self.timestamps >= start) & (self.timestamps <= end)
+            np.testing.assert_array_equal(timestamps, self.timestamps[inside])
+            np.testing.assert_array_equal(values, self.values[inside])
+
+    def test_locate(self):
+        """Test seeking to a time."""
+        node = VoltageArchive(self.path).node('N1')
+        self.assertEqual(node.locate(1000.0 + 2 * 450), (1, 150))
+        self.assertEqual(node.locate(1000.0 + 2 * 450, side='right'), (1, 151))
+        self.assertEqual(node.locate(10_000.0), (4, 0))
+
+    def test_unflushed_append_discarded(self):
+        """Test that rows appended without a flush are replaced by the next writer."""
+        path = os.path.join(self.tmp.name, 'crash')
+        with VoltageArchive(path, segment_rows=4, index_stride=2) as archive:
+            archive.append('N1', [0.0, 1.0, 2.0], [0.0, 1.0, 2.0])
+        # Appended but never flushed, fills the segment and starts another
+        VoltageArchive(path).append('N1', [3.0, 4.0], [3.0, 4.0])
+        with VoltageArchive(path) as archive:
+            archive.append('N1', [5.0, 6.0], [5.0, 6.0])
+        timestamps, values = VoltageArchive(path).read('N1')
+        np.testing.assert_array_equal(timestamps, [0.0, 1.0, 2.0, 5.0, 6.0])
+        np.testing.assert_array_equal(values, [0.0, 1.0, 2.0, 5.0, 6.0])
+        self.assertEqual(VoltageArchive(path).read('N1', 4.5, 5.5)[0].tolist(), [5.0])
+
+    def test_append_in_time_order(self):
+        """Test that records older than the archive are rejected."""
+        archive = VoltageArchive(self.path)
+        with self.assertRaises(ValueError):
+            archive.append('N1', [10.0], [1.0])
+        with self.assertRaises(KeyError):
+            archive.read('N2')
+
+
+class TestConvertToArchive(unittest.TestCase):
+    """Tests for converting the CSV and JSON telemetry layouts."""
+
+    def test_convert_sample_files(self):
+        """Test converting sample_data/voltage_data.csv and test_data/voltage_data.json."""
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = convert_to_archive(
+                [os.path.join(REPO_ROOT, 'sample_data', 'voltage_data.csv'),
+                 os.path.join(REPO_ROOT, 'test_data', 'voltage_data.json')],
+                tmp, node_id='N1'
+            )
+            self.assertEqual(sorted(archive.node_ids()), ['N1', 'RES1'])
+            timestamps, values = archive.read('N1', 1672531200, 1672531200 + 3600)
+            np.testing.assert_array_equal(timestamps, [1672531200, 1672534800])
+            np.testing.assert_array_equal(values, [230.1, 230.5])
+            _, values = archive.read('RES1')
+            self.assertEqual(values[0], 232.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import sys
+import os
+import unittest
+import numpy as np
+
+# Add parent directory to path to import from modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from ml_pipeline.baselines import (
+    NaiveMeanForecaster, EWMAForecaster, SeasonalNaiveForecaster,
+    HoltWintersForecaster, ARForecaster, ForecasterSelector, PredictorForecaster, default_baselines
+)
+
+
+class RecurrencePredictor:
+    """Stand-in for a trained VoltagePredictor that knows a nonlinear one-step rule."""
+
+    sequence_length = 4
+
+    @staticmethod
+    def step(previous):
+        return 230.0 + 5.0 * np.sin(previous)
+
+    def predict(self, X):
+        return self.step(X[:, -1, 0])[:, None]
+
+
+class TestBaselineForecasters(unittest.TestCase):
+    """Tests for the vectorized baseline forecasters."""
+
+    def setUp(self):
+        """Set up a batch of hourly series with a daily cycle."""
+        t = np.arange(24 * 7)
+        self.history = np.stack([
+            230 + 5 * np.sin(2 * np.pi * t / 24),
+            231 + 3 * np.sin(2 * np.pi * t / 24 + 1),
+            np.full(len(t), 229.5)
+        ])
+
+    def test_naive_matches_api_rule(self):
+        """Test the recursive mean-of-last-3 rule used by /ml/predict."""
+        values = np.array([230.1, 229.8, 230.2, 230.0, 229.9])
+        expected = []
+        for _ in range(4):
+            next_val = np.mean(values[-3:])
+            expected.append(next_val)
+            values = np.append(values, next_val)
+        forecast = NaiveMeanForecaster(window=3).forecast(values[:5], 4)
+        np.testing.assert_allclose(forecast[0], expected)
+
+    def test_ewma_matches_recursion(self):
+        """Test that the closed-form EWMA level equals the recursive one."""
+        series = self.history[0]
+        level = series[0]
+        for value in series[1:]:
+            level = 0.3 * value + 0.7 * level
+        forecast = EWMAForecaster(alpha=0.3).forecast(series, 2)
+        np.testing.assert_allclose(forecast[0], [level, level])
+
+    def test_seasonal_naive_repeats_last_season(self):
+        """Test that the forecast repeats the last 24 values."""
+        forecast = SeasonalNaiveForecaster(24).forecast(self.history, 30)
+        np.testing.assert_allclose(forecast[:, :24], self.history[:, -24:])
+        np.testing.assert_allclose(forecast[:, 24:], self.history[:, -24:-18])
+
+    def test_history_length_tail_is_enough(self):
+        """Test that forecasting from the declared tail matches the full history."""
+        for forecaster in (NaiveMeanForecaster(3), SeasonalNaiveForecaster(24)):
+            tail = self.history[:, -forecaster.history_length():]
+            np.testing.assert_allclose(forecaster.forecast(tail, 30), forecaster.forecast(self.history, 30))
+
+    def test_seasonal_naive_rejects_short_history(self):
+        """Test that fewer observations than one season is an error."""
+        with self.assertRaises(ValueError):
+            SeasonalNaiveForecaster(24).forecast(self.history[:, :10], 30)
+
+    def test_holt_winters_tracks_seasonal_series(self):
+        """Test that Holt-Winters forecasts a clean cycle closely."""
+        forecast = HoltWintersForecaster(season_length=24).forecast(self.history[:, :-24], 24)
+        self.assertLess(np.abs(forecast - self.history[:, -24:]).max(), 0.5)
+
+    def test_ar_recovers_coefficients(self):
+        """Test least-squares AR fitting on a known AR(1) process."""
+        rng = np.random.default_rng(0)
+        series = np.zeros((2, 500))
+        for t in range(1, 500):
+            series[:, t] = 0.8 * series[:, t - 1] + rng.normal(size=2)
+        coefficients = ARForecaster(order=1).fit(series)
+        np.testing.assert_allclose(coefficients[:, 0], [0.8, 0.8], atol=0.1)
+
+    def test_selector_picks_per_series(self):
+        """Test that the selector prefers seasonal models for cyclic series."""
+        selector = ForecasterSelector(horizon=12, n_folds=2)
+        forecasts, names = selector.forecast(self.history, 12)
+        self.assertEqual(forecasts.shape, (3, 12))
+        self.assertIn(names[0], ("seasonal_naive", "holt_winters"))
+        self.assertEqual(sum(selector.summary().values()), 3)
+
+    def test_selector_picks_predictor_when_it_backtests_best(self):
+        """Test that a predictor candidate wins series it forecasts better than the baselines."""
+        series = [231.0]
+        for _ in range(119):
+            series.append(RecurrencePredictor.step(series[-1]))
+        lstm = PredictorForecaster(RecurrencePredictor(), normalize=False)
+        selector = ForecasterSelector(default_baselines() + [lstm], horizon=10)
+        forecasts, names = selector.forecast(np.array(series), 5)
+
+        self.assertEqual(names, ["lstm"])
+        expected = [series[-1]]
+        for _ in range(5):
+            expected.append(RecurrencePredictor.step(expected[-1]))
+        np.testing.assert_allclose(forecasts[0], expected[1:])
+
+
+if __name__ == "__main__":
+    unittest.main()
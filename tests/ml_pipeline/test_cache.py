@@ -0,0 +1,92 @@
+import sys
+import os
+import tempfile
+import time
+import unittest
+import numpy as np
+
+# Add parent directory to path to import from modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from ml_pipeline.cache import ResultCache, hash_array
+
+
+class TestResultCache(unittest.TestCase):
+    """Tests for the content-addressed result cache."""
+
+    def test_key_depends_on_content_and_parameters(self):
+        """Test that keys change with the data and with the parameters."""
+        values = np.array([230.1, 229.8, 230.2])
+        key = ResultCache.make_key(values, "anomalies", eps=0.3, min_samples=5)
+        self.assertEqual(key, ResultCache.make_key(values.copy(), "anomalies", min_samples=5, eps=0.3))
+        self.assertNotEqual(key, ResultCache.make_key(values, "anomalies", eps=0.4, min_samples=5))
+        self.assertNotEqual(hash_array(values), hash_array(values.astype(np.float32)))
+
+    def test_hit_and_miss_counters(self):
+        """Test that lookups are counted."""
+        cache = ResultCache()
+        self.assertIsNone(cache.get("k"))
+        cache.set("k", {"predictions": [1.0]})
+        self.assertEqual(cache.get("k"), {"predictions": [1.0]})
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = ResultCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_ttl_expiry(self):
+        """Test that expired entries are not returned."""
+        cache = ResultCache(ttl=0.01)
+        cache.set("k", 1)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("k"))
+
+    def test_disk_tier(self):
+        """Test that results survive a memory wipe through the disk tier."""
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResultCache(disk_dir=tmp)
+            cache.set("predict:abc:def", {"predictions": [230.0]})
+            cache.clear()
+            self.assertEqual(cache.get("predict:abc:def"), {"predictions": [230.0]})
+            self.assertEqual(cache.stats()["disk_hits"], 1)
+
+    def test_disk_tier_is_bounded(self):
+        """Test that the least recently used files are evicted, including ones left by an earlier run."""
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResultCache(disk_dir=tmp, disk_max_entries=2)
+            cache.set("a", 1)
+            cache.set("b", 2)
+            cache.clear()
+            cache.get("a")
+            cache.set("c", 3)
+            cache.clear()
+            self.assertIsNone(cache.get("b"))
+            self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+            self.assertEqual(len(os.listdir(tmp)), 2)
+            self.assertEqual(cache.stats()["disk_evictions"], 1)
+
+            ResultCache(disk_dir=tmp, disk_max_entries=1)
+            self.assertEqual(len(os.listdir(tmp)), 1)
+
+    def test_disk_hit_keeps_remaining_ttl(self):
+        """Test that promoting a disk entry to memory does not restart its TTL."""
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResultCache(ttl=0.2, disk_dir=tmp)
+            cache.set("k", 1)
+            cache.clear()
+            time.sleep(0.15)
+            self.assertEqual(cache.get("k"), 1)
+            time.sleep(0.1)
+            self.assertIsNone(cache.get("k"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import sys
+import os
+import threading
+import unittest
+import numpy as np
+
+# Add parent directory to path to import from modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from ml_pipeline.features import RingBuffer, NodeFeatures, FeatureStore
+
+
+class TestRingBuffer(unittest.TestCase):
+    """Tests for the fixed-capacity ring buffer."""
+
+    def test_wraparound_keeps_latest(self):
+        """Test that the buffer returns the most recent readings in order."""
+        buffer = RingBuffer(5)
+        buffer.extend([1, 2, 3])
+        evicted = buffer.extend([4, 5, 6, 7])
+        np.testing.assert_array_equal(buffer.latest(5), [3, 4, 5, 6, 7])
+        np.testing.assert_array_equal(evicted, [1, 2])
+        np.testing.assert_array_equal(buffer.latest(2), [6, 7])
+
+    def test_oversized_append(self):
+        """Test appending more readings than the capacity at once."""
+        buffer = RingBuffer(3)
+        buffer.extend([1, 2])
+        evicted = buffer.extend(np.arange(10, 15))
+        np.testing.assert_array_equal(buffer.latest(3), [12, 13, 14])
+        np.testing.assert_array_equal(evicted, [1, 2, 10, 11])
+
+
+class TestNodeFeatures(unittest.TestCase):
+    """Tests for incrementally maintained node features."""
+
+    def test_incremental_matches_batch(self):
+        """Test that streamed statistics match a full recomputation."""
+        values = 230 + np.random.default_rng(0).normal(size=500)
+        node = NodeFeatures(capacity=48, rolling_windows=(6, 24))
+        for start in range(0, len(values), 7):
+            node.append(values[start:start + 7])
+
+        self.assertAlmostEqual(node.mean, values.mean())
+        self.assertAlmostEqual(node.std, values.std())
+        self.assertAlmostEqual(node.rolling(24)["mean"], values[-24:].mean())
+        self.assertAlmostEqual(node.rolling(6)["max"], values[-6:].max())
+        np.testing.assert_allclose(node.buffer.latest(12), values[-12:])
+
+    def test_non_finite_readings_dropped(self):
+        """Test that NaN and inf readings do not reach the statistics."""
+        node = NodeFeatures(capacity=10, rolling_windows=(4,))
+        node.append([230.0, float("nan"), 232.0, float("inf")])
+        node.append([234.0, 236.0])
+
+        self.assertEqual(node.count, 4)
+        self.assertAlmostEqual(node.mean, 233.0)
+        self.assertAlmostEqual(node.rolling(4)["mean"], 233.0)
+
+
+    def test_reads_are_consistent_during_appends(self):
+        """Test that windows read while another thread appends are never torn."""
+        node = NodeFeatures(capacity=64, rolling_windows=(8,))
+        node.append(np.arange(64.0))
+        done = threading.Event()
+
+        def writer():
+            start = 64.0
+            while not done.is_set():
+                node.append(np.arange(start, start + 7))
+                start += 7
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            for _ in range(2000):
+                window = node.latest(16)
+                np.testing.assert_array_equal(np.diff(window), np.ones(15))
+        finally:
+            done.set()
+            thread.join()
+
+
+class TestFeatureStore(unittest.TestCase):
+    """Tests for the per-node feature store."""
+
+    def test_nodes_created_on_append(self):
+        """Test that each node gets its own state on first append."""
+        store = FeatureStore(capacity=24)
+        store.append("N1", np.linspace(229, 231, 30))
+        store.append("N2", np.linspace(231, 229, 30))
+        self.assertEqual(sorted(store.node_ids()), ["N1", "N2"])
+        self.assertEqual(len(store.get("N1").buffer), 24)
+        self.assertIsNone(store.get("N3"))
+
+
+if __name__ == "__main__":
+    unittest.main()
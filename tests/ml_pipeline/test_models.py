@@ -0,0 +1,53 @@
+import sys
+import os
+import importlib.util
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+# Add parent directory to path to import from modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+HAS_TENSORFLOW = importlib.util.find_spec("tensorflow") is not None
+
+
+@unittest.skipUnless(HAS_TENSORFLOW, "VoltagePredictor requires TensorFlow")
+class TestVoltagePredictorPersistence(unittest.TestCase):
+    """Test cases for saving, loading and sharing trained predictors."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_loaded_model_publishes_its_own_architecture(self):
+        """Test save -> load_model -> publish -> build with a non-default config."""
+        from api.compute import PREDICTOR_STATE, build_voltage_predictor, publish_voltage_predictor
+        from api.shared_state import SharedStateStore
+        from ml_pipeline.models import VoltagePredictor
+
+        predictor = VoltagePredictor(sequence_length=6, lstm_units=(8, 4), dropout_rate=0.1,
+                                     learning_rate=0.01)
+        path = os.path.join(self.directory, "predictor.keras")
+        predictor.save_model(path)
+
+        loaded = VoltagePredictor.load_model(path)
+        config, expected = loaded.get_config(), predictor.get_config()
+        self.assertAlmostEqual(config.pop("learning_rate"), expected.pop("learning_rate"))
+        self.assertEqual(config, expected)
+
+        store = SharedStateStore(os.path.join(self.directory, "state"))
+        publish_voltage_predictor(store, loaded)
+        rebuilt = build_voltage_predictor(store.load(PREDICTOR_STATE))
+        self.assertEqual(rebuilt.sequence_length, 6)
+        self.assertEqual(tuple(rebuilt.lstm_units), (8, 4))
+
+        window = np.random.default_rng(0).normal(size=(1, 6, 1))
+        np.testing.assert_allclose(rebuilt.predict(window), predictor.predict(window), rtol=1e-5)
+
+
+if __name__ == '__main__':
+    unittest.main()
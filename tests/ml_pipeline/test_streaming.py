@@ -0,0 +1,96 @@
+import sys
+import os
+import tempfile
+import unittest
+import numpy as np
+
+# Add parent directory to path to import from modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from ml_pipeline.streaming import (
+    RunningStats, WindowDataset, BatchPrefetcher, iter_telemetry_chunks, materialize_telemetry
+)
+
+
+class TestRunningStats(unittest.TestCase):
+    """Tests for the streaming mean/variance accumulator."""
+
+    def test_chunked_update_matches_numpy(self):
+        """Test that chunked updates give the same result as a full pass."""
+        data = np.random.default_rng(0).normal(230.0, 5.0, size=(1000, 3))
+        stats = RunningStats(3)
+        for start in range(0, len(data), 77):
+            stats.update(data[start:start + 77])
+        np.testing.assert_allclose(stats.mean, data.mean(axis=0))
+        np.testing.assert_allclose(stats.std, data.std(axis=0))
+
+    def test_merge(self):
+        """Test that merging two accumulators equals one accumulator over both halves."""
+        data = np.random.default_rng(1).normal(size=500)
+        left, right = RunningStats(), RunningStats()
+        left.update(data[:200])
+        right.update(data[200:])
+        left.merge(right)
+        np.testing.assert_allclose(left.mean, [data.mean()])
+        np.testing.assert_allclose(left.variance, [data.var()])
+
+
+class TestWindowDataset(unittest.TestCase):
+    """Tests for out-of-core window sampling."""
+
+    def test_materialize_sample_csv(self):
+        """Test converting the sample CSV into a memory-mapped matrix."""
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        source = os.path.join(root, "sample_data", "voltage_data.csv")
+        with tempfile.TemporaryDirectory() as tmp:
+            data, stats, columns = materialize_telemetry(source, os.path.join(tmp, "v.f32"), chunk_size=5)
+            self.assertEqual(columns, ["voltage"])
+            self.assertEqual(data.shape[1], 1)
+            np.testing.assert_allclose(stats.mean, [np.asarray(data).mean()], rtol=1e-6)
+
+    def test_npy_value_columns_select(self):
+        """Test that value_columns picks .npy columns by position name."""
+        values = np.arange(12, dtype=np.float32).reshape(4, 3)
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "v.npy")
+            np.save(source, values)
+            chunks = list(iter_telemetry_chunks(source, ["2", "0"], chunk_size=3))
+            self.assertEqual([columns for columns, _ in chunks], [["2", "0"], ["2", "0"]])
+            np.testing.assert_array_equal(np.concatenate([c for _, c in chunks]), values[:, [2, 0]])
+            with self.assertRaises(ValueError):
+                list(iter_telemetry_chunks(source, ["3"]))
+
+    def test_windows_follow_series(self):
+        """Test that each sampled target is the reading right after its window."""
+        data = np.arange(100, dtype=np.float32).reshape(50, 2)
+        dataset = WindowDataset(data, sequence_length=4, batch_size=16, seed=0)
+        X, y = dataset.sample_batch()
+        self.assertEqual(X.shape, (16, 4, 1))
+        # Columns hold values with a stride of 2, so the target is last + 2
+        np.testing.assert_array_equal(y, X[:, -1, 0] + 2)
+
+    def test_split_is_disjoint_in_targets(self):
+        """Test that the time split keeps training targets before validation targets."""
+        dataset = WindowDataset(np.zeros(100), sequence_length=10)
+        train, validation = dataset.split(0.2)
+        self.assertEqual(train.time_range, (0, 80))
+        self.assertEqual(validation.time_range, (70, 100))
+
+    def test_prefetcher_yields_batches(self):
+        """Test that the prefetcher produces batches of the dataset's shape."""
+        dataset = WindowDataset(np.random.rand(200), sequence_length=8, batch_size=4)
+        with BatchPrefetcher(dataset, num_workers=2, max_prefetch=2, seed=0) as batches:
+            X, y = next(batches)
+        self.assertEqual(X.shape, (4, 8, 1))
+        self.assertEqual(y.shape, (4,))
+
+    def test_prefetcher_stops_after_close(self):
+        """Test that iteration ends instead of blocking once the prefetcher is closed."""
+        dataset = WindowDataset(np.random.rand(200), sequence_length=8, batch_size=4)
+        batches = BatchPrefetcher(dataset, num_workers=1, max_prefetch=2, seed=0)
+        batches.close()
+        self.assertLessEqual(len(list(batches)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
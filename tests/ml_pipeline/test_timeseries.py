@@ -0,0 +1,145 @@
+import sys
+import os
+import unittest
+import warnings
+import numpy as np
+
+# Add parent directory to path to import from modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from ml_pipeline.timeseries import CompressedChunk, Rollup, NodeSeries, TimeSeriesStore
+
+
+class TestCompressedChunk(unittest.TestCase):
+    """Tests for Gorilla-style chunk compression."""
+
+    def test_round_trip_is_lossless(self):
+        """Test that values decode bit-exactly and timestamps to the millisecond."""
+        rng = np.random.default_rng(0)
+        timestamps = 1.7e9 + np.cumsum(rng.choice([1.0, 1.0, 1.0, 0.999, 1.002], 500))
+        values = np.round(230 + np.cumsum(rng.normal(0, 0.1, 500)), 2)
+        values[10] = -0.0
+        values[20] = np.nan
+        decoded_times, decoded_values = CompressedChunk(timestamps, values).decode()
+        np.testing.assert_allclose(decoded_times, timestamps, atol=5e-4, rtol=0)
+        np.testing.assert_array_equal(decoded_values.view(np.uint64), values.view(np.uint64))
+
+    def test_regular_series_compresses(self):
+        """Test that regular, slowly changing readings use far fewer than 16 bytes each."""
+        timestamps = 1.7e9 + np.arange(1024.0)
+        values = np.repeat([230.0, 230.5, 231.0, 230.5], 256)
+        chunk = CompressedChunk(timestamps, values)
+        self.assertLess(chunk.nbytes, 16 * 1024 / 20)
+        self.assertEqual((chunk.min, chunk.max, chunk.count), (230.0, 231.0, 1024))
+
+    def test_short_chunks(self):
+        """Test chunks of one and two samples."""
+        for n in (1, 2):
+            timestamps, values = CompressedChunk(np.arange(n) + 5.0, np.arange(n) + 1.5).decode()
+            np.testing.assert_array_equal(timestamps, np.arange(n) + 5.0)
+            np.testing.assert_array_equal(values, np.arange(n) + 1.5)
+
+
+class TestRollup(unittest.TestCase):
+    """Tests for bucketed min/max/mean aggregates."""
+
+    def test_aggregates_across_updates(self):
+        """Test that a bucket spanning two updates is merged."""
+        rollup = Rollup(resolution=10, capacity=4)
+        rollup.update(np.array([0.0, 5.0, 12.0]), np.array([1.0, 3.0, 10.0]))
+        rollup.update(np.array([15.0, 31.0]), np.array([20.0, 7.0]))
+        buckets = rollup.query(0, 39)
+        np.testing.assert_array_equal(buckets["timestamps"], [0, 10, 30])
+        np.testing.assert_array_equal(buckets["min"], [1, 10, 7])
+        np.testing.assert_array_equal(buckets["max"], [3, 20, 7])
+        np.testing.assert_array_equal(buckets["mean"], [2, 15, 7])
+
+    def test_old_buckets_are_overwritten(self):
+        """Test that the ring only answers for its most recent buckets."""
+        rollup = Rollup(resolution=1, capacity=3)
+        rollup.update(np.arange(10.0), np.arange(10.0))
+        buckets = rollup.query(-np.inf, np.inf)
+        np.testing.assert_array_equal(buckets["timestamps"], [7, 8, 9])
+        self.assertEqual(len(rollup.query(0, 5)["timestamps"]), 0)
+
+    def test_empty_rollup_has_no_buckets(self):
+        """Test that a rollup with nothing stored answers with empty arrays."""
+        series = NodeSeries(chunk_size=4, rollups={10: 8})
+        self.assertEqual(series.append([0.0, 1.0], [np.nan, np.nan]), 0)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            buckets = series.rollup(10, -np.inf, np.inf)
+            self.assertTrue(all(len(column) == 0 for column in buckets.values()))
+            self.assertEqual(len(Rollup(resolution=10, capacity=8).query(-20, 0)["timestamps"]), 0)
+
+
+class TestNodeSeries(unittest.TestCase):
+    """Tests for a node's compressed history."""
+
+    def setUp(self):
+        self.series = NodeSeries(chunk_size=100, max_chunks=5, rollups={60: 100})
+        self.timestamps = 1000.0 + np.arange(650.0)
+        self.values = 230 + np.sin(np.arange(650) / 10)
+        for offset in range(0, 650, 130):
+            self.series.append(self.timestamps[offset:offset + 130], self.values[offset:offset + 130])
+
+    def test_range_reads_overlapping_chunks(self):
+        """Test range queries across chunk boundaries and the head block."""
+        timestamps, values = self.series.range(1150, 1249)
+        np.testing.assert_array_equal(timestamps, self.timestamps[150:250])
+        np.testing.assert_array_equal(values, self.values[150:250])
+        timestamps, _ = self.series.range(1620, np.inf)
+        np.testing.assert_array_equal(timestamps, self.timestamps[620:])
+
+    def test_ring_of_chunks(self):
+        """Test that raw history is bounded while rollups keep older buckets."""
+        self.assertEqual(len(self.series), 550)
+        self.assertEqual(self.series.range()[0][0], self.timestamps[100])
+        buckets = self.series.rollup(60, 1000, 1649)
+        self.assertEqual(buckets["count"].sum(), 650)
+        with self.assertRaises(ValueError):
+            self.series.rollup(30, 1000, 1649)
+
+    def test_out_of_order_samples_dropped(self):
+        """Test that samples older than the newest one are not stored."""
+        stored = self.series.append([1649.0, 1500.0, 1650.0], [1.0, 2.0, 3.0])
+        self.assertEqual(stored, 2)
+        self.assertEqual(self.series.dropped, 1)
+
+    def test_latest(self):
+        """Test reading the newest samples."""
+        _, values = self.series.latest(120)
+        np.testing.assert_array_equal(values, self.values[-120:])
+
+    def test_timestamps_stable_across_sealing(self):
+        """Test that a sub-millisecond timestamp reads back the same before and after compression."""
+        series = NodeSeries(chunk_size=4, max_chunks=2, rollups={})
+        series.append([10.0, 10.2504, 11.0], [1.0, 2.0, 3.0])
+        before = series.range()[0]
+        series.append([12.0], [4.0])
+        np.testing.assert_array_equal(series.range()[0][:3], before)
+        timestamp = float(before[1])
+        np.testing.assert_array_equal(series.range(timestamp, timestamp)[1], [2.0])
+
+
+class TestTimeSeriesStore(unittest.TestCase):
+    """Tests for feeding stored history to the models."""
+
+    def test_model_inputs(self):
+        """Test input windows and training pairs shaped for VoltagePredictor."""
+        store = TimeSeriesStore(chunk_size=16)
+        values = np.arange(40.0)
+        store.append("N1", np.arange(40.0), values)
+        np.testing.assert_array_equal(store.input_window("N1", 5).ravel(), values[-5:])
+        X, y = store.training_sequences("N1", 5)
+        self.assertEqual(X.shape, (35, 5, 1))
+        np.testing.assert_array_equal(X[0].ravel(), values[:5])
+        np.testing.assert_array_equal(y.ravel(), values[5:])
+        with self.assertRaises(KeyError):
+            store.latest_values("N2", 5)
+        with self.assertRaises(ValueError):
+            store.input_window("N1", 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import sys
+import os
+import json
+import tempfile
+import unittest
+import numpy as np
+
+# Add parent directory to path to import from modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from ml_pipeline.tuning import HyperparameterTuner, WindowCache, regression_metrics
+
+
+def fake_trial(task):
+    """Stand-in for LSTM training: lower learning rates score better."""
+    mse = task['params']['learning_rate'] * 100 / task['epochs']
+    metrics = {'r_squared': 1 - mse, 'mean_absolute_error': mse, 'mean_squared_error': mse}
+    return {
+        'trial_id': task['trial_id'],
+        'params': task['params'],
+        'epochs_trained': task['epochs'],
+        'stopped_early': False,
+        'training_metrics': dict(metrics, training_samples=10),
+        'validation_metrics': dict(metrics, validation_samples=2),
+        'actual_vs_predicted': []
+    }
+
+
+class TestTuning(unittest.TestCase):
+    """Tests for the successive-halving hyperparameter search."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.series = 230 + np.sin(np.arange(200) / 5.0)
+
+    def tearDown(self):
+        """Remove temporary files."""
+        self.tmp.cleanup()
+
+    def test_regression_metrics(self):
+        """Test that perfect predictions give zero error and R² of one."""
+        metrics = regression_metrics([1.0, 2.0, 3.0], [1.0, 2.0, 3.0])
+        self.assertEqual(metrics['mean_squared_error'], 0.0)
+        self.assertEqual(metrics['r_squared'], 1.0)
+
+    def test_window_cache_reuses_entries(self):
+        """Test that windows are built once and reused for identical inputs."""
+        cache = WindowCache(self.tmp.name)
+        first = cache.get(self.series, 10, 0.2)
+        second = cache.get(self.series, 10, 0.2)
+        self.assertEqual(first, second)
+        X_train = np.load(first['X_train'])
+        y_val = np.load(first['y_val'])
+        self.assertEqual(X_train.shape[1:], (10, 1))
+        self.assertEqual(len(X_train) + len(y_val), len(self.series) - 10)
+
+    def test_successive_halving_prunes_configurations(self):
+        """Test that only the best configurations reach the final budget."""
+        tuner = HyperparameterTuner(
+            self.series,
+            search_space={'lstm_units': [(8, 4)], 'dropout_rate': [0.1],
+                          'learning_rate': [0.1, 0.01, 0.001, 0.0001]},
+            sequence_length=10, min_epochs=1, max_epochs=9, reduction_factor=2,
+            max_workers=1, cache_dir=self.tmp.name, trial_function=fake_trial
+        )
+        self.assertEqual(tuner.rung_budgets(), [1, 2, 4, 8, 9])
+        leaderboard = tuner.run()
+        self.assertEqual(leaderboard[0]['params']['learning_rate'], 0.0001)
+        self.assertEqual(leaderboard[0]['epochs_trained'], 9)
+        self.assertEqual(leaderboard[-1]['epochs_trained'], 1)
+
+        path = os.path.join(self.tmp.name, 'leaderboard.json')
+        tuner.write_leaderboard(path)
+        with open(path) as f:
+            entry = json.load(f)['leaderboard'][0]
+        self.assertIn('validation_metrics', entry)
+        self.assertIn('training_samples', entry['training_metrics'])
+
+
+if __name__ == "__main__":
+    unittest.main()
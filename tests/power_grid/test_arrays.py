@@ -0,0 +1,67 @@
+import sys
+import os
+import unittest
+import numpy as np
+
+# Add parent directory to path to import from modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from power_grid.grid import Node, Line, PowerGrid
+from power_grid.arrays import ArrayGrid
+
+
+def build_grid():
+    """Build the 3-node, 2-line example grid with an extra isolated node."""
+    grid = PowerGrid()
+    nodes = [Node("N1", 230.0), Node("N2", 115.0), Node("N3", 0.0), Node("N4", 10.0)]
+    for node in nodes:
+        grid.add_node(node)
+    grid.add_line(Line("L1", nodes[0], nodes[1], 10.0))
+    grid.add_line(Line("L2", nodes[1], nodes[2], 5.0))
+    return grid
+
+
+class TestArrayGrid(unittest.TestCase):
+    """Tests for the column-oriented grid representation."""
+
+    def test_matches_object_grid(self):
+        """Test that currents and validation match the PowerGrid results."""
+        grid = build_grid()
+        array_grid = ArrayGrid.from_power_grid(grid)
+        self.assertEqual(array_grid.calculate_all_currents(), grid.calculate_all_currents())
+        self.assertEqual(array_grid.validate_grid(), grid.validate_grid())
+        self.assertAlmostEqual(array_grid.total_power(), 11.5 ** 2 * 10.0 + 23.0 ** 2 * 5.0)
+
+    def test_round_trip(self):
+        """Test conversion back to an object-based grid."""
+        grid = ArrayGrid.from_power_grid(build_grid()).to_power_grid()
+        self.assertEqual(grid.get_line("L2").to_node.node_id, "N3")
+        self.assertEqual(grid.get_node("N4").voltage, 10.0)
+
+    def test_arrays_round_trip(self):
+        """Test conversion to plain arrays and back, without copying numeric columns."""
+        array_grid = ArrayGrid.from_power_grid(build_grid())
+        arrays = array_grid.to_arrays()
+        self.assertEqual(arrays["node_ids"].dtype.kind, "U")
+        restored = ArrayGrid.from_arrays(arrays)
+        self.assertEqual(restored.node_ids, ["N1", "N2", "N3", "N4"])
+        self.assertIs(type(restored.line_ids[0]), str)
+        self.assertTrue(np.shares_memory(restored.voltages, arrays["voltages"]))
+        self.assertEqual(restored.calculate_all_currents(), array_grid.calculate_all_currents())
+
+    def test_invalid_columns(self):
+        """Test that invalid values and references are rejected."""
+        with self.assertRaises(ValueError):
+            ArrayGrid.from_columns(["N1", "N2"], [1.0, 2.0], ["L1"], ["N1"], ["N9"], [1.0])
+        with self.assertRaises(ValueError):
+            ArrayGrid(["N1", "N2"], [1.0, 2.0], ["L1"], [0], [1], [0.0])
+        with self.assertRaises(ValueError):
+            ArrayGrid(["N1", "N2"], [-1.0, 2.0], ["L1"], [0], [1], [1.0])
+        with self.assertRaises(ValueError):
+            ArrayGrid(["N1", "N2"], [1.0, 2.0], ["L1"], [0], [2], [1.0])
+        with self.assertRaises(ValueError):
+            ArrayGrid(["N1", "N1"], np.zeros(2), [], [], [], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
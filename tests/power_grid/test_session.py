@@ -0,0 +1,91 @@
+import sys
+import os
+import time
+import unittest
+
+# Add parent directory to path to import from modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from power_grid.grid import Node, Line, PowerGrid
+from power_grid.session import GridSession, GridSessionStore
+
+
+def build_grid():
+    """Build the 3-node, 2-line example grid."""
+    grid = PowerGrid()
+    nodes = [Node("N1", 230.0), Node("N2", 115.0), Node("N3", 0.0)]
+    for node in nodes:
+        grid.add_node(node)
+    grid.add_line(Line("L1", nodes[0], nodes[1], 10.0))
+    grid.add_line(Line("L2", nodes[1], nodes[2], 5.0))
+    return grid
+
+
+class TestGridSession(unittest.TestCase):
+    """Tests for incrementally updated grid sessions."""
+
+    def test_voltage_delta_updates_incident_lines(self):
+        """Test that a voltage change recomputes only the lines at that node."""
+        session = GridSession(build_grid())
+        changed = session.apply_delta(voltages={"N3": 15.0})
+        self.assertEqual(changed, {"L2": (115.0 - 15.0) / 5.0})
+        self.assertEqual(session.currents()["L1"], 11.5)
+
+    def test_total_power_matches_full_recalculation(self):
+        """Test that incremental losses equal a full P = I²R recomputation."""
+        session = GridSession(build_grid())
+        session.apply_delta(voltages={"N2": 100.0}, resistances={"L1": 20.0})
+        expected = sum(current ** 2 * session.grid.get_line(line_id).resistance
+                       for line_id, current in session.grid.calculate_all_currents().items())
+        self.assertAlmostEqual(session.total_power, expected)
+
+    def test_invalid_delta_is_rejected_atomically(self):
+        """Test that a bad value leaves the session unchanged."""
+        session = GridSession(build_grid())
+        with self.assertRaises(ValueError):
+            session.apply_delta(voltages={"N1": 240.0}, resistances={"L2": 0.0})
+        self.assertEqual(session.grid.get_node("N1").voltage, 230.0)
+        with self.assertRaises(KeyError):
+            session.apply_delta(voltages={"N9": 1.0})
+
+    def test_validate_reports_isolated_nodes(self):
+        """Test validation against the resident grid."""
+        grid = build_grid()
+        grid.add_node(Node("N4", 50.0))
+        self.assertEqual(GridSession(grid).validate(), grid.validate_grid())
+
+
+class TestGridSessionStore(unittest.TestCase):
+    """Tests for bounded session storage."""
+
+    def test_lru_eviction(self):
+        """Test that the least recently used session is evicted at capacity."""
+        store = GridSessionStore(max_sessions=2)
+        first, _ = store.create(build_grid())
+        second, _ = store.create(build_grid())
+        store.get(first)
+        store.create(build_grid())
+        self.assertIsNotNone(store.get(first))
+        self.assertIsNone(store.get(second))
+
+    def test_idle_eviction(self):
+        """Test that idle sessions expire."""
+        store = GridSessionStore(idle_timeout=0.01)
+        session_id, _ = store.create(build_grid())
+        time.sleep(0.02)
+        self.assertIsNone(store.get(session_id))
+        self.assertEqual(len(store), 0)
+
+    def test_removal_callback(self):
+        """Test that deleted and evicted sessions are reported."""
+        removed = []
+        store = GridSessionStore(max_sessions=1, on_remove=removed.append)
+        first, _ = store.create(build_grid())
+        second, _ = store.create(build_grid())
+        self.assertTrue(store.delete(second))
+        self.assertFalse(store.delete(second))
+        self.assertEqual(removed, [first, second])
+
+
+if __name__ == "__main__":
+    unittest.main()
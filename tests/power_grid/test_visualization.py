@@ -0,0 +1,80 @@
+import sys
+import os
+import unittest
+
+# Add parent directory to path to import from modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from power_grid.visualization import GridSnapshot, VisualizationStore, load_visualization_data
+
+SAMPLE_GRID = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                           'test_data', 'sample_grid.json')
+
+
+class TestGridSnapshot(unittest.TestCase):
+    """Tests for the precomputed visualization snapshot."""
+
+    def setUp(self):
+        self.nodes, self.links = load_visualization_data(SAMPLE_GRID)
+        self.snapshot = GridSnapshot(self.nodes, self.links, version=1)
+
+    def test_full_view_matches_input(self):
+        """Test that the full view lists every node with Ohm's Law currents."""
+        view = self.snapshot.view()
+        self.assertEqual(len(view["nodes"]), len(self.nodes))
+        self.assertEqual(len(view["links"]), len(self.links))
+        link = view["links"][0]
+        source = next(n for n in self.nodes if n["id"] == link["source"])
+        target = next(n for n in self.nodes if n["id"] == link["target"])
+        self.assertAlmostEqual(link["current"], (source["voltage"] - target["voltage"]) / link["resistance"])
+
+    def test_pages_cover_every_node_and_link_once(self):
+        """Test that paging splits nodes and links without overlap."""
+        pages = [self.snapshot.view(offset=offset, limit=5) for offset in range(0, len(self.nodes), 5)]
+        node_ids = [n["id"] for page in pages for n in page["nodes"]]
+        link_ids = [l["id"] for page in pages for l in page["links"]]
+        self.assertEqual(sorted(node_ids), sorted(n["id"] for n in self.nodes))
+        self.assertEqual(sorted(link_ids), sorted(l["id"] for l in self.links))
+
+    def test_substation_clusters(self):
+        """Test that clusters partition the nodes and merge parallel links."""
+        view = self.snapshot.view(lod="substation")
+        self.assertEqual(sum(n["count"] for n in view["nodes"]), len(self.nodes))
+        self.assertTrue(all(n["id"].startswith("cluster:SUB") for n in view["nodes"]))
+        for link in view["links"]:
+            self.assertNotEqual(link["source"], link["target"])
+
+    def test_viewport_filter(self):
+        """Test that only nodes inside the viewport, and links between them, are returned."""
+        bbox = (34.0, -118.35, 34.12, -118.2)
+        view = self.snapshot.view(bbox=bbox)
+        inside = {n["id"] for n in self.nodes
+                  if bbox[0] <= n["lat"] <= bbox[2] and bbox[1] <= n["lng"] <= bbox[3]}
+        self.assertEqual({n["id"] for n in view["nodes"]}, inside)
+        for link in view["links"]:
+            self.assertIn(link["source"], inside)
+            self.assertIn(link["target"], inside)
+
+    def test_geographic_zoom_changes_cluster_count(self):
+        """Test that zooming out merges geographic cells."""
+        coarse = self.snapshot.view(lod="geographic", zoom=2)
+        fine = self.snapshot.view(lod="geographic", zoom=14)
+        self.assertEqual(coarse["total_nodes"], 1)
+        self.assertGreater(fine["total_nodes"], coarse["total_nodes"])
+
+    def test_views_are_memoized_and_tagged(self):
+        """Test that views are cached and ETags differ per view and version."""
+        self.assertIs(self.snapshot.view(lod="substation"), self.snapshot.view(lod="substation"))
+        self.assertNotEqual(self.snapshot.view_etag(), self.snapshot.view_etag(lod="substation"))
+        self.assertEqual(self.snapshot.view_etag(zoom=3), self.snapshot.view_etag(zoom=4))
+        store = VisualizationStore(lambda: (self.nodes, self.links))
+        first = store.snapshot
+        second = store.publish(self.nodes, self.links)
+        self.assertEqual(second.version, first.version + 1)
+        self.assertNotEqual(first.view_etag(), second.view_etag())
+        with self.assertRaises(ValueError):
+            self.snapshot.view(lod="street")
+
+
+if __name__ == '__main__':
+    unittest.main()